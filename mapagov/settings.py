@@ -568,3 +568,58 @@ except Exception:
             "Redis indisponivel. Cache LocMemCache ativo em producao. "
             "Configure REDIS_HOST para rate limiting distribuido."
         )
+
+# Motor do rate limiting (processos/infra/rate_limit_engine.py)
+# 'auto': GCRA no Redis (script Lua) se o cache default for django-redis,
+# senão em memória do processo; 'redis' | 'local' forçam o motor.
+RATE_LIMIT_ENGINE = os.getenv('RATE_LIMIT_ENGINE', 'auto').lower()
+
+# Configuração do RLS por requisição (processos/infra/rls_middleware.py)
+# 'classico': SET LOCAL/RESET por requisição; 'combinado': 1 set_config só
+# quando o contexto da conexão muda; 'adiado': idem, na primeira query.
+RLS_SETUP_MODE = os.getenv('RLS_SETUP_MODE', 'classico').lower()
+RLS_ORGAO_CACHE_SECONDS = int(os.getenv('RLS_ORGAO_CACHE_SECONDS', '300'))
+
+# Snapshots/versões de POP (processos/infra/snapshot_store.py): keyframe
+# completo a cada N versões da cadeia; as demais guardam só o delta (zstd)
+POP_SNAPSHOT_KEYFRAME_INTERVAL = int(os.getenv('POP_SNAPSHOT_KEYFRAME_INTERVAL', '10'))
+
+# Auditoria assíncrona (processos/infra/audit_sink.py)
+# AuditLog/SecurityEvent vão para uma fila no processo e são gravados em lote
+# por uma thread; SecurityEvent com severidade em AUDIT_SYNC_SEVERITIES é
+# gravado na hora. Overflow: 'sincrono' | 'descartar_novo' | 'descartar_antigo'.
+AUDIT_ASYNC = os.getenv('AUDIT_ASYNC', 'False').lower() in ('true', '1', 'yes')
+AUDIT_SINK_MAX_QUEUE = int(os.getenv('AUDIT_SINK_MAX_QUEUE', '10000'))
+AUDIT_SINK_BATCH_SIZE = int(os.getenv('AUDIT_SINK_BATCH_SIZE', '200'))
+AUDIT_SINK_FLUSH_SECONDS = float(os.getenv('AUDIT_SINK_FLUSH_SECONDS', '1'))
+AUDIT_SINK_OVERFLOW = os.getenv('AUDIT_SINK_OVERFLOW', 'sincrono').lower()
+AUDIT_SYNC_SEVERITIES = ('high', 'critical')
+
+# Cache de PDFs renderizados (processos/infra/pdf_render_cache.py)
+# LRU em disco local; incrementar PDF_TEMPLATE_VERSION ao mudar o layout
+# invalida os PDFs já gerados.
+PDF_CACHE_DIR = os.getenv('PDF_CACHE_DIR', str(MEDIA_ROOT / 'pdf_cache'))
+PDF_CACHE_MAX_BYTES = int(os.getenv('PDF_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+PDF_CACHE_LOW_WATERMARK = 0.9
+PDF_TEMPLATE_VERSION = os.getenv('PDF_TEMPLATE_VERSION', '1')
+
+# Exports fora da requisição (processos/infra/export_jobs.py)
+# ?async=1 nos endpoints de PDF/DOCX responde 202 + job id. Worker:
+# `manage.py run_export_jobs` e/ou EXPORT_JOBS_THREADS threads no processo web.
+EXPORT_JOBS_DEFAULT_ASYNC = os.getenv('EXPORT_JOBS_DEFAULT_ASYNC', 'False').lower() in ('true', '1', 'yes')
+EXPORT_JOBS_THREADS = int(os.getenv('EXPORT_JOBS_THREADS', '0'))
+EXPORT_JOBS_DIR = os.getenv('EXPORT_JOBS_DIR', str(MEDIA_ROOT / 'export_jobs'))
+EXPORT_JOBS_MAX_PENDING_PER_USER = int(os.getenv('EXPORT_JOBS_MAX_PENDING_PER_USER', '5'))
+EXPORT_JOBS_MAX_RUNNING_PER_USER = int(os.getenv('EXPORT_JOBS_MAX_RUNNING_PER_USER', '1'))
+EXPORT_JOBS_MAX_ATTEMPTS = int(os.getenv('EXPORT_JOBS_MAX_ATTEMPTS', '3'))
+EXPORT_JOBS_RETRY_BASE_SECONDS = 5
+EXPORT_JOBS_LEASE_SECONDS = 300
+EXPORT_JOBS_POLL_SECONDS = 2.0
+
+# Write-behind de mensagens de chat (opcional)
+# Mensagens vão para um buffer no Redis e são gravadas em lote no PostgreSQL
+# por um flusher (thread no processo + `manage.py flush_chat_buffer`).
+# Sem Redis, o SessionManager grava direto no banco (modo síncrono).
+CHAT_WRITE_BEHIND = os.getenv('CHAT_WRITE_BEHIND', 'False').lower() in ('true', '1', 'yes')
+CHAT_WRITE_BEHIND_FLUSH_SECONDS = float(os.getenv('CHAT_WRITE_BEHIND_FLUSH_SECONDS', '2'))
+CHAT_WRITE_BEHIND_BATCH_SIZE = int(os.getenv('CHAT_WRITE_BEHIND_BATCH_SIZE', '500'))
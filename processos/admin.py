@@ -29,7 +29,12 @@ class POPAdmin(admin.ModelAdmin):
 class PopVersionAdmin(admin.ModelAdmin):
     list_display = ('pop', 'versao', 'is_current', 'published_at', 'published_by')
     list_filter = ('is_current',)
-    readonly_fields = ('payload', 'integrity_hash')
+    readonly_fields = ('payload_completo', 'integrity_hash', 'blob')
+    exclude = ('payload',)
+
+    @admin.display(description='Dados completos congelados')
+    def payload_completo(self, obj):
+        return obj.obter_payload()
 
 
 @admin.register(UserProfile)
@@ -363,10 +363,10 @@ def finalizar_analise(request, analise_id):
 
         # Criar snapshot de finalizacao
         ultima_versao = AnaliseSnapshot.objects.filter(analise=analise).count()
-        AnaliseSnapshot.objects.create(
+        AnaliseSnapshot.criar_com_payload(
+            {"status": "FINALIZADA"}, {'analise': analise},
             analise=analise,
             versao=ultima_versao + 1,
-            dados_completos={"status": "FINALIZADA"},
             motivo_snapshot=MotivoSnapshot.FINALIZACAO,
             criado_por=user,
         )
@@ -753,13 +753,14 @@ def salvar_contexto_v2(request, analise_id):
         # Se ja existir contexto, criar snapshot antes de atualizar
         if contexto_atual and contexto_atual != {}:
             ultima_versao = AnaliseSnapshot.objects.filter(analise=analise).count()
-            AnaliseSnapshot.objects.create(
-                analise=analise,
-                versao=ultima_versao + 1,
-                dados_completos={
+            AnaliseSnapshot.criar_com_payload(
+                {
                     "contexto_estruturado": contexto_atual,
                     "etapa_atual": analise.etapa_atual,
                 },
+                {'analise': analise},
+                analise=analise,
+                versao=ultima_versao + 1,
                 motivo_snapshot=MotivoSnapshot.EDICAO_CONTEXTO,
                 criado_por=user,
             )
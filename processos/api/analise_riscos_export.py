@@ -21,8 +21,10 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
-from processos.models_analise_riscos import AnaliseRiscos
+from processos.models_analise_riscos import AnaliseRiscos, AnaliseSnapshot
 from processos.infra.rate_limiting import rate_limit_user
+from processos.infra.export_jobs import ErroTarefaDefinitivo, pedido_assincrono
+from processos.api.export_jobs_api import responder_export_assincrono
 from processos.api.export_helpers import (
     get_snapshot_para_export,
     verificar_desatualizacao,
@@ -2071,16 +2073,42 @@ def gerar_pdf(analise: AnaliseRiscos) -> io.BytesIO:
 # ENDPOINT
 # =============================================================================
 
+CONTENT_TYPES = {
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'pdf': 'application/pdf',
+}
+
+
+def _renderizar(formato: str, data: Dict[str, Any], snap, desatualizado: bool) -> bytes:
+    renderer = render_docx if formato == 'docx' else render_pdf
+    return renderer(data, snap, desatualizado).getvalue()
+
+
+def tarefa_exportar_analise(parametros: Dict[str, Any]):
+    """Tarefa de ExportJob 'analise_export' (ver processos/infra/export_jobs.py)."""
+    snap = AnaliseSnapshot.objects.filter(
+        id=parametros['snapshot_id'], analise_id=parametros['analise_id']
+    ).first()
+    if not snap:
+        raise ErroTarefaDefinitivo("Snapshot da analise nao encontrado")
+
+    formato = parametros['formato']
+    conteudo = _renderizar(formato, snap.obter_payload(), snap, parametros.get('desatualizado', False))
+    return conteudo, f"analise_riscos_{parametros['analise_id']}.{formato}", CONTENT_TYPES[formato]
+
+
 @api_view(["GET"])
 @permission_classes([AllowAny])  # PROVISORIO: liberado para teste
 @rate_limit_user(limit=10, window=60)
 def exportar_analise(request, analise_id):
     """
     GET /api/analise-riscos/<id>/exportar/?formato=pdf|docx
+    GET /api/analise-riscos/<id>/exportar/?formato=pdf&async=1  → 202 + job id
 
     Exporta analise.
 
-    - Autenticado: usa snapshot (persiste se necessario)
+    - Autenticado: usa snapshot (persiste se necessario); com ?async=1 a
+      renderizacao do snapshot vira ExportJob
     - Anonimo: stateless (zero writes, gera em memoria)
     """
     try:
@@ -2094,6 +2122,8 @@ def exportar_analise(request, analise_id):
             return Response({"erro": "Analise nao encontrada"}, status=404)
 
         formato = request.GET.get('formato', 'pdf').lower()
+        if formato not in CONTENT_TYPES:
+            return Response({"erro": f"Formato '{formato}' nao suportado. Use 'pdf' ou 'docx'."}, status=400)
 
         # === STATELESS para anonimo (ZERO WRITES) ===
         if not getattr(request.user, "is_authenticated", False):
@@ -2104,29 +2134,23 @@ def exportar_analise(request, analise_id):
         else:
             # Fluxo normal: usa/cria snapshot
             snap = get_snapshot_para_export(analise, request.user)
-            data = snap.dados_completos
             desatualizado = verificar_desatualizacao(analise, snap)
 
-        if formato == 'docx':
-            buffer = render_docx(data, snap, desatualizado)
-            response = HttpResponse(
-                buffer.getvalue(),
-                content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            )
-            response['Content-Disposition'] = f'attachment; filename="analise_riscos_{analise_id}.docx"'
-            return response
-
-        elif formato == 'pdf':
-            buffer = render_pdf(data, snap, desatualizado)
-            response = HttpResponse(
-                buffer.getvalue(),
-                content_type='application/pdf'
-            )
-            response['Content-Disposition'] = f'attachment; filename="analise_riscos_{analise_id}.pdf"'
-            return response
+            if pedido_assincrono(request):
+                return responder_export_assincrono(request, 'analise_export', {
+                    'analise_id': str(analise.id),
+                    'snapshot_id': str(snap.id),
+                    'formato': formato,
+                    'desatualizado': desatualizado,
+                })
+            data = snap.obter_payload()
 
-        else:
-            return Response({"erro": f"Formato '{formato}' nao suportado. Use 'pdf' ou 'docx'."}, status=400)
+        response = HttpResponse(
+            _renderizar(formato, data, snap, desatualizado),
+            content_type=CONTENT_TYPES[formato]
+        )
+        response['Content-Disposition'] = f'attachment; filename="analise_riscos_{analise_id}.{formato}"'
+        return response
 
     except ImportError as e:
         logger.exception("Biblioteca de exportacao nao instalada")
@@ -0,0 +1,106 @@
+"""
+Classificação em lote de atividades (Helena POP - Camadas 1 e 2).
+
+POST /api/busca-atividade/lote/
+    {"area_codigo": "CGBEN", "descricoes": ["...", "..."], "top_k": 3}
+
+Resposta JSON (padrão):
+    {"area_codigo": "CGBEN", "total": 2, "resultados": [{...}, {...}]}
+
+Resposta JSON Lines (?formato=jsonl ou Accept: application/x-ndjson):
+    1 objeto por linha, emitido à medida que cada bloco é classificado.
+"""
+import json
+import logging
+import threading
+
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework import status
+
+from processos.infra.rate_limiting import rate_limit_user
+
+logger = logging.getLogger(__name__)
+
+MAX_LINHAS_LOTE = 2000
+MAX_TOP_K = 10
+CONTENT_TYPE_JSONL = "application/x-ndjson"
+
+# Pipeline compartilhado (CSVs carregados 1x por worker)
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def _get_pipeline():
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                from processos.domain.helena_mapeamento.busca_atividade_pipeline import BuscaAtividadePipeline
+                _pipeline = BuscaAtividadePipeline()
+    return _pipeline
+
+
+def _quer_jsonl(request) -> bool:
+    formato = (request.GET.get("formato") or "").lower()
+    return formato == "jsonl" or CONTENT_TYPE_JSONL in request.META.get("HTTP_ACCEPT", "")
+
+
+@api_view(["POST"])
+@rate_limit_user(limit=10, window=60)
+def classificar_lote(request):
+    """
+    Classifica uma lista de descrições de atividade contra a arquitetura DECIPEX.
+
+    Respostas:
+        200: resultados por linha (JSON ou JSON Lines)
+        400: payload inválido ou lote acima de MAX_LINHAS_LOTE
+    """
+    data = request.data
+    area_codigo = (data.get("area_codigo") or "").strip()
+    descricoes = data.get("descricoes")
+
+    if not area_codigo:
+        return Response(
+            {"erro": "campo 'area_codigo' é obrigatório", "codigo": "AREA_OBRIGATORIA"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if not isinstance(descricoes, list) or not all(isinstance(d, str) for d in descricoes):
+        return Response(
+            {"erro": "campo 'descricoes' deve ser uma lista de textos", "codigo": "DESCRICOES_INVALIDAS"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if len(descricoes) > MAX_LINHAS_LOTE:
+        return Response(
+            {"erro": f"máximo de {MAX_LINHAS_LOTE} descrições por lote", "codigo": "LOTE_EXCEDIDO"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        top_k = min(max(int(data.get("top_k", 3)), 1), MAX_TOP_K)
+    except (TypeError, ValueError):
+        top_k = 3
+
+    autor_dados = None
+    if request.user.is_authenticated:
+        autor_dados = {"nome": request.user.get_full_name() or request.user.username}
+
+    pipeline = _get_pipeline()
+    logger.info(f"[LOTE] {len(descricoes)} descrições | área={area_codigo} | top_k={top_k}")
+
+    if _quer_jsonl(request):
+        linhas = pipeline.iterar_atividades_lote(descricoes, area_codigo, autor_dados, top_k)
+        return StreamingHttpResponse(
+            (json.dumps(linha, ensure_ascii=False) + "\n" for linha in linhas),
+            content_type=CONTENT_TYPE_JSONL,
+        )
+
+    resultados = pipeline.buscar_atividades_lote(descricoes, area_codigo, autor_dados, top_k)
+    return Response({
+        "area_codigo": area_codigo,
+        "total": len(resultados),
+        "resultados": resultados,
+    })
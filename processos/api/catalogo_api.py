@@ -425,10 +425,10 @@ class POPViewSet(viewsets.ModelViewSet):
             pop.review_snapshot = None
             pop.save()
 
-            version = PopVersion.objects.create(
+            version = PopVersion.criar_com_payload(
+                pop.get_dados_completos(), {'pop': pop},
                 pop=pop,
                 versao=pop.versao,
-                payload=pop.get_dados_completos(),
                 integrity_hash=pop.integrity_hash,
                 published_by=request.user,
                 motivo=motivo,
@@ -543,7 +543,7 @@ class POPViewSet(viewsets.ModelViewSet):
     def versions(self, request, uuid=None):
         """GET /api/pops/{uuid}/versions/ — lista versoes publicadas."""
         pop = self.get_object()
-        versions = pop.versions.all()
+        versions = pop.versions.select_related('blob__base')
         serializer = PopVersionSerializer(versions, many=True)
         return Response(serializer.data)
 
@@ -646,6 +646,7 @@ class POPViewSet(viewsets.ModelViewSet):
 
         # Inicializar SM no estado REVISAO_FINAL para o clone
         from processos.domain.helena_mapeamento.helena_pop import POPStateMachine, EstadoPOP
+        from processos.infra.helena_state_store import HelenaStateStore
 
         sm = POPStateMachine()
         sm.estado = EstadoPOP.REVISAO_FINAL
@@ -676,9 +677,9 @@ class POPViewSet(viewsets.ModelViewSet):
         if hasattr(sm, "dados_interface"):
             sm.dados_interface = {}
 
-        session_key = f"helena_pop_state_{new_session_id}"
-        request.session[session_key] = sm.to_dict()
-        request.session.modified = True
+        state_store = HelenaStateStore(request.session)
+        state_store.salvar(new_session_id, sm.to_dict())
+        session_key = state_store.chave(new_session_id)
 
         logger.info(
             "[CLONE-SM] State machine gravada: session_key=%s, estado=%s",
@@ -747,6 +748,7 @@ class POPViewSet(viewsets.ModelViewSet):
 
         # Inicializar SM no estado REVISAO_FINAL (mesmo padrao do clone)
         from processos.domain.helena_mapeamento.helena_pop import POPStateMachine, EstadoPOP
+        from processos.infra.helena_state_store import HelenaStateStore
 
         sm = POPStateMachine()
         sm.estado = EstadoPOP.REVISAO_FINAL
@@ -778,9 +780,9 @@ class POPViewSet(viewsets.ModelViewSet):
         if hasattr(sm, "dados_interface"):
             sm.dados_interface = {}
 
-        session_key = f"helena_pop_state_{session_id}"
-        request.session[session_key] = sm.to_dict()
-        request.session.modified = True
+        state_store = HelenaStateStore(request.session)
+        state_store.salvar(session_id, sm.to_dict())
+        session_key = state_store.chave(session_id)
 
         logger.info(
             "[RETOMAR-SM] SM gravada: session_key=%s, estado=%s, pop_uuid=%s",
@@ -885,7 +887,7 @@ def resolve_pop(request):
             'published': True,
             'published_at': version.published_at.isoformat(),
             'integrity_hash': version.integrity_hash,
-            'dados': version.payload,
+            'dados': version.obter_payload(),
         })
 
     # Ultima versao publicada
@@ -902,7 +904,7 @@ def resolve_pop(request):
             'published': True,
             'published_at': current_version.published_at.isoformat(),
             'integrity_hash': current_version.integrity_hash,
-            'dados': current_version.payload,
+            'dados': current_version.obter_payload(),
         })
 
     # Sem versao publicada: retorna dados correntes
@@ -6,19 +6,23 @@ GET /api/areas/{slug}/pops/{codigo}/pdf/?v=3
 
 Fluxo:
   1. Resolve POP por area slug + codigo_processo
-  2. Decide fonte de dados (PopVersion.payload ou POP corrente)
+  2. Decide fonte de dados (PopVersion.obter_payload() ou POP corrente)
   3. Normaliza via preparar_pop_para_pdf()
-  4. Gera PDF via PDFGenerator.gerar_pop_completo()
-  5. Retorna HttpResponse(application/pdf)
+  4. Gera PDF via PDFGenerator.gerar_pop_completo() (ou reaproveita do
+     cache de renderização; ETag/If-None-Match → 304)
+  5. Retorna HttpResponse(application/pdf), ou 202 + job id com ?async=1
+     quando o PDF ainda não está no cache (ver processos/infra/export_jobs.py)
 """
 import logging
-import os
-import tempfile
 
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils.cache import get_conditional_response
 from rest_framework.decorators import api_view
 
+from processos.api.export_jobs_api import responder_export_assincrono
 from processos.export.pop_adapter import preparar_pop_para_pdf
+from processos.infra.export_jobs import ErroTarefaDefinitivo, pedido_assincrono
+from processos.infra.pdf_render_cache import get_pdf_render_cache
 from processos.models import Area, POP, PopVersion
 from processos.utils import PDFGenerator
 
@@ -74,23 +78,19 @@ def _dados_para_pdf(pop, version_payload=None, area=None, versao_label=None, pub
     return preparar_pop_para_pdf(dados)
 
 
-@api_view(['GET'])
-def gerar_pdf_catalogo(request, slug, codigo):
+def _preparar_catalogo(slug, codigo, v_param=None):
     """
-    GET /api/areas/{slug}/pops/{codigo}/pdf/
-    GET /api/areas/{slug}/pops/{codigo}/pdf/?v=3
+    Resolve POP/versão e monta os dados do PDF.
 
-    Gera PDF sob demanda a partir de:
-    - ?v=N  → PopVersion com versao=N
-    - sem v → PopVersion is_current=True (se existir), senão POP corrente
+    Returns:
+        (dados, nome_arquivo, versao_label, None, None) ou
+        (None, None, None, mensagem de erro, status HTTP)
     """
     area, pop, erro = _resolver_pop_e_area(slug, codigo)
     if erro:
-        status = 404
-        return JsonResponse({'error': erro}, status=status)
+        return None, None, None, erro, 404
 
     # Decidir fonte de dados
-    v_param = request.query_params.get('v')
     version = None
     version_payload = None
     versao_label = None
@@ -100,22 +100,19 @@ def gerar_pdf_catalogo(request, slug, codigo):
         try:
             v_int = int(v_param)
         except (ValueError, TypeError):
-            return JsonResponse({'error': 'Parâmetro v deve ser inteiro.'}, status=400)
+            return None, None, None, 'Parâmetro v deve ser inteiro.', 400
 
         version = PopVersion.objects.filter(pop=pop, versao=v_int).first()
         if not version:
-            return JsonResponse(
-                {'error': f'Versão {v_int} não encontrada para este POP.'},
-                status=404,
-            )
-        version_payload = version.payload
+            return None, None, None, f'Versão {v_int} não encontrada para este POP.', 404
+        version_payload = version.obter_payload()
         versao_label = version.versao
         published_at = version.published_at
     else:
         # Preferir versão publicada atual
         version = PopVersion.objects.filter(pop=pop, is_current=True).first()
         if version:
-            version_payload = version.payload
+            version_payload = version.obter_payload()
             versao_label = version.versao
             published_at = version.published_at
 
@@ -129,24 +126,69 @@ def gerar_pdf_catalogo(request, slug, codigo):
     )
 
     if not dados.get('nome_processo'):
-        return JsonResponse(
-            {'error': 'POP sem nome_processo — não é possível gerar PDF.'},
-            status=400,
-        )
+        return None, None, None, 'POP sem nome_processo — não é possível gerar PDF.', 400
 
-    # Gerar PDF em diretório temporário
     v_suffix = f'v{versao_label}' if versao_label else f'v{pop.versao}'
     nome_arquivo = f'POP_{slug}_{codigo.replace(".", "-")}_{v_suffix}.pdf'
+    return dados, nome_arquivo, versao_label, None, None
+
+
+def _gerar_pdf(pdf_cache, chave, dados):
+    # PDFGenerator salva em media/pdfs/; o cache move o arquivo para o seu diretório
+    return pdf_cache.obter_ou_gerar(
+        chave, lambda: PDFGenerator().gerar_pop_completo(dados, f'{chave}.pdf')
+    )
+
+
+def tarefa_pdf_catalogo(parametros):
+    """Tarefa de ExportJob 'catalogo_pdf' (ver processos/infra/export_jobs.py)."""
+    dados, nome_arquivo, _, erro, _ = _preparar_catalogo(
+        parametros['slug'], parametros['codigo'], parametros.get('v')
+    )
+    if erro:
+        raise ErroTarefaDefinitivo(erro)
 
-    generator = PDFGenerator()
-    tmp_dir = tempfile.mkdtemp(prefix='mapagov_pdf_')
-    tmp_path = os.path.join(tmp_dir, nome_arquivo)
+    pdf_cache = get_pdf_render_cache()
+    pdf_path, _ = _gerar_pdf(pdf_cache, pdf_cache.chave(dados), dados)
+    if not pdf_path:
+        raise RuntimeError('PDFGenerator não gerou o arquivo')
+    return str(pdf_path), nome_arquivo, 'application/pdf'
 
-    # PDFGenerator salva em media/pdfs/ por padrão.
-    # Geramos lá e lemos de volta para streaming.
-    pdf_path = generator.gerar_pop_completo(dados, nome_arquivo)
 
-    if not pdf_path or not os.path.exists(pdf_path):
+@api_view(['GET'])
+def gerar_pdf_catalogo(request, slug, codigo):
+    """
+    GET /api/areas/{slug}/pops/{codigo}/pdf/
+    GET /api/areas/{slug}/pops/{codigo}/pdf/?v=3
+    GET /api/areas/{slug}/pops/{codigo}/pdf/?async=1  → 202 + job id
+
+    Gera PDF sob demanda a partir de:
+    - ?v=N  → PopVersion com versao=N
+    - sem v → PopVersion is_current=True (se existir), senão POP corrente
+    """
+    v_param = request.query_params.get('v')
+    dados, nome_arquivo, versao_label, erro, status = _preparar_catalogo(slug, codigo, v_param)
+    if erro:
+        return JsonResponse({'error': erro}, status=status)
+
+    # Mesmo conteúdo = mesmo PDF: cache de renderização + ETag
+    pdf_cache = get_pdf_render_cache()
+    chave = pdf_cache.chave(dados)
+    etag = f'"{chave}"'
+    if get_conditional_response(request, etag=etag) is not None:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    # PDF ainda não renderizado + pedido assíncrono: gera fora da requisição
+    if not pdf_cache.caminho(chave) and pedido_assincrono(request):
+        return responder_export_assincrono(
+            request, 'catalogo_pdf', {'slug': slug, 'codigo': codigo, 'v': v_param}
+        )
+
+    pdf_path, cache_hit = _gerar_pdf(pdf_cache, chave, dados)
+
+    if not pdf_path:
         return JsonResponse(
             {'error': 'Erro ao gerar PDF. Verifique os logs do servidor.'},
             status=500,
@@ -155,19 +197,17 @@ def gerar_pdf_catalogo(request, slug, codigo):
     try:
         with open(pdf_path, 'rb') as f:
             pdf_bytes = f.read()
-    finally:
-        # Limpar arquivo gerado (é sob demanda, não precisa persistir)
-        try:
-            os.remove(pdf_path)
-        except OSError:
-            pass
+    except FileNotFoundError:  # removido pelo LRU entre a geração e a leitura
+        return JsonResponse({'error': 'PDF indisponível, tente novamente.'}, status=503)
 
     response = HttpResponse(pdf_bytes, content_type='application/pdf')
     response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}"'
     response['Content-Length'] = len(pdf_bytes)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
 
     logger.info(
-        f"[catalogo_pdf] PDF gerado: {nome_arquivo} "
+        f"[catalogo_pdf] PDF {'do cache' if cache_hit else 'gerado'}: {nome_arquivo} "
         f"({len(pdf_bytes) / 1024:.1f} KB, version={'v' + str(versao_label) if versao_label else 'corrente'})"
     )
 
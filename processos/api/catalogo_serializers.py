@@ -61,6 +61,7 @@ class PopVersionSerializer(serializers.ModelSerializer):
     published_by_name = serializers.CharField(
         source='published_by.username', default='', read_only=True
     )
+    payload = serializers.SerializerMethodField()
 
     class Meta:
         model = PopVersion
@@ -69,3 +70,6 @@ class PopVersionSerializer(serializers.ModelSerializer):
             'integrity_hash', 'published_by_name', 'payload',
         ]
         read_only_fields = fields
+
+    def get_payload(self, obj):
+        return obj.obter_payload()
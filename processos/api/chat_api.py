@@ -18,6 +18,7 @@ from processos.domain.helena_mapeamento.helena_pop import HelenaPOP
 from processos.domain.helena_mapeamento.helena_mapeamento import HelenaMapeamento
 from processos.domain.helena_planejamento_estrategico import HelenaPlanejamentoEstrategico
 from processos.infra.rate_limiting import rate_limit_user  # FASE 2: Rate limiting
+from processos.infra.session_manager import SessaoDesatualizada
 # Importar outros produtos conforme necessário
 
 logger = logging.getLogger(__name__)
@@ -41,8 +42,8 @@ def get_helena_core() -> HelenaCore:
         # antigas que usam contexto 'etapas'. Com ETAPAS_INLINE=true (default),
         # novas sessões coletam etapas direto dentro do HelenaPOP.
         registry = {
-            'pop': HelenaPOP(),
-            'etapas': HelenaEtapas(),
+            'pop': HelenaPOP.instancia(),
+            'etapas': HelenaEtapas.instancia(),
             'mapeamento': HelenaMapeamento(),
             'planejamento_estrategico': HelenaPlanejamentoEstrategico(),
             # 'fluxograma': HelenaFluxograma(),
@@ -166,6 +167,16 @@ def chat_v2(request):
     except json.JSONDecodeError:
         return JsonResponse({'error': 'Invalid JSON payload'}, status=400)
 
+    except SessaoDesatualizada as e:
+        # Outro turno da mesma sessão gravou primeiro; o cliente reenvia a mensagem
+        logger.warning(f"Turno concorrente no chat_v2: {e}")
+        return JsonResponse({
+            'erro': 'A sessão foi atualizada por outra requisição. Tente novamente.',
+            'code': 'session_conflict',
+            'retryable': True,
+            'session_id': session_id,
+        }, status=409)
+
     except ValueError as e:
         logger.warning(f"Erro de validação no chat_v2: {e}")
         return JsonResponse({
@@ -605,10 +605,10 @@ def criar_snapshot(
     dados["criado_por_tipo"] = criado_por_tipo
 
     # Cria snapshot
-    snapshot = AnaliseSnapshot.objects.create(
+    snapshot = AnaliseSnapshot.criar_com_payload(
+        dados, {'analise': analise},
         analise=analise,
         versao=proxima_versao,
-        dados_completos=dados,
         motivo_snapshot=motivo,
         correlation_id=correlation_id,
         criado_por=user,
@@ -622,7 +622,7 @@ def _snapshot_invalido(snapshot: AnaliseSnapshot, analise: AnaliseRiscos) -> boo
     Verifica se snapshot esta invalido/incompleto para export.
 
     Criterios:
-    - dados_completos nao existe ou nao e dict
+    - payload nao existe ou nao e dict
     - nao tem schema_version (snapshot antigo/ruim)
     - nao tem riscos
     - riscos vazio mas analise tem riscos no model
@@ -634,7 +634,7 @@ def _snapshot_invalido(snapshot: AnaliseSnapshot, analise: AnaliseRiscos) -> boo
     Returns:
         True se snapshot invalido, False se OK
     """
-    data = snapshot.dados_completos or {}
+    data = snapshot.obter_payload() or {}
 
     if not isinstance(data, dict) or not data:
         return True
@@ -697,7 +697,7 @@ def verificar_desatualizacao(analise: AnaliseRiscos, snapshot: AnaliseSnapshot)
     Returns:
         True se houver alteracoes apos o snapshot
     """
-    fonte_estado_em = snapshot.dados_completos.get("fonte_estado_em")
+    fonte_estado_em = (snapshot.obter_payload() or {}).get("fonte_estado_em")
 
     if not fonte_estado_em:
         return True  # Sem data = considera desatualizado
@@ -0,0 +1,106 @@
+"""
+API de jobs de exportação (PDF/DOCX gerados fora da requisição).
+
+GET /api/export-jobs/<id>/            status do job
+GET /api/export-jobs/<id>/resultado/  arquivo gerado (status 'done')
+
+Só o dono do job (usuário ou sessão que o criou) enxerga o job.
+"""
+import logging
+
+from django.http import FileResponse, JsonResponse
+from django.views.decorators.http import require_http_methods
+
+from processos.infra.export_jobs import LimiteJobsExcedido, dono_da_requisicao, enfileirar
+from processos.models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+
+def _urls(job):
+    return {
+        'status_url': f'/api/export-jobs/{job.pk}/',
+        'resultado_url': f'/api/export-jobs/{job.pk}/resultado/',
+    }
+
+
+def resposta_job_aceito(job):
+    """202 Accepted com o id e as URLs de acompanhamento do job."""
+    response = JsonResponse({
+        'success': True,
+        'job_id': str(job.pk),
+        'status': job.status,
+        **_urls(job),
+    }, status=202)
+    response['Location'] = _urls(job)['status_url']
+    return response
+
+
+def responder_export_assincrono(request, tipo, parametros):
+    """Enfileira um ExportJob e responde 202 (429 no limite por usuário)."""
+    dono = dono_da_requisicao(request)
+    if dono is None:
+        return JsonResponse({'success': False, 'error': 'Sessão necessária para export assíncrono.'}, status=400)
+    try:
+        job = enfileirar(tipo, parametros, dono, usuario=request.user)
+    except LimiteJobsExcedido:
+        response = JsonResponse({
+            'success': False,
+            'error': 'Muitos exports em andamento. Aguarde a conclusão dos anteriores.',
+        }, status=429)
+        response['Retry-After'] = '10'
+        return response
+    return resposta_job_aceito(job)
+
+
+def _job_do_dono(request, job_id):
+    dono = dono_da_requisicao(request)
+    return ExportJob.objects.filter(pk=job_id, dono=dono).first() if dono else None
+
+
+@require_http_methods(["GET"])
+def status_export_job(request, job_id):
+    job = _job_do_dono(request, job_id)
+    if not job:
+        return JsonResponse({'success': False, 'error': 'Job não encontrado.'}, status=404)
+
+    dados = {
+        'success': True,
+        'job_id': str(job.pk),
+        'tipo': job.tipo,
+        'status': job.status,
+        'tentativas': job.tentativas,
+        'criado_em': job.criado_em.isoformat(),
+        'concluido_em': job.concluido_em.isoformat() if job.concluido_em else None,
+        'status_url': _urls(job)['status_url'],
+    }
+    if job.status == 'done':
+        dados['resultado_url'] = _urls(job)['resultado_url']
+        dados['arquivo'] = job.resultado_nome
+    elif job.status == 'failed':
+        dados['error'] = 'Não foi possível gerar o arquivo.'
+    return JsonResponse(dados)
+
+
+@require_http_methods(["GET"])
+def resultado_export_job(request, job_id):
+    job = _job_do_dono(request, job_id)
+    if not job:
+        return JsonResponse({'success': False, 'error': 'Job não encontrado.'}, status=404)
+    if job.status != 'done':
+        return JsonResponse({
+            'success': False, 'error': 'Job ainda não concluído.', 'status': job.status,
+        }, status=409)
+
+    try:
+        arquivo = open(job.resultado_arquivo, 'rb')
+    except (FileNotFoundError, OSError):
+        logger.warning(f"[EXPORT JOB] Resultado de {job.pk} não está mais em disco")
+        return JsonResponse({'success': False, 'error': 'Arquivo expirado. Gere novamente.'}, status=410)
+
+    response = FileResponse(
+        arquivo, as_attachment=True, filename=job.resultado_nome,
+        content_type=job.resultado_content_type or 'application/octet-stream',
+    )
+    response['Cache-Control'] = 'no-store'
+    return response
@@ -28,8 +28,8 @@ class HelenaCore:
 
     Uso:
         core = HelenaCore(registry={
-            'etapas': HelenaEtapas(),
-            'pop': HelenaPOP(),
+            'etapas': HelenaEtapas,
+            'pop': HelenaPOP,
         })
         resultado = core.processar_mensagem(
             mensagem="Olá Helena",
@@ -43,8 +43,10 @@ class HelenaCore:
         Inicializa orquestrador.
 
         Args:
-            registry: Dicionário de CLASSES (não instâncias) de produtos Helena
+            registry: Dicionário de produtos Helena (classes ou instâncias)
                       {'etapas': HelenaEtapas, 'pop': HelenaPOP, ...}
+                      Classes viram a instância única do processo
+                      (BaseHelena.instancia()); produtos são stateless.
 
         Raises:
             ValueError: Se registry vazio ou produtos inválidos
@@ -52,7 +54,10 @@ class HelenaCore:
         if not registry:
             raise ValueError("Registry não pode ser vazio")
 
-        self.registry = registry
+        self.registry = {
+            nome: produto.instancia() if isinstance(produto, type) else produto
+            for nome, produto in registry.items()
+        }
         self.session_manager = SessionManager()
 
         logger.info(f"HelenaCore inicializado com {len(registry)} produtos: {list(registry.keys())}")
@@ -71,9 +76,9 @@ class HelenaCore:
         1. Busca/cria sessão (SessionManager)
         2. Detecta mudança de contexto (se necessário)
         3. Delega para produto Helena específico
-        4. Salva mensagens (user + assistant)
-        5. Atualiza estado e cache
-        6. Retorna resposta
+        4. Commit do turno (TurnCommit): estado + mensagens (user + assistant)
+           em 1 transação; Redis em 1 pipeline após o commit
+        5. Retorna resposta
 
         Args:
             mensagem: Texto do usuário
@@ -96,6 +101,7 @@ class HelenaCore:
 
         Raises:
             ValueError: Se mensagem inválida ou sessão com problemas
+            SessaoDesatualizada: Se outro turno gravou a sessão primeiro
         """
         if not mensagem or not isinstance(mensagem, str):
             raise ValueError("Mensagem deve ser uma string não-vazia")
@@ -111,17 +117,21 @@ class HelenaCore:
             user=user
         )
 
+        # Mudanças do turno acumuladas e gravadas juntas (ver TurnCommit)
+        turno = self.session_manager.begin_turn(session)
+
         # 2. Detecta mudança de contexto
         novo_contexto = self._detectar_mudanca_contexto(mensagem, session)
         if novo_contexto and novo_contexto != session.contexto_atual:
             logger.info(f"Mudança de contexto detectada: {session.contexto_atual} → {novo_contexto}")
             session.contexto_atual = novo_contexto
-            session.save(update_fields=['contexto_atual', 'atualizado_em'])
+            turno.mark_dirty('contexto_atual')
 
         # 3. Pega produto Helena ativo
         produto = self.registry.get(session.contexto_atual)
         if not produto:
             logger.error(f"Contexto inválido: {session.contexto_atual}")
+            turno.commit()
             return self._resposta_erro(
                 f"Contexto '{session.contexto_atual}' não encontrado. "
                 f"Disponíveis: {', '.join(self.registry.keys())}",
@@ -151,6 +161,7 @@ class HelenaCore:
                 session_id, session.contexto_atual, req_uuid,
                 type(e).__name__
             )
+            turno.commit()
             return self._resposta_erro(
                 f"Desculpe, ocorreu um erro ao processar sua mensagem. "
                 f"Por favor, tente novamente.",
@@ -163,12 +174,10 @@ class HelenaCore:
         # 7. Atualiza versão do agente
         session.agent_versions[session.contexto_atual] = produto.get_version()
 
-        # 8. Salva no banco
-        session.save(update_fields=['estados', 'agent_versions', 'atualizado_em'])
+        turno.mark_dirty('estados', 'agent_versions')
 
-        # 9. Salva mensagens (idempotência via req_uuid)
-        self.session_manager.save_message(
-            session=session,
+        # 8. Mensagens do turno (idempotência via req_uuid)
+        turno.add_message(
             role='user',
             content=mensagem,
             req_uuid=req_uuid,
@@ -185,8 +194,7 @@ class HelenaCore:
         if resultado.get('dados_interface'):
             metadados_completos['dados_interface'] = resultado['dados_interface']
 
-        self.session_manager.save_message(
-            session=session,
+        turno.add_message(
             role='assistant',
             content=resultado['resposta'],
             req_uuid=resp_uuid,
@@ -194,10 +202,7 @@ class HelenaCore:
             metadados=metadados_completos
         )
 
-        # 10. Incrementa contador e verifica sync
-        self.session_manager.cache.increment_message_count(session_id)
-
-        # 11. Verificar se produto solicitou mudança de contexto
+        # 9. Verificar se produto solicitou mudança de contexto
         metadados = resultado.get('metadados', {})
         if 'mudar_contexto' in metadados:
             novo_contexto = metadados['mudar_contexto']
@@ -220,8 +225,7 @@ class HelenaCore:
 
                     session.agent_versions[novo_contexto] = novo_produto.get_version()
 
-            # Salvar mudanças
-            session.save(update_fields=['contexto_atual', 'estados', 'agent_versions', 'atualizado_em'])
+            turno.mark_dirty('contexto_atual', 'estados', 'agent_versions')
             logger.info(f"[HELENA CORE] Contexto mudado para {novo_contexto}")
 
             # 🎯 NOVO: Processar mensagem de inicialização automática no novo produto
@@ -235,7 +239,6 @@ class HelenaCore:
 
                 # Atualizar estado do novo produto
                 session.estados[novo_contexto] = resultado_init.get('novo_estado', session.estados[novo_contexto])
-                session.save(update_fields=['estados', 'atualizado_em'])
 
                 # ✨ MODIFICAR a resposta para incluir AMBAS as mensagens
                 # Concatenar a mensagem de despedida do produto antigo + primeira pergunta do novo
@@ -251,7 +254,11 @@ class HelenaCore:
                 metadados['contexto_mudou'] = True
                 logger.info(f"[HELENA CORE] Primeira pergunta do {novo_contexto} concatenada à resposta")
 
-        # 12. Monta resposta
+        # 10. Commit do turno: 1 transação (sessão + mensagens em lote),
+        # depois sessão + contador no Redis em 1 pipeline
+        turno.commit()
+
+        # 11. Monta resposta
         response = {
             'resposta': resultado['resposta'],
             'session_id': session_id,
@@ -266,7 +273,7 @@ class HelenaCore:
             }
         }
 
-        # 13. Adiciona interface dinâmica se houver
+        # 12. Adiciona interface dinâmica se houver
         if 'tipo_interface' in resultado:
             response['tipo_interface'] = resultado['tipo_interface']
 
@@ -311,8 +318,11 @@ class HelenaCore:
         session = self.session_manager.get_or_create_session(session_id, user)
         contexto_anterior = session.contexto_atual
 
+        # Via TurnCommit: mantém o cache Redis (autoritativo) atualizado
+        turno = self.session_manager.begin_turn(session)
         session.contexto_atual = novo_contexto
-        session.save(update_fields=['contexto_atual', 'atualizado_em'])
+        turno.mark_dirty('contexto_atual')
+        turno.commit()
 
         produto = self.registry[novo_contexto]
 
@@ -470,9 +480,8 @@ class HelenaCore:
                 f"Disponíveis: {', '.join(self.registry.keys())}"
             )
 
-        # 2. Instanciar produto (classe, não instância)
-        produto_cls = self.registry[contexto]
-        produto = produto_cls()
+        # 2. Produto (instância compartilhada, stateless)
+        produto = self.registry[contexto]
 
         # 3. Processar mensagem
         resultado = produto.processar(mensagem, estado_atual)
@@ -500,8 +509,7 @@ class HelenaCore:
         logger.info(f"[CORE PURO] Transição detectada: {contexto} → {novo_contexto}")
 
         # 6. Inicializar novo produto
-        novo_produto_cls = self.registry[novo_contexto]
-        novo_produto = novo_produto_cls()
+        novo_produto = self.registry[novo_contexto]
 
         # 7. Inicializar estado do novo produto com dados herdados
         try:
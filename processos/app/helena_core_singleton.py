@@ -3,7 +3,8 @@ Singleton do HelenaCore para evitar reinstanciação em cada request.
 
 Responsabilidades:
 - Fornece instância única do HelenaCore
-- Registry de produtos (POP, Etapas, etc.)
+- Registry de produtos (POP, Etapas, etc.) com a instância única de cada
+  produto no processo (BaseHelena.instancia())
 - Sem dependências de Django/Redis (Core puro)
 
 ⚠️ IMPORTANTE - Comportamento em Produção:
@@ -48,8 +49,8 @@ def get_helena_core():
 
     if _core_instance is None:
         _core_instance = HelenaCore(registry={
-            'pop': HelenaPOP,
-            'etapas': HelenaEtapas,
+            'pop': HelenaPOP.instancia(),
+            'etapas': HelenaEtapas.instancia(),
         })
 
     return _core_instance
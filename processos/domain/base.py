@@ -7,6 +7,7 @@ Garante consistência na interface e facilita extensibilidade.
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
 import logging
+import threading
 import time
 
 logger = logging.getLogger(__name__)
@@ -25,16 +26,41 @@ class BaseHelena(ABC):
     1. Ser stateless (sem self.estado)
     2. Receber estado via parâmetro
     3. Retornar novo estado no resultado
+
+    Por isso a instância é compartilhada no processo (instancia()): atributos
+    de self são só recursos somente-leitura (arquitetura, sugestores,
+    pipeline), nunca dados de uma conversa.
     """
 
     VERSION = "1.0.0"  # Versionamento semântico (MAJOR.MINOR.PATCH)
     PRODUTO_NOME = "Helena Base"  # Sobrescrever nas subclasses
     SCHEMA_VERSION = "1.0"  # Versao do contrato de interface (ver ADR-001 §2.10)
 
+    # Classe -> instância única no processo (ver instancia())
+    _instancias: Dict[type, 'BaseHelena'] = {}
+    _instancias_lock = threading.Lock()
+
     def __init__(self):
         """Inicialização básica - não deve conter estado mutável"""
         logger.info(f"Inicializando {self.PRODUTO_NOME} v{self.VERSION}")
 
+    @classmethod
+    def instancia(cls) -> 'BaseHelena':
+        """
+        Retorna a instância do produto compartilhada pelo processo.
+
+        Criada no primeiro uso (thread-safe); as requisições seguintes não
+        pagam o __init__ (CSVs, sugestores, pipeline).
+        """
+        produto = BaseHelena._instancias.get(cls)
+        if produto is None:
+            with BaseHelena._instancias_lock:
+                produto = BaseHelena._instancias.get(cls)
+                if produto is None:
+                    produto = cls()
+                    BaseHelena._instancias[cls] = produto
+        return produto
+
     @abstractmethod
     def processar(self, mensagem: str, session_data: dict) -> dict:
         """
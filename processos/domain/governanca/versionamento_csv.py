@@ -9,11 +9,13 @@ import json
 import logging
 import os
 import shutil
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, Any, List, Tuple
 
 import pandas as pd
+from django.db import transaction
 
 from processos.models_new import AtividadeSugerida, HistoricoAtividade
 
@@ -127,6 +129,86 @@ def atualizar_changelog(
     logger.info(f"[GOVERNANÇA] Changelog atualizado: {versao_nome}")
 
 
+def reindexar_corpus_semantico(
+    csv_path: str = 'documentos_base/Arquitetura_DECIPEX_mapeada.csv'
+) -> bool:
+    """
+    Atualiza o corpus de embeddings após mudança no CSV (build incremental).
+
+    Reaproveita o SentenceTransformer já carregado pelo pipeline (se houver)
+    e invalida o cache do corpus neste worker. Falhas são apenas logadas: a
+    publicação no CSV não depende do índice semântico.
+
+    Returns:
+        bool: True se o corpus foi atualizado
+    """
+    if os.getenv('HELENA_LITE_MODE', 'False').lower() in ('true', '1', 'yes'):
+        logger.info("[GOVERNANÇA] HELENA_LITE_MODE ativo - corpus semântico não atualizado")
+        return False
+
+    try:
+        from processos.domain.helena_mapeamento.busca_atividade_pipeline import (
+            _CORPUS_CACHE, invalidar_corpus_cache,
+        )
+        from processos.infra.corpus_builder import atualizar_corpus
+
+        stats = atualizar_corpus(
+            base_path=os.path.dirname(csv_path) or '.',
+            csv_path=csv_path,
+            model=_CORPUS_CACHE['model'],
+        )
+        invalidar_corpus_cache()
+        logger.info(
+            f"[GOVERNANÇA] Corpus semântico atualizado: {stats['gerados']} vetor(es) gerado(s), "
+            f"{stats['reaproveitados']} reaproveitado(s)"
+        )
+        return True
+    except Exception as e:
+        logger.warning(f"[GOVERNANÇA] Corpus semântico não atualizado (rode scripts/gerar_embeddings_corpus.py): {e}")
+        return False
+
+
+# Reindexação em background: 1 thread por processo, caminhos pendentes coalescidos
+_reindex_lock = threading.Lock()
+_reindex_pendentes = set()
+_reindex_thread = None
+
+
+def agendar_reindexacao_corpus(
+    csv_path: str = 'documentos_base/Arquitetura_DECIPEX_mapeada.csv'
+) -> None:
+    """
+    Reindexa o corpus semântico depois do commit, numa thread daemon.
+
+    O request não espera o build (nem a carga a frio do SentenceTransformer);
+    publicações seguidas enquanto um build roda viram um único build a mais.
+    """
+    transaction.on_commit(lambda: _iniciar_reindexacao(csv_path))
+
+
+def _iniciar_reindexacao(csv_path: str) -> None:
+    global _reindex_thread
+
+    with _reindex_lock:
+        _reindex_pendentes.add(csv_path)
+        if _reindex_thread is not None:
+            return
+        _reindex_thread = threading.Thread(target=_loop_reindexacao, name='corpus-reindex', daemon=True)
+        _reindex_thread.start()
+
+
+def _loop_reindexacao() -> None:
+    global _reindex_thread
+
+    while True:
+        with _reindex_lock:
+            if not _reindex_pendentes:
+                _reindex_thread = None
+                return
+            csv_path = _reindex_pendentes.pop()
+        reindexar_corpus_semantico(csv_path)
+
+
 def injetar_atividade_no_csv(
     atividade: AtividadeSugerida,
     csv_path: str = 'documentos_base/Arquitetura_DECIPEX_mapeada.csv'
@@ -137,8 +219,9 @@ def injetar_atividade_no_csv(
     Fluxo:
     1. Criar versão do CSV atual (backup)
     2. Adicionar nova linha ao CSV
-    3. Atualizar status da atividade para 'publicada'
-    4. Registrar CAP oficial
+    3. Agendar o corpus semântico (incremental, em background após o commit)
+    4. Atualizar status da atividade para 'publicada'
+    5. Registrar CAP oficial
 
     Args:
         atividade: Instância de AtividadeSugerida (status='validada')
@@ -172,6 +255,9 @@ def injetar_atividade_no_csv(
         df_atualizado = pd.concat([df, nova_linha], ignore_index=True)
         df_atualizado.to_csv(csv_path, index=False, encoding='utf-8')
 
+        # 4b. Atividade buscável sem rebuild completo nem redeploy (fora do request)
+        agendar_reindexacao_corpus(csv_path)
+
         # 5. Atualizar status da atividade para 'publicada'
         atividade.status = 'publicada'
         atividade.cap_oficial = atividade.cap_provisorio  # CAP provisório vira oficial
@@ -21,6 +21,13 @@ OTIMIZAÇÃO v4.0:
     - Lazy load com cache global por processo (não por request)
     - Fallback gracioso se arquivos não existirem
 
+OTIMIZAÇÃO v4.2 (hot reload):
+    - Corpus servido como versão imutável (CorpusVersao), trocada por
+      atribuição única quando o fingerprint muda
+    - Rechecagem rate-limited (os.stat, CORPUS_RECHECK_SECONDS)
+    - Cada request fixa a versão no início: requests em andamento terminam
+      com a versão antiga; nenhum restart/redeploy por mudança no catálogo
+
 Autor: Claude Code Agent
 Data: 2025-10-28
 ===============================================================================
@@ -28,28 +35,168 @@ Data: 2025-10-28
 
 import logging
 import os
-import json
+import threading
 import time
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
 from processos.domain.governanca.normalize import normalize_area_prefix, normalize_numero_csv, resolve_prefixo_cap
+from processos.infra.corpus_store import ARQUIVO_EMBEDDINGS, ARQUIVO_FINGERPRINT, CorpusStore
+from processos.infra.loaders.arquitetura_index import ArquiteturaIndex, obter_indice_arquitetura
+from processos.infra.loaders.registro_referencia import obter_snapshot_referencia
+from processos.infra.metrics import reference_data_reloads_total
+from processos.infra.query_embedding_cache import get_query_embedding_cache
 
 logger = logging.getLogger(__name__)
 
+MODELO_EMBEDDINGS = 'paraphrase-multilingual-MiniLM-L12-v2'
+
+# Classificação em lote (buscar_atividades_lote)
+TAMANHO_BLOCO_LOTE = 256    # Descrições por model.encode / produto matricial
+SCORE_MINIMO_SEMANTICO = 0.50  # Mesmo corte da Camada 2 em buscar_atividade
+
+CORPUS_BASE_PATH = 'documentos_base'
+
+
+@dataclass(frozen=True)
+class CorpusVersao:
+    """
+    Versão imutável do corpus semântico carregada neste worker.
+
+    Um request obtém a versão 1x e usa só ela: a troca por uma versão nova
+    (hot reload) não afeta requests em andamento.
+    """
+    embeddings: np.ndarray        # (N, D) - np.memmap (CorpusStore)
+    meta: Any                     # CorpusMeta (ou List[Dict] no formato legado)
+    macro_ids: np.ndarray         # (N,) int32 - macroprocesso de cada linha (-1 = inválido)
+    macro_nomes: List[str]        # macroprocessos únicos (ordem de 1ª aparição)
+    macro_centroides: np.ndarray  # (K, D) - centróide normalizado de cada macroprocesso
+    fingerprint: Optional[Dict]
+    assinatura: Tuple             # os.stat do fingerprint na abertura
+    versao: int                   # Incrementa a cada recarga neste worker
+    load_time_ms: float
+
+
 # ==============================================================================
 # CACHE GLOBAL (1x por worker, não por request)
 # ==============================================================================
 _CORPUS_CACHE = {
-    'embeddings': None,      # np.ndarray (N, D)
-    'meta': None,            # List[Dict]
-    'fingerprint': None,     # Dict
+    'corpus': None,          # CorpusVersao atual (trocada por atribuição única)
+    'proxima_checagem': 0.0,  # time.monotonic() da próxima rechecagem do fingerprint
     'model': None,           # SentenceTransformer (lazy)
-    'loaded': False,
-    'load_time_ms': 0
 }
+_CORPUS_LOCK = threading.Lock()
+
+
+def _intervalo_rechecagem_corpus() -> float:
+    return float(os.getenv('CORPUS_RECHECK_SECONDS', '5'))
+
+
+def _assinatura_corpus(base_path: str) -> Tuple:
+    """
+    (arquivo, mtime_ns, tamanho, inode) do fingerprint - só os.stat.
+
+    O builder grava o fingerprint por último: a troca só é disparada com o
+    store completo. Sem fingerprint (store legado), usa a matriz.
+    """
+    for nome in (ARQUIVO_FINGERPRINT, ARQUIVO_EMBEDDINGS):
+        try:
+            st = os.stat(os.path.join(base_path, nome))
+        except OSError:
+            continue
+        return (nome, st.st_mtime_ns, st.st_size, st.st_ino)
+    return ()
+
+
+def _abrir_corpus(base_path: str, assinatura: Tuple, versao: int) -> Optional[CorpusVersao]:
+    """Abre o store e pré-computa macro_ids/centróides (None se indisponível/inválido)."""
+    start_time = time.time()
+
+    store = CorpusStore.abrir(base_path)
+    if store is None:
+        return None
+
+    if hasattr(store.meta, 'coluna'):
+        numeros = store.meta.coluna('numero')
+        macros = store.meta.coluna('macroprocesso')
+    else:
+        numeros = [m.get('numero', '') for m in store.meta]
+        macros = [m.get('macroprocesso', '') for m in store.meta]
+
+    macro_nomes, macro_centroides = _calcular_centroides_macro(store.embeddings, macros)
+
+    return CorpusVersao(
+        embeddings=store.embeddings,
+        meta=store.meta,
+        macro_ids=_extrair_macro_ids(numeros),
+        macro_nomes=macro_nomes,
+        macro_centroides=macro_centroides,
+        fingerprint=store.fingerprint,
+        assinatura=assinatura,
+        versao=versao,
+        load_time_ms=(time.time() - start_time) * 1000,
+    )
+
+
+def obter_corpus(base_path: str = CORPUS_BASE_PATH) -> Optional[CorpusVersao]:
+    """
+    Versão atual do corpus neste worker (carrega na 1ª chamada).
+
+    Hot reload: no máximo a cada CORPUS_RECHECK_SECONDS (default: 5s) um
+    os.stat do fingerprint/matriz; se mudaram, abre a versão nova e troca por
+    atribuição única (threads que já têm a versão antiga seguem com ela).
+    Store novo inválido (ex: build em andamento) ou ausente mantém a versão
+    atual (ou None) e é rechecado no próximo intervalo.
+    """
+    agora = time.monotonic()
+    if agora < _CORPUS_CACHE['proxima_checagem']:
+        return _CORPUS_CACHE['corpus']
+
+    with _CORPUS_LOCK:
+        atual = _CORPUS_CACHE['corpus']
+        if agora < _CORPUS_CACHE['proxima_checagem']:
+            return atual
+        _CORPUS_CACHE['proxima_checagem'] = agora + _intervalo_rechecagem_corpus()
+
+        assinatura = _assinatura_corpus(base_path)
+        if atual is not None and assinatura == atual.assinatura:
+            return atual
+
+        try:
+            novo = _abrir_corpus(base_path, assinatura, atual.versao + 1 if atual else 1)
+        except Exception as e:
+            logger.error(f"[PIPELINE] Erro ao carregar embeddings: {e}")
+            novo = None
+
+        if novo is None:
+            if atual is None:
+                logger.warning("[PIPELINE] Corpus de embeddings indisponível. Busca semântica desabilitada.")
+                logger.warning("[PIPELINE] Execute: python scripts/gerar_embeddings_corpus.py")
+            else:
+                logger.warning(f"[PIPELINE] Corpus novo inválido - mantendo versão {atual.versao}")
+            return atual
+
+        _CORPUS_CACHE['corpus'] = novo
+
+    reference_data_reloads_total.labels(dataset='corpus_semantico').inc()
+    logger.info(
+        f"[PIPELINE] ✅ Corpus versão {novo.versao} aberto em {novo.load_time_ms:.0f}ms "
+        f"(shape: {novo.embeddings.shape})"
+    )
+    return novo
+
+
+def invalidar_corpus_cache():
+    """
+    Força rechecagem do corpus na próxima busca deste worker.
+
+    O modelo SentenceTransformer é mantido. Chamado após o build incremental
+    (corpus_builder.atualizar_corpus).
+    """
+    _CORPUS_CACHE['proxima_checagem'] = 0.0
 
 
 def precarregar_modelo_semantico():
@@ -59,9 +206,7 @@ def precarregar_modelo_semantico():
     Chamada pelo AppConfig.ready() para eliminar cold-start na primeira busca.
     Idempotente: se já carregado, retorna imediatamente.
     """
-    global _CORPUS_CACHE
-
-    if _CORPUS_CACHE['model'] is not None and _CORPUS_CACHE['loaded']:
+    if _CORPUS_CACHE['model'] is not None and _CORPUS_CACHE['corpus'] is not None:
         logger.info("[STARTUP] Modelo semântico já carregado")
         return
 
@@ -133,6 +278,107 @@ def _max_atividade_db(prefixo):
     return max_db
 
 
+def _ler_prefixos_areas(csv_path: str) -> Dict[str, str]:
+    """CSV de áreas -> {codigo: prefixo} (todas as linhas, inclusive subáreas)."""
+    df_areas = pd.read_csv(csv_path)
+    # Criar dicionário: CGRIS -> "6", CGBEN -> "1", DIGEP-RO -> "5.1", etc
+    # Remover .0 apenas se for inteiro (6.0 -> 6, mas manter 5.1 -> 5.1)
+    return {
+        codigo: normalize_area_prefix(str(prefixo))
+        for codigo, prefixo in zip(df_areas['codigo'], df_areas['prefixo'])
+    }
+
+
+def _ler_mapeamento_macroprocesso(csv_path: str) -> Dict[str, List[str]]:
+    """CSV de mapeamento -> {area_codigo: [números de macroprocesso]}."""
+    df_mapeamento = pd.read_csv(csv_path)
+
+    # Ex: CGRIS -> [7], CGBEN -> [1, 2]
+    area_macros_map = {}
+    for area_codigo, macro_numero in zip(df_mapeamento['area_codigo'], df_mapeamento['macroprocesso_numero']):
+        area_macros_map.setdefault(area_codigo, []).append(str(macro_numero))
+    return area_macros_map
+
+
+def _extrair_macro_ids(numeros: List[str]) -> np.ndarray:
+    """
+    Extrai o número do macroprocesso (1º segmento do Numero CSV) de cada linha.
+
+    '7.2.1.1' -> 7 | '' ou inválido -> -1
+    """
+    macro_ids = np.full(len(numeros), -1, dtype=np.int32)
+    for idx, numero in enumerate(numeros):
+        primeiro = str(numero).strip().split('.')[0]
+        if primeiro.isdigit():
+            macro_ids[idx] = int(primeiro)
+    return macro_ids
+
+
+def _calcular_centroides_macro(embeddings: np.ndarray, macros: List[str]) -> Tuple[List[str], np.ndarray]:
+    """
+    Centróide normalizado dos embeddings de cada macroprocesso.
+
+    Substitui o encode dos nomes de macroprocesso a cada chamada de
+    _classificar_macroprocesso: calculado 1x no load do corpus.
+
+    Returns:
+        (nomes, centroides) - centroides[i] corresponde a nomes[i]
+    """
+    nomes = []
+    indice_nome = {}
+    grupos = np.empty(len(macros), dtype=np.intp)
+    for idx, macro in enumerate(macros):
+        macro = (macro or '').strip()
+        if macro not in indice_nome:
+            indice_nome[macro] = len(nomes)
+            nomes.append(macro)
+        grupos[idx] = indice_nome[macro]
+
+    dim = embeddings.shape[1] if embeddings.ndim == 2 else 0
+    centroides = np.zeros((len(nomes), dim), dtype=np.float32)
+    np.add.at(centroides, grupos, np.asarray(embeddings, dtype=np.float32))
+    normas = np.linalg.norm(centroides, axis=1, keepdims=True)
+    centroides /= np.where(normas > 0, normas, 1.0)
+
+    # Macroprocesso vazio não é classificação válida
+    validos = [i for i, nome in enumerate(nomes) if nome]
+    return [nomes[i] for i in validos], centroides[validos]
+
+
+def _indices_top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Índices dos k maiores scores, em ordem decrescente.
+
+    argpartition é O(N); só os k selecionados são ordenados.
+    """
+    n = scores.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        candidatos = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidatos = np.arange(n)
+    return candidatos[np.argsort(-scores[candidatos], kind='stable')]
+
+
+def _indices_top_k_lote(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Versão 2D de _indices_top_k: scores (B, N) -> índices (B, k), cada
+    linha em ordem decrescente.
+    """
+    b, n = scores.shape
+    k = min(k, n)
+    if k <= 0:
+        return np.empty((b, 0), dtype=np.intp)
+    if k < n:
+        candidatos = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidatos = np.broadcast_to(np.arange(n), (b, n)).copy()
+    ordem = np.argsort(-np.take_along_axis(scores, candidatos, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(candidatos, ordem, axis=1)
+
+
 class BuscaAtividadePipeline:
     """
     Pipeline de busca em 5 camadas para atividades da DECIPEX.
@@ -146,14 +392,14 @@ class BuscaAtividadePipeline:
             csv_path: Caminho do CSV com a arquitetura oficial
         """
         self.csv_path = csv_path
-        self.df_csv = None
         self.model = None
         self.corpus_embeddings = None
         self.areas_map = {}  # Mapa: codigo -> prefixo (ex: CGRIS -> 6)
         self.area_macros_map = {}  # Mapa: area_codigo -> lista de números de macroprocessos (ex: CGRIS -> [7])
+        self.area_macros_ids = {}  # Mesmo mapa como np.ndarray int (boost vetorizado da Camada 2)
 
-        # Carregar CSV
-        self._carregar_csv()
+        # Índice da arquitetura (compartilhado, construído 1x por processo)
+        logger.info(f"[PIPELINE] Arquitetura indexada: {len(self.arquitetura)} atividades")
 
         # Carregar mapa de áreas
         self._carregar_areas()
@@ -164,25 +410,17 @@ class BuscaAtividadePipeline:
         # Carregar modelo de embeddings (lazy loading)
         self._modelo_carregado = False
 
-    def _carregar_csv(self):
-        """Carrega CSV da arquitetura oficial."""
-        try:
-            self.df_csv = pd.read_csv(self.csv_path)
-            self.df_csv = self.df_csv.fillna('')
-            logger.info(f"[PIPELINE] CSV carregado: {len(self.df_csv)} atividades")
-        except Exception as e:
-            logger.error(f"[PIPELINE] Erro ao carregar CSV: {e}")
-            self.df_csv = pd.DataFrame()
+    @property
+    def arquitetura(self) -> ArquiteturaIndex:
+        """Índice imutável do CSV da arquitetura oficial (recarrega só se o CSV mudar)."""
+        return obter_indice_arquitetura(self.csv_path)
 
     def _carregar_areas(self):
-        """Carrega mapa de áreas: codigo -> prefixo numérico."""
+        """Carrega mapa de áreas: codigo -> prefixo numérico (snapshot do registro de referência)."""
         try:
-            df_areas = pd.read_csv('documentos_base/areas_organizacionais.csv')
-            # Criar dicionário: CGRIS -> "6", CGBEN -> "1", DIGEP-RO -> "5.1", etc
-            # Remover .0 apenas se for inteiro (6.0 -> 6, mas manter 5.1 -> 5.1)
-            self.areas_map = {}
-            for codigo, prefixo in zip(df_areas['codigo'], df_areas['prefixo']):
-                self.areas_map[codigo] = normalize_area_prefix(str(prefixo))
+            self.areas_map = obter_snapshot_referencia(
+                'prefixos_areas', 'documentos_base/areas_organizacionais.csv', _ler_prefixos_areas
+            ).dados
 
             logger.info(f"[PIPELINE] Mapa de áreas carregado: {len(self.areas_map)} áreas")
             logger.debug(f"[PIPELINE] Mapa de áreas: {self.areas_map}")
@@ -214,98 +452,46 @@ class BuscaAtividadePipeline:
         corresponde aos macroprocessos típicos da área selecionada.
         """
         try:
-            # Carregar CSV de mapeamento
-            df_mapeamento = pd.read_csv('documentos_base/mapeamento_macroprocesso_area.csv')
-
-            # Criar dicionário: area_codigo -> lista de números de macroprocessos
-            # Ex: CGRIS -> [7], CGBEN -> [1, 2]
-            area_macros_map = {}
-            for _, row in df_mapeamento.iterrows():
-                area_codigo = row['area_codigo']
-                macro_numero = str(row['macroprocesso_numero'])
-
-                if area_codigo not in area_macros_map:
-                    area_macros_map[area_codigo] = []
-                area_macros_map[area_codigo].append(macro_numero)
+            # Snapshot do registro de referência (CSV lido 1x por processo, só leitura)
+            area_macros_map = obter_snapshot_referencia(
+                'mapeamento_macroprocesso_area',
+                'documentos_base/mapeamento_macroprocesso_area.csv',
+                _ler_mapeamento_macroprocesso,
+            ).dados
 
             self.area_macros_map = area_macros_map
+            self.area_macros_ids = {
+                area: np.array([int(m) for m in macros if str(m).isdigit()], dtype=np.int32)
+                for area, macros in area_macros_map.items()
+            }
             logger.info(f"[PIPELINE] Mapeamento área->macroprocessos carregado: {len(area_macros_map)} áreas")
             logger.debug(f"[PIPELINE] Mapeamento: {area_macros_map}")
 
         except Exception as e:
             logger.error(f"[PIPELINE] Erro ao carregar mapeamento macroprocesso: {e}")
             self.area_macros_map = {}
+            self.area_macros_ids = {}
 
     def _carregar_embeddings_precomputados(self) -> bool:
         """
-        Carrega embeddings pré-computados de arquivo (lazy load com cache global).
+        Garante o corpus de embeddings pré-computados neste worker.
 
         OTIMIZAÇÃO v4.0:
         - Carrega 1x por worker (não por request)
         - Usa cache global _CORPUS_CACHE
         - Fallback gracioso se arquivos não existirem
 
-        Returns:
-            True se carregou com sucesso, False caso contrário
-        """
-        global _CORPUS_CACHE
-
-        # Já carregado neste worker?
-        if _CORPUS_CACHE['loaded']:
-            return True
-
-        # Paths dos arquivos
-        base_path = 'documentos_base'
-        embeddings_path = os.path.join(base_path, 'corpus_embeddings.npy')
-        meta_path = os.path.join(base_path, 'corpus_meta.json')
-        fingerprint_path = os.path.join(base_path, 'corpus_fingerprint.json')
-
-        # Verificar se arquivos existem
-        if not os.path.exists(embeddings_path) or not os.path.exists(meta_path):
-            logger.warning("[PIPELINE] Arquivos de embeddings não encontrados. Busca semântica desabilitada.")
-            logger.warning(f"[PIPELINE] Esperado: {embeddings_path}, {meta_path}")
-            logger.warning("[PIPELINE] Execute: python scripts/gerar_embeddings_corpus.py")
-            return False
-
-        try:
-            start_time = time.time()
-
-            # Carregar embeddings (numpy)
-            logger.info(f"[PIPELINE] Carregando embeddings: {embeddings_path}")
-            _CORPUS_CACHE['embeddings'] = np.load(embeddings_path)
-
-            # Carregar metadados
-            logger.info(f"[PIPELINE] Carregando metadados: {meta_path}")
-            with open(meta_path, 'r', encoding='utf-8') as f:
-                _CORPUS_CACHE['meta'] = json.load(f)
-
-            # Carregar fingerprint (opcional)
-            if os.path.exists(fingerprint_path):
-                with open(fingerprint_path, 'r', encoding='utf-8') as f:
-                    _CORPUS_CACHE['fingerprint'] = json.load(f)
+        OTIMIZAÇÃO v4.1 (CorpusStore mmap-v1):
+        - Embeddings e metadados colunares abertos com mmap_mode='r'
+        - Workers compartilham as páginas via page cache do SO
+        - Validação contra corpus_fingerprint.json só lê cabeçalhos
 
-            # Validar alinhamento
-            n_embeddings = _CORPUS_CACHE['embeddings'].shape[0]
-            n_meta = len(_CORPUS_CACHE['meta'])
-            if n_embeddings != n_meta:
-                logger.error(f"[PIPELINE] ERRO: embeddings ({n_embeddings}) != meta ({n_meta})")
-                return False
+        OTIMIZAÇÃO v4.2: recarrega se o fingerprint mudou (obter_corpus)
 
-            load_time = (time.time() - start_time) * 1000
-            _CORPUS_CACHE['loaded'] = True
-            _CORPUS_CACHE['load_time_ms'] = load_time
-
-            logger.info(f"[PIPELINE] ✅ Embeddings carregados em {load_time:.0f}ms")
-            logger.info(f"[PIPELINE]    Shape: {_CORPUS_CACHE['embeddings'].shape}")
-            logger.info(f"[PIPELINE]    Atividades: {n_meta}")
-
-            return True
-
-        except Exception as e:
-            logger.error(f"[PIPELINE] Erro ao carregar embeddings: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
+        Returns:
+            True se há corpus disponível, False caso contrário
+        """
+        return obter_corpus() is not None
 
     def _carregar_modelo_query(self) -> bool:
         """
@@ -314,21 +500,34 @@ class BuscaAtividadePipeline:
         NOTA: Só carrega quando realmente precisar (lazy load).
         O modelo é usado apenas para a query do usuário, não para o corpus.
         """
-        global _CORPUS_CACHE
-
         if _CORPUS_CACHE['model'] is not None:
             return True
 
         try:
             logger.info("[PIPELINE] Carregando modelo SentenceTransformer para query...")
             from sentence_transformers import SentenceTransformer
-            _CORPUS_CACHE['model'] = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
+            _CORPUS_CACHE['model'] = SentenceTransformer(MODELO_EMBEDDINGS)
             logger.info("[PIPELINE] ✅ Modelo carregado")
             return True
         except Exception as e:
             logger.error(f"[PIPELINE] Erro ao carregar modelo: {e}")
             return False
 
+    def _gerar_embedding_query(self, descricao_usuario: str) -> np.ndarray:
+        """
+        Gera embedding normalizado da query, via cache LRU/TTL.
+
+        Descrições iguais a menos de acentos, caixa e espaços reaproveitam
+        o vetor (encode é a etapa mais cara do pipeline em CPU).
+        Requer _carregar_modelo_query() antes.
+        """
+        model = _CORPUS_CACHE['model']
+        return get_query_embedding_cache().obter_ou_calcular(
+            descricao_usuario,
+            lambda texto: model.encode(texto, convert_to_numpy=True, normalize_embeddings=True),
+            modelo=MODELO_EMBEDDINGS,
+        )
+
     def _carregar_modelo_embeddings(self):
         """DEPRECATED: Mantido para compatibilidade. Usa _carregar_embeddings_precomputados()."""
         if self._modelo_carregado:
@@ -338,7 +537,7 @@ class BuscaAtividadePipeline:
         if self._carregar_embeddings_precomputados():
             self._modelo_carregado = True
             # Referências locais para compatibilidade
-            self.corpus_embeddings = _CORPUS_CACHE['embeddings']
+            self.corpus_embeddings = _CORPUS_CACHE['corpus'].embeddings
             self.model = _CORPUS_CACHE.get('model')
             return
 
@@ -348,10 +547,10 @@ class BuscaAtividadePipeline:
             from sentence_transformers import SentenceTransformer
             import torch
 
-            self.model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
+            self.model = SentenceTransformer(MODELO_EMBEDDINGS)
             corpus_textos = []
-            for _, row in self.df_csv.iterrows():
-                texto = f"{row['Macroprocesso']} {row['Processo']} {row['Subprocesso']} {row['Atividade']}"
+            for linha in self.arquitetura.linhas:
+                texto = f"{linha.macroprocesso} {linha.processo} {linha.subprocesso} {linha.atividade}"
                 corpus_textos.append(texto)
 
             self.corpus_embeddings = self.model.encode(corpus_textos, convert_to_tensor=True)
@@ -413,7 +612,7 @@ class BuscaAtividadePipeline:
         logger.info("[PIPELINE] >>> CAMADA 2: Busca Semântica (SentenceTransformer)")
         resultado_camada2 = self._camada2_busca_semantica(descricao_usuario, area_codigo)
 
-        if resultado_camada2['sucesso'] and resultado_camada2['score'] >= 0.50:
+        if resultado_camada2['sucesso'] and resultado_camada2['score'] >= SCORE_MINIMO_SEMANTICO:
             logger.info(f"[PIPELINE] [OK] CAMADA 2 encontrou atividade (score: {resultado_camada2['score']:.3f})")
             # Adicionar botões: Confirmar / Selecionar manualmente
             resultado_camada2['acoes_usuario'] = ['confirmar', 'selecionar_manualmente']
@@ -443,6 +642,181 @@ class BuscaAtividadePipeline:
             'mensagem': 'Por favor, selecione sua atividade navegando pela estrutura organizacional:'
         }
 
+    # ========================================================================
+    # CLASSIFICAÇÃO EM LOTE (Camadas 1 e 2)
+    # ========================================================================
+
+    def buscar_atividades_lote(
+        self,
+        descricoes: List[str],
+        area_codigo: str,
+        autor_dados: Optional[Dict] = None,
+        top_k: int = 3
+    ) -> List[Dict]:
+        """
+        Classifica várias descrições de uma vez (Camadas 1 e 2).
+
+        Ver iterar_atividades_lote() para o formato de cada linha.
+        """
+        return list(self.iterar_atividades_lote(descricoes, area_codigo, autor_dados, top_k))
+
+    def iterar_atividades_lote(
+        self,
+        descricoes: List[str],
+        area_codigo: str,
+        autor_dados: Optional[Dict] = None,
+        top_k: int = 3,
+        tamanho_bloco: int = TAMANHO_BLOCO_LOTE
+    ):
+        """
+        Gerador da classificação em lote, em blocos de tamanho_bloco linhas.
+
+        Por bloco:
+        - Camada 1 (match exato/fuzzy) linha a linha
+        - Linhas sem match: 1 model.encode(lista) + 1 produto matriz-matriz
+          contra o corpus + top-K por linha (argpartition 2D)
+
+        Camadas 3-5 são interativas e não se aplicam ao lote: linha sem
+        match semântico volta como 'nao_encontrado' com os candidatos.
+
+        Yields (na ordem de entrada):
+            {
+                'linha': 0,
+                'descricao': '...',
+                'origem': 'match_exato' | 'match_fuzzy' | 'semantic' | 'nao_encontrado',
+                'score': 0.87,
+                'cap': '01.02.03.04.005' | None,
+                'tipo_cap': 'oficial' | None,
+                'atividade': {...} | None,
+                'candidatos': [...]
+            }
+        """
+        corpus = self._obter_corpus_semantico()  # mesma versão para o lote inteiro
+        for inicio in range(0, len(descricoes), tamanho_bloco):
+            bloco = [(d or '').strip() for d in descricoes[inicio:inicio + tamanho_bloco]]
+            yield from self._classificar_bloco_lote(corpus, bloco, inicio, area_codigo, autor_dados, top_k)
+
+    def _classificar_bloco_lote(
+        self,
+        corpus: Optional[CorpusVersao],
+        bloco: List[str],
+        inicio: int,
+        area_codigo: str,
+        autor_dados: Optional[Dict],
+        top_k: int
+    ) -> List[Dict]:
+        """Camada 1 por linha; Camada 2 vetorizada só para as linhas restantes."""
+        resultados = []
+        pendentes = []  # posições no bloco que vão para a Camada 2
+
+        for pos, descricao in enumerate(bloco):
+            linha = {
+                'linha': inicio + pos,
+                'descricao': descricao,
+                'origem': 'nao_encontrado',
+                'score': 0.0,
+                'cap': None,
+                'tipo_cap': None,
+                'atividade': None,
+                'candidatos': []
+            }
+            resultados.append(linha)
+            if not descricao:
+                continue
+
+            resultado_camada1 = self._camada1_match_deterministico(descricao, area_codigo, None, autor_dados)
+            if resultado_camada1['sucesso'] and resultado_camada1.get('encontrado'):
+                linha.update({
+                    'origem': resultado_camada1['origem'],
+                    'score': resultado_camada1['score'],
+                    'cap': resultado_camada1['cap'],
+                    'tipo_cap': 'oficial',
+                    'atividade': resultado_camada1['atividade']
+                })
+            else:
+                pendentes.append(pos)
+
+        if pendentes:
+            candidatos_por_linha = self._camada2_busca_semantica_lote(
+                corpus, [bloco[pos] for pos in pendentes], area_codigo, top_k
+            )
+            for pos, candidatos in zip(pendentes, candidatos_por_linha):
+                linha = resultados[pos]
+                linha['candidatos'] = candidatos
+                if candidatos and candidatos[0]['score'] >= SCORE_MINIMO_SEMANTICO:
+                    best = candidatos[0]
+                    linha.update({
+                        'origem': 'semantic',
+                        'score': best['score'],
+                        'cap': best['cap'],
+                        'tipo_cap': 'oficial',
+                        'atividade': {
+                            'macroprocesso': best['macroprocesso'],
+                            'processo': best['processo'],
+                            'subprocesso': best['subprocesso'],
+                            'atividade': best['atividade']
+                        }
+                    })
+                elif candidatos:
+                    linha['score'] = candidatos[0]['score']
+
+        return resultados
+
+    def _camada2_busca_semantica_lote(
+        self,
+        corpus: Optional[CorpusVersao],
+        descricoes: List[str],
+        area_codigo: str,
+        top_k: int
+    ) -> List[List[Dict]]:
+        """
+        Camada 2 vetorizada: candidatos top-K de cada descrição.
+
+        Q (B, D) = 1 encode em lote (misses do cache de query)
+        S (B, N) = Q @ E.T, boost de área aplicado por broadcast da máscara
+
+        Returns:
+            Lista alinhada com descricoes ([] por linha se a camada estiver
+            indisponível - LITE MODE, sem embeddings ou sem modelo)
+        """
+        vazio = [[] for _ in descricoes]
+
+        if corpus is None or not self._carregar_modelo_query():
+            logger.warning("[PIPELINE] Camada 2 indisponível para o lote")
+            return vazio
+
+        try:
+            start_time = time.time()
+            model = _CORPUS_CACHE['model']
+            queries = get_query_embedding_cache().obter_ou_calcular_lote(
+                descricoes,
+                lambda textos: model.encode(textos, convert_to_numpy=True, normalize_embeddings=True),
+                modelo=MODELO_EMBEDDINGS,
+            )
+
+            cos_scores = queries @ np.asarray(corpus.embeddings).T
+            mascara_area = self._mascara_area(corpus, area_codigo)
+            ranking_scores = cos_scores
+            if mascara_area is not None:
+                ranking_scores = np.where(mascara_area[np.newaxis, :], cos_scores * 1.50, cos_scores)
+
+            top_idx = _indices_top_k_lote(ranking_scores, top_k)
+            prefixo_area = self._obter_prefixo_area(area_codigo)
+
+            candidatos_por_linha = [
+                [self._montar_candidato(corpus, int(idx), float(cos_scores[i, idx]), prefixo_area)
+                 for idx in top_idx[i]]
+                for i in range(len(descricoes))
+            ]
+
+            elapsed_ms = (time.time() - start_time) * 1000
+            logger.info(f"[PIPELINE] Camada 2 (lote de {len(descricoes)}) concluída em {elapsed_ms:.0f}ms")
+            return candidatos_por_linha
+
+        except Exception as e:
+            logger.error(f"[PIPELINE] Erro na Camada 2 (lote): {e}")
+            return vazio
+
     # ========================================================================
     # IMPLEMENTAÇÃO DAS CAMADAS
     # ========================================================================
@@ -499,7 +873,7 @@ class BuscaAtividadePipeline:
             traceback.print_exc()
             return {'sucesso': False, 'encontrado': False}
 
-    def _camada2_busca_semantica(self, descricao_usuario: str, area_codigo: str) -> Dict:
+    def _camada2_busca_semantica(self, descricao_usuario: str, area_codigo: str, top_k: int = 5) -> Dict:
         """
         Camada 2: Busca semântica com embeddings pré-computados + numpy
 
@@ -508,9 +882,12 @@ class BuscaAtividadePipeline:
         - Usa embeddings de arquivo .npy (não gera em runtime)
         - Cosine similarity com numpy (rápido)
         - Fallback gracioso se arquivos não existirem
-        """
-        global _CORPUS_CACHE
 
+        OTIMIZAÇÃO v4.1:
+        - Boost de área = máscara numpy sobre macro_ids pré-computados
+        - Top-K via argpartition: o mesmo passe devolve 'candidatos'
+          ranqueados para o dropdown
+        """
         start_time = time.time()
 
         # ========================================================================
@@ -521,9 +898,10 @@ class BuscaAtividadePipeline:
             return {'sucesso': False, 'score': 0.0}
 
         # ========================================================================
-        # CHECK 2: Carregar embeddings pré-computados
+        # CHECK 2: Carregar embeddings pré-computados (versão fixa neste request)
         # ========================================================================
-        if not self._carregar_embeddings_precomputados():
+        corpus = obter_corpus()
+        if corpus is None:
             logger.warning("[PIPELINE] Embeddings não disponíveis - pulando Camada 2")
             return {'sucesso': False, 'score': 0.0}
 
@@ -535,45 +913,33 @@ class BuscaAtividadePipeline:
             return {'sucesso': False, 'score': 0.0}
 
         try:
-            # Gerar embedding da query (normalizado)
-            query_embedding = _CORPUS_CACHE['model'].encode(
-                descricao_usuario,
-                convert_to_numpy=True,
-                normalize_embeddings=True
-            )
+            # Gerar embedding da query (normalizado, com cache)
+            query_embedding = self._gerar_embedding_query(descricao_usuario)
 
-            # Cosine similarity com numpy (vetores já normalizados = dot product)
-            corpus_embeddings = _CORPUS_CACHE['embeddings']
-            cos_scores = np.dot(corpus_embeddings, query_embedding)
-
-            # BOOST: priorizar atividades da área do usuário
-            macros_da_area = self.area_macros_map.get(area_codigo, [])
-            boosted_scores = cos_scores.copy()
+            # Cosine + boost de área + Top-K (argpartition, O(N))
+            top_idx, cos_scores, mascara_area = self._ranquear_corpus(corpus, query_embedding, area_codigo, top_k)
+            prefixo_area = self._obter_prefixo_area(area_codigo)
 
-            corpus_meta = _CORPUS_CACHE['meta']
-            for idx, meta in enumerate(corpus_meta):
-                numero_csv = meta.get('numero', '')
-                parts = numero_csv.split('.')
-                if len(parts) > 0 and parts[0] in macros_da_area:
-                    boosted_scores[idx] *= 1.50  # Boost 50%
+            candidatos = [
+                self._montar_candidato(corpus, int(idx), float(cos_scores[idx]), prefixo_area)
+                for idx in top_idx
+            ]
 
             # Melhor match
-            best_idx = int(np.argmax(boosted_scores))
-            best_score = float(cos_scores[best_idx])  # Score original
-            best_meta = corpus_meta[best_idx]
+            best_idx = int(top_idx[0])
+            best = candidatos[0]
+            best_score = best['score']
 
             # Log métricas
             elapsed_ms = (time.time() - start_time) * 1000
-            macro_match = best_meta['numero'].split('.')[0] if '.' in best_meta['numero'] else best_meta['numero']
-            foi_boosted = macro_match in macros_da_area
+            foi_boosted = bool(mascara_area[best_idx]) if mascara_area is not None else False
 
             logger.info(f"[PIPELINE] Camada 2 concluída em {elapsed_ms:.0f}ms")
             logger.info(f"[PIPELINE] Melhor match: score={best_score:.3f} {'(BOOSTED)' if foi_boosted else ''}")
-            logger.info(f"[PIPELINE]   Atividade: {best_meta['atividade']}")
+            logger.info(f"[PIPELINE]   Atividade: {best['atividade']}")
 
-            # Gerar CAP (SNI: AA.MM.PP.SS.III)
-            prefixo_area = self._obter_prefixo_area(area_codigo)
-            cap_completo = f"{prefixo_area}.{normalize_numero_csv(best_meta['numero'])}"
+            # CAP (SNI: AA.MM.PP.SS.III)
+            cap_completo = best['cap']
 
             return {
                 'sucesso': True,
@@ -584,15 +950,17 @@ class BuscaAtividadePipeline:
                 'acao_permitida': 'concordar_ou_selecionar_manual',
                 'pode_editar': False,
                 'atividade': {
-                    'macroprocesso': best_meta['macroprocesso'],
-                    'processo': best_meta['processo'],
-                    'subprocesso': best_meta['subprocesso'],
-                    'atividade': best_meta['atividade']
+                    'macroprocesso': best['macroprocesso'],
+                    'processo': best['processo'],
+                    'subprocesso': best['subprocesso'],
+                    'atividade': best['atividade']
                 },
+                'candidatos': candidatos,
                 'metricas': {
                     'tempo_ms': elapsed_ms,
-                    'corpus_size': len(corpus_meta),
-                    'cache_hit': _CORPUS_CACHE['loaded']
+                    'corpus_size': len(corpus.meta),
+                    'corpus_versao': corpus.versao,
+                    'cache_hit': True
                 }
             }
 
@@ -602,40 +970,87 @@ class BuscaAtividadePipeline:
             traceback.print_exc()
             return {'sucesso': False, 'score': 0.0}
 
+    def _ranquear_corpus(
+        self,
+        corpus: CorpusVersao,
+        query_embedding: np.ndarray,
+        area_codigo: Optional[str],
+        top_k: int,
+        aplicar_boost: bool = True
+    ) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """
+        Ranqueia o corpus para uma query já codificada (NumPy puro).
+
+        Vetores normalizados: cosine = dot product. O boost de área (+50%)
+        é uma máscara sobre macro_ids pré-computados.
+
+        Returns:
+            (top_idx, cos_scores, mascara_area) - top_idx ordenado pelo score
+            com boost; cos_scores sem boost; mascara_area None se sem boost
+        """
+        cos_scores = np.dot(corpus.embeddings, query_embedding)
+
+        mascara_area = self._mascara_area(corpus, area_codigo) if aplicar_boost else None
+        ranking_scores = cos_scores
+        if mascara_area is not None:
+            ranking_scores = np.where(mascara_area, cos_scores * 1.50, cos_scores)
+
+        return _indices_top_k(ranking_scores, top_k), cos_scores, mascara_area
+
+    def _obter_corpus_semantico(self) -> Optional[CorpusVersao]:
+        """Versão do corpus para um request (None em LITE MODE ou se indisponível)."""
+        if os.getenv('HELENA_LITE_MODE', 'False').lower() in ('true', '1', 'yes'):
+            logger.info("[PIPELINE] LITE MODE ativo - sem Camada 2")
+            return None
+        return obter_corpus()
+
+    def _mascara_area(self, corpus: CorpusVersao, area_codigo: Optional[str]) -> Optional[np.ndarray]:
+        """Máscara (N,) das linhas do corpus nos macroprocessos da área (None se área sem mapa)."""
+        macros_da_area = self.area_macros_ids.get(area_codigo)
+        if macros_da_area is None or not macros_da_area.size:
+            return None
+        return np.isin(corpus.macro_ids, macros_da_area)
+
+    def _montar_candidato(self, corpus: CorpusVersao, idx: int, score: float, prefixo_area: str) -> Dict:
+        """Monta candidato (linha do corpus) com CAP = prefixo_area + numero_csv (SNI)."""
+        meta = corpus.meta[idx]
+        return {
+            'score': score,
+            'cap': f"{prefixo_area}.{normalize_numero_csv(meta['numero'])}",
+            'tipo_cap': 'oficial',
+            'macroprocesso': meta['macroprocesso'],
+            'processo': meta['processo'],
+            'subprocesso': meta['subprocesso'],
+            'atividade': meta['atividade']
+        }
+
     def _preparar_candidatos_dropdown(self, descricao_usuario: str, area_codigo: str, top_k: int = 5) -> List[Dict]:
         """
         Prepara top-K candidatos para dropdown (Camada 3)
+
+        Caminho NumPy: 1 encode da query (com cache) + 1 dot product.
+        Sem torch em tempo de request.
         """
-        if self.model is None or self.corpus_embeddings is None:
+        corpus = obter_corpus()
+        if corpus is None or not self._carregar_modelo_query():
             return []
 
         try:
-            query_embedding = self.model.encode(descricao_usuario, convert_to_tensor=True)
-            cos_scores = util.pytorch_cos_sim(query_embedding, self.corpus_embeddings)[0]
-
-            # Top-K scores
-            top_results = torch.topk(cos_scores, k=min(top_k, len(cos_scores)))
+            query_embedding = self._gerar_embedding_query(descricao_usuario)
+            top_idx, cos_scores, _ = self._ranquear_corpus(
+                corpus, query_embedding, area_codigo, top_k, aplicar_boost=False
+            )
 
             # Obter prefixo da área selecionada
             prefixo_area = self._obter_prefixo_area(area_codigo)
 
             candidatos = []
             MIN_SCORE = 0.50  # Ignorar sugestões com similaridade < 50%
-            for score, idx in zip(top_results[0], top_results[1]):
-                if float(score) < MIN_SCORE:
+            for idx in top_idx:
+                score = float(cos_scores[idx])
+                if score < MIN_SCORE:
                     continue
-                row = self.df_csv.iloc[int(idx)]
-                # CAP = prefixo_area + numero_csv (SNI padded)
-                cap_completo = f"{prefixo_area}.{normalize_numero_csv(str(row['Numero']).strip())}"
-                candidatos.append({
-                    'score': float(score),
-                    'cap': cap_completo,
-                    'tipo_cap': 'oficial',
-                    'macroprocesso': row['Macroprocesso'],
-                    'processo': row['Processo'],
-                    'subprocesso': row['Subprocesso'],
-                    'atividade': row['Atividade']
-                })
+                candidatos.append(self._montar_candidato(corpus, int(idx), score, prefixo_area))
 
             logger.info(f"[PIPELINE] Top-{len(candidatos)} candidatos preparados para dropdown")
             return candidatos
@@ -671,12 +1086,12 @@ class BuscaAtividadePipeline:
             if area_codigo:
                 prefixo_area = self._obter_prefixo_area(area_codigo)
 
-            for _, row in self.df_csv.iterrows():
-                macro = row['Macroprocesso']
-                processo = row['Processo']
-                subprocesso = row['Subprocesso']
-                atividade = row['Atividade']
-                numero_csv = str(row['Numero']).strip()
+            for linha in self.arquitetura.linhas:
+                macro = linha.macroprocesso
+                processo = linha.processo
+                subprocesso = linha.subprocesso
+                atividade = linha.atividade
+                numero_csv = linha.numero
 
                 # Gerar CAP: prefixo_area + numero_csv (SNI padded)
                 numero_norm = normalize_numero_csv(numero_csv)
@@ -895,33 +1310,27 @@ class BuscaAtividadePipeline:
     def _classificar_macroprocesso(self, descricao_usuario: str) -> str:
         """
         Classifica a atividade em um dos 12 macroprocessos oficiais usando embeddings
+
+        Compara a query com centróides pré-computados de cada macroprocesso
+        (média normalizada das linhas do corpus): 1 encode + 1 dot product.
         """
-        if self.df_csv.empty:
-            return "Gestão de Benefícios Previdenciários"  # Fallback
+        fallback = "Gestão de Benefícios Previdenciários"
 
         try:
-            # Carregar modelo se necessário
-            self._carregar_modelo_embeddings()
-
-            if self.model is None:
-                return "Gestão de Benefícios Previdenciários"  # Fallback
-
-            # Lista de macroprocessos únicos
-            macros_unicos = self.df_csv['Macroprocesso'].unique().tolist()
-            macros_unicos = [m for m in macros_unicos if m and str(m).strip()]
+            corpus = obter_corpus()
+            if corpus is None or not self._carregar_modelo_query():
+                return fallback
 
+            macros_unicos = corpus.macro_nomes
+            centroides = corpus.macro_centroides
             if not macros_unicos:
-                return "Gestão de Benefícios Previdenciários"  # Fallback
+                return fallback
 
             logger.info(f"[PIPELINE] Classificando entre {len(macros_unicos)} macroprocessos")
 
-            # Gerar embeddings dos macroprocessos
-            macro_embeddings = self.model.encode(macros_unicos, convert_to_tensor=True)
-            query_embedding = self.model.encode(descricao_usuario, convert_to_tensor=True)
-
-            # Calcular similaridade
-            scores = util.pytorch_cos_sim(query_embedding, macro_embeddings)[0]
-            best_idx = int(torch.argmax(scores))
+            query_embedding = self._gerar_embedding_query(descricao_usuario)
+            scores = np.dot(centroides, query_embedding)
+            best_idx = int(np.argmax(scores))
             best_score = float(scores[best_idx])
 
             macroprocesso_escolhido = macros_unicos[best_idx]
@@ -932,7 +1341,7 @@ class BuscaAtividadePipeline:
 
         except Exception as e:
             logger.error(f"[PIPELINE] Erro ao classificar macroprocesso: {e}")
-            return "Gestão de Benefícios Previdenciários"  # Fallback
+            return fallback
 
     def _gerar_cap(self, atividade: Dict, area_codigo: str) -> str:
         """
@@ -968,7 +1377,7 @@ class BuscaAtividadePipeline:
         try:
             prefixo_area = self._obter_prefixo_area(area_codigo)
 
-            macros = self.df_csv['Macroprocesso'].unique().tolist()
+            macros = list(self.arquitetura.filhos())
             if macroprocesso in macros:
                 idx_macro = macros.index(macroprocesso) + 1
             else:
@@ -992,14 +1401,8 @@ class BuscaAtividadePipeline:
         apenas novas atividades dentro da hierarquia existente.
         """
         try:
-            # Filtrar linhas que correspondem à hierarquia completa
-            filtro = (
-                (self.df_csv['Macroprocesso'] == macroprocesso) &
-                (self.df_csv['Processo'] == processo) &
-                (self.df_csv['Subprocesso'] == subprocesso)
-            )
-
-            exists = not self.df_csv[filtro].empty
+            # Lookup O(1) no índice da arquitetura
+            exists = self.arquitetura.existe(macroprocesso, processo, subprocesso)
 
             if exists:
                 logger.info(f"[PIPELINE] Hierarquia validada: {macroprocesso} > {processo} > {subprocesso}")
@@ -1042,22 +1445,16 @@ class BuscaAtividadePipeline:
                 # Fallback: usar 99 como área desconhecida
                 prefixo_area = "99"
 
-            # Filtrar atividades do mesmo subprocesso
-            filtro = (
-                (self.df_csv['Macroprocesso'] == macroprocesso) &
-                (self.df_csv['Processo'] == processo) &
-                (self.df_csv['Subprocesso'] == subprocesso)
-            )
-
-            atividades_subprocesso = self.df_csv[filtro]
+            # Atividades do mesmo subprocesso (índice da arquitetura)
+            atividades_subprocesso = self.arquitetura.linhas_do_caminho(macroprocesso, processo, subprocesso)
 
-            if atividades_subprocesso.empty:
+            if not atividades_subprocesso:
                 logger.warning(f"[PIPELINE] Nenhuma atividade encontrada no subprocesso: {subprocesso}")
                 # Se não encontrou atividades, começar do índice 1
                 return f"{prefixo_area}.01.01.01.001"
 
             # Extrair todos os CAPs do subprocesso
-            caps_existentes = atividades_subprocesso['Numero'].tolist()
+            caps_existentes = [linha.numero for linha in atividades_subprocesso]
 
             logger.info(f"[PIPELINE] CAPs existentes no subprocesso '{subprocesso}': {len(caps_existentes)}")
 
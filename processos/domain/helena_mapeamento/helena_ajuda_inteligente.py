@@ -22,8 +22,6 @@ import json
 from openai import OpenAI
 from dotenv import load_dotenv
 import os
-import pandas as pd
-from rapidfuzz import process, fuzz
 from datetime import datetime
 import hashlib
 from django.db import transaction
@@ -78,10 +76,8 @@ def analisar_atividade_com_helena(descricao_usuario, nivel_atual, contexto_ja_se
                 contexto_texto += f"- Atividade: {contexto_ja_selecionado['atividade']}\n"
 
         # Carregar os 12 macroprocessos oficiais do CSV
-        import pandas as pd
-        csv_path = 'documentos_base/Arquitetura_DECIPEX_mapeada.csv'
-        df = pd.read_csv(csv_path)
-        macros_oficiais = df['Macroprocesso'].unique().tolist()
+        from processos.infra.loaders import obter_indice_arquitetura
+        macros_oficiais = list(obter_indice_arquitetura('documentos_base/Arquitetura_DECIPEX_mapeada.csv').filhos())
         lista_macros = "\n".join([f"{i+1}. {macro}" for i, macro in enumerate(macros_oficiais)])
 
         # Prompt para o GPT-4
@@ -193,7 +189,7 @@ def validar_sugestao_contra_csv(sugestao, arquitetura):
             ...
         }
     """
-    from .dados_decipex import ArquiteturaDecipex
+    from processos.infra.loaders import ArquiteturaDecipex
 
     if not arquitetura:
         arquitetura = ArquiteturaDecipex()
@@ -266,7 +262,7 @@ def validar_sugestao_contra_csv(sugestao, arquitetura):
 # INTEGRAÇÃO HELENA + MÉTODO CAP
 # ============================================================================
 
-def classificar_e_gerar_cap(descricao_usuario, area_codigo, contexto=None, autor_dados=None):
+def classificar_e_gerar_cap(descricao_usuario, area_codigo, contexto=None, autor_dados=None, filtrar_por_area=False):
     """
     Classifica atividade e gera CAP (oficial ou provisório)
 
@@ -275,6 +271,9 @@ def classificar_e_gerar_cap(descricao_usuario, area_codigo, contexto=None, autor
     2. Match fuzzy >= 85% → retorna CAP oficial
     3. Não encontrou → IA sugere → gera CAP provisório
 
+    OTIMIZAÇÃO: usa o índice pré-computado da Camada 1 (indice_camada1),
+    construído 1x por processo - sem leitura de CSV por chamada.
+
     Args:
         descricao_usuario (str): Descrição da atividade
         area_codigo (str): Código da área (ex: 'CGBEN', 'CGPAG')
@@ -285,6 +284,8 @@ def classificar_e_gerar_cap(descricao_usuario, area_codigo, contexto=None, autor
                 'nome': 'João Silva',
                 'area': 'CGBEN'
             }
+        filtrar_por_area (bool): Match fuzzy só entre atividades dos
+            macroprocessos da área (mapeamento_macroprocesso_area.csv)
 
     Returns:
         dict: {
@@ -303,118 +304,57 @@ def classificar_e_gerar_cap(descricao_usuario, area_codigo, contexto=None, autor
     """
 
     try:
-        # 1️⃣ Carregar CSV
-        csv_path = 'documentos_base/Arquitetura_DECIPEX_mapeada.csv'
-        df = pd.read_csv(csv_path)
-
-        # 🔍 DIAGNÓSTICO: Logs detalhados para debug
-        logger.info("="*80)
-        logger.info("[BUSCA] DIAGNÓSTICO DE BUSCA NO CSV")
-        logger.info("="*80)
-        logger.info(f"[INFO] Colunas do CSV: {df.columns.tolist()}")
-        logger.info(f"[INFO] Total de linhas: {len(df)}")
-        logger.info(f"[INFO] Primeiras 3 linhas:\n{df.head(3)}")
-        logger.info(f"[BUSCA] Buscando: '{descricao_usuario}' (len={len(descricao_usuario)}, type={type(descricao_usuario)})")
-
-        df = df.fillna('')
-
-        # Verificar tipos e amostras das colunas de busca
-        colunas_busca = ['Macroprocesso', 'Processo', 'Subprocesso', 'Atividade']
-        for col in colunas_busca:
-            if col in df.columns:
-                logger.info(f"[DEBUG] Coluna '{col}':")
-                logger.info(f"   - Tipo: {df[col].dtype}")
-                logger.info(f"   - Valores únicos: {df[col].nunique()}")
-                if len(df[col]) > 0:
-                    amostra = df[col].iloc[0]
-                    logger.info(f"   - Amostra [0]: '{amostra}' (len={len(str(amostra))})")
-                    logger.info(f"   - Encoding bytes: {amostra.encode('utf-8') if isinstance(amostra, str) else 'N/A'}")
-            else:
-                logger.warning(f"⚠️ Coluna '{col}' NÃO ENCONTRADA no CSV!")
-
-        logger.info("="*80)
-
-        # 2️⃣ Match EXATO (case insensitive) - busca em todas colunas relevantes
-        logger.info("[BUSCA] Tentando MATCH EXATO...")
-        for col in colunas_busca:
-            if col not in df.columns:
-                continue
-            logger.info(f"   Buscando em '{col}'...")
-            descricao_lower = descricao_usuario.lower().strip()
-            logger.info(f"   Termo normalizado: '{descricao_lower}'")
-            match_exato = df[df[col].str.lower().str.strip() == descricao_lower]
-            logger.info(f"   Resultados encontrados: {len(match_exato)}")
-            if not match_exato.empty:
-                linha = match_exato.iloc[0]
-                logger.info(f"[OK] Match exato encontrado em '{col}'!")
-                logger.info(f"   Linha matched: {linha.to_dict()}")
-
-                return {
-                    'sucesso': True,
-                    'tipo_cap': 'oficial',
-                    'origem_fluxo': 'match_exato',
-                    'cap': _gerar_cap_oficial(linha, area_codigo),
-                    'macroprocesso': linha['Macroprocesso'],
-                    'processo': linha['Processo'],
-                    'subprocesso': linha['Subprocesso'],
-                    'atividade': linha['Atividade'],
-                    'resultado_final': f"{linha['Atividade']} concluída",  # Inferir resultado
-                    'justificativa': f"Encontrado no catálogo oficial (correspondência exata em '{col}').",
-                    'confianca': 'alta'
-                }
-
-        logger.info("[ERRO] Nenhum match exato encontrado")
-
-        # 3️⃣ Match FUZZY >= 85% (busca por similaridade)
-        logger.info("[BUSCA] Tentando MATCH FUZZY (threshold >= 85%)...")
-        todas_atividades = df['Atividade'].tolist()
-        logger.info(f"   Total de atividades para comparar: {len(todas_atividades)}")
-        logger.info(f"   Primeiras 3 atividades: {todas_atividades[:3]}")
-
-        if todas_atividades:
-            match_result = process.extractOne(
-                descricao_usuario,
-                todas_atividades,
-                scorer=fuzz.token_sort_ratio
-            )
-            logger.info(f"   Resultado do fuzzy: {match_result}")
-
-            if match_result:
-                match_texto, score, idx = match_result
-                logger.info(f"   Melhor match: '{match_texto}' (score: {score}%, índice: {idx})")
-
-                if score >= 85:
-                    linha = df.iloc[idx]
-                    logger.info(f"[OK] Match fuzzy encontrado: '{match_texto}' (score: {score}%)")
-                    logger.info(f"   Linha matched: {linha.to_dict()}")
-
-                    return {
-                        'sucesso': True,
-                        'tipo_cap': 'oficial',
-                        'origem_fluxo': 'match_fuzzy',
-                        'cap': _gerar_cap_oficial(linha, area_codigo),
-                        'macroprocesso': linha['Macroprocesso'],
-                        'processo': linha['Processo'],
-                        'subprocesso': linha['Subprocesso'],
-                        'atividade': linha['Atividade'],
-                        'resultado_final': f"{linha['Atividade']} concluída",
-                        'justificativa': f"Encontrado no catálogo oficial (similaridade de {score:.1f}% com '{match_texto}').",
-                        'confianca': 'media' if score < 95 else 'alta'
-                    }
-                else:
-                    logger.info(f"[AVISO] Melhor match: '{match_texto}' ({score}%) - abaixo do limite (85%)")
-            else:
-                logger.info("[AVISO] process.extractOne retornou None")
-        else:
-            logger.info("[AVISO] Lista de atividades está vazia")
-
-        logger.info("[ERRO] Nenhum match fuzzy encontrado")
-
-        # 4️⃣ Não encontrou → retornar "não encontrado" para o pipeline decidir
-        logger.info("="*80)
+        from .indice_camada1 import obter_indice_camada1, SCORE_MINIMO_FUZZY
+
+        indice = obter_indice_camada1()
+        logger.debug(f"[BUSCA] Camada 1: '{descricao_usuario}' ({len(indice.linhas)} atividades)")
+
+        # 1️⃣ Match EXATO (case insensitive) - busca em todas colunas relevantes
+        match = indice.match_exato(descricao_usuario)
+        if match is not None:
+            linha, col = match
+            logger.info(f"[OK] Match exato encontrado em '{col}': {linha.numero}")
+
+            return {
+                'sucesso': True,
+                'tipo_cap': 'oficial',
+                'origem_fluxo': 'match_exato',
+                'cap': _gerar_cap_oficial(linha, area_codigo),
+                'macroprocesso': linha.macroprocesso,
+                'processo': linha.processo,
+                'subprocesso': linha.subprocesso,
+                'atividade': linha.atividade,
+                'resultado_final': f"{linha.atividade} concluída",  # Inferir resultado
+                'justificativa': f"Encontrado no catálogo oficial (correspondência exata em '{col}').",
+                'confianca': 'alta'
+            }
+
+        # 2️⃣ Match FUZZY >= 85% (busca por similaridade)
+        macros_area = None
+        if filtrar_por_area and area_codigo:
+            macros_area = _macros_da_area(area_codigo)
+
+        match = indice.match_fuzzy(descricao_usuario, SCORE_MINIMO_FUZZY, macros_area)
+        if match is not None:
+            linha, score, match_texto = match
+            logger.info(f"[OK] Match fuzzy encontrado: '{match_texto}' (score: {score}%)")
+
+            return {
+                'sucesso': True,
+                'tipo_cap': 'oficial',
+                'origem_fluxo': 'match_fuzzy',
+                'cap': _gerar_cap_oficial(linha, area_codigo),
+                'macroprocesso': linha.macroprocesso,
+                'processo': linha.processo,
+                'subprocesso': linha.subprocesso,
+                'atividade': linha.atividade,
+                'resultado_final': f"{linha.atividade} concluída",
+                'justificativa': f"Encontrado no catálogo oficial (similaridade de {score:.1f}% com '{match_texto}').",
+                'confianca': 'media' if score < 95 else 'alta'
+            }
+
+        # 3️⃣ Não encontrou → retornar "não encontrado" para o pipeline decidir
         logger.info("[CAMADA 1] Nenhum match no CSV - retornando 'encontrado=False'")
-        logger.info("[CAMADA 1] Pipeline decidirá próximas camadas (semântica/RAG)")
-        logger.info("="*80)
 
         return {
             'sucesso': True,
@@ -430,6 +370,19 @@ def classificar_e_gerar_cap(descricao_usuario, area_codigo, contexto=None, autor
         }
 
 
+def _macros_da_area(area_codigo):
+    """Números de macroprocesso típicos da área (snapshot do registro de referência)."""
+    from processos.infra.loaders.registro_referencia import obter_snapshot_referencia
+    from .busca_atividade_pipeline import _ler_mapeamento_macroprocesso
+
+    mapeamento = obter_snapshot_referencia(
+        'mapeamento_macroprocesso_area',
+        'documentos_base/mapeamento_macroprocesso_area.csv',
+        _ler_mapeamento_macroprocesso,
+    ).dados
+    return mapeamento.get(area_codigo)
+
+
 def _gerar_cap_oficial(linha_csv, area_codigo):
     """
     Retorna CAP oficial da linha do CSV, com prefixo da área.
@@ -438,28 +391,23 @@ def _gerar_cap_oficial(linha_csv, area_codigo):
 
     REGRA: Camadas 1-3 SEMPRE retornam CAP do CSV oficial.
     CAP é obrigatório - se não existir, lança exceção.
-    """
-    import pandas as pd
-
-    # Verificar se campo Numero existe e está preenchido
-    if 'Numero' not in linha_csv.index:
-        raise ValueError("Campo 'Numero' não encontrado no CSV oficial.")
 
-    numero_csv = linha_csv['Numero']
+    Args:
+        linha_csv: LinhaArquitetura (índice da arquitetura)
+    """
+    numero = linha_csv.numero
 
     # Validar que CAP não é vazio/None
-    if pd.isna(numero_csv) or not str(numero_csv).strip():
+    if not numero:
         raise ValueError(
-            f"Atividade '{linha_csv.get('Atividade', 'N/A')}' não possui CAP registrado no CSV oficial. "
+            f"Atividade '{linha_csv.atividade or 'N/A'}' não possui CAP registrado no CSV oficial. "
             f"Todas as atividades nas Camadas 1-3 devem ter CAP obrigatório."
         )
 
-    numero = str(numero_csv).strip()
-
     # Adicionar prefixo da área (ex: COATE -> "3", CGRIS -> "6")
     if area_codigo:
-        from processos.infra.loaders import carregar_areas_organizacionais
-        areas = carregar_areas_organizacionais()
+        from processos.infra.loaders.areas_loader import snapshot_areas_organizacionais
+        areas = snapshot_areas_organizacionais().dados
         prefixo = None
         for info in areas.values():
             if info.get('codigo') == area_codigo:
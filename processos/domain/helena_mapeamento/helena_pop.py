@@ -12,10 +12,11 @@ Refatorado em 2024-11:
 - Loaders de dados extraídos para processos/infra/loaders/
 """
 from enum import Enum
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Mapping, Tuple
 import logging
 import re
 import json
+import threading
 
 from processos.domain.base import BaseHelena
 from processos.infra.parsers import parse_operadores
@@ -32,7 +33,6 @@ from processos.domain.governanca import (
 # Loaders (carregamento de dados)
 from processos.infra.loaders import (
     carregar_areas_organizacionais,
-    carregar_descricoes_areas,
     carregar_sistemas,
     carregar_operadores,
     carregar_orgaos_centralizados,
@@ -41,7 +41,12 @@ from processos.infra.loaders import (
     carregar_arquitetura_csv,
     carregar_tipos_documentos_requeridos,
     carregar_tipos_documentos_gerados,
+    snapshot_areas_organizacionais,
+    snapshot_descricoes_areas,
+    snapshot_sistemas,
+    snapshot_operadores,
 )
+from processos.infra.loaders.registro_referencia import descongelar
 
 # Tentativa de importar BaseLegalSuggestorDECIPEx (opcional)
 try:
@@ -316,12 +321,9 @@ class HelenaPOP(BaseHelena):
         else:
             self.suggestor_base_legal = None
 
-        # Memória anti-repetição de sugestões
-        self._atividades_sugeridas = []
-        self._codigos_sugeridos = set()
-
         # Lazy loading do pipeline de busca
         self._pipeline_instance = None
+        self._pipeline_lock = threading.Lock()
 
     # ========================================================================
     # HELPER - Detecção de Intenção
@@ -376,33 +378,38 @@ class HelenaPOP(BaseHelena):
     def _pipeline(self):
         """Lazy loading do BuscaAtividadePipeline (instância única)"""
         if self._pipeline_instance is None:
-            from processos.domain.helena_mapeamento.busca_atividade_pipeline import BuscaAtividadePipeline
-            self._pipeline_instance = BuscaAtividadePipeline()
+            with self._pipeline_lock:
+                if self._pipeline_instance is None:
+                    from processos.domain.helena_mapeamento.busca_atividade_pipeline import BuscaAtividadePipeline
+                    self._pipeline_instance = BuscaAtividadePipeline()
         return self._pipeline_instance
 
     # ========================================================================
     # PROPERTIES - Usam os loaders extraídos em processos/infra/loaders/
+    # (snapshots em memória do registro de referência: sem leitura de CSV por turno)
+    # Somente leitura: dados congelados e compartilhados, sem cópia por acesso.
+    # Para guardar no estado/interface, use carregar_*() ou descongelar().
     # ========================================================================
 
     @property
-    def AREAS_DECIPEX(self) -> Dict[int, Dict[str, str]]:
-        """Áreas organizacionais carregadas do CSV via loader."""
-        return carregar_areas_organizacionais()
+    def AREAS_DECIPEX(self) -> Mapping[int, Mapping[str, Any]]:
+        """Áreas organizacionais (snapshot do registro de referência)."""
+        return snapshot_areas_organizacionais().dados
 
     @property
-    def DESCRICOES_AREAS(self) -> Dict[str, str]:
-        """Descrições personalizadas de cada área via loader."""
-        return carregar_descricoes_areas()
+    def DESCRICOES_AREAS(self) -> Mapping[str, str]:
+        """Descrições personalizadas de cada área (snapshot do registro de referência)."""
+        return snapshot_descricoes_areas().dados
 
     @property
-    def SISTEMAS_DECIPEX(self) -> Dict[str, List[str]]:
-        """Sistemas carregados do CSV via loader."""
-        return carregar_sistemas()
+    def SISTEMAS_DECIPEX(self) -> Mapping[str, Tuple[str, ...]]:
+        """Sistemas (snapshot do registro de referência)."""
+        return snapshot_sistemas().dados
 
     @property
-    def OPERADORES_DECIPEX(self) -> List[str]:
-        """Operadores carregados do CSV via loader."""
-        return carregar_operadores()
+    def OPERADORES_DECIPEX(self) -> Tuple[str, ...]:
+        """Operadores (snapshot do registro de referência)."""
+        return snapshot_operadores().dados
 
     def _preparar_dados_dropdown_hierarquico(self) -> Dict[str, Any]:
         """
@@ -856,7 +863,7 @@ class HelenaPOP(BaseHelena):
             # Interface rica de operadores
             tipo_interface = 'operadores'
             dados_interface = {
-                'opcoes': self.OPERADORES_DECIPEX,
+                'opcoes': carregar_operadores(),
                 'campo_livre': True,
                 'multipla_selecao': True
             }
@@ -865,7 +872,7 @@ class HelenaPOP(BaseHelena):
             # Interface rica de sistemas organizados
             tipo_interface = 'sistemas'
             dados_interface = {
-                'sistemas_por_categoria': self.SISTEMAS_DECIPEX,
+                'sistemas_por_categoria': carregar_sistemas(),
                 'campo_livre': True,
                 'multipla_selecao': True
             }
@@ -1511,7 +1518,7 @@ class HelenaPOP(BaseHelena):
         try:
             numero = int(mensagem.strip())
             if numero in self.AREAS_DECIPEX:
-                sm.area_selecionada = self.AREAS_DECIPEX[numero]
+                sm.area_selecionada = descongelar(self.AREAS_DECIPEX[numero])
 
                 # Verificar se a área tem subáreas
                 if sm.area_selecionada.get('tem_subareas', False):
@@ -2281,7 +2288,7 @@ class HelenaPOP(BaseHelena):
         sm.estado = EstadoPOP.SISTEMAS
         sm.tipo_interface = 'sistemas'
         sm.dados_interface = {
-            'sistemas_por_categoria': self.SISTEMAS_DECIPEX,
+            'sistemas_por_categoria': carregar_sistemas(),
             'campo_livre': True,
             'multipla_selecao': True
         }
@@ -3382,13 +3389,13 @@ class HelenaPOP(BaseHelena):
 
             secao_map = {
                 'sistemas': (EstadoPOP.SISTEMAS, 'sistemas', {
-                    'sistemas_por_categoria': self.SISTEMAS_DECIPEX,
+                    'sistemas_por_categoria': carregar_sistemas(),
                     'campo_livre': True,
                     'multipla_selecao': True,
                     'selecionados': sm.dados_coletados.get('sistemas', []),
                 }),
                 'operadores': (EstadoPOP.OPERADORES, 'operadores', {
-                    'opcoes': self.OPERADORES_DECIPEX,
+                    'opcoes': carregar_operadores(),
                     'campo_livre': True,
                     'multipla_selecao': True,
                     'selecionados': sm.dados_coletados.get('operadores', []),
@@ -3916,14 +3923,13 @@ class HelenaPOP(BaseHelena):
 
 
     def _buscar_linha_arquitetura(self, sm: POPStateMachine):
-        """Busca linha no CSV da arquitetura pelo filtro hierárquico."""
-        filtro = (
-            (self.arquitetura.df['Macroprocesso'] == sm.macro_selecionado) &
-            (self.arquitetura.df['Processo'] == sm.processo_selecionado) &
-            (self.arquitetura.df['Subprocesso'] == sm.subprocesso_selecionado) &
-            (self.arquitetura.df['Atividade'] == sm.atividade_selecionada)
+        """Busca linha da arquitetura pelo caminho hierárquico (lookup O(1) no índice)."""
+        return self.arquitetura.indice.linha(
+            sm.macro_selecionado,
+            sm.processo_selecionado,
+            sm.subprocesso_selecionado,
+            sm.atividade_selecionada,
         )
-        return self.arquitetura.df[filtro]
 
     def _gerar_codigo_processo(self, sm: POPStateMachine) -> str:
         """Gera código CAP (Código na Arquitetura de Processos) automaticamente."""
@@ -3937,11 +3943,10 @@ class HelenaPOP(BaseHelena):
         # Tentar buscar código direto no CSV
         try:
             linha = self._buscar_linha_arquitetura(sm)
-            if not linha.empty:
-                # Buscar coluna Codigo (case insensitive)
-                col_codigo = next((c for c in linha.columns if c.lower() == 'codigo'), None)
-                if col_codigo:
-                    codigo_csv = linha[col_codigo].iloc[0]
+            if linha is not None:
+                # Coluna Codigo (opcional no CSV)
+                if linha.codigo:
+                    codigo_csv = linha.codigo
                     if not self._codigo_existe_no_banco(codigo_csv):
                         logger.info(f"[CAP] Encontrado no CSV: {codigo_csv}")
                         return codigo_csv
@@ -3951,8 +3956,8 @@ class HelenaPOP(BaseHelena):
         # Gerar código baseado em numeração do CSV ou índices dinâmicos
         try:
             linha = self._buscar_linha_arquitetura(sm)
-            if not linha.empty and 'Numero' in linha.columns:
-                partes = str(linha.iloc[0]['Numero']).split('.')
+            if linha is not None and linha.numero:
+                partes = linha.numero.split('.')
                 if len(partes) >= 4:
                     codigo_base = f"{prefixo}.{partes[0]}.{partes[1]}.{partes[2]}.{partes[3]}"
                 else:
@@ -0,0 +1,151 @@
+"""
+Índice da Camada 1 (match exato/fuzzy) - Helena POP
+
+Responsável por:
+- Match exato O(1): dict por coluna (Macroprocesso, Processo, Subprocesso,
+  Atividade) com chave texto.lower().strip() -> 1ª linha do CSV
+- Match fuzzy sobre escolhas pré-computadas: token_sort_ratio(q, c) é
+  ratio(sorted_tokens(q), sorted_tokens(c)); os tokens das atividades são
+  ordenados 1x no build, por consulta só a query é processada
+- Filtro opcional por área (macroprocessos da área) com escolhas
+  pré-computadas por conjunto de macroprocessos
+
+Construído a partir do ArquiteturaIndex (arquitetura_index) e reconstruído
+apenas quando o hash do CSV muda.
+"""
+
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from rapidfuzz import fuzz, process
+
+from processos.infra.loaders.arquitetura_index import (
+    ArquiteturaIndex, LinhaArquitetura, obter_indice_arquitetura,
+)
+
+logger = logging.getLogger(__name__)
+
+CSV_ARQUITETURA = 'documentos_base/Arquitetura_DECIPEX_mapeada.csv'
+SCORE_MINIMO_FUZZY = 85
+
+# Ordem de prioridade do match exato (mesma do fluxo original)
+COLUNAS_MATCH_EXATO = (
+    ('Macroprocesso', 'macroprocesso'),
+    ('Processo', 'processo'),
+    ('Subprocesso', 'subprocesso'),
+    ('Atividade', 'atividade'),
+)
+
+
+def _chave_exata(texto: str) -> str:
+    return texto.lower().strip()
+
+
+def _tokens_ordenados(texto: str) -> str:
+    return ' '.join(sorted(texto.split()))
+
+
+class IndiceCamada1:
+    """Índice imutável para match exato/fuzzy contra a arquitetura oficial."""
+
+    def __init__(self, arquitetura: ArquiteturaIndex):
+        self.csv_hash = arquitetura.csv_hash
+        self.linhas = arquitetura.linhas
+
+        self._exato: Dict[str, Dict[str, int]] = {}
+        for coluna, atributo in COLUNAS_MATCH_EXATO:
+            mapa: Dict[str, int] = {}
+            for linha in self.linhas:
+                chave = _chave_exata(getattr(linha, atributo))
+                if chave and chave not in mapa:
+                    mapa[chave] = linha.idx
+            self._exato[coluna] = mapa
+
+        self._escolhas: List[str] = [_tokens_ordenados(l.atividade) for l in self.linhas]
+        self._macro_ids: List[str] = [l.numero.split('.')[0] for l in self.linhas]
+
+        # frozenset(macros) -> (escolhas, idx das linhas); preenchido sob demanda
+        self._escolhas_por_macros: Dict[frozenset, Tuple[List[str], List[int]]] = {}
+        self._lock = threading.Lock()
+
+    def match_exato(self, descricao: str) -> Optional[Tuple[LinhaArquitetura, str]]:
+        """(linha, coluna) da 1ª correspondência exata, na ordem de COLUNAS_MATCH_EXATO."""
+        chave = _chave_exata(descricao)
+        if not chave:
+            return None
+        for coluna, _ in COLUNAS_MATCH_EXATO:
+            idx = self._exato[coluna].get(chave)
+            if idx is not None:
+                return self.linhas[idx], coluna
+        return None
+
+    def _escolhas_area(self, macros: Iterable[str]) -> Tuple[List[str], List[int]]:
+        chave = frozenset(str(m) for m in macros)
+        entrada = self._escolhas_por_macros.get(chave)
+        if entrada is None:
+            with self._lock:
+                entrada = self._escolhas_por_macros.get(chave)
+                if entrada is None:
+                    idxs = [i for i, macro in enumerate(self._macro_ids) if macro in chave]
+                    entrada = ([self._escolhas[i] for i in idxs], idxs)
+                    self._escolhas_por_macros[chave] = entrada
+        return entrada
+
+    def match_fuzzy(
+        self,
+        descricao: str,
+        score_minimo: float = SCORE_MINIMO_FUZZY,
+        macros_area: Optional[Iterable[str]] = None,
+    ) -> Optional[Tuple[LinhaArquitetura, float, str]]:
+        """
+        Melhor atividade por token_sort_ratio (>= score_minimo).
+
+        Args:
+            macros_area: Números de macroprocesso da área (filtra as escolhas)
+
+        Returns:
+            (linha, score, atividade) ou None
+        """
+        if macros_area is not None:
+            escolhas, idxs = self._escolhas_area(macros_area)
+        else:
+            escolhas, idxs = self._escolhas, None
+
+        if not escolhas:
+            return None
+
+        resultado = process.extractOne(
+            _tokens_ordenados(descricao),
+            escolhas,
+            scorer=fuzz.ratio,
+            score_cutoff=score_minimo,
+        )
+        if resultado is None:
+            return None
+
+        _, score, pos = resultado
+        linha = self.linhas[idxs[pos] if idxs is not None else pos]
+        return linha, score, linha.atividade
+
+
+_INDICE: Optional[IndiceCamada1] = None
+_INDICE_LOCK = threading.Lock()
+
+
+def obter_indice_camada1(caminho_csv: str = CSV_ARQUITETURA) -> IndiceCamada1:
+    """
+    Retorna o índice da Camada 1 (1x por processo; refeito se o CSV mudar).
+    """
+    global _INDICE
+
+    arquitetura = obter_indice_arquitetura(caminho_csv)
+    indice = _INDICE
+    if indice is not None and indice.csv_hash == arquitetura.csv_hash:
+        return indice
+
+    with _INDICE_LOCK:
+        if _INDICE is None or _INDICE.csv_hash != arquitetura.csv_hash:
+            _INDICE = IndiceCamada1(arquitetura)
+            logger.info(f"[CAMADA 1] Índice construído: {len(arquitetura)} atividades")
+        return _INDICE
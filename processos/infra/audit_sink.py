@@ -0,0 +1,268 @@
+"""
+Audit Sink - Gravação assíncrona em lote de AuditLog / SecurityEvent
+
+Responsável por:
+- Tirar o INSERT de auditoria do caminho da requisição: eventos (instâncias
+  não salvas) vão para uma fila limitada em memória do processo
+- Gravar a fila em lotes (bulk_create por model) numa thread daemon
+- Flush final na saída do processo (atexit)
+- Mapa de ContentType em memória (content_type_id sem query)
+
+Política de fila cheia (settings.AUDIT_SINK_OVERFLOW):
+- 'sincrono' (default): grava o evento na hora, como antes
+- 'descartar_novo': descarta o evento que chegou
+- 'descartar_antigo': descarta o mais antigo da fila
+
+Eventos que não podem esperar (SecurityEvent de severidade alta, ou
+sincrono=True) não passam pela fila. Sem settings.AUDIT_ASYNC tudo é
+gravado na hora.
+
+Métricas: mapagov_audit_queue_depth, mapagov_audit_events_written_total,
+mapagov_audit_events_dropped_total.
+"""
+import atexit
+import logging
+import threading
+from collections import defaultdict, deque
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from processos.infra.metrics import (
+    audit_events_dropped_total,
+    audit_events_written_total,
+    audit_queue_depth,
+)
+
+logger = logging.getLogger(__name__)
+
+POLITICAS_OVERFLOW = ('sincrono', 'descartar_novo', 'descartar_antigo')
+
+_content_types: Dict[str, int] = {}
+_content_types_lock = threading.Lock()
+
+
+def content_type_id(instancia) -> int:
+    """ID do ContentType do model da instância (1 query por model/processo)."""
+    rotulo = instancia._meta.label_lower
+    ct_id = _content_types.get(rotulo)
+    if ct_id is None:
+        from django.contrib.contenttypes.models import ContentType
+        ct_id = ContentType.objects.get_for_model(instancia).pk
+        with _content_types_lock:
+            _content_types[rotulo] = ct_id
+    return ct_id
+
+
+def gravar_agora(instancia):
+    """INSERT síncrono (caminho antigo) com métrica."""
+    instancia.save(force_insert=True)
+    audit_events_written_total.labels(model=type(instancia).__name__, modo='sincrono').inc()
+    return instancia
+
+
+class AuditSink:
+    """
+    Fila limitada + flusher em lote (thread-safe).
+
+    Uso:
+        sink = AuditSink(max_fila=10000, tamanho_lote=200)
+        sink.enviar(AuditLog(...))   # não bloqueia a requisição
+        sink.flush()                 # grava tudo o que está na fila
+    """
+
+    def __init__(
+        self,
+        max_fila: int = 10000,
+        tamanho_lote: int = 200,
+        intervalo: float = 1.0,
+        politica: str = 'sincrono',
+        thread: bool = True,
+    ):
+        if politica not in POLITICAS_OVERFLOW:
+            logger.warning(f"[AUDIT] Política de overflow inválida ({politica!r}); usando 'sincrono'")
+            politica = 'sincrono'
+
+        self.max_fila = max_fila
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.politica = politica
+        self._usar_thread = thread
+
+        self._fila: deque = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._atexit_registrado = False
+
+    # ------------------------------------------------------------------
+    # Produtor
+    # ------------------------------------------------------------------
+
+    def enviar(self, instancia) -> bool:
+        """
+        Enfileira o evento.
+
+        Returns:
+            False se o evento foi descartado (fila cheia, 'descartar_novo')
+        """
+        if self._usar_thread:
+            self._garantir_thread()
+
+        with self._cond:
+            cheia = len(self._fila) >= self.max_fila
+            if cheia and self.politica == 'descartar_novo':
+                audit_events_dropped_total.labels(motivo='fila_cheia').inc()
+                return False
+            if cheia and self.politica == 'descartar_antigo':
+                self._fila.popleft()
+                audit_events_dropped_total.labels(motivo='fila_cheia').inc()
+                cheia = False
+
+            if not cheia:
+                self._fila.append(instancia)
+                profundidade = len(self._fila)
+                if profundidade >= self.tamanho_lote:
+                    self._cond.notify()
+
+        if cheia:
+            # 'sincrono': grava fora do lock, no caminho da requisição
+            gravar_agora(instancia)
+            return True
+
+        audit_queue_depth.set(profundidade)
+        return True
+
+    # ------------------------------------------------------------------
+    # Consumidor
+    # ------------------------------------------------------------------
+
+    def pendentes(self) -> int:
+        return len(self._fila)
+
+    def flush(self) -> int:
+        """
+        Grava tudo o que está na fila (em lotes de tamanho_lote).
+
+        Returns:
+            Quantidade de eventos gravados
+        """
+        total = 0
+        with self._flush_lock:
+            while True:
+                with self._cond:
+                    lote = [self._fila.popleft() for _ in range(min(self.tamanho_lote, len(self._fila)))]
+                    audit_queue_depth.set(len(self._fila))
+                if not lote:
+                    break
+                total += self._gravar_lote(lote)
+        return total
+
+    def _gravar_lote(self, lote: List) -> int:
+        """bulk_create por model; se o lote falhar, grava 1 a 1 (isola o evento ruim)."""
+        por_model = defaultdict(list)
+        for instancia in lote:
+            por_model[type(instancia)].append(instancia)
+
+        gravados = 0
+        for model, instancias in por_model.items():
+            try:
+                model.objects.bulk_create(instancias, batch_size=self.tamanho_lote)
+                gravados += len(instancias)
+                audit_events_written_total.labels(model=model.__name__, modo='lote').inc(len(instancias))
+                continue
+            except Exception as e:
+                logger.error(f"[AUDIT] bulk_create de {len(instancias)} {model.__name__} falhou: {e}")
+
+            for instancia in instancias:
+                try:
+                    instancia.pk = None
+                    instancia.save(force_insert=True)
+                    gravados += 1
+                    audit_events_written_total.labels(model=model.__name__, modo='lote').inc()
+                except Exception as e:
+                    audit_events_dropped_total.labels(motivo='erro_banco').inc()
+                    logger.error(f"[AUDIT] Evento de auditoria descartado ({model.__name__}): {e}")
+        return gravados
+
+    # ------------------------------------------------------------------
+    # Thread
+    # ------------------------------------------------------------------
+
+    def _garantir_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._loop, name='audit-sink-flusher', daemon=True)
+            self._thread.start()
+            if not self._atexit_registrado:
+                atexit.register(self.parar)
+                self._atexit_registrado = True
+            logger.info(f"[AUDIT] Flusher iniciado (lote: {self.tamanho_lote}, intervalo: {self.intervalo}s)")
+
+    def _loop(self) -> None:
+        while not self._parar.is_set():
+            with self._cond:
+                if len(self._fila) < self.tamanho_lote:
+                    self._cond.wait(self.intervalo)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"[AUDIT] Erro no flush da fila de auditoria: {e}")
+            finally:
+                close_old_connections()
+
+    def parar(self) -> None:
+        """Para a thread e grava o que restou na fila."""
+        self._parar.set()
+        with self._cond:
+            self._cond.notify_all()
+        self.flush()
+
+
+_audit_sink: Optional[AuditSink] = None
+_audit_sink_lock = threading.Lock()
+
+
+def get_audit_sink() -> AuditSink:
+    """Retorna instância singleton do sink de auditoria."""
+    global _audit_sink
+
+    if _audit_sink is None:
+        with _audit_sink_lock:
+            if _audit_sink is None:
+                _audit_sink = AuditSink(
+                    max_fila=getattr(settings, 'AUDIT_SINK_MAX_QUEUE', 10000),
+                    tamanho_lote=getattr(settings, 'AUDIT_SINK_BATCH_SIZE', 200),
+                    intervalo=getattr(settings, 'AUDIT_SINK_FLUSH_SECONDS', 1.0),
+                    politica=getattr(settings, 'AUDIT_SINK_OVERFLOW', 'sincrono'),
+                )
+
+    return _audit_sink
+
+
+def definir_audit_sink(sink: Optional[AuditSink]) -> None:
+    """Substitui o sink (testes). None = recria a partir dos settings."""
+    global _audit_sink
+    with _audit_sink_lock:
+        _audit_sink = sink
+
+
+def registrar_evento(instancia, sincrono: bool = False):
+    """
+    Ponto único de gravação de eventos de auditoria.
+
+    Grava na hora se sincrono=True ou settings.AUDIT_ASYNC desligado;
+    senão enfileira no sink. Retorna a instância (sem pk se enfileirada).
+    """
+    if sincrono or not getattr(settings, 'AUDIT_ASYNC', False):
+        return gravar_agora(instancia)
+
+    get_audit_sink().enviar(instancia)
+    return instancia
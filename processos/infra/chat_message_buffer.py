@@ -0,0 +1,312 @@
+"""
+Chat Message Buffer - Write-behind de mensagens de chat (Redis → PostgreSQL)
+
+Responsável por:
+- Enfileirar mensagens no Redis (lista por sessão) fora do caminho crítico
+  do chat, com idempotência por req_uuid
+- Gravar o buffer no PostgreSQL em lotes (bulk_create, ignore_conflicts)
+- Flusher periódico no processo (thread daemon) e via management command
+
+Chaves Redis:
+- chat:buffer:{session_id}     lista de mensagens (JSON) na ordem de chegada
+- chat:buffer:sessions         conjunto de sessões com mensagens pendentes
+- chat:buffer:req:{req_uuid}   marcador de idempotência (TTL)
+- chat:buffer:flush_lock       1 flusher por vez (entre processos)
+- chat:buffer:dead             mensagens que o banco recusou (dead-letter)
+
+Garantias:
+- Mensagem só sai do buffer depois do INSERT (LRANGE → bulk_create → LTRIM);
+  queda no meio regrava o lote, e a constraint de req_uuid descarta duplicatas
+- Ordem preservada por sessão; criado_em = momento do flush (atraso máximo
+  ~CHAT_WRITE_BEHIND_FLUSH_SECONDS)
+- Leituras de histórico e finalização de sessão fazem flush da sessão antes
+- Lote recusado pelo banco (ex.: sessão apagada → FK) é regravado por sessão
+  e depois 1 a 1; só a mensagem ruim vai para a dead-letter, o resto segue
+
+Ativado por settings.CHAT_WRITE_BEHIND (ver SessionManager).
+"""
+import atexit
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import DataError, IntegrityError, close_old_connections, transaction
+
+from processos.models_new.chat_message import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+PREFIXO = 'chat:buffer'
+CHAVE_SESSOES = f'{PREFIXO}:sessions'
+CHAVE_LOCK = f'{PREFIXO}:flush_lock'
+CHAVE_DEAD_LETTER = f'{PREFIXO}:dead'
+TTL_IDEMPOTENCIA = 86400  # 24h: janela de retry com o mesmo req_uuid
+TTL_LOCK = 60
+
+# Erros do próprio dado (não adianta repetir); indisponibilidade do banco
+# propaga e o lote fica no buffer para o próximo flush
+ERROS_DE_DADO = (IntegrityError, DataError, ValueError, KeyError, TypeError)
+
+# KEYS: marcador req_uuid, lista da sessão, conjunto de sessões
+# ARGV: mensagem JSON, TTL do marcador, session_id
+_LUA_ENFILEIRAR = """
+if redis.call('SET', KEYS[1], '1', 'NX', 'EX', ARGV[2]) then
+    redis.call('RPUSH', KEYS[2], ARGV[1])
+    redis.call('SADD', KEYS[3], ARGV[3])
+    return 1
+end
+return 0
+"""
+
+# KEYS: lista da sessão, conjunto de sessões | ARGV: qtd gravada, session_id
+_LUA_CONFIRMAR = """
+redis.call('LTRIM', KEYS[1], ARGV[1], -1)
+if redis.call('LLEN', KEYS[1]) == 0 then
+    redis.call('SREM', KEYS[2], ARGV[2])
+end
+return 1
+"""
+
+# KEYS: lock | ARGV: token do dono
+_LUA_LIBERAR = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _chave_sessao(session_id: str) -> str:
+    return f'{PREFIXO}:{session_id}'
+
+
+def serializar_mensagem(message: ChatMessage) -> str:
+    """ChatMessage (não salva) -> JSON do buffer."""
+    return json.dumps({
+        'req_uuid': str(message.req_uuid),
+        'session_pk': message.session_id,
+        'user_id': message.user_id,
+        'role': message.role,
+        'content': message.content,
+        'contexto': message.contexto,
+        'metadados': message.metadados,
+    }, ensure_ascii=False, default=str)
+
+
+def desserializar_mensagem(payload: str) -> ChatMessage:
+    dados = json.loads(payload)
+    return ChatMessage(
+        req_uuid=uuid.UUID(dados['req_uuid']),
+        session_id=dados['session_pk'],
+        user_id=dados['user_id'],
+        role=dados['role'],
+        content=dados['content'],
+        contexto=dados['contexto'],
+        metadados=dados['metadados'],
+    )
+
+
+class ChatMessageBuffer:
+    """
+    Buffer write-behind de mensagens sobre o cliente do RedisSessionCache.
+
+    Todos os métodos degradam para None/0 se o Redis falhar; o chamador
+    (SessionManager) grava direto no banco nesse caso.
+    """
+
+    def __init__(self, client, batch_size: int = 500):
+        self.client = client
+        self.batch_size = batch_size
+        self._enfileirar = client.register_script(_LUA_ENFILEIRAR)
+        self._confirmar = client.register_script(_LUA_CONFIRMAR)
+        self._liberar = client.register_script(_LUA_LIBERAR)
+
+    def enqueue(self, session_id: str, messages: List[ChatMessage]) -> Optional[List[bool]]:
+        """
+        Enfileira mensagens da sessão em 1 round-trip.
+
+        Returns:
+            Lista alinhada com messages (False = req_uuid duplicado, ignorada)
+            ou None se o Redis falhar
+        """
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for message in messages:
+                self._enfileirar(
+                    keys=[f'{PREFIXO}:req:{message.req_uuid}', _chave_sessao(session_id), CHAVE_SESSOES],
+                    args=[serializar_mensagem(message), TTL_IDEMPOTENCIA, session_id],
+                    client=pipe,
+                )
+            return [bool(r) for r in pipe.execute()]
+        except Exception as e:
+            logger.error(f"Erro ao enfileirar mensagens no Redis: {e}")
+            return None
+
+    def pending(self, session_id: Optional[str] = None) -> int:
+        """Mensagens pendentes (de uma sessão ou de todas)."""
+        try:
+            if session_id is not None:
+                return int(self.client.llen(_chave_sessao(session_id)))
+            sessoes = list(self.client.smembers(CHAVE_SESSOES))
+            if not sessoes:
+                return 0
+            pipe = self.client.pipeline(transaction=False)
+            for sid in sessoes:
+                pipe.llen(_chave_sessao(sid))
+            return int(sum(pipe.execute()))
+        except Exception as e:
+            logger.error(f"Erro ao consultar buffer de mensagens: {e}")
+            return 0
+
+    def flush(self, session_id: Optional[str] = None) -> int:
+        """
+        Grava mensagens pendentes no PostgreSQL (uma sessão ou todas).
+
+        Returns:
+            Quantidade de mensagens retiradas do buffer (inclui duplicatas
+            descartadas pela constraint de req_uuid)
+        """
+        token = str(uuid.uuid4())
+        try:
+            # Flush de sessão (finalização/leitura) espera o flusher em curso
+            if not self.client.set(CHAVE_LOCK, token, nx=True, ex=TTL_LOCK):
+                if session_id is None:
+                    return 0
+                for _ in range(50):
+                    time.sleep(0.1)
+                    if self.client.set(CHAVE_LOCK, token, nx=True, ex=TTL_LOCK):
+                        break
+                else:
+                    logger.warning(f"Flush da sessão {session_id} sem lock (flusher ocupado)")
+                    return 0
+
+            sessoes = [session_id] if session_id is not None else list(self.client.smembers(CHAVE_SESSOES))
+            total = self._flush_sessoes(sessoes)
+            if total:
+                logger.info(f"[CHAT BUFFER] {total} mensagem(ns) gravada(s) em lote")
+            return total
+        except Exception as e:
+            logger.error(f"Erro no flush do buffer de mensagens: {e}")
+            return 0
+        finally:
+            try:
+                self._liberar(keys=[CHAVE_LOCK], args=[token])
+            except Exception:
+                pass
+
+    def _flush_sessoes(self, sessoes: List[str]) -> int:
+        """
+        Até batch_size mensagens de cada sessão por rodada, todas num único
+        bulk_create; LTRIM (confirmação) só depois do INSERT. Se o lote
+        conjunto falhar por causa dos dados, grava sessão a sessão.
+        """
+        total = 0
+        pendentes = list(sessoes)
+        while pendentes:
+            pipe = self.client.pipeline(transaction=False)
+            for sid in pendentes:
+                pipe.lrange(_chave_sessao(sid), 0, self.batch_size - 1)
+            lidos = list(zip(pendentes, pipe.execute()))
+
+            try:
+                lote = [desserializar_mensagem(p) for _, payloads in lidos for p in payloads]
+                if lote:
+                    with transaction.atomic():
+                        ChatMessage.objects.bulk_create(lote, batch_size=self.batch_size, ignore_conflicts=True)
+            except ERROS_DE_DADO as e:
+                logger.error(f"[CHAT BUFFER] Lote de {len(lidos)} sessão(ões) recusado, gravando por sessão: {e}")
+                for sid, payloads in lidos:
+                    self._gravar_sessao(sid, payloads)
+
+            pipe = self.client.pipeline(transaction=False)
+            for sid, payloads in lidos:
+                self._confirmar(keys=[_chave_sessao(sid), CHAVE_SESSOES], args=[len(payloads), sid], client=pipe)
+            pipe.execute()
+
+            total += sum(len(payloads) for _, payloads in lidos)
+            pendentes = [sid for sid, payloads in lidos if len(payloads) == self.batch_size]
+        return total
+
+    def _gravar_sessao(self, session_id: str, payloads: List[str]) -> None:
+        """Lote de uma sessão; se falhar, 1 a 1 e a mensagem recusada vai para a dead-letter."""
+        try:
+            with transaction.atomic():
+                ChatMessage.objects.bulk_create(
+                    [desserializar_mensagem(p) for p in payloads], batch_size=self.batch_size, ignore_conflicts=True
+                )
+            return
+        except ERROS_DE_DADO:
+            pass
+
+        for payload in payloads:
+            try:
+                with transaction.atomic():
+                    ChatMessage.objects.bulk_create([desserializar_mensagem(payload)], ignore_conflicts=True)
+            except ERROS_DE_DADO as e:
+                self._descartar(session_id, payload, e)
+
+    def _descartar(self, session_id: str, payload: str, erro: Exception) -> None:
+        logger.error(f"[CHAT BUFFER] Mensagem da sessão {session_id} recusada pelo banco (dead-letter): {erro}")
+        self.client.rpush(CHAVE_DEAD_LETTER, json.dumps({
+            'session_id': session_id,
+            'payload': payload,
+            'erro': str(erro)[:500],
+            'em': time.time(),
+        }, ensure_ascii=False))
+
+    def dead_letters(self) -> int:
+        """Mensagens na dead-letter (para inspeção manual)."""
+        try:
+            return int(self.client.llen(CHAVE_DEAD_LETTER))
+        except Exception as e:
+            logger.error(f"Erro ao consultar dead-letter de mensagens: {e}")
+            return 0
+
+
+# ============================================================================
+# Flusher no processo (thread daemon)
+# ============================================================================
+
+_flusher_thread: Optional[threading.Thread] = None
+_flusher_stop = threading.Event()
+_flusher_lock = threading.Lock()
+
+
+def iniciar_flusher(buffer: ChatMessageBuffer, intervalo: Optional[float] = None) -> None:
+    """
+    Inicia (1x por processo) a thread que grava o buffer a cada `intervalo` s.
+
+    Na saída do processo faz um último flush (atexit).
+    """
+    global _flusher_thread
+
+    if intervalo is None:
+        intervalo = getattr(settings, 'CHAT_WRITE_BEHIND_FLUSH_SECONDS', 2.0)
+
+    with _flusher_lock:
+        if _flusher_thread is not None and _flusher_thread.is_alive():
+            return
+
+        def _loop():
+            while not _flusher_stop.wait(intervalo):
+                try:
+                    buffer.flush()
+                finally:
+                    close_old_connections()
+
+        _flusher_stop.clear()
+        _flusher_thread = threading.Thread(target=_loop, name='chat-buffer-flusher', daemon=True)
+        _flusher_thread.start()
+        atexit.register(parar_flusher, buffer)
+        logger.info(f"[CHAT BUFFER] Flusher iniciado (intervalo: {intervalo}s)")
+
+
+def parar_flusher(buffer: Optional[ChatMessageBuffer] = None) -> None:
+    """Para a thread do flusher e faz o flush final."""
+    _flusher_stop.set()
+    if buffer is not None:
+        buffer.flush()
@@ -0,0 +1,229 @@
+"""
+Corpus Builder - Build incremental do corpus semântico (Helena POP)
+
+Responsável por:
+- Ler o CSV de arquitetura e montar texto + metadados de cada linha
+  (mesmo formato de corpus_meta.json)
+- Hash do texto de cada linha (corpus_row_hashes.npy): linhas inalteradas
+  reaproveitam o vetor do corpus_embeddings.npy anterior
+- Gerar embeddings apenas das linhas novas/alteradas, em lotes
+- Gravar os artefatos de forma atômica, fingerprint por último (um leitor que
+  valida pelo fingerprint nunca aceita um store pela metade)
+
+Usado por scripts/gerar_embeddings_corpus.py e por
+versionamento_csv.injetar_atividade_no_csv (atividade publicada fica buscável
+sem rebuild completo nem redeploy).
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from processos.infra.corpus_store import (
+    ARQUIVO_EMBEDDINGS,
+    ARQUIVO_FINGERPRINT,
+    ARQUIVO_META_LEGADO,
+    ARQUIVO_ROW_HASHES,
+    carregar_fingerprint,
+    descrever_store,
+    gravar_json_atomico,
+    gravar_meta_colunar,
+    gravar_npy_atomico,
+)
+
+logger = logging.getLogger(__name__)
+
+CSV_ARQUITETURA = 'documentos_base/Arquitetura_DECIPEX_mapeada.csv'
+MODELO_EMBEDDINGS = 'paraphrase-multilingual-MiniLM-L12-v2'
+VERSAO_CORPUS = '4.1'
+TAMANHO_LOTE_PADRAO = 64
+
+# Um build por processo de cada vez (publicações simultâneas)
+_BUILD_LOCK = threading.Lock()
+
+# Encoder: lista de textos -> np.ndarray (B, D) normalizado
+Encoder = Callable[[List[str]], np.ndarray]
+
+
+def hash_texto(texto: str) -> bytes:
+    """SHA-256 (32 chars hex) do texto da linha."""
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()[:32].encode('ascii')
+
+
+def calcular_hash_arquivo(filepath: str) -> str:
+    """SHA-256 do arquivo (primeiros 16 chars, formato do fingerprint)."""
+    sha256 = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(8192), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()[:16]
+
+
+def montar_corpus(csv_path: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Lê o CSV e retorna (corpus_meta, textos), alinhados por linha.
+
+    Texto = "Macroprocesso Processo Subprocesso Atividade" (o que é embeddado).
+    """
+    import pandas as pd
+
+    df = pd.read_csv(csv_path).fillna('')
+
+    corpus_meta = []
+    textos = []
+    for idx, row in df.iterrows():
+        texto = f"{row['Macroprocesso']} {row['Processo']} {row['Subprocesso']} {row['Atividade']}".strip()
+        corpus_meta.append({
+            'idx': int(idx),
+            'numero': str(row.get('Numero', '')).strip(),
+            'texto': texto,
+            'macroprocesso': row['Macroprocesso'],
+            'processo': row['Processo'],
+            'subprocesso': row['Subprocesso'],
+            'atividade': row['Atividade'],
+        })
+        textos.append(texto)
+    return corpus_meta, textos
+
+
+def _vetores_anteriores(base_path: str, model_name: str) -> Dict[bytes, np.ndarray]:
+    """
+    hash do texto -> vetor do build anterior (vazio se incompatível/ausente).
+
+    Sem corpus_row_hashes.npy (store gerado antes do build incremental), os
+    hashes são reconstruídos a partir do 'texto' de corpus_meta.json.
+    """
+    fingerprint = carregar_fingerprint(base_path)
+    if not fingerprint or fingerprint.get('model_name') != model_name:
+        return {}
+
+    embeddings_path = os.path.join(base_path, ARQUIVO_EMBEDDINGS)
+    hashes_path = os.path.join(base_path, ARQUIVO_ROW_HASHES)
+    meta_path = os.path.join(base_path, ARQUIVO_META_LEGADO)
+
+    try:
+        embeddings = np.load(embeddings_path)
+        if os.path.exists(hashes_path):
+            hashes = list(np.load(hashes_path))
+        else:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                hashes = [hash_texto(m.get('texto', '')) for m in json.load(f)]
+    except Exception as e:
+        logger.warning(f"[CORPUS BUILD] Build anterior ilegível, gerando tudo: {e}")
+        return {}
+
+    if len(hashes) != embeddings.shape[0]:
+        logger.warning("[CORPUS BUILD] Hashes e embeddings anteriores desalinhados, gerando tudo")
+        return {}
+
+    anteriores = {}
+    for h, vetor in zip(hashes, embeddings):
+        anteriores.setdefault(bytes(h), vetor)
+    return anteriores
+
+
+def _encoder_sentence_transformer(model=None, model_name: str = MODELO_EMBEDDINGS) -> Encoder:
+    """Encoder padrão (SentenceTransformer carregado só quando chamado)."""
+    estado = {'model': model}
+
+    def encoder(textos: List[str]) -> np.ndarray:
+        if estado['model'] is None:
+            from sentence_transformers import SentenceTransformer
+            logger.info(f"[CORPUS BUILD] Carregando modelo {model_name}...")
+            estado['model'] = SentenceTransformer(model_name)
+        return estado['model'].encode(
+            textos, convert_to_numpy=True, show_progress_bar=False, normalize_embeddings=True
+        )
+
+    return encoder
+
+
+def _gerar_embeddings(textos: Sequence[str], encoder: Encoder, tamanho_lote: int) -> np.ndarray:
+    blocos = [
+        np.asarray(encoder(list(textos[i:i + tamanho_lote])), dtype=np.float32)
+        for i in range(0, len(textos), tamanho_lote)
+    ]
+    return np.vstack(blocos)
+
+
+def atualizar_corpus(
+    base_path: str = 'documentos_base',
+    csv_path: str = CSV_ARQUITETURA,
+    encoder: Optional[Encoder] = None,
+    model=None,
+    model_name: str = MODELO_EMBEDDINGS,
+    tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+    forcar: bool = False,
+) -> Dict[str, Any]:
+    """
+    Atualiza os artefatos do corpus a partir do CSV (incremental).
+
+    Args:
+        encoder: textos -> vetores normalizados (default: SentenceTransformer)
+        model: SentenceTransformer já carregado (ex: o do pipeline) - evita
+            carregar o modelo de novo no processo
+        forcar: ignora o build anterior e gera todos os vetores
+
+    Returns:
+        {'n_atividades', 'reaproveitados', 'gerados', 'csv_hash', 'tempo_ms'}
+    """
+    if encoder is None:
+        encoder = _encoder_sentence_transformer(model, model_name)
+
+    with _BUILD_LOCK:
+        inicio = time.time()
+        corpus_meta, textos = montar_corpus(csv_path)
+        if not textos:
+            raise ValueError(f"CSV sem atividades: {csv_path}")
+
+        hashes = [hash_texto(t) for t in textos]
+        anteriores = {} if forcar else _vetores_anteriores(base_path, model_name)
+
+        pendentes = [i for i, h in enumerate(hashes) if h not in anteriores]
+        novos: Dict[int, np.ndarray] = {}
+        if pendentes:
+            vetores = _gerar_embeddings([textos[i] for i in pendentes], encoder, tamanho_lote)
+            novos = dict(zip(pendentes, vetores))
+
+        embeddings = np.vstack([
+            novos[i] if i in novos else anteriores[h] for i, h in enumerate(hashes)
+        ]).astype(np.float32)
+
+        # Ordem: dados primeiro, fingerprint por último
+        gravar_npy_atomico(os.path.join(base_path, ARQUIVO_EMBEDDINGS), embeddings)
+        gravar_meta_colunar(corpus_meta, base_path)
+        gravar_json_atomico(os.path.join(base_path, ARQUIVO_META_LEGADO), corpus_meta)
+        gravar_npy_atomico(os.path.join(base_path, ARQUIVO_ROW_HASHES), np.array(hashes, dtype='S32'))
+
+        csv_hash = calcular_hash_arquivo(csv_path)
+        gravar_json_atomico(os.path.join(base_path, ARQUIVO_FINGERPRINT), {
+            'csv_path': csv_path,
+            'csv_hash': csv_hash,
+            'model_name': model_name,
+            'n_atividades': len(corpus_meta),
+            'embedding_dim': int(embeddings.shape[1]),
+            'gerado_em': datetime.now().isoformat(),
+            'versao': VERSAO_CORPUS,
+            'store': descrever_store(base_path),
+        })
+
+        stats = {
+            'n_atividades': len(corpus_meta),
+            'reaproveitados': len(corpus_meta) - len(pendentes),
+            'gerados': len(pendentes),
+            'csv_hash': csv_hash,
+            'tempo_ms': (time.time() - inicio) * 1000,
+        }
+
+    logger.info(
+        f"[CORPUS BUILD] {stats['n_atividades']} atividades "
+        f"({stats['reaproveitados']} reaproveitadas, {stats['gerados']} geradas) "
+        f"em {stats['tempo_ms']:.0f}ms"
+    )
+    return stats
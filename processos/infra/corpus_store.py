@@ -0,0 +1,285 @@
+"""
+Corpus Store - Armazenamento mmap do corpus semântico (Helena POP)
+
+Responsável por:
+- Abrir embeddings + metadados colunares com mmap_mode='r'
+- Validar artefatos contra corpus_fingerprint.json lendo apenas cabeçalhos
+- Gravar metadados no formato colunar (usado por processos/infra/corpus_builder.py)
+- Gravação atômica (arquivo temporário + os.replace): workers com o arquivo
+  antigo em mmap continuam lendo o inode antigo
+
+Formato 'mmap-v1' (em documentos_base/):
+- corpus_embeddings.npy     float32 (N, D) - vetores normalizados
+- corpus_meta_codes.npy     int32 (N, 5)   - índice no dicionário, por coluna
+- corpus_meta_strings.npy   |S (K,)        - dicionário de strings únicas (UTF-8)
+
+Por que mmap:
+- Com N workers gunicorn, todos compartilham as mesmas páginas no page cache
+  do SO (1 cópia da matriz em RAM, não N)
+- Abrir o store lê apenas os cabeçalhos .npy (cold-start ~0ms)
+- Nenhum json.load por worker no caminho principal
+
+Fallback: se os arquivos colunares não existirem, usa corpus_meta.json legado.
+"""
+import json
+import logging
+import os
+import tempfile
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMATO_STORE = 'mmap-v1'
+
+ARQUIVO_EMBEDDINGS = 'corpus_embeddings.npy'
+ARQUIVO_META_CODES = 'corpus_meta_codes.npy'
+ARQUIVO_META_STRINGS = 'corpus_meta_strings.npy'
+ARQUIVO_META_LEGADO = 'corpus_meta.json'
+ARQUIVO_FINGERPRINT = 'corpus_fingerprint.json'
+ARQUIVO_ROW_HASHES = 'corpus_row_hashes.npy'  # Hash do texto de cada linha (build incremental)
+
+# Ordem das colunas em corpus_meta_codes.npy
+COLUNAS_META = ('numero', 'macroprocesso', 'processo', 'subprocesso', 'atividade')
+
+
+class CorpusMeta(Sequence):
+    """
+    Visão somente-leitura dos metadados do corpus.
+
+    Comporta-se como a lista de dicts de corpus_meta.json (len, índice,
+    iteração), mas materializa cada dict apenas quando acessado.
+    """
+
+    def __init__(self, codes: np.ndarray, strings: np.ndarray):
+        self._codes = codes
+        self._strings = strings
+
+    def __len__(self) -> int:
+        return int(self._codes.shape[0])
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        idx = int(idx)
+        if idx < 0:
+            idx += len(self)
+        row = self._codes[idx]
+        meta = {'idx': idx}
+        for col, nome in enumerate(COLUNAS_META):
+            meta[nome] = self._strings[row[col]].decode('utf-8')
+        meta['texto'] = ' '.join(
+            meta[nome] for nome in ('macroprocesso', 'processo', 'subprocesso', 'atividade')
+        ).strip()
+        return meta
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def coluna(self, nome: str) -> List[str]:
+        """Retorna todos os valores de uma coluna (alinhados com os embeddings)."""
+        col = COLUNAS_META.index(nome)
+        return [s.decode('utf-8') for s in self._strings[self._codes[:, col]]]
+
+
+class CorpusStore:
+    """
+    Corpus semântico aberto em modo somente-leitura.
+
+    Atributos:
+        embeddings: np.ndarray (N, D) float32 - np.memmap quando possível
+        meta: CorpusMeta ou List[Dict] (fallback legado)
+        fingerprint: Dict (corpus_fingerprint.json) ou None
+        formato: 'mmap-v1' | 'legado'
+    """
+
+    def __init__(self, embeddings, meta, fingerprint: Optional[Dict], formato: str):
+        self.embeddings = embeddings
+        self.meta = meta
+        self.fingerprint = fingerprint
+        self.formato = formato
+
+    @classmethod
+    def abrir(cls, base_path: str = 'documentos_base') -> Optional['CorpusStore']:
+        """
+        Abre o corpus em base_path.
+
+        Returns:
+            CorpusStore ou None se os artefatos não existirem ou forem inválidos
+        """
+        embeddings_path = os.path.join(base_path, ARQUIVO_EMBEDDINGS)
+        codes_path = os.path.join(base_path, ARQUIVO_META_CODES)
+        strings_path = os.path.join(base_path, ARQUIVO_META_STRINGS)
+        legado_path = os.path.join(base_path, ARQUIVO_META_LEGADO)
+
+        if not os.path.exists(embeddings_path):
+            logger.warning(f"[CORPUS] Embeddings não encontrados: {embeddings_path}")
+            return None
+
+        fingerprint = carregar_fingerprint(base_path)
+
+        ok, motivo = validar_fingerprint(base_path, fingerprint)
+        if not ok:
+            logger.error(f"[CORPUS] Store inválido: {motivo}")
+            return None
+
+        embeddings = np.load(embeddings_path, mmap_mode='r')
+
+        if os.path.exists(codes_path) and os.path.exists(strings_path):
+            codes = np.load(codes_path, mmap_mode='r')
+            strings = np.load(strings_path, mmap_mode='r')
+            meta = CorpusMeta(codes, strings)
+            formato = FORMATO_STORE
+        elif os.path.exists(legado_path):
+            logger.warning("[CORPUS] Metadados colunares ausentes - usando corpus_meta.json (legado)")
+            with open(legado_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            formato = 'legado'
+        else:
+            logger.warning(f"[CORPUS] Metadados não encontrados em {base_path}")
+            return None
+
+        if embeddings.shape[0] != len(meta):
+            logger.error(f"[CORPUS] ERRO: embeddings ({embeddings.shape[0]}) != meta ({len(meta)})")
+            return None
+
+        return cls(embeddings, meta, fingerprint, formato)
+
+
+def carregar_fingerprint(base_path: str = 'documentos_base') -> Optional[Dict]:
+    """Lê corpus_fingerprint.json (arquivo pequeno) ou None se ausente."""
+    fingerprint_path = os.path.join(base_path, ARQUIVO_FINGERPRINT)
+    if not os.path.exists(fingerprint_path):
+        return None
+    try:
+        with open(fingerprint_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"[CORPUS] Fingerprint ilegível: {e}")
+        return None
+
+
+def ler_cabecalho_npy(path: str) -> Tuple[Tuple[int, ...], str]:
+    """
+    Lê apenas o cabeçalho de um .npy (shape, dtype) sem carregar os dados.
+    """
+    with open(path, 'rb') as f:
+        versao = np.lib.format.read_magic(f)
+        if versao == (1, 0):
+            shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, _, dtype = np.lib.format.read_array_header_2_0(f)
+    return tuple(shape), dtype.str
+
+
+def validar_fingerprint(base_path: str, fingerprint: Optional[Dict]) -> Tuple[bool, str]:
+    """
+    Valida artefatos do corpus contra o fingerprint sem ler os arquivos inteiros.
+
+    Checagens (apenas cabeçalhos .npy + os.stat):
+    - n_atividades / embedding_dim batem com o shape da matriz
+    - tamanho em bytes de cada arquivo do store bate com o registrado
+
+    Fingerprint ausente ou sem seção 'store' (gerado por versões antigas do
+    script) é aceito - a checagem de alinhamento com meta continua valendo.
+
+    Returns:
+        (ok, motivo)
+    """
+    if not fingerprint:
+        return True, 'sem fingerprint'
+
+    embeddings_path = os.path.join(base_path, ARQUIVO_EMBEDDINGS)
+    try:
+        shape, _ = ler_cabecalho_npy(embeddings_path)
+    except Exception as e:
+        return False, f'cabeçalho .npy ilegível: {e}'
+
+    if len(shape) != 2:
+        return False, f'shape inesperado: {shape}'
+
+    n_esperado = fingerprint.get('n_atividades')
+    if n_esperado is not None and shape[0] != n_esperado:
+        return False, f'n_atividades: fingerprint={n_esperado}, arquivo={shape[0]}'
+
+    dim_esperada = fingerprint.get('embedding_dim')
+    if dim_esperada is not None and shape[1] != dim_esperada:
+        return False, f'embedding_dim: fingerprint={dim_esperada}, arquivo={shape[1]}'
+
+    store = fingerprint.get('store') or {}
+    for nome, info in (store.get('arquivos') or {}).items():
+        path = os.path.join(base_path, nome)
+        if not os.path.exists(path):
+            return False, f'arquivo ausente: {nome}'
+        tamanho = os.path.getsize(path)
+        if tamanho != info.get('bytes'):
+            return False, f'{nome}: bytes fingerprint={info.get("bytes")}, arquivo={tamanho}'
+
+    return True, 'ok'
+
+
+def gravar_meta_colunar(corpus_meta: List[Dict[str, Any]], base_path: str = 'documentos_base') -> None:
+    """
+    Grava metadados no formato colunar (codes + dicionário de strings).
+
+    Args:
+        corpus_meta: Lista de dicts alinhada com os embeddings
+        base_path: Diretório de saída
+    """
+    dicionario: Dict[str, int] = {}
+    codes = np.zeros((len(corpus_meta), len(COLUNAS_META)), dtype=np.int32)
+
+    for i, meta in enumerate(corpus_meta):
+        for col, nome in enumerate(COLUNAS_META):
+            valor = str(meta.get(nome, '') or '')
+            if valor not in dicionario:
+                dicionario[valor] = len(dicionario)
+            codes[i, col] = dicionario[valor]
+
+    strings = np.array([v.encode('utf-8') for v in dicionario] or [b''], dtype=np.bytes_)
+
+    gravar_npy_atomico(os.path.join(base_path, ARQUIVO_META_CODES), codes)
+    gravar_npy_atomico(os.path.join(base_path, ARQUIVO_META_STRINGS), strings)
+
+
+def _substituir_atomico(path: str, escrever) -> None:
+    """Escreve em arquivo temporário no mesmo diretório e faz os.replace."""
+    diretorio = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=diretorio, prefix='.tmp_', suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            escrever(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def gravar_npy_atomico(path: str, array: np.ndarray) -> None:
+    """np.save atômico (leitores nunca veem arquivo parcial)."""
+    _substituir_atomico(path, lambda f: np.save(f, array))
+
+
+def gravar_json_atomico(path: str, dados: Any) -> None:
+    """json.dump atômico (UTF-8, indentado como os artefatos versionados)."""
+    conteudo = json.dumps(dados, ensure_ascii=False, indent=2).encode('utf-8')
+    _substituir_atomico(path, lambda f: f.write(conteudo))
+
+
+def descrever_store(base_path: str = 'documentos_base') -> Dict[str, Any]:
+    """
+    Gera a seção 'store' do fingerprint (formato + bytes de cada arquivo).
+    """
+    arquivos = {}
+    for nome in (ARQUIVO_EMBEDDINGS, ARQUIVO_META_CODES, ARQUIVO_META_STRINGS):
+        path = os.path.join(base_path, nome)
+        if os.path.exists(path):
+            arquivos[nome] = {'bytes': os.path.getsize(path)}
+    return {'formato': FORMATO_STORE, 'arquivos': arquivos}
@@ -0,0 +1,351 @@
+"""
+Export Jobs - Geração de PDF/DOCX fora da thread da requisição
+
+Responsável por:
+- Fila em banco (ExportJob): o endpoint enfileira e responde 202 + job id
+- Reserva otimista com lease: UPDATE ... WHERE status='pending' (funciona
+  em PostgreSQL e SQLite, vários workers); job 'running' com lease vencido
+  (worker morreu) volta a ser reservável
+- Retentativas com backoff exponencial (EXPORT_JOBS_RETRY_BASE_SECONDS * 2^n)
+- Limites por usuário: jobs na fila (EXPORT_JOBS_MAX_PENDING_PER_USER, 429
+  ao enfileirar) e jobs em execução simultânea (EXPORT_JOBS_MAX_RUNNING_PER_USER,
+  aproximado entre workers)
+- Executores: `manage.py run_export_jobs` (thread principal: o timeout por
+  signal.alarm funciona) e/ou pool de threads no próprio processo
+  (EXPORT_JOBS_THREADS > 0)
+
+Tarefas: TAREFAS mapeia tipo -> função (caminho pontilhado) que recebe
+job.parametros e devolve (bytes | caminho do arquivo, nome, content_type).
+ErroTarefaDefinitivo = falha sem retentativa (ex.: POP não encontrado).
+
+Métricas: mapagov_export_jobs_total, mapagov_export_job_duration_seconds.
+"""
+import atexit
+import logging
+import os
+import shutil
+import socket
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from processos.infra.metrics import export_job_duration_seconds, export_jobs_total
+
+logger = logging.getLogger(__name__)
+
+TAREFAS = {
+    'pop_pdf': 'processos.views.tarefa_pdf_pop',
+    'catalogo_pdf': 'processos.api.catalogo_pdf.tarefa_pdf_catalogo',
+    'analise_export': 'processos.api.analise_riscos_export.tarefa_exportar_analise',
+}
+
+LOTE_CANDIDATOS = 20
+
+
+class LimiteJobsExcedido(Exception):
+    """Usuário já tem EXPORT_JOBS_MAX_PENDING_PER_USER jobs na fila."""
+
+
+class ErroTarefaDefinitivo(Exception):
+    """Falha que não adianta repetir (dados inválidos, objeto inexistente)."""
+
+
+def _config(nome: str, padrao):
+    return getattr(settings, nome, padrao)
+
+
+def _job_model():
+    from processos.models_new.export_job import ExportJob
+    return ExportJob
+
+
+def diretorio_resultados() -> Path:
+    return Path(_config('EXPORT_JOBS_DIR', Path(settings.MEDIA_ROOT) / 'export_jobs'))
+
+
+# ----------------------------------------------------------------------
+# Requisição
+# ----------------------------------------------------------------------
+
+def dono_da_requisicao(request) -> Optional[str]:
+    """'user:<id>' ou 'session:<chave>' (cria a sessão se preciso)."""
+    if getattr(request.user, 'is_authenticated', False):
+        return f'user:{request.user.pk}'
+    session = getattr(request, 'session', None)
+    if session is None:
+        return None
+    if not session.session_key:
+        session.save()
+    return f'session:{session.session_key}'
+
+
+def pedido_assincrono(request, dados: Optional[dict] = None) -> bool:
+    """?async=1 (ou "async": true no corpo) ou EXPORT_JOBS_DEFAULT_ASYNC."""
+    valor = request.GET.get('async')
+    if valor is None and dados is not None:
+        valor = dados.get('async')
+    if valor is None:
+        return bool(_config('EXPORT_JOBS_DEFAULT_ASYNC', False))
+    return str(valor).lower() in ('1', 'true', 'yes')
+
+
+def enfileirar(tipo: str, parametros: dict, dono: str, usuario=None):
+    """
+    Cria o job (status 'pending') e acorda o pool do processo, se houver.
+
+    Raises:
+        LimiteJobsExcedido: dono já tem o máximo de jobs na fila/em execução
+    """
+    ExportJob = _job_model()
+    if tipo not in TAREFAS:
+        raise ValueError(f"Tipo de job desconhecido: {tipo!r}")
+
+    abertos = ExportJob.objects.filter(dono=dono, status__in=('pending', 'running')).count()
+    if abertos >= _config('EXPORT_JOBS_MAX_PENDING_PER_USER', 5):
+        raise LimiteJobsExcedido(f"{abertos} exports em andamento")
+
+    job = ExportJob.objects.create(
+        tipo=tipo,
+        parametros=parametros,
+        dono=dono,
+        usuario=usuario if getattr(usuario, 'is_authenticated', False) else None,
+        max_tentativas=_config('EXPORT_JOBS_MAX_ATTEMPTS', 3),
+    )
+    export_jobs_total.labels(tipo=tipo, resultado='enfileirado').inc()
+
+    if _config('EXPORT_JOBS_THREADS', 0) > 0:
+        get_export_job_pool().acordar()
+    return job
+
+
+# ----------------------------------------------------------------------
+# Worker
+# ----------------------------------------------------------------------
+
+def reservar(worker: str):
+    """
+    Reserva o próximo job executável respeitando o limite por usuário.
+
+    Returns:
+        ExportJob já marcado 'running' (tentativas incrementadas) ou None
+    """
+    ExportJob = _job_model()
+    agora = timezone.now()
+    lease = timedelta(seconds=_config('EXPORT_JOBS_LEASE_SECONDS', 300))
+    limite = _config('EXPORT_JOBS_MAX_RUNNING_PER_USER', 1)
+
+    candidatos = list(
+        ExportJob.objects.filter(
+            Q(status='pending', executar_apos__lte=agora) | Q(status='running', lease_ate__lt=agora)
+        ).order_by('criado_em').only('id', 'tipo', 'status', 'dono', 'tentativas', 'max_tentativas')[:LOTE_CANDIDATOS]
+    )
+    if not candidatos:
+        return None
+
+    ocupados = dict(
+        ExportJob.objects.filter(
+            status='running', lease_ate__gte=agora, dono__in={c.dono for c in candidatos}
+        ).values_list('dono').annotate(n=Count('id')).order_by()
+    )
+
+    for candidato in candidatos:
+        if ocupados.get(candidato.dono, 0) >= limite:
+            continue
+
+        filtro = Q(pk=candidato.pk, status=candidato.status)
+        if candidato.status == 'running':
+            # Lease vencido: o worker anterior morreu no meio da geração
+            filtro &= Q(lease_ate__lt=agora)
+            if candidato.tentativas >= candidato.max_tentativas:
+                ExportJob.objects.filter(filtro).update(
+                    status='failed', erro='Worker interrompido (lease expirado)', concluido_em=agora, lease_ate=None
+                )
+                export_jobs_total.labels(tipo=candidato.tipo, resultado='falhou').inc()
+                continue
+
+        reservado = ExportJob.objects.filter(filtro).update(
+            status='running',
+            worker=worker,
+            lease_ate=agora + lease,
+            iniciado_em=agora,
+            tentativas=F('tentativas') + 1,
+        )
+        if reservado:
+            return ExportJob.objects.get(pk=candidato.pk)
+
+    return None
+
+
+def _salvar_resultado(job, conteudo) -> str:
+    diretorio = diretorio_resultados()
+    diretorio.mkdir(parents=True, exist_ok=True)
+    sufixo = Path(job.resultado_nome).suffix
+    destino = diretorio / f'{job.pk}{sufixo}'
+    tmp = diretorio / f'.{job.pk}.tmp'
+    if isinstance(conteudo, (bytes, bytearray)):
+        tmp.write_bytes(conteudo)
+    else:
+        shutil.copyfile(conteudo, tmp)
+    os.replace(tmp, destino)
+    return str(destino)
+
+
+def executar(job, worker: str) -> str:
+    """
+    Roda a tarefa do job e grava o desfecho.
+
+    Returns:
+        status final: 'done' | 'pending' (nova tentativa) | 'failed'
+    """
+    ExportJob = _job_model()
+    meu = ExportJob.objects.filter(pk=job.pk, worker=worker, status='running')
+    inicio = time.monotonic()
+
+    try:
+        tarefa = import_string(TAREFAS[job.tipo])
+        conteudo, nome, content_type = tarefa(job.parametros)
+        job.resultado_nome = nome
+        arquivo = _salvar_resultado(job, conteudo)
+    except Exception as e:
+        definitivo = isinstance(e, ErroTarefaDefinitivo) or job.tentativas >= job.max_tentativas
+        if definitivo:
+            logger.error(f"[EXPORT JOB] {job.tipo} {job.pk} falhou ({job.tentativas}x): {e}")
+            meu.update(status='failed', erro=str(e)[:2000], concluido_em=timezone.now(), lease_ate=None)
+            export_jobs_total.labels(tipo=job.tipo, resultado='falhou').inc()
+            return 'failed'
+
+        espera = _config('EXPORT_JOBS_RETRY_BASE_SECONDS', 5) * 2 ** (job.tentativas - 1)
+        logger.warning(f"[EXPORT JOB] {job.tipo} {job.pk} tentativa {job.tentativas} falhou, nova em {espera}s: {e}")
+        meu.update(
+            status='pending', erro=str(e)[:2000], lease_ate=None,
+            executar_apos=timezone.now() + timedelta(seconds=espera),
+        )
+        export_jobs_total.labels(tipo=job.tipo, resultado='retentativa').inc()
+        return 'pending'
+    finally:
+        export_job_duration_seconds.labels(tipo=job.tipo).observe(time.monotonic() - inicio)
+
+    meu.update(
+        status='done', erro='', lease_ate=None, concluido_em=timezone.now(),
+        resultado_arquivo=arquivo, resultado_nome=nome, resultado_content_type=content_type,
+    )
+    export_jobs_total.labels(tipo=job.tipo, resultado='concluido').inc()
+    logger.info(f"[EXPORT JOB] {job.tipo} {job.pk} concluído em {time.monotonic() - inicio:.2f}s")
+    return 'done'
+
+
+def processar_proximo(worker: str) -> bool:
+    """Reserva e executa 1 job. False se não havia job executável."""
+    job = reservar(worker)
+    if job is None:
+        return False
+    try:
+        executar(job, worker)
+    finally:
+        close_old_connections()
+    return True
+
+
+def nome_worker() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}'[:100]
+
+
+def remover_antigos(dias: int) -> int:
+    """Remove jobs concluídos/falhos (e seus arquivos) com mais de `dias`."""
+    ExportJob = _job_model()
+    antigos = ExportJob.objects.filter(
+        status__in=('done', 'failed'), concluido_em__lt=timezone.now() - timedelta(days=dias)
+    )
+    for arquivo in antigos.exclude(resultado_arquivo='').values_list('resultado_arquivo', flat=True):
+        try:
+            os.remove(arquivo)
+        except FileNotFoundError:
+            pass
+    removidos, _ = antigos.delete()
+    return removidos
+
+
+class ExportJobPool:
+    """
+    Threads do próprio processo consumindo a fila (opcional).
+
+    Uso:
+        pool = ExportJobPool(threads=2)
+        pool.acordar()   # após enfileirar: inicia as threads se preciso
+    """
+
+    def __init__(self, threads: int = 2, intervalo: float = 2.0):
+        self.threads = threads
+        self.intervalo = intervalo
+        self._cond = threading.Condition()
+        self._parar = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._atexit_registrado = False
+
+    def acordar(self) -> None:
+        self._garantir_threads()
+        with self._cond:
+            self._cond.notify()
+
+    def _garantir_threads(self) -> None:
+        if self._threads and all(t.is_alive() for t in self._threads):
+            return
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            self._parar.clear()
+            while len(self._threads) < self.threads:
+                t = threading.Thread(
+                    target=self._loop, name=f'export-job-{len(self._threads) + 1}', daemon=True
+                )
+                t.start()
+                self._threads.append(t)
+            if not self._atexit_registrado:
+                atexit.register(self.parar)
+                self._atexit_registrado = True
+            logger.info(f"[EXPORT JOB] Pool iniciado ({self.threads} threads)")
+
+    def _loop(self) -> None:
+        worker = nome_worker()
+        while not self._parar.is_set():
+            try:
+                if processar_proximo(worker):
+                    continue
+            except Exception as e:
+                logger.error(f"[EXPORT JOB] Erro no pool: {e}")
+                close_old_connections()
+            with self._cond:
+                self._cond.wait(self.intervalo)
+
+    def parar(self) -> None:
+        """Sinaliza as threads para saírem (jobs em andamento terminam)."""
+        self._parar.set()
+        with self._cond:
+            self._cond.notify_all()
+
+
+_export_job_pool: Optional[ExportJobPool] = None
+_export_job_pool_lock = threading.Lock()
+
+
+def get_export_job_pool() -> ExportJobPool:
+    """Retorna instância singleton do pool de jobs do processo."""
+    global _export_job_pool
+
+    if _export_job_pool is None:
+        with _export_job_pool_lock:
+            if _export_job_pool is None:
+                _export_job_pool = ExportJobPool(
+                    threads=_config('EXPORT_JOBS_THREADS', 0) or 1,
+                    intervalo=_config('EXPORT_JOBS_POLL_SECONDS', 2.0),
+                )
+
+    return _export_job_pool
@@ -0,0 +1,208 @@
+"""
+Helena State Store - Estado conversacional dos produtos Helena na sessão
+
+Responsável por:
+- Guardar o estado (POPStateMachine.to_dict() + campos do roteador) na
+  sessão Django em formato compacto: orjson -> zstd -> base64 (a sessão usa
+  JSONSerializer, então o valor precisa ser str)
+- Não guardar o que é derivável: catálogos de referência dentro de
+  dados_interface (sistemas, operadores, áreas, órgãos, canais, tipos de
+  documento) saem do estado e são recarregados dos loaders na leitura
+- Só regravar quando o estado muda (hash do estado compacto no prefixo do
+  valor; estado igual = sessão não é marcada como modificada)
+
+Formato do valor: 'hz1:<hash>:<base64(zstd(orjson))>'. Sessões antigas
+(dict puro) continuam sendo lidas.
+"""
+import base64
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import orjson
+import zstandard
+
+from processos.infra.loaders import (
+    snapshot_areas_organizacionais,
+    snapshot_canais_atendimento,
+    snapshot_operadores,
+    snapshot_orgaos_centralizados,
+    snapshot_sistemas,
+    snapshot_tipos_documentos_gerados,
+    snapshot_tipos_documentos_requeridos,
+)
+from processos.infra.loaders.registro_referencia import descongelar, igual_aos_dados
+
+logger = logging.getLogger(__name__)
+
+FORMATO = 'hz1'
+NIVEL_ZSTD = 3
+CHAVE_CATALOGOS = '_catalogos'
+
+
+def _areas_organizacionais():
+    areas = snapshot_areas_organizacionais().dados
+    return tuple(areas.values()) if isinstance(areas, Mapping) else areas
+
+
+# Catálogo -> dados congelados do loader (mesma forma que os handlers do
+# HelenaPOP põem na interface). Comparar não copia; expandir descongela.
+CATALOGOS: Dict[str, Callable[[], Any]] = {
+    'sistemas': lambda: snapshot_sistemas().dados,
+    'operadores': lambda: snapshot_operadores().dados,
+    'areas_organizacionais': _areas_organizacionais,
+    'orgaos_centralizados': lambda: snapshot_orgaos_centralizados().dados,
+    'canais_atendimento': lambda: snapshot_canais_atendimento().dados,
+    'tipos_documentos_requeridos': lambda: snapshot_tipos_documentos_requeridos().dados,
+    'tipos_documentos_gerados': lambda: snapshot_tipos_documentos_gerados().dados,
+}
+
+# Campo de dados_interface -> catálogos que ele pode conter
+CAMPOS_CATALOGO: Dict[str, Tuple[str, ...]] = {
+    'sistemas_por_categoria': ('sistemas',),
+    'sistemas': ('sistemas',),
+    'opcoes': ('operadores',),
+    'areas_organizacionais': ('areas_organizacionais',),
+    'orgaos_centralizados': ('orgaos_centralizados',),
+    'canais_atendimento': ('canais_atendimento',),
+    'tipos_documentos_requeridos': ('tipos_documentos_requeridos',),
+    'tipos_documentos_gerados': ('tipos_documentos_gerados',),
+    'tipos_documentos': ('tipos_documentos_requeridos', 'tipos_documentos_gerados'),
+}
+
+# ZstdCompressor/Decompressor não são thread-safe: 1 par por thread
+_zstd = threading.local()
+
+
+def _compressor() -> zstandard.ZstdCompressor:
+    if not hasattr(_zstd, 'c'):
+        _zstd.c = zstandard.ZstdCompressor(level=NIVEL_ZSTD)
+        _zstd.d = zstandard.ZstdDecompressor()
+    return _zstd.c
+
+
+def _decompressor() -> zstandard.ZstdDecompressor:
+    _compressor()
+    return _zstd.d
+
+
+def compactar_interface(dados_interface: Any) -> Any:
+    """
+    Remove de dados_interface os campos iguais a um catálogo de referência.
+
+    Só sai o que é idêntico ao catálogo atual; os nomes ficam em
+    dados_interface['_catalogos'] para expandir_interface.
+    """
+    if not isinstance(dados_interface, dict):
+        return dados_interface
+
+    compacto = dict(dados_interface)
+    removidos = {}
+    for campo, catalogos in CAMPOS_CATALOGO.items():
+        valor = compacto.get(campo)
+        if not valor:
+            continue
+        for nome in catalogos:
+            try:
+                if igual_aos_dados(valor, CATALOGOS[nome]()):
+                    removidos[campo] = nome
+                    del compacto[campo]
+                    break
+            except Exception as e:
+                logger.warning(f"[STATE STORE] Catálogo '{nome}' indisponível: {e}")
+    if removidos:
+        compacto[CHAVE_CATALOGOS] = removidos
+    return compacto
+
+
+def expandir_interface(dados_interface: Any) -> Any:
+    """Inverso de compactar_interface: recarrega os catálogos dos loaders."""
+    if not isinstance(dados_interface, dict) or CHAVE_CATALOGOS not in dados_interface:
+        return dados_interface
+
+    dados = dict(dados_interface)
+    for campo, nome in dados.pop(CHAVE_CATALOGOS).items():
+        dados[campo] = descongelar(CATALOGOS[nome]())
+    return dados
+
+
+def codificar_estado(estado: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Estado -> (valor para a sessão, hash do estado compacto).
+    """
+    compacto = dict(estado)
+    if 'dados_interface' in compacto:
+        compacto['dados_interface'] = compactar_interface(compacto['dados_interface'])
+
+    bruto = orjson.dumps(compacto, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS)
+    hash_estado = hashlib.blake2b(bruto, digest_size=8).hexdigest()
+    comprimido = base64.b64encode(_compressor().compress(bruto)).decode('ascii')
+    return f'{FORMATO}:{hash_estado}:{comprimido}', hash_estado
+
+
+def decodificar_estado(valor: Any) -> Optional[Dict[str, Any]]:
+    """Valor da sessão -> estado (aceita o formato antigo, dict puro)."""
+    if not valor:
+        return None
+    if isinstance(valor, dict):
+        return valor
+
+    _, _, comprimido = valor.split(':', 2)
+    estado = orjson.loads(_decompressor().decompress(base64.b64decode(comprimido)))
+    if 'dados_interface' in estado:
+        estado['dados_interface'] = expandir_interface(estado['dados_interface'])
+    return estado
+
+
+def _hash_do_valor(valor: Any) -> Optional[str]:
+    if isinstance(valor, str) and valor.startswith(f'{FORMATO}:'):
+        return valor.split(':', 2)[1]
+    return None
+
+
+class HelenaStateStore:
+    """
+    Estado de um produto Helena por session_id (do frontend) na sessão Django.
+
+    Uso:
+        store = HelenaStateStore(request.session)
+        session_data = store.carregar(session_id) or POPStateMachine().to_dict()
+        ...
+        store.salvar(session_id, novo_session_data)
+    """
+
+    def __init__(self, session, prefixo: str = 'helena_pop_state'):
+        self.session = session
+        self.prefixo = prefixo
+
+    def chave(self, session_id: str) -> str:
+        return f'{self.prefixo}_{session_id}'
+
+    def carregar(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Estado salvo ou None (sessão nova ou valor ilegível)."""
+        valor = self.session.get(self.chave(session_id))
+        try:
+            return decodificar_estado(valor)
+        except Exception as e:
+            logger.error(f"[STATE STORE] Estado ilegível em {self.chave(session_id)}: {e}")
+            return None
+
+    def salvar(self, session_id: str, estado: Dict[str, Any]) -> bool:
+        """
+        Grava o estado se ele mudou.
+
+        Returns:
+            True se a sessão foi modificada
+        """
+        chave = self.chave(session_id)
+        valor, hash_estado = codificar_estado(estado)
+        if _hash_do_valor(self.session.get(chave)) == hash_estado:
+            return False
+
+        self.session[chave] = valor
+        logger.debug(f"[STATE STORE] {chave} gravado ({len(valor)} bytes)")
+        return True
+
+    def remover(self, session_id: str) -> None:
+        self.session.pop(self.chave(session_id), None)
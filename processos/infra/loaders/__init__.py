@@ -7,16 +7,34 @@ Responsabilidades:
 - Carregar operadores
 - Carregar órgãos centralizados
 - Carregar canais de atendimento
-- Carregar arquitetura DECIPEX
+- Carregar arquitetura DECIPEX (índice imutável compartilhado)
 - Carregar tipos de documentos (requeridos e gerados)
+
+Os CSVs de referência passam pelo registro_referencia (a arquitetura usa
+o arquitetura_index): lidos 1x por processo e relidos só quando o arquivo muda.
+snapshot_*() servem os dados congelados (leitura sem cópia); carregar_*()
+devolvem uma cópia mutável.
 """
 
-from .areas_loader import carregar_areas_organizacionais, carregar_descricoes_areas
-from .sistemas_loader import carregar_sistemas
-from .operadores_loader import carregar_operadores
-from .orgaos_canais_loader import carregar_orgaos_centralizados, carregar_canais_atendimento
+from .areas_loader import (
+    carregar_areas_organizacionais, carregar_descricoes_areas,
+    snapshot_areas_organizacionais, snapshot_descricoes_areas,
+)
+from .sistemas_loader import carregar_sistemas, snapshot_sistemas
+from .operadores_loader import carregar_operadores, snapshot_operadores
+from .orgaos_canais_loader import (
+    carregar_orgaos_centralizados, carregar_canais_atendimento,
+    snapshot_orgaos_centralizados, snapshot_canais_atendimento,
+)
 from .arquitetura_loader import ArquiteturaDecipex, carregar_arquitetura_csv
-from .documentos_loader import carregar_tipos_documentos_requeridos, carregar_tipos_documentos_gerados
+from .arquitetura_index import ArquiteturaIndex, LinhaArquitetura, obter_indice_arquitetura
+from .registro_referencia import (
+    RegistroReferencia, SnapshotReferencia, get_registro_referencia, obter_snapshot_referencia,
+)
+from .documentos_loader import (
+    carregar_tipos_documentos_requeridos, carregar_tipos_documentos_gerados,
+    snapshot_tipos_documentos_requeridos, snapshot_tipos_documentos_gerados,
+)
 
 __all__ = [
     'carregar_areas_organizacionais',
@@ -27,6 +45,21 @@ __all__ = [
     'carregar_canais_atendimento',
     'ArquiteturaDecipex',
     'carregar_arquitetura_csv',
+    'ArquiteturaIndex',
+    'LinhaArquitetura',
+    'obter_indice_arquitetura',
     'carregar_tipos_documentos_requeridos',
     'carregar_tipos_documentos_gerados',
+    'RegistroReferencia',
+    'SnapshotReferencia',
+    'get_registro_referencia',
+    'obter_snapshot_referencia',
+    'snapshot_areas_organizacionais',
+    'snapshot_descricoes_areas',
+    'snapshot_sistemas',
+    'snapshot_operadores',
+    'snapshot_orgaos_centralizados',
+    'snapshot_canais_atendimento',
+    'snapshot_tipos_documentos_requeridos',
+    'snapshot_tipos_documentos_gerados',
 ]
@@ -12,6 +12,10 @@ import pandas as pd
 
 from processos.domain.governanca.normalize import normalize_area_prefix
 
+from .registro_referencia import (
+    SnapshotReferencia, descongelar, obter_snapshot_referencia,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,8 +41,17 @@ def carregar_areas_organizacionais() -> Dict[int, Dict[str, Any]]:
     Returns:
         Dict[int, Dict]: Mapa de ordem -> {codigo, sigla, nome, prefixo, tem_subareas, subareas}
     """
+    return descongelar(snapshot_areas_organizacionais().dados)
+
+
+def snapshot_areas_organizacionais() -> SnapshotReferencia:
+    """Snapshot imutável das áreas (leitura sem cópia, para caminhos quentes)."""
     csv_path = _get_csv_path('AREAS_CSV_PATH', 'areas_organizacionais.csv')
+    return obter_snapshot_referencia('areas', csv_path, _ler_areas_organizacionais)
+
 
+def _ler_areas_organizacionais(csv_path: str) -> Dict[int, Dict[str, Any]]:
+    """Lê o CSV de áreas (chamado pelo registro só quando o arquivo muda)."""
     try:
         df = pd.read_csv(csv_path, encoding='utf-8')
 
@@ -111,8 +124,17 @@ def carregar_descricoes_areas() -> Dict[str, str]:
     Returns:
         Dict[str, str]: {codigo: descricao}
     """
+    return descongelar(snapshot_descricoes_areas().dados)
+
+
+def snapshot_descricoes_areas() -> SnapshotReferencia:
+    """Snapshot imutável das descrições das áreas (leitura sem cópia)."""
     csv_path = _get_csv_path('AREAS_CSV_PATH', 'areas_organizacionais.csv')
+    return obter_snapshot_referencia('descricoes_areas', csv_path, _ler_descricoes_areas)
+
 
+def _ler_descricoes_areas(csv_path: str) -> Dict[str, str]:
+    """Lê as descrições do CSV de áreas (chamado pelo registro só quando o arquivo muda)."""
     try:
         df = pd.read_csv(csv_path)
         df_ativas = df[df['ativo'] == True]
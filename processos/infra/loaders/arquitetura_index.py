@@ -0,0 +1,235 @@
+"""
+Índice da Arquitetura DECIPEX
+
+Responsabilidade única: índice imutável (árvore + dicts) do CSV de arquitetura,
+construído 1x por processo e reconstruído apenas quando o conteúdo do CSV muda.
+
+Substitui os filtros por máscara booleana em pandas (O(N) por pergunta) por
+lookups O(1):
+- filhos('Macro')                      -> processos do macroprocesso
+- existe('Macro', 'Proc', 'Sub')       -> hierarquia existe?
+- linhas('Macro', 'Proc', 'Sub')       -> linhas (com Numero) do subprocesso
+- linha_por_numero('1.1.1.1')          -> linha da atividade
+- prefixo_numero('Macro', 'Proc')      -> '1.1' (prefixo do Numero CSV)
+
+Compartilhado por ArquiteturaDecipex, BuscaAtividadePipeline e
+helena_ajuda_inteligente via obter_indice_arquitetura().
+"""
+
+import csv
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+COLUNAS_HIERARQUIA = ('Macroprocesso', 'Processo', 'Subprocesso', 'Atividade')
+
+
+def _csv_padrao() -> str:
+    return os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))),
+        'documentos_base',
+        'Arquitetura_DECIPEX_mapeada.csv'
+    )
+
+
+@dataclass(frozen=True)
+class LinhaArquitetura:
+    """Uma linha (atividade) do CSV de arquitetura."""
+    idx: int
+    numero: str
+    macroprocesso: str
+    processo: str
+    subprocesso: str
+    atividade: str
+    aba: str = ''
+    codigo: str = ''
+
+    @property
+    def caminho(self) -> Tuple[str, str, str, str]:
+        return (self.macroprocesso, self.processo, self.subprocesso, self.atividade)
+
+    def como_dict(self) -> Dict[str, str]:
+        return {
+            'numero': self.numero,
+            'macroprocesso': self.macroprocesso,
+            'processo': self.processo,
+            'subprocesso': self.subprocesso,
+            'atividade': self.atividade,
+        }
+
+
+class ArquiteturaIndex:
+    """
+    Índice imutável da arquitetura (caminhos como tuplas de nomes).
+
+    Caminho () = raiz, ('Macro',) = macroprocesso, ('Macro', 'Proc') = processo,
+    ('Macro', 'Proc', 'Sub') = subprocesso, 4 níveis = atividade.
+    Filhos preservam a ordem de 1ª aparição no CSV (mesma de DataFrame.unique()).
+    """
+
+    def __init__(self, linhas: List[LinhaArquitetura], csv_hash: str = ''):
+        self.csv_hash = csv_hash
+        self.linhas: Tuple[LinhaArquitetura, ...] = tuple(linhas)
+
+        filhos: Dict[tuple, Dict[str, None]] = {(): {}}
+        linhas_por_caminho: Dict[tuple, List[int]] = {}
+        por_numero: Dict[str, int] = {}
+
+        for linha in self.linhas:
+            caminho = linha.caminho
+            for nivel in range(4):
+                pai, nome = caminho[:nivel], caminho[nivel]
+                if not nome:
+                    break
+                filhos.setdefault(pai, {})[nome] = None
+                filhos.setdefault(caminho[:nivel + 1], {})
+                linhas_por_caminho.setdefault(caminho[:nivel + 1], []).append(linha.idx)
+            if linha.numero and linha.numero not in por_numero:
+                por_numero[linha.numero] = linha.idx
+
+        self._filhos: Mapping[tuple, Tuple[str, ...]] = MappingProxyType(
+            {caminho: tuple(nomes) for caminho, nomes in filhos.items()}
+        )
+        self._linhas_por_caminho: Mapping[tuple, Tuple[int, ...]] = MappingProxyType(
+            {caminho: tuple(idxs) for caminho, idxs in linhas_por_caminho.items()}
+        )
+        self._por_numero: Mapping[str, int] = MappingProxyType(por_numero)
+
+    def __len__(self) -> int:
+        return len(self.linhas)
+
+    def filhos(self, *caminho: str) -> Tuple[str, ...]:
+        """Nomes do nível seguinte (vazio se o caminho não existir)."""
+        return self._filhos.get(tuple(caminho), ())
+
+    def existe(self, *caminho: str) -> bool:
+        return tuple(caminho) in self._linhas_por_caminho
+
+    def linhas_do_caminho(self, *caminho: str) -> Tuple[LinhaArquitetura, ...]:
+        """Linhas (atividades) sob o caminho, na ordem do CSV."""
+        return tuple(self.linhas[i] for i in self._linhas_por_caminho.get(tuple(caminho), ()))
+
+    def linha(self, macro: str, processo: str, subprocesso: str, atividade: str) -> Optional[LinhaArquitetura]:
+        """Primeira linha da atividade (ou None)."""
+        idxs = self._linhas_por_caminho.get((macro, processo, subprocesso, atividade))
+        return self.linhas[idxs[0]] if idxs else None
+
+    def linha_por_numero(self, numero: str) -> Optional[LinhaArquitetura]:
+        idx = self._por_numero.get(str(numero).strip())
+        return self.linhas[idx] if idx is not None else None
+
+    def prefixo_numero(self, *caminho: str) -> Optional[str]:
+        """
+        Prefixo do Numero CSV correspondente ao caminho.
+
+        ('Macro', 'Proc') -> '1.1' (primeiros 2 segmentos do Numero da 1ª linha)
+        """
+        idxs = self._linhas_por_caminho.get(tuple(caminho))
+        if not idxs:
+            return None
+        partes = self.linhas[idxs[0]].numero.split('.')
+        if len(partes) < len(caminho):
+            return None
+        return '.'.join(partes[:len(caminho)])
+
+    def hierarquia(self) -> Dict[str, Dict]:
+        """
+        Estrutura aninhada (cópia nova, pode ser alterada pelo chamador):
+        {macro: {'processos': {proc: {'subprocessos': {sub: {'atividades': [...]}}}}}}
+        """
+        return {
+            macro: {'processos': {
+                proc: {'subprocessos': {
+                    sub: {'atividades': [l.atividade for l in self.linhas_do_caminho(macro, proc, sub)]}
+                    for sub in self.filhos(macro, proc)
+                }}
+                for proc in self.filhos(macro)
+            }}
+            for macro in self.filhos()
+        }
+
+
+def _ler_linhas(conteudo: bytes) -> List[LinhaArquitetura]:
+    texto = conteudo.decode('utf-8-sig')
+    leitor = csv.DictReader(texto.splitlines())
+    col_codigo = next((c for c in (leitor.fieldnames or []) if c.lower() == 'codigo'), None)
+
+    linhas = []
+    for row in leitor:
+        valores = {col: (row.get(col) or '').strip() for col in COLUNAS_HIERARQUIA}
+        # Mesma regra de carregar_arquitetura_csv: sem macro ou atividade = linha vazia
+        if not valores['Macroprocesso'] or not valores['Atividade']:
+            continue
+        linhas.append(LinhaArquitetura(
+            idx=len(linhas),
+            numero=(row.get('Numero') or '').strip(),
+            macroprocesso=valores['Macroprocesso'],
+            processo=valores['Processo'],
+            subprocesso=valores['Subprocesso'],
+            atividade=valores['Atividade'],
+            aba=(row.get('Aba') or '').strip(),
+            codigo=(row.get(col_codigo) or '').strip() if col_codigo else '',
+        ))
+    return linhas
+
+
+# Cache por processo: caminho absoluto -> (assinatura stat, índice)
+_INDICES: Dict[str, Tuple[Tuple[int, int], ArquiteturaIndex]] = {}
+_INDICES_LOCK = threading.Lock()
+_INDICE_VAZIO = ArquiteturaIndex([])
+
+
+def obter_indice_arquitetura(caminho_csv: str = None) -> ArquiteturaIndex:
+    """
+    Retorna o índice da arquitetura (construído 1x por processo).
+
+    Rechecagem barata a cada chamada: os.stat (mtime_ns, tamanho). Só se o
+    arquivo mudou o conteúdo é relido; se o hash SHA-256 for igual ao do
+    índice atual, o mesmo objeto é reaproveitado.
+
+    CSV ausente/ilegível -> índice vazio (mesmo fallback dos loaders).
+    """
+    caminho = os.path.abspath(caminho_csv or _csv_padrao())
+
+    try:
+        st = os.stat(caminho)
+    except OSError:
+        logger.warning(f"Arquivo CSV não encontrado: {caminho}")
+        return _INDICE_VAZIO
+    assinatura = (st.st_mtime_ns, st.st_size)
+
+    atual = _INDICES.get(caminho)
+    if atual is not None and atual[0] == assinatura:
+        return atual[1]
+
+    with _INDICES_LOCK:
+        atual = _INDICES.get(caminho)
+        if atual is not None and atual[0] == assinatura:
+            return atual[1]
+
+        try:
+            with open(caminho, 'rb') as f:
+                conteudo = f.read()
+        except OSError as e:
+            logger.error(f"Erro ao carregar CSV: {e}")
+            return _INDICE_VAZIO
+
+        csv_hash = hashlib.sha256(conteudo).hexdigest()
+        if atual is not None and atual[1].csv_hash == csv_hash:
+            indice = atual[1]
+        else:
+            try:
+                indice = ArquiteturaIndex(_ler_linhas(conteudo), csv_hash)
+            except Exception as e:
+                logger.error(f"Erro ao indexar CSV de arquitetura: {e}")
+                return _INDICE_VAZIO
+            logger.info(f"[ARQUITETURA] Índice construído: {len(indice)} atividades ({csv_hash[:12]})")
+
+        _INDICES[caminho] = (assinatura, indice)
+        return indice
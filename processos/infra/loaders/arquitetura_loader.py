@@ -2,6 +2,9 @@
 Carregamento da Arquitetura DECIPEX
 
 Responsabilidade única: carregar e consultar arquitetura de processos.
+
+Consultas usam o índice imutável compartilhado (arquitetura_index), sem
+filtros pandas por chamada.
 """
 
 import logging
@@ -10,6 +13,8 @@ from typing import Dict, Any, List
 
 import pandas as pd
 
+from .arquitetura_index import ArquiteturaIndex, obter_indice_arquitetura
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,32 +29,39 @@ class ArquiteturaDecipex:
                 'Arquitetura_DECIPEX_mapeada.csv'
             )
 
-        try:
-            self.df = pd.read_csv(caminho_csv)
-        except FileNotFoundError:
-            logger.warning(f"Arquivo CSV não encontrado: {caminho_csv}")
-            self.df = pd.DataFrame(columns=['Macroprocesso', 'Processo', 'Subprocesso', 'Atividade'])
-        except Exception as e:
-            logger.error(f"Erro ao carregar CSV: {e}")
-            self.df = pd.DataFrame(columns=['Macroprocesso', 'Processo', 'Subprocesso', 'Atividade'])
+        self.caminho_csv = caminho_csv
+        self._df = None
+
+    @property
+    def indice(self) -> ArquiteturaIndex:
+        """Índice compartilhado (reconstruído só se o CSV mudar)."""
+        return obter_indice_arquitetura(self.caminho_csv)
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """DataFrame do CSV (legado - lido só se alguém ainda precisar)."""
+        if self._df is None:
+            try:
+                self._df = pd.read_csv(self.caminho_csv)
+            except FileNotFoundError:
+                logger.warning(f"Arquivo CSV não encontrado: {self.caminho_csv}")
+                self._df = pd.DataFrame(columns=['Macroprocesso', 'Processo', 'Subprocesso', 'Atividade'])
+            except Exception as e:
+                logger.error(f"Erro ao carregar CSV: {e}")
+                self._df = pd.DataFrame(columns=['Macroprocesso', 'Processo', 'Subprocesso', 'Atividade'])
+        return self._df
 
     def obter_macroprocessos_unicos(self) -> List[str]:
-        return self.df['Macroprocesso'].unique().tolist()
+        return list(self.indice.filhos())
 
     def obter_processos_por_macro(self, macro: str) -> List[str]:
-        return self.df[self.df['Macroprocesso'] == macro]['Processo'].unique().tolist()
+        return list(self.indice.filhos(macro))
 
     def obter_subprocessos_por_processo(self, macro: str, processo: str) -> List[str]:
-        filtro = (self.df['Macroprocesso'] == macro) & (self.df['Processo'] == processo)
-        return self.df[filtro]['Subprocesso'].unique().tolist()
+        return list(self.indice.filhos(macro, processo))
 
     def obter_atividades_por_subprocesso(self, macro: str, processo: str, subprocesso: str) -> List[str]:
-        filtro = (
-            (self.df['Macroprocesso'] == macro) &
-            (self.df['Processo'] == processo) &
-            (self.df['Subprocesso'] == subprocesso)
-        )
-        return self.df[filtro]['Atividade'].unique().tolist()
+        return list(self.indice.filhos(macro, processo, subprocesso))
 
 
 def carregar_arquitetura_csv() -> Dict[str, Any]:
@@ -81,56 +93,21 @@ def carregar_arquitetura_csv() -> Dict[str, Any]:
             ]
         }
     """
-    csv_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))),
-        'documentos_base',
-        'Arquitetura_DECIPEX_mapeada.csv'
-    )
-
-    try:
-        df = pd.read_csv(csv_path, encoding='utf-8')
-
-        # Estrutura hierárquica
-        hierarquia = {}
-        lista_plana = []
-
-        for _, row in df.iterrows():
-            macro = row['Macroprocesso']
-            processo = row['Processo']
-            subprocesso = row['Subprocesso']
-            atividade = row['Atividade']
-
-            # Pular linhas vazias
-            if pd.isna(macro) or pd.isna(atividade):
-                continue
-
-            # Adicionar à lista plana
-            lista_plana.append({
-                'macroprocesso': macro,
-                'processo': processo,
-                'subprocesso': subprocesso,
-                'atividade': atividade
-            })
-
-            # Construir hierarquia
-            if macro not in hierarquia:
-                hierarquia[macro] = {'processos': {}}
-
-            if processo not in hierarquia[macro]['processos']:
-                hierarquia[macro]['processos'][processo] = {'subprocessos': {}}
-
-            if subprocesso not in hierarquia[macro]['processos'][processo]['subprocessos']:
-                hierarquia[macro]['processos'][processo]['subprocessos'][subprocesso] = {'atividades': []}
-
-            hierarquia[macro]['processos'][processo]['subprocessos'][subprocesso]['atividades'].append(atividade)
-
-        logger.info(f"[ATIVIDADES] CSV carregado: {len(lista_plana)} atividades em hierarquia")
-
-        return {
-            'macroprocessos': hierarquia,
-            'flat_list': lista_plana
+    indice = obter_indice_arquitetura()
+
+    lista_plana = [
+        {
+            'macroprocesso': linha.macroprocesso,
+            'processo': linha.processo,
+            'subprocesso': linha.subprocesso,
+            'atividade': linha.atividade
         }
+        for linha in indice.linhas
+    ]
+
+    logger.info(f"[ATIVIDADES] CSV carregado: {len(lista_plana)} atividades em hierarquia")
 
-    except Exception as e:
-        logger.error(f"❌ Erro ao carregar CSV de arquitetura: {e}")
-        return {'macroprocessos': {}, 'flat_list': []}
+    return {
+        'macroprocessos': indice.hierarquia(),
+        'flat_list': lista_plana
+    }
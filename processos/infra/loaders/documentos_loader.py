@@ -11,6 +11,8 @@ from typing import Dict, List
 
 import pandas as pd
 
+from .registro_referencia import SnapshotReferencia, descongelar, obter_snapshot_referencia
+
 logger = logging.getLogger(__name__)
 
 _BASE_DIR = os.path.join(
@@ -18,11 +20,38 @@ _BASE_DIR = os.path.join(
     'documentos_base',
 )
 
-
-def _carregar_csv_documentos(csv_filename: str, fallback: List[Dict]) -> List[Dict]:
-    """Carrega um CSV de tipos de documentos com fallback."""
+_FALLBACK_REQUERIDOS = [
+    {'tipo': 'Requerimento', 'descricao': 'Solicitacao formal do interessado', 'hint_detalhamento': ''},
+    {'tipo': 'Processo SEI', 'descricao': 'Processo administrativo eletronico no SEI', 'hint_detalhamento': ''},
+    {'tipo': 'Documentos pessoais', 'descricao': 'CPF, RG, certidoes', 'hint_detalhamento': ''},
+    {'tipo': 'Declaracao', 'descricao': 'Declaracao emitida por pessoa, empresa ou orgao', 'hint_detalhamento': ''},
+    {'tipo': 'Certidao', 'descricao': 'Documento que certifica informacao oficial', 'hint_detalhamento': ''},
+    {'tipo': 'Comprovante de pagamento', 'descricao': 'Boleto, recibo, fatura', 'hint_detalhamento': ''},
+    {'tipo': 'Parecer', 'descricao': 'Opiniao tecnica ou juridica', 'hint_detalhamento': ''},
+    {'tipo': 'Planilha / Dados', 'descricao': 'Dados estruturados para analise', 'hint_detalhamento': ''},
+    {'tipo': 'Outro', 'descricao': 'Outro tipo de documento', 'hint_detalhamento': ''},
+]
+
+_FALLBACK_GERADOS = [
+    {'tipo': 'Nota Tecnica', 'descricao': 'Documento tecnico', 'hint_detalhamento': ''},
+    {'tipo': 'Despacho', 'descricao': 'Decisao ou encaminhamento formal', 'hint_detalhamento': ''},
+    {'tipo': 'Oficio', 'descricao': 'Comunicacao formal', 'hint_detalhamento': ''},
+    {'tipo': 'Formulario', 'descricao': 'Documento estruturado', 'hint_detalhamento': ''},
+    {'tipo': 'Tela de sistema', 'descricao': 'Interface de sistema', 'hint_detalhamento': ''},
+    {'tipo': 'Outro', 'descricao': 'Outro tipo de documento', 'hint_detalhamento': ''},
+]
+
+
+def _snapshot_csv_documentos(csv_filename: str, fallback: List[Dict]) -> SnapshotReferencia:
+    """Snapshot de um CSV de tipos de documentos com fallback (via registro de referência)."""
     csv_path = os.path.join(_BASE_DIR, csv_filename)
+    return obter_snapshot_referencia(
+        csv_filename, csv_path, lambda caminho: _ler_csv_documentos(caminho, csv_filename, fallback)
+    )
 
+
+def _ler_csv_documentos(csv_path: str, csv_filename: str, fallback: List[Dict]) -> List[Dict]:
+    """Lê um CSV de tipos de documentos (chamado pelo registro só quando o arquivo muda)."""
     try:
         df = pd.read_csv(csv_path)
         df_ativos = df[df['ativo'] == True].sort_values('ordem')
@@ -50,20 +79,12 @@ def carregar_tipos_documentos_requeridos() -> List[Dict]:
     Returns:
         List[Dict]: Lista de {tipo, descricao, hint_detalhamento}
     """
-    return _carregar_csv_documentos(
-        'tipos_documentos_requeridos.csv',
-        fallback=[
-            {'tipo': 'Requerimento', 'descricao': 'Solicitacao formal do interessado', 'hint_detalhamento': ''},
-            {'tipo': 'Processo SEI', 'descricao': 'Processo administrativo eletronico no SEI', 'hint_detalhamento': ''},
-            {'tipo': 'Documentos pessoais', 'descricao': 'CPF, RG, certidoes', 'hint_detalhamento': ''},
-            {'tipo': 'Declaracao', 'descricao': 'Declaracao emitida por pessoa, empresa ou orgao', 'hint_detalhamento': ''},
-            {'tipo': 'Certidao', 'descricao': 'Documento que certifica informacao oficial', 'hint_detalhamento': ''},
-            {'tipo': 'Comprovante de pagamento', 'descricao': 'Boleto, recibo, fatura', 'hint_detalhamento': ''},
-            {'tipo': 'Parecer', 'descricao': 'Opiniao tecnica ou juridica', 'hint_detalhamento': ''},
-            {'tipo': 'Planilha / Dados', 'descricao': 'Dados estruturados para analise', 'hint_detalhamento': ''},
-            {'tipo': 'Outro', 'descricao': 'Outro tipo de documento', 'hint_detalhamento': ''},
-        ]
-    )
+    return descongelar(snapshot_tipos_documentos_requeridos().dados)
+
+
+def snapshot_tipos_documentos_requeridos() -> SnapshotReferencia:
+    """Snapshot imutável dos tipos de documentos requeridos (leitura sem cópia)."""
+    return _snapshot_csv_documentos('tipos_documentos_requeridos.csv', _FALLBACK_REQUERIDOS)
 
 
 def carregar_tipos_documentos_gerados() -> List[Dict]:
@@ -73,14 +94,9 @@ def carregar_tipos_documentos_gerados() -> List[Dict]:
     Returns:
         List[Dict]: Lista de {tipo, descricao, hint_detalhamento}
     """
-    return _carregar_csv_documentos(
-        'tipos_documentos_gerados.csv',
-        fallback=[
-            {'tipo': 'Nota Tecnica', 'descricao': 'Documento tecnico', 'hint_detalhamento': ''},
-            {'tipo': 'Despacho', 'descricao': 'Decisao ou encaminhamento formal', 'hint_detalhamento': ''},
-            {'tipo': 'Oficio', 'descricao': 'Comunicacao formal', 'hint_detalhamento': ''},
-            {'tipo': 'Formulario', 'descricao': 'Documento estruturado', 'hint_detalhamento': ''},
-            {'tipo': 'Tela de sistema', 'descricao': 'Interface de sistema', 'hint_detalhamento': ''},
-            {'tipo': 'Outro', 'descricao': 'Outro tipo de documento', 'hint_detalhamento': ''},
-        ]
-    )
+    return descongelar(snapshot_tipos_documentos_gerados().dados)
+
+
+def snapshot_tipos_documentos_gerados() -> SnapshotReferencia:
+    """Snapshot imutável dos tipos de documentos gerados (leitura sem cópia)."""
+    return _snapshot_csv_documentos('tipos_documentos_gerados.csv', _FALLBACK_GERADOS)
@@ -10,6 +10,8 @@ from typing import List
 
 import pandas as pd
 
+from .registro_referencia import SnapshotReferencia, descongelar, obter_snapshot_referencia
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,6 +25,11 @@ def carregar_operadores() -> List[str]:
     Returns:
         List[str]: Lista de operadores disponíveis
     """
+    return descongelar(snapshot_operadores().dados)
+
+
+def snapshot_operadores() -> SnapshotReferencia:
+    """Snapshot imutável dos operadores (leitura sem cópia)."""
     csv_path = os.environ.get(
         'OPERADORES_CSV_PATH',
         os.path.join(
@@ -31,7 +38,11 @@ def carregar_operadores() -> List[str]:
             'operadores.csv'
         )
     )
+    return obter_snapshot_referencia('operadores', csv_path, _ler_operadores)
+
 
+def _ler_operadores(csv_path: str) -> List[str]:
+    """Lê o CSV de operadores (chamado pelo registro só quando o arquivo muda)."""
     try:
         df = pd.read_csv(csv_path)
 
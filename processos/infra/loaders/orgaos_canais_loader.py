@@ -10,6 +10,8 @@ from typing import Dict, List
 
 import pandas as pd
 
+from .registro_referencia import SnapshotReferencia, descongelar, obter_snapshot_referencia
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,6 +22,11 @@ def carregar_orgaos_centralizados() -> List[Dict[str, str]]:
     Returns:
         List[Dict]: Lista de dicionários com sigla, nome_completo, observacao
     """
+    return descongelar(snapshot_orgaos_centralizados().dados)
+
+
+def snapshot_orgaos_centralizados() -> SnapshotReferencia:
+    """Snapshot imutável dos órgãos centralizados (leitura sem cópia)."""
     csv_path = os.environ.get(
         'ORGAOS_CENTRALIZADOS_CSV_PATH',
         os.path.join(
@@ -28,7 +35,11 @@ def carregar_orgaos_centralizados() -> List[Dict[str, str]]:
             'orgaos_centralizados.csv'
         )
     )
+    return obter_snapshot_referencia('orgaos_centralizados', csv_path, _ler_orgaos_centralizados)
+
 
+def _ler_orgaos_centralizados(csv_path: str) -> List[Dict[str, str]]:
+    """Lê o CSV de órgãos centralizados (chamado pelo registro só quando o arquivo muda)."""
     try:
         df = pd.read_csv(csv_path, encoding='utf-8')
 
@@ -70,6 +81,11 @@ def carregar_canais_atendimento() -> List[Dict[str, str]]:
     Returns:
         List[Dict]: Lista de dicionários com codigo, nome, descricao
     """
+    return descongelar(snapshot_canais_atendimento().dados)
+
+
+def snapshot_canais_atendimento() -> SnapshotReferencia:
+    """Snapshot imutável dos canais de atendimento (leitura sem cópia)."""
     csv_path = os.environ.get(
         'CANAIS_ATENDIMENTO_CSV_PATH',
         os.path.join(
@@ -78,7 +94,11 @@ def carregar_canais_atendimento() -> List[Dict[str, str]]:
             'canais_atendimento.csv'
         )
     )
+    return obter_snapshot_referencia('canais_atendimento', csv_path, _ler_canais_atendimento)
+
 
+def _ler_canais_atendimento(csv_path: str) -> List[Dict[str, str]]:
+    """Lê o CSV de canais de atendimento (chamado pelo registro só quando o arquivo muda)."""
     try:
         df = pd.read_csv(csv_path, encoding='utf-8')
 
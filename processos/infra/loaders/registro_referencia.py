@@ -0,0 +1,198 @@
+"""
+Registro de Dados de Referência (CSVs de documentos_base/)
+
+Responsabilidade única: ler cada CSV de referência 1x por processo e servir
+snapshots imutáveis a partir da memória.
+
+- Rechecagem barata: os.stat (mtime_ns, tamanho) no máximo a cada
+  REFERENCE_DATA_RECHECK_SECONDS (default: 5s) por conjunto
+- Arquivo alterado: SHA-256 do conteúdo; só relê se o hash mudou
+- Snapshot imutável (SnapshotReferencia, dados congelados em
+  MappingProxyType/tuple) compartilhado pelos leitores: snapshot_*().dados
+  não copia nada; carregar_*() devolvem cópias mutáveis para quem altera
+  os dados ou os guarda no estado/JSON
+- Métrica de recarga: mapagov_reference_data_reloads_total{dataset}
+
+Uso (nos loaders):
+    def snapshot_operadores() -> SnapshotReferencia:
+        return obter_snapshot_referencia('operadores', csv_path, _ler_operadores)
+
+    def carregar_operadores() -> List[str]:
+        return descongelar(snapshot_operadores().dados)
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from processos.infra.metrics import reference_data_reloads_total
+
+logger = logging.getLogger(__name__)
+
+
+def congelar(valor: Any) -> Any:
+    """dict -> MappingProxyType, list -> tuple (recursivo)."""
+    if isinstance(valor, dict):
+        return MappingProxyType({k: congelar(v) for k, v in valor.items()})
+    if isinstance(valor, (list, tuple)):
+        return tuple(congelar(v) for v in valor)
+    return valor
+
+
+def descongelar(valor: Any) -> Any:
+    """Inverso de congelar: cópia mutável (dict/list) para o chamador."""
+    if isinstance(valor, MappingProxyType):
+        return {k: descongelar(v) for k, v in valor.items()}
+    if isinstance(valor, tuple):
+        return [descongelar(v) for v in valor]
+    return valor
+
+
+def igual_aos_dados(valor: Any, congelado: Any) -> bool:
+    """valor (dict/list) == congelado, sem descongelar o snapshot."""
+    if isinstance(congelado, MappingProxyType):
+        return (
+            isinstance(valor, (dict, MappingProxyType))
+            and len(valor) == len(congelado)
+            and all(k in valor and igual_aos_dados(valor[k], v) for k, v in congelado.items())
+        )
+    if isinstance(congelado, tuple):
+        return (
+            isinstance(valor, (list, tuple))
+            and len(valor) == len(congelado)
+            and all(igual_aos_dados(a, b) for a, b in zip(valor, congelado))
+        )
+    return valor == congelado
+
+
+@dataclass(frozen=True)
+class SnapshotReferencia:
+    """Versão imutável de um conjunto de dados de referência."""
+    nome: str
+    caminho: str
+    dados: Any                 # Estrutura congelada
+    csv_hash: str              # '' quando o leitor caiu no fallback (arquivo ausente)
+    versao: int                # Incrementa a cada recarga efetiva
+    carregado_em: float        # time.time()
+
+
+class RegistroReferencia:
+    """Cache por processo de snapshots de dados de referência (thread-safe)."""
+
+    def __init__(self, intervalo_rechecagem: float = 5.0):
+        self.intervalo_rechecagem = intervalo_rechecagem
+        # nome -> (snapshot, assinatura stat, próxima rechecagem monotonic)
+        self._entradas: Dict[str, Tuple[SnapshotReferencia, Optional[Tuple[int, int]], float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _assinatura(caminho: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(caminho)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _hash_arquivo(caminho: str) -> str:
+        try:
+            with open(caminho, 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return ''
+
+    def obter(self, nome: str, caminho: str, leitor: Callable[[str], Any]) -> SnapshotReferencia:
+        """
+        Retorna o snapshot atual de `nome`, lendo o CSV só quando necessário.
+
+        Args:
+            nome: Identificador do conjunto (ex: 'areas', 'sistemas')
+            caminho: Caminho do CSV (pode vir de variável de ambiente)
+            leitor: Função caminho -> dados (com o fallback do loader)
+        """
+        agora = time.monotonic()
+        entrada = self._entradas.get(nome)
+        if entrada is not None and entrada[0].caminho == caminho and agora < entrada[2]:
+            return entrada[0]
+
+        with self._lock:
+            entrada = self._entradas.get(nome)
+            if entrada is not None and entrada[0].caminho == caminho and agora < entrada[2]:
+                return entrada[0]
+
+            assinatura = self._assinatura(caminho)
+            proxima = agora + self.intervalo_rechecagem
+
+            if entrada is not None and entrada[0].caminho == caminho:
+                snapshot, assinatura_anterior, _ = entrada
+                if assinatura == assinatura_anterior:
+                    self._entradas[nome] = (snapshot, assinatura, proxima)
+                    return snapshot
+                csv_hash = self._hash_arquivo(caminho) if assinatura else ''
+                if csv_hash and csv_hash == snapshot.csv_hash:
+                    # mtime mudou, conteúdo igual (touch/checkout)
+                    self._entradas[nome] = (snapshot, assinatura, proxima)
+                    return snapshot
+                versao = snapshot.versao + 1
+            else:
+                csv_hash = self._hash_arquivo(caminho) if assinatura else ''
+                versao = 1
+
+            snapshot = SnapshotReferencia(
+                nome=nome,
+                caminho=caminho,
+                dados=congelar(leitor(caminho)),
+                csv_hash=csv_hash,
+                versao=versao,
+                carregado_em=time.time(),
+            )
+            self._entradas[nome] = (snapshot, assinatura, proxima)
+
+        reference_data_reloads_total.labels(dataset=nome).inc()
+        logger.info(f"[REFERENCIA] '{nome}' carregado (versão {versao}, hash {csv_hash[:12] or 'fallback'})")
+        return snapshot
+
+    def invalidar(self, nome: Optional[str] = None) -> None:
+        """Força releitura na próxima consulta (um conjunto ou todos)."""
+        with self._lock:
+            if nome is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(nome, None)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                nome: {'versao': snap.versao, 'hash': snap.csv_hash, 'caminho': snap.caminho}
+                for nome, (snap, _, _) in self._entradas.items()
+            }
+
+
+# Instância global (1x por worker)
+_registro_instance = None
+_registro_lock = threading.Lock()
+
+
+def get_registro_referencia() -> RegistroReferencia:
+    """Retorna instância singleton do registro de dados de referência."""
+    global _registro_instance
+
+    if _registro_instance is None:
+        with _registro_lock:
+            if _registro_instance is None:
+                _registro_instance = RegistroReferencia(
+                    intervalo_rechecagem=float(os.getenv('REFERENCE_DATA_RECHECK_SECONDS', '5'))
+                )
+
+    return _registro_instance
+
+
+def obter_snapshot_referencia(nome: str, caminho: str, leitor: Callable[[str], Any]) -> SnapshotReferencia:
+    """Atalho para get_registro_referencia().obter(...)."""
+    return get_registro_referencia().obter(nome, caminho, leitor)
+
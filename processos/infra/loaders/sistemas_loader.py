@@ -10,6 +10,8 @@ from typing import Dict, List
 
 import pandas as pd
 
+from .registro_referencia import SnapshotReferencia, descongelar, obter_snapshot_referencia
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,6 +25,11 @@ def carregar_sistemas() -> Dict[str, List[str]]:
     Returns:
         Dict[str, List[str]]: Sistemas agrupados por categoria
     """
+    return descongelar(snapshot_sistemas().dados)
+
+
+def snapshot_sistemas() -> SnapshotReferencia:
+    """Snapshot imutável dos sistemas (leitura sem cópia)."""
     csv_path = os.environ.get(
         'SISTEMAS_CSV_PATH',
         os.path.join(
@@ -31,7 +38,11 @@ def carregar_sistemas() -> Dict[str, List[str]]:
             'sistemas.csv'
         )
     )
+    return obter_snapshot_referencia('sistemas', csv_path, _ler_sistemas)
+
 
+def _ler_sistemas(csv_path: str) -> Dict[str, List[str]]:
+    """Lê o CSV de sistemas (chamado pelo registro só quando o arquivo muda)."""
     try:
         df = pd.read_csv(csv_path)
 
@@ -159,6 +159,46 @@ cache_hit_rate = Gauge(
     registry=registry
 )
 
+# Counter: Queries evitadas ao hidratar ChatSession do Redis (SessionManager)
+chat_session_queries_saved_total = Counter(
+    'mapagov_chat_session_queries_saved_total',
+    'Total de queries ao banco evitadas por sessões de chat servidas do cache',
+    registry=registry
+)
+
+
+# ================================================
+# Busca Semântica Metrics (Helena POP - Camada 2)
+# ================================================
+
+# Counter: Hits no cache de embeddings de query
+query_embedding_cache_hits_total = Counter(
+    'mapagov_query_embedding_cache_hits_total',
+    'Total de hits no cache de embeddings de query',
+    ['nivel'],  # processo, redis
+    registry=registry
+)
+
+# Counter: Misses no cache de embeddings de query (encode executado)
+query_embedding_cache_misses_total = Counter(
+    'mapagov_query_embedding_cache_misses_total',
+    'Total de misses no cache de embeddings de query',
+    registry=registry
+)
+
+
+# ================================================
+# Dados de Referência (CSVs de documentos_base/)
+# ================================================
+
+# Counter: Recargas de CSV de referência (1ª leitura + mudanças de conteúdo)
+reference_data_reloads_total = Counter(
+    'mapagov_reference_data_reloads_total',
+    'Total de recargas de dados de referência',
+    ['dataset'],  # areas, sistemas, operadores, ...
+    registry=registry
+)
+
 
 # ================================================
 # Security Metrics
@@ -197,6 +237,69 @@ security_events_total = Counter(
 )
 
 
+# ================================================
+# Auditoria (AuditLog / SecurityEvent - audit_sink)
+# ================================================
+
+# Gauge: Eventos de auditoria aguardando gravação em lote
+audit_queue_depth = Gauge(
+    'mapagov_audit_queue_depth',
+    'Eventos de auditoria na fila do processo',
+    registry=registry
+)
+
+# Counter: Eventos de auditoria gravados
+audit_events_written_total = Counter(
+    'mapagov_audit_events_written_total',
+    'Total de eventos de auditoria gravados',
+    ['model', 'modo'],  # modo: lote, sincrono
+    registry=registry
+)
+
+# Counter: Eventos de auditoria descartados
+audit_events_dropped_total = Counter(
+    'mapagov_audit_events_dropped_total',
+    'Total de eventos de auditoria descartados',
+    ['motivo'],  # fila_cheia, erro_banco
+    registry=registry
+)
+
+
+# ================================================
+# Payload Blobs (snapshots/versões)
+# ================================================
+
+# Counter: Referências a blobs de payload
+payload_blobs_total = Counter(
+    'mapagov_payload_blobs_total',
+    'Total de referências a blobs de payload (novo blob ou deduplicado)',
+    ['resultado'],  # novo, deduplicado
+    registry=registry
+)
+
+
+# ================================================
+# Export Jobs (PDF/DOCX fora da requisição)
+# ================================================
+
+# Counter: Jobs de exportação por desfecho
+export_jobs_total = Counter(
+    'mapagov_export_jobs_total',
+    'Total de jobs de exportação por desfecho',
+    ['tipo', 'resultado'],  # enfileirado, concluido, retentativa, falhou
+    registry=registry
+)
+
+# Histogram: Duração da execução de um job
+export_job_duration_seconds = Histogram(
+    'mapagov_export_job_duration_seconds',
+    'Duração da execução de jobs de exportação em segundos',
+    ['tipo'],
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+    registry=registry
+)
+
+
 # ================================================
 # System Metrics
 # ================================================
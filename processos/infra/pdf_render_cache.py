@@ -0,0 +1,228 @@
+"""
+PDF Render Cache - PDFs de POP já renderizados, em disco local
+
+Responsável por:
+- Chave de conteúdo: sha256(dados normalizados para o PDF + url_base +
+  versão do template + versão do PDFGenerator); POP sem mudança desde o
+  último export = mesmo arquivo, sem passar pelo reportlab
+- LRU limitado por tamanho (PDF_CACHE_MAX_BYTES): hit renova o mtime do
+  arquivo; ao gravar, os mais antigos saem até PDF_CACHE_LOW_WATERMARK
+- Single-flight: gerações simultâneas da mesma chave esperam a primeira
+  (lock por chave no processo + flock entre workers do mesmo host)
+- ETag = chave (download_pdf responde 304 a If-None-Match)
+
+A capa traz a data de geração da primeira renderização da chave.
+
+Métricas: mapagov_cache_hits_total / mapagov_cache_misses_total
+(cache_type='pdf_render').
+"""
+import hashlib
+import logging
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import orjson
+from django.conf import settings
+
+from processos.infra.metrics import cache_hits_total, cache_misses_total
+
+try:
+    import fcntl
+except ImportError:  # Windows (dev): single-flight só dentro do processo
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_TYPE = 'pdf_render'
+CHAVE_VALIDA = re.compile(r'^[0-9a-f]{64}$')
+
+
+class PDFRenderCache:
+    """
+    Cache de PDFs renderizados (thread-safe e multi-processo no mesmo host).
+
+    Uso:
+        chave = cache.chave(dados_limpos, url_base)
+        caminho, hit = cache.obter_ou_gerar(chave, lambda: generator.gerar_pop_completo(...))
+    """
+
+    def __init__(
+        self,
+        diretorio,
+        max_bytes: int = 512 * 1024 * 1024,
+        low_watermark: float = 0.9,
+        versao_template: str = '1',
+        versao_gerador: str = '',
+    ):
+        self.diretorio = Path(diretorio)
+        self.max_bytes = max_bytes
+        self.low_watermark = low_watermark
+        self.versao_template = versao_template
+        self.versao_gerador = versao_gerador
+
+        self._locks: Dict[str, list] = {}  # chave -> [Lock, usuários]
+        self._locks_lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Chaves e caminhos
+    # ------------------------------------------------------------------
+
+    def chave(self, dados: Dict[str, Any], url_base: Optional[str] = None) -> str:
+        conteudo = orjson.dumps(
+            {'dados': dados, 'url_base': url_base},
+            default=str,
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+        )
+        h = hashlib.sha256(f'{self.versao_template}:{self.versao_gerador}:'.encode())
+        h.update(conteudo)
+        return h.hexdigest()
+
+    def caminho(self, chave: str) -> Optional[Path]:
+        """Arquivo em cache da chave (renova o LRU) ou None."""
+        if not CHAVE_VALIDA.match(chave or ''):
+            return None
+        caminho = self.diretorio / f'{chave}.pdf'
+        try:
+            os.utime(caminho)
+        except OSError:
+            return None
+        return caminho
+
+    # ------------------------------------------------------------------
+    # Geração
+    # ------------------------------------------------------------------
+
+    def obter_ou_gerar(self, chave: str, gerar: Callable[[], Optional[str]]) -> Tuple[Optional[Path], bool]:
+        """
+        PDF da chave; em miss roda gerar() (que devolve o caminho do PDF
+        gerado, movido para o cache) uma única vez por chave.
+
+        Returns:
+            (caminho no cache ou None se gerar() falhou, hit)
+        """
+        caminho = self.caminho(chave)
+        if caminho:
+            cache_hits_total.labels(cache_type=CACHE_TYPE).inc()
+            return caminho, True
+
+        with self._single_flight(chave):
+            # Outra requisição pode ter gerado enquanto esperávamos
+            caminho = self.caminho(chave)
+            if caminho:
+                cache_hits_total.labels(cache_type=CACHE_TYPE).inc()
+                return caminho, True
+
+            cache_misses_total.labels(cache_type=CACHE_TYPE).inc()
+            gerado = gerar()
+            if not gerado or not os.path.exists(gerado):
+                return None, False
+
+            destino = self.diretorio / f'{chave}.pdf'
+            tmp = self.diretorio / f'.{chave}.{os.getpid()}.tmp'
+            shutil.move(gerado, tmp)
+            os.replace(tmp, destino)  # atômico: leitores nunca veem arquivo parcial
+
+        self._evict()
+        return destino, False
+
+    @contextmanager
+    def _single_flight(self, chave: str):
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+
+        with self._locks_lock:
+            entrada = self._locks.setdefault(chave, [threading.Lock(), 0])
+            entrada[1] += 1
+        try:
+            with entrada[0]:
+                if fcntl is None:
+                    yield
+                    return
+                # 256 arquivos de lock (por prefixo da chave) em vez de 1 por PDF
+                with open(self.diretorio / f'.lock-{chave[:2]}', 'w') as lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    try:
+                        yield
+                    finally:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            with self._locks_lock:
+                entrada[1] -= 1
+                if entrada[1] == 0:
+                    self._locks.pop(chave, None)
+
+    # ------------------------------------------------------------------
+    # LRU
+    # ------------------------------------------------------------------
+
+    def _evict(self) -> int:
+        """Remove os PDFs menos usados até low_watermark * max_bytes."""
+        if not self._evict_lock.acquire(blocking=False):
+            return 0  # outra thread já está limpando
+        try:
+            arquivos = []
+            total = 0
+            for entrada in os.scandir(self.diretorio):
+                if not entrada.name.endswith('.pdf'):
+                    continue
+                try:
+                    st = entrada.stat()
+                except FileNotFoundError:
+                    continue
+                arquivos.append((st.st_mtime, st.st_size, entrada.path))
+                total += st.st_size
+
+            if total <= self.max_bytes:
+                return 0
+
+            alvo = self.max_bytes * self.low_watermark
+            removidos = 0
+            for _, tamanho, caminho in sorted(arquivos):
+                if total <= alvo:
+                    break
+                try:
+                    os.remove(caminho)
+                except FileNotFoundError:
+                    pass
+                total -= tamanho
+                removidos += 1
+
+            logger.info(f"[PDF CACHE] {removidos} PDFs removidos (LRU), {total / 1024 / 1024:.1f} MB em cache")
+            return removidos
+        finally:
+            self._evict_lock.release()
+
+
+_pdf_render_cache: Optional[PDFRenderCache] = None
+_pdf_render_cache_lock = threading.Lock()
+
+
+def get_pdf_render_cache() -> PDFRenderCache:
+    """Retorna instância singleton do cache de PDFs."""
+    global _pdf_render_cache
+
+    if _pdf_render_cache is None:
+        with _pdf_render_cache_lock:
+            if _pdf_render_cache is None:
+                from processos.utils import PDFGenerator
+                _pdf_render_cache = PDFRenderCache(
+                    diretorio=getattr(settings, 'PDF_CACHE_DIR', Path(settings.MEDIA_ROOT) / 'pdf_cache'),
+                    max_bytes=getattr(settings, 'PDF_CACHE_MAX_BYTES', 512 * 1024 * 1024),
+                    low_watermark=getattr(settings, 'PDF_CACHE_LOW_WATERMARK', 0.9),
+                    versao_template=getattr(settings, 'PDF_TEMPLATE_VERSION', '1'),
+                    versao_gerador=PDFGenerator.VERSAO,
+                )
+
+    return _pdf_render_cache
+
+
+def definir_pdf_render_cache(cache: Optional[PDFRenderCache]) -> None:
+    """Substitui o cache (testes). None = recria a partir dos settings."""
+    global _pdf_render_cache
+    with _pdf_render_cache_lock:
+        _pdf_render_cache = cache
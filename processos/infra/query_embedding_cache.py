@@ -0,0 +1,245 @@
+"""
+Query Embedding Cache - Cache de embeddings de query (Helena POP - Camada 2)
+
+Responsável por:
+- Evitar SentenceTransformer.encode repetido para a mesma descrição
+- Chave normalizada: sem acentos, minúsculas, espaços colapsados
+  ("Analisar aposentadoria " == "analisar aposentadória")
+- LRU limitado + TTL por processo (thread-safe, gunicorn --threads)
+- Nível opcional compartilhado via Redis (conexão django-redis existente)
+- Métricas de hit/miss em processos.infra.metrics
+
+Configuração (variáveis de ambiente):
+- QUERY_EMBEDDING_CACHE_SIZE  (default: 512 entradas)
+- QUERY_EMBEDDING_CACHE_TTL   (default: 3600s)
+- QUERY_EMBEDDING_CACHE_REDIS (default: 0; 1 = compartilhar entre workers)
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from processos.infra.metrics import (
+    query_embedding_cache_hits_total,
+    query_embedding_cache_misses_total,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def normalizar_chave_query(texto: str) -> str:
+    """
+    Normaliza texto da query para uso como chave de cache.
+
+    'Analisar  Aposentadória ' -> 'analisar aposentadoria'
+    """
+    texto = unicodedata.normalize('NFKD', texto or '')
+    texto = ''.join(ch for ch in texto if not unicodedata.combining(ch))
+    return ' '.join(texto.lower().split())
+
+
+class QueryEmbeddingCache:
+    """
+    Cache LRU + TTL de embeddings de query.
+
+    Vetores são armazenados como float32 somente-leitura (o chamador não
+    pode alterar um vetor compartilhado por engano).
+    """
+
+    def __init__(
+        self,
+        max_itens: int = 512,
+        ttl: int = 3600,
+        usar_redis: bool = False,
+        namespace: str = 'qemb',
+    ):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self.namespace = namespace
+        self._itens: 'OrderedDict[str, Tuple[float, np.ndarray]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+
+        if usar_redis:
+            from processos.infra.redis_cache import get_django_redis_client
+            self._redis = get_django_redis_client()
+            if self._redis is None:
+                logger.info("[QEMB] Redis indisponível - cache apenas por processo")
+
+    # ------------------------------------------------------------------
+    # Nível 1: processo
+    # ------------------------------------------------------------------
+
+    def _obter_local(self, chave: str) -> Optional[np.ndarray]:
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            expira_em, vetor = item
+            if expira_em < time.monotonic():
+                del self._itens[chave]
+                return None
+            self._itens.move_to_end(chave)
+            return vetor
+
+    def _guardar_local(self, chave: str, vetor: np.ndarray) -> None:
+        with self._lock:
+            self._itens[chave] = (time.monotonic() + self.ttl, vetor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Nível 2: Redis (opcional)
+    # ------------------------------------------------------------------
+
+    def _chave_redis(self, chave: str, modelo: str) -> str:
+        digest = hashlib.sha1(chave.encode('utf-8')).hexdigest()
+        return f"{self.namespace}:{modelo}:{digest}"
+
+    def _obter_redis(self, chave: str, modelo: str) -> Optional[np.ndarray]:
+        if self._redis is None:
+            return None
+        try:
+            data = self._redis.get(self._chave_redis(chave, modelo))
+        except Exception as e:
+            logger.warning(f"[QEMB] Erro ao ler Redis: {e}")
+            return None
+        if not data:
+            return None
+        return np.frombuffer(data, dtype=np.float32)
+
+    def _guardar_redis(self, chave: str, modelo: str, vetor: np.ndarray) -> None:
+        if self._redis is None:
+            return
+        try:
+            self._redis.setex(self._chave_redis(chave, modelo), self.ttl, vetor.tobytes())
+        except Exception as e:
+            logger.warning(f"[QEMB] Erro ao gravar Redis: {e}")
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def obter_ou_calcular(
+        self,
+        texto: str,
+        encoder: Callable[[str], np.ndarray],
+        modelo: str = 'default',
+    ) -> np.ndarray:
+        """
+        Retorna embedding da query, chamando encoder apenas em miss.
+
+        Args:
+            texto: Descrição original do usuário (é ela que vai para o encoder)
+            encoder: Função texto -> vetor normalizado
+            modelo: Nome do modelo (isola chaves Redis entre modelos)
+        """
+        chave = normalizar_chave_query(texto)
+
+        vetor = self._obter_local(chave)
+        if vetor is not None:
+            query_embedding_cache_hits_total.labels(nivel='processo').inc()
+            return vetor
+
+        vetor = self._obter_redis(chave, modelo)
+        if vetor is not None:
+            query_embedding_cache_hits_total.labels(nivel='redis').inc()
+            self._guardar_local(chave, vetor)
+            return vetor
+
+        query_embedding_cache_misses_total.inc()
+        vetor = np.asarray(encoder(texto), dtype=np.float32).copy()
+        vetor.setflags(write=False)
+        self._guardar_local(chave, vetor)
+        self._guardar_redis(chave, modelo, vetor)
+        return vetor
+
+    def obter_ou_calcular_lote(
+        self,
+        textos: List[str],
+        encoder_lote: Callable[[List[str]], np.ndarray],
+        modelo: str = 'default',
+    ) -> np.ndarray:
+        """
+        Versão em lote: consulta o cache por texto e chama encoder_lote
+        UMA vez com todos os misses (textos repetidos no lote são
+        codificados uma única vez).
+
+        Returns:
+            np.ndarray (len(textos), D) float32
+        """
+        chaves = [normalizar_chave_query(t) for t in textos]
+        vetores: Dict[str, np.ndarray] = {}
+        pendentes: Dict[str, str] = {}  # chave -> texto original (1º visto)
+
+        for texto, chave in zip(textos, chaves):
+            if chave in vetores or chave in pendentes:
+                continue
+            vetor = self._obter_local(chave)
+            if vetor is not None:
+                query_embedding_cache_hits_total.labels(nivel='processo').inc()
+                vetores[chave] = vetor
+                continue
+            vetor = self._obter_redis(chave, modelo)
+            if vetor is not None:
+                query_embedding_cache_hits_total.labels(nivel='redis').inc()
+                self._guardar_local(chave, vetor)
+                vetores[chave] = vetor
+                continue
+            pendentes[chave] = texto
+
+        if pendentes:
+            query_embedding_cache_misses_total.inc(len(pendentes))
+            calculados = np.asarray(encoder_lote(list(pendentes.values())), dtype=np.float32)
+            for chave, vetor in zip(pendentes.keys(), calculados):
+                vetor = vetor.copy()
+                vetor.setflags(write=False)
+                self._guardar_local(chave, vetor)
+                self._guardar_redis(chave, modelo, vetor)
+                vetores[chave] = vetor
+
+        if not chaves:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack([vetores[chave] for chave in chaves])
+
+    def limpar(self) -> None:
+        """Esvazia o nível por processo (Redis expira por TTL)."""
+        with self._lock:
+            self._itens.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'itens': len(self._itens),
+                'max_itens': self.max_itens,
+                'ttl': self.ttl,
+                'redis': self._redis is not None,
+            }
+
+
+# Instância global (1x por worker)
+_query_cache_instance = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """Retorna instância singleton do cache de embeddings de query."""
+    global _query_cache_instance
+
+    if _query_cache_instance is None:
+        with _query_cache_lock:
+            if _query_cache_instance is None:
+                _query_cache_instance = QueryEmbeddingCache(
+                    max_itens=int(os.getenv('QUERY_EMBEDDING_CACHE_SIZE', '512')),
+                    ttl=int(os.getenv('QUERY_EMBEDDING_CACHE_TTL', '3600')),
+                    usar_redis=os.getenv('QUERY_EMBEDDING_CACHE_REDIS', '0') == '1',
+                )
+
+    return _query_cache_instance
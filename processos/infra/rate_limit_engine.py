@@ -0,0 +1,278 @@
+"""
+Rate Limit Engine - Motores de rate limiting (GCRA)
+
+Responsável por:
+- Decidir permitido/negado por chave com estado O(1): um único inteiro por
+  chave (TAT, "theoretical arrival time"), sem listas de timestamps
+- Motor Redis: avaliação atômica num script Lua (GET + SET numa só chamada,
+  relógio do próprio Redis), via cliente do django-redis
+- Motor local (no processo): fallback quando o Redis não está configurado ou
+  falha; locks por faixa de chave, sem lock global no caminho quente
+
+GCRA (limit requisições por window segundos):
+- Intervalo de emissão T = window / limit
+- Requisição permitida se TAT' = max(TAT, agora) + T  <=  agora + window
+- Rajada máxima = limit; depois, 1 requisição a cada T segundos
+- Restantes = floor((agora + window - TAT') / T); TAT' = quando a cota
+  volta a ficar cheia (reset_at)
+
+Seleção por settings.RATE_LIMIT_ENGINE: 'auto' (Redis se disponível),
+'redis' ou 'local'. Ver RateLimiter em rate_limiting.py.
+"""
+import logging
+import math
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MICRO = 1_000_000
+
+# KEYS: chave | ARGV: intervalo de emissão (us), janela (us), consumir (1/0)
+# Retorna {permitido, TAT' - agora (us), retry_after (us)}; sem consumir, TAT - agora
+_LUA_GCRA = """
+redis.replicate_commands()
+local t = redis.call('TIME')
+local agora = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local tat = tonumber(redis.call('GET', KEYS[1])) or agora
+if tat < agora then
+    tat = agora
+end
+local novo_tat = tat + tonumber(ARGV[1])
+local permitido_em = novo_tat - tonumber(ARGV[2])
+if agora < permitido_em then
+    return {0, tat - agora, permitido_em - agora}
+end
+if ARGV[3] ~= '1' then
+    return {1, tat - agora, 0}
+end
+redis.call('SET', KEYS[1], string.format('%d', novo_tat),
+    'PX', string.format('%d', math.ceil((novo_tat - agora) / 1000)))
+return {1, novo_tat - agora, 0}
+"""
+
+
+@dataclass(frozen=True)
+class DecisaoRateLimit:
+    """Resultado de uma consulta ao motor."""
+    permitido: bool
+    restantes: int
+    reset_em: float        # epoch (s): cota cheia de novo
+    retry_after: float     # s até a próxima permitida (0 se permitido)
+
+
+def _decidir(offset_us: int, retry_us: int, permitido: bool, limite: int,
+             janela_us: int, intervalo_us: int, agora: float) -> DecisaoRateLimit:
+    """Monta a decisão a partir de (TAT - agora) e do retry, em microssegundos."""
+    restantes = 0 if not permitido else max(0, (janela_us - offset_us) // intervalo_us)
+    return DecisaoRateLimit(
+        permitido=permitido,
+        restantes=min(int(restantes), limite),
+        reset_em=agora + offset_us / MICRO,
+        retry_after=retry_us / MICRO,
+    )
+
+
+def _parametros(limite: int, janela: int):
+    janela_us = int(janela * MICRO)
+    return janela_us, max(1, janela_us // max(1, limite))
+
+
+class MotorRateLimit(ABC):
+    """Interface dos motores (pluggable via definir_motor_rate_limit)."""
+
+    nome = 'base'
+
+    @abstractmethod
+    def consumir(self, chave: str, limite: int, janela: int) -> DecisaoRateLimit:
+        """Avalia e, se permitido, registra a requisição."""
+        pass
+
+    @abstractmethod
+    def consultar(self, chave: str, limite: int, janela: int) -> DecisaoRateLimit:
+        """Avalia sem registrar (status/admin)."""
+        pass
+
+    @abstractmethod
+    def resetar(self, chave: str) -> None:
+        """Apaga o estado da chave."""
+        pass
+
+
+class MotorGCRALocal(MotorRateLimit):
+    """
+    GCRA em memória do processo (por worker, não compartilhado).
+
+    A leitura-decisão-escrita de uma chave precisa ser atômica e o Python
+    não tem compare-and-swap: cada chave cai numa de `faixas` locks (hash
+    da chave), então chaves diferentes raramente disputam o mesmo lock.
+    Entradas expiradas são varridas quando o dicionário passa de max_chaves.
+    """
+
+    nome = 'local'
+
+    def __init__(self, max_chaves: int = 100_000, faixas: int = 64,
+                 relogio: Callable[[], float] = time.time):
+        self.max_chaves = max_chaves
+        self.relogio = relogio
+        self._tat: Dict[str, int] = {}
+        self._faixas = [threading.Lock() for _ in range(faixas)]
+        self._varredura = threading.Lock()
+
+    def _lock(self, chave: str) -> threading.Lock:
+        return self._faixas[zlib.crc32(chave.encode('utf-8')) % len(self._faixas)]
+
+    def _avaliar(self, chave: str, limite: int, janela: int, consumir: bool) -> DecisaoRateLimit:
+        janela_us, intervalo_us = _parametros(limite, janela)
+        agora = self.relogio()
+        agora_us = int(agora * MICRO)
+
+        with self._lock(chave):
+            tat = max(self._tat.get(chave, agora_us), agora_us)
+            novo_tat = tat + intervalo_us
+            permitido_em = novo_tat - janela_us
+            if agora_us < permitido_em:
+                return _decidir(tat - agora_us, permitido_em - agora_us, False,
+                                limite, janela_us, intervalo_us, agora)
+            if not consumir:
+                return _decidir(tat - agora_us, 0, True, limite, janela_us, intervalo_us, agora)
+            self._tat[chave] = novo_tat
+
+        if len(self._tat) > self.max_chaves:
+            self._varrer(agora_us)
+        return _decidir(novo_tat - agora_us, 0, True, limite, janela_us, intervalo_us, agora)
+
+    def _varrer(self, agora_us: int) -> None:
+        """Remove chaves com TAT no passado (cota já cheia = estado padrão)."""
+        if not self._varredura.acquire(blocking=False):
+            return
+        try:
+            for chave, tat in list(self._tat.items()):
+                if tat <= agora_us:
+                    with self._lock(chave):
+                        if self._tat.get(chave, agora_us + 1) <= agora_us:
+                            del self._tat[chave]
+        finally:
+            self._varredura.release()
+
+    def consumir(self, chave: str, limite: int, janela: int) -> DecisaoRateLimit:
+        return self._avaliar(chave, limite, janela, consumir=True)
+
+    def consultar(self, chave: str, limite: int, janela: int) -> DecisaoRateLimit:
+        return self._avaliar(chave, limite, janela, consumir=False)
+
+    def resetar(self, chave: str) -> None:
+        with self._lock(chave):
+            self._tat.pop(chave, None)
+
+
+class MotorGCRARedis(MotorRateLimit):
+    """
+    GCRA atômico no Redis (1 EVALSHA por requisição, 1 inteiro por chave).
+
+    Se o Redis falhar, a decisão vem do motor local (limite por worker em vez
+    de global, mas sem deixar de limitar); o aviso é logado no máximo 1x/min.
+    """
+
+    nome = 'redis'
+    INTERVALO_AVISO = 60.0
+
+    def __init__(self, client, fallback: Optional[MotorRateLimit] = None):
+        self.client = client
+        self.fallback = fallback or MotorGCRALocal()
+        self._script = client.register_script(_LUA_GCRA)
+        self._proximo_aviso = 0.0
+
+    def _avisar(self, erro: Exception) -> None:
+        agora = time.monotonic()
+        if agora >= self._proximo_aviso:
+            self._proximo_aviso = agora + self.INTERVALO_AVISO
+            logger.warning(f"Rate limit: Redis indisponível, usando motor local ({erro})")
+
+    def _avaliar(self, chave: str, limite: int, janela: int, consumir: bool) -> DecisaoRateLimit:
+        janela_us, intervalo_us = _parametros(limite, janela)
+        try:
+            permitido, offset_us, retry_us = self._script(
+                keys=[chave], args=[intervalo_us, janela_us, 1 if consumir else 0]
+            )
+        except Exception as e:
+            self._avisar(e)
+            if consumir:
+                return self.fallback.consumir(chave, limite, janela)
+            return self.fallback.consultar(chave, limite, janela)
+
+        return _decidir(int(offset_us), int(retry_us), bool(permitido),
+                        limite, janela_us, intervalo_us, time.time())
+
+    def consumir(self, chave: str, limite: int, janela: int) -> DecisaoRateLimit:
+        return self._avaliar(chave, limite, janela, consumir=True)
+
+    def consultar(self, chave: str, limite: int, janela: int) -> DecisaoRateLimit:
+        return self._avaliar(chave, limite, janela, consumir=False)
+
+    def resetar(self, chave: str) -> None:
+        try:
+            self.client.delete(chave)
+        except Exception as e:
+            self._avisar(e)
+        self.fallback.resetar(chave)
+
+
+# ================================================
+# Motor padrão (1x por processo)
+# ================================================
+
+_motor: Optional[MotorRateLimit] = None
+_motor_lock = threading.Lock()
+
+
+def _criar_motor() -> MotorRateLimit:
+    engine = getattr(settings, 'RATE_LIMIT_ENGINE', 'auto')
+    if engine != 'local':
+        from processos.infra.redis_cache import get_django_redis_client
+
+        client = get_django_redis_client()
+        if client is not None:
+            return MotorGCRARedis(client)
+        if engine == 'redis':
+            logger.warning("RATE_LIMIT_ENGINE='redis' sem cache django-redis; usando motor local")
+    return MotorGCRALocal()
+
+
+def obter_motor_rate_limit() -> MotorRateLimit:
+    """Retorna o motor padrão (criado no primeiro uso, conforme settings)."""
+    global _motor
+
+    if _motor is None:
+        with _motor_lock:
+            if _motor is None:
+                _motor = _criar_motor()
+                logger.info(f"[RATE LIMIT] Motor: {_motor.nome}")
+
+    return _motor
+
+
+def definir_motor_rate_limit(motor: Optional[MotorRateLimit]) -> None:
+    """Troca o motor padrão (None = recriar a partir de settings no próximo uso)."""
+    global _motor
+
+    with _motor_lock:
+        _motor = motor
+
+
+def decisao_para_info(decisao: DecisaoRateLimit, limite: int) -> dict:
+    """Converte a decisão no dict `info` usado pelos decorators/headers."""
+    info = {
+        'remaining': decisao.restantes,
+        'limit': limite,
+        'reset_at': int(math.ceil(decisao.reset_em)),
+    }
+    if not decisao.permitido:
+        info['retry_after'] = max(1, int(math.ceil(decisao.retry_after)))
+    return info
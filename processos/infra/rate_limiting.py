@@ -9,7 +9,8 @@ Estratégias:
 - Por órgão (limite global do órgão)
 - Por endpoint (endpoints sensíveis têm limites menores)
 
-Armazenamento: Redis (rápido) com fallback para DB
+Algoritmo: GCRA (ver rate_limit_engine)
+Armazenamento: Redis (script Lua atômico) com fallback em memória do processo
 """
 
 import time
@@ -20,29 +21,44 @@ from django.core.cache import cache
 from django.conf import settings
 import logging
 
+from processos.infra.metrics import rate_limit_exceeded_total
+from processos.infra.rate_limit_engine import (
+    MotorRateLimit,
+    decisao_para_info,
+    obter_motor_rate_limit,
+)
+
 logger = logging.getLogger(__name__)
 
 
 class RateLimiter:
     """
-    Rate limiter usando sliding window algorithm.
+    Rate limiter GCRA (janela deslizante sem lista de timestamps).
 
     Benefícios:
-    - Mais preciso que fixed window
-    - Evita burst attacks
-    - Suave degradação
+    - Estado O(1) por identificador (1 inteiro), decisão atômica
+    - Evita burst attacks (rajada máxima = limit)
+    - Suave degradação: Redis fora -> motor local no processo
+
+    A decisão é delegada ao motor (rate_limit_engine): Redis via Lua quando
+    o cache default é django-redis, memória do processo caso contrário.
     """
 
-    def __init__(self, key_prefix: str, limit: int, window: int):
+    def __init__(self, key_prefix: str, limit: int, window: int, motor: MotorRateLimit = None):
         """
         Args:
             key_prefix: Prefixo da chave (ex: 'ratelimit:user:123')
             limit: Número máximo de requisições
             window: Janela de tempo em segundos
+            motor: Motor específico (None = motor padrão do processo)
         """
         self.key_prefix = key_prefix
         self.limit = limit
         self.window = window
+        self.motor = motor
+
+    def _motor(self) -> MotorRateLimit:
+        return self.motor or obter_motor_rate_limit()
 
     def is_allowed(self, identifier: str) -> tuple[bool, dict]:
         """
@@ -53,43 +69,13 @@ class RateLimiter:
 
         Returns:
             (is_allowed: bool, info: dict)
-            info contém: remaining, reset_at
+            info contém: remaining, limit, reset_at (+ retry_after se negada)
         """
         key = f"{self.key_prefix}:{identifier}"
-        current_time = time.time()
-        window_start = current_time - self.window
 
         try:
-            # Obter histórico de requisições
-            requests = cache.get(key, [])
-
-            # Filtrar apenas requisições dentro da janela
-            requests = [req_time for req_time in requests if req_time > window_start]
-
-            # Verificar limite
-            if len(requests) >= self.limit:
-                # Limite excedido
-                oldest_request = min(requests)
-                reset_at = oldest_request + self.window
-
-                return False, {
-                    'remaining': 0,
-                    'limit': self.limit,
-                    'reset_at': int(reset_at),
-                    'retry_after': int(reset_at - current_time)
-                }
-
-            # Adicionar requisição atual
-            requests.append(current_time)
-
-            # Salvar no cache (TTL = janela de tempo)
-            cache.set(key, requests, timeout=self.window)
-
-            return True, {
-                'remaining': self.limit - len(requests),
-                'limit': self.limit,
-                'reset_at': int(current_time + self.window)
-            }
+            decisao = self._motor().consumir(key, self.limit, self.window)
+            return decisao.permitido, decisao_para_info(decisao, self.limit)
 
         except Exception as e:
             logger.error(f"Erro no rate limiter: {e}")
@@ -97,9 +83,15 @@ class RateLimiter:
             return True, {
                 'remaining': self.limit,
                 'limit': self.limit,
-                'reset_at': int(current_time + self.window)
+                'reset_at': int(time.time() + self.window)
             }
 
+    def status(self, identifier: str) -> tuple[bool, dict]:
+        """Como is_allowed, mas sem contar a requisição."""
+        key = f"{self.key_prefix}:{identifier}"
+        decisao = self._motor().consultar(key, self.limit, self.window)
+        return decisao.permitido, decisao_para_info(decisao, self.limit)
+
     def reset(self, identifier: str):
         """
         Reseta contador para um identificador.
@@ -107,7 +99,7 @@ class RateLimiter:
         Útil para testes ou após resolver incidente.
         """
         key = f"{self.key_prefix}:{identifier}"
-        cache.delete(key)
+        self._motor().resetar(key)
 
 
 # ================================================
@@ -193,6 +185,10 @@ def rate_limit(
                     f"Rate limit excedido: {identifier} no endpoint {request.path}"
                 )
 
+                rate_limit_exceeded_total.labels(
+                    limiter_type=_limiter.key_prefix.split(':')[1] if ':' in _limiter.key_prefix else _limiter.key_prefix
+                ).inc()
+
                 # Logar evento de segurança
                 _log_rate_limit_exceeded(request, identifier, info)
 
@@ -384,18 +380,11 @@ def get_rate_limit_status(identifier: str, limiter: RateLimiter) -> dict:
             'reset_at': 1234567890
         }
     """
-    is_allowed, info = limiter.is_allowed(identifier)
-
-    # Obter contagem atual sem incrementar
-    key = f"{limiter.key_prefix}:{identifier}"
-    requests = cache.get(key, [])
-    current_time = time.time()
-    window_start = current_time - limiter.window
-    requests = [req_time for req_time in requests if req_time > window_start]
+    is_allowed, info = limiter.status(identifier)
 
     return {
         'identifier': identifier,
-        'requests_count': len(requests),
+        'requests_count': info['limit'] - info['remaining'],
         'remaining': info['remaining'],
         'limit': info['limit'],
         'reset_at': info['reset_at'],
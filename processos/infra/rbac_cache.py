@@ -0,0 +1,163 @@
+"""
+RBAC Cache - Conjuntos de permissões resolvidos por (usuário, órgão)
+
+Responsável por:
+- Guardar o frozenset de códigos de permissão de (user_id, orgao_id) já com
+  a hierarquia de roles achatada: checagem de permissão = 1 lookup em set
+- Dois níveis: memória do processo (L1) e cache default do Django (L2,
+  Redis quando disponível)
+- Invalidação por versão global (rbac_version): qualquer mudança em
+  Role/Permission/RolePermission/UserRole incrementa a versão (signals em
+  models_new/rbac.py) e as chaves antigas deixam de ser usadas
+
+Chaves:
+- rbac:version                          versão global (L2, sem TTL)
+- rbac:perms:{user}:{orgao}:{versao}    lista de códigos (L2, RBAC_CACHE_TTL)
+
+Outros processos enxergam a versão nova em até RBAC_VERSION_RECHECK_SECONDS
+(default 5s); no processo que fez a mudança a invalidação é imediata.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, FrozenSet, Optional, Tuple
+
+from django.core.cache import cache
+
+from processos.infra.metrics import cache_hit_rate, cache_hits_total, cache_misses_total
+
+logger = logging.getLogger(__name__)
+
+CHAVE_VERSAO = 'rbac:version'
+CACHE_TYPE = 'rbac_permissions'
+MAX_ENTRADAS_LOCAIS = 10_000
+
+
+class RBACPermissionCache:
+    """Cache de permissões resolvidas (thread-safe)."""
+
+    def __init__(self, ttl: int = 3600, intervalo_rechecagem: float = 5.0):
+        self.ttl = ttl
+        self.intervalo_rechecagem = intervalo_rechecagem
+        self._local: Dict[Tuple[int, int, int], FrozenSet[str]] = {}
+        self._versao: Optional[int] = None
+        self._proxima_checagem = 0.0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+
+    # ------------------------------------------------------------------
+    # Versão
+    # ------------------------------------------------------------------
+
+    def versao(self) -> int:
+        """Versão atual (relida do L2 no máximo a cada intervalo_rechecagem)."""
+        agora = time.monotonic()
+        versao = self._versao
+        if versao is not None and agora < self._proxima_checagem:
+            return versao
+
+        try:
+            lida = cache.get(CHAVE_VERSAO)
+            if lida is None:
+                # Inicial em ms: se a chave for despejada, a nova versão
+                # nunca coincide com uma anterior
+                cache.add(CHAVE_VERSAO, int(time.time() * 1000), timeout=None)
+                lida = cache.get(CHAVE_VERSAO)
+            versao = int(lida)
+        except Exception as e:
+            logger.warning(f"[RBAC CACHE] Versão indisponível no cache: {e}")
+            versao = versao if versao is not None else 0
+
+        with self._lock:
+            if versao != self._versao:
+                self._local.clear()
+            self._versao = versao
+            self._proxima_checagem = agora + self.intervalo_rechecagem
+        return versao
+
+    def invalidar(self) -> None:
+        """Nova versão global; descarta o L1 deste processo na hora."""
+        try:
+            if not cache.add(CHAVE_VERSAO, int(time.time() * 1000), timeout=None):
+                cache.incr(CHAVE_VERSAO)
+        except Exception as e:
+            logger.warning(f"[RBAC CACHE] Falha ao incrementar versão: {e}")
+
+        with self._lock:
+            self._local.clear()
+            self._versao = None
+            self._proxima_checagem = 0.0
+        logger.debug("[RBAC CACHE] Permissões invalidadas")
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def _registrar(self, hit: bool) -> None:
+        (cache_hits_total if hit else cache_misses_total).labels(cache_type=CACHE_TYPE).inc()
+        with self._lock:
+            self._stats['hits' if hit else 'misses'] += 1
+            taxa = self._stats['hits'] / (self._stats['hits'] + self._stats['misses'])
+        cache_hit_rate.labels(cache_type=CACHE_TYPE).set(taxa)
+
+    def obter(
+        self,
+        user_id: int,
+        orgao_id: int,
+        resolver: Callable[[], FrozenSet[str]],
+    ) -> FrozenSet[str]:
+        """
+        Permissões de (user_id, orgao_id); resolver() só roda em miss L1+L2.
+        """
+        versao = self.versao()
+        chave_local = (user_id, orgao_id, versao)
+
+        permissoes = self._local.get(chave_local)
+        if permissoes is not None:
+            self._registrar(hit=True)
+            return permissoes
+
+        chave = f'rbac:perms:{user_id}:{orgao_id}:{versao}'
+        try:
+            codigos = cache.get(chave)
+        except Exception as e:
+            logger.warning(f"[RBAC CACHE] L2 indisponível: {e}")
+            codigos = None
+
+        if codigos is not None:
+            permissoes = frozenset(codigos)
+            self._registrar(hit=True)
+        else:
+            permissoes = frozenset(resolver())
+            self._registrar(hit=False)
+            try:
+                cache.set(chave, sorted(permissoes), timeout=self.ttl)
+            except Exception as e:
+                logger.warning(f"[RBAC CACHE] Falha ao gravar L2: {e}")
+
+        with self._lock:
+            if self._versao == versao:
+                if len(self._local) >= MAX_ENTRADAS_LOCAIS:
+                    self._local.clear()
+                self._local[chave_local] = permissoes
+        return permissoes
+
+
+_rbac_cache: Optional[RBACPermissionCache] = None
+_rbac_cache_lock = threading.Lock()
+
+
+def get_rbac_cache() -> RBACPermissionCache:
+    """Retorna instância singleton do cache de permissões."""
+    global _rbac_cache
+
+    if _rbac_cache is None:
+        with _rbac_cache_lock:
+            if _rbac_cache is None:
+                _rbac_cache = RBACPermissionCache(
+                    ttl=int(os.getenv('RBAC_CACHE_TTL', '3600')),
+                    intervalo_rechecagem=float(os.getenv('RBAC_VERSION_RECHECK_SECONDS', '5')),
+                )
+
+    return _rbac_cache
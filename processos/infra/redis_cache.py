@@ -9,12 +9,34 @@ Responsável por:
 import redis
 import json
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
 
+def get_django_redis_client():
+    """
+    Retorna o cliente Redis bruto do cache 'default' (django-redis).
+
+    Reutiliza o pool de conexões já configurado em settings.CACHES.
+
+    Returns:
+        redis.Redis ou None se o cache default não for django-redis
+        (ex: fallback LocMemCache quando Redis indisponível)
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if 'django_redis' not in backend:
+        return None
+
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+    except Exception as e:
+        logger.warning(f"Cliente django-redis indisponível: {e}")
+        return None
+
+
 class RedisSessionCache:
     """
     Cliente Redis para cache de sessões de chat.
@@ -86,6 +108,30 @@ class RedisSessionCache:
             logger.error(f"Erro ao buscar sessão no Redis: {e}")
             return None
 
+    def get_session_with_count(self, session_id: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        """
+        Busca sessão + contador de mensagens em 1 round-trip (pipeline).
+
+        Args:
+            session_id: UUID da sessão
+
+        Returns:
+            (dict da sessão ou None, total de mensagens ou 0)
+        """
+        if not self.available:
+            return None, 0
+
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.get(f'session:{session_id}')
+            pipe.get(f'session:{session_id}:msg_count')
+            data, count = pipe.execute()
+            logger.debug(f"Cache {'HIT' if data else 'MISS'}: {session_id}")
+            return (json.loads(data) if data else None), (int(count) if count else 0)
+        except Exception as e:
+            logger.error(f"Erro ao buscar sessão no Redis: {e}")
+            return None, 0
+
     def set_session(self, session_id: str, data: Dict[str, Any]) -> bool:
         """
         Salva sessão no cache.
@@ -111,6 +157,7 @@ class RedisSessionCache:
             return True
         except Exception as e:
             logger.error(f"Erro ao salvar sessão no Redis: {e}")
+            self._descartar_apos_falha(session_id)
             return False
 
     def delete_session(self, session_id: str) -> bool:
@@ -135,6 +182,17 @@ class RedisSessionCache:
             logger.error(f"Erro ao deletar sessão no Redis: {e}")
             return False
 
+    def _descartar_apos_falha(self, session_id: str) -> None:
+        """
+        Escrita falhou depois do commit no banco: remove a entrada (melhor
+        esforço) para não servir estado velho. Se nem o DELETE passar, o
+        UPDATE condicional da sessão (salvar_se_versao) detecta o cache velho.
+        """
+        try:
+            self.client.delete(f'session:{session_id}')
+        except Exception:
+            pass
+
     def increment_message_count(self, session_id: str) -> int:
         """
         Incrementa contador de mensagens da sessão.
@@ -159,6 +217,36 @@ class RedisSessionCache:
             logger.error(f"Erro ao incrementar contador: {e}")
             return 0
 
+    def commit_turn(self, session_id: str, data: Dict[str, Any]) -> int:
+        """
+        Atualiza sessão + contador de mensagens em 1 round-trip (pipeline).
+
+        Chamado após o commit do turno no banco (TurnCommit).
+
+        Args:
+            session_id: UUID da sessão
+            data: Dados da sessão (session.to_dict())
+
+        Returns:
+            int: Total de mensagens ou 0 se erro
+        """
+        if not self.available:
+            return 0
+
+        try:
+            count_key = f'session:{session_id}:msg_count'
+            pipe = self.client.pipeline(transaction=False)
+            pipe.setex(f'session:{session_id}', self.ttl, json.dumps(data, default=str))
+            pipe.incr(count_key)
+            pipe.expire(count_key, self.ttl)
+            _, count, _ = pipe.execute()
+            logger.debug(f"Cache TURN: {session_id} (msg_count={count})")
+            return count
+        except Exception as e:
+            logger.error(f"Erro ao atualizar turno no Redis: {e}")
+            self._descartar_apos_falha(session_id)
+            return 0
+
     def get_message_count(self, session_id: str) -> int:
         """
         Retorna contador de mensagens da sessão.
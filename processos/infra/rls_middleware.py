@@ -12,14 +12,105 @@ Para cada requisição:
 ESCOPO ATUAL (migração 0008):
 - Políticas RLS ativas apenas em: ChatSession, ChatMessage
 - Demais tabelas ainda não possuem políticas RLS
+
+MODOS (settings.RLS_SETUP_MODE):
+- 'classico': 2x SET LOCAL no início + 2x RESET no fim de cada requisição
+- 'combinado': 1 único SELECT set_config(...), set_config(...) no início,
+  só quando o contexto da conexão (persistente, CONN_MAX_AGE) é outro;
+  sem limpeza no fim (a próxima requisição na conexão redefine)
+- 'adiado': igual ao combinado, mas aplicado na primeira query da requisição
+  (connection.execute_wrapper); requisição sem banco não paga nada
+
+O órgão do usuário fica em cache na sessão (RLS_ORGAO_CACHE_SECONDS).
 """
 
 import logging
+import time
+from typing import Callable, Optional, Tuple
+
+from django.conf import settings
 from django.db import connection
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
 from django.contrib.auth.models import AnonymousUser
 
 logger = logging.getLogger(__name__)
 
+MODOS_RLS = ('classico', 'combinado', 'adiado')
+
+# (app.current_orgao_id, app.is_superuser) como texto, igual ao set_config
+ContextoRLS = Tuple[str, str]
+CONTEXTO_VAZIO: ContextoRLS = ('', '')
+
+SQL_DEFINIR_CONTEXTO = (
+    "SELECT set_config('app.current_orgao_id', %s, false), "
+    "set_config('app.is_superuser', %s, false)"
+)
+
+CHAVE_SESSAO_ORGAO = '_rls_orgao'
+
+
+@receiver(connection_created)
+def _marcar_conexao_limpa(sender, connection, **kwargs):
+    """Conexão nova não tem variáveis RLS definidas."""
+    connection._rls_contexto = CONTEXTO_VAZIO
+
+
+def aplicar_contexto(conexao, contexto: ContextoRLS, cursor) -> bool:
+    """
+    Garante o contexto RLS na conexão com no máximo 1 statement.
+
+    A conexão guarda o último contexto aplicado (_rls_contexto); se já é o
+    mesmo, nada é executado. Dentro de transação o set_config pode ser
+    desfeito por rollback, então a marca só é gravada após o commit.
+
+    Args:
+        conexao: DatabaseWrapper do Django
+        contexto: (orgao_id, is_superuser) como texto
+        cursor: cursor usado para o set_config (fora dos execute_wrappers)
+
+    Returns:
+        True se executou o set_config
+    """
+    if getattr(conexao, '_rls_contexto', None) == contexto:
+        return False
+
+    conexao._rls_contexto = None
+    cursor.execute(SQL_DEFINIR_CONTEXTO, list(contexto))
+
+    if conexao.in_atomic_block:
+        def _confirmar():
+            conexao._rls_contexto = contexto
+        conexao.on_commit(_confirmar)
+    else:
+        conexao._rls_contexto = contexto
+    return True
+
+
+class ContextoRLSAdiado:
+    """
+    execute_wrapper que aplica o contexto RLS antes da primeira query.
+
+    O contexto é resolvido de forma preguiçosa (resolver pode consultar o
+    banco para achar o órgão; essas queries passam direto pelo wrapper).
+    """
+
+    def __init__(self, resolver: Callable[[], ContextoRLS]):
+        self.resolver = resolver
+        self.contexto: Optional[ContextoRLS] = None
+        self._resolvendo = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if not self._resolvendo:
+            if self.contexto is None:
+                self._resolvendo = True
+                try:
+                    self.contexto = self.resolver()
+                finally:
+                    self._resolvendo = False
+            aplicar_contexto(context['connection'], self.contexto, context['cursor'].cursor)
+        return execute(sql, params, many, context)
+
 
 class RLSMiddleware:
     """
@@ -32,8 +123,16 @@ class RLSMiddleware:
 
     def __init__(self, get_response):
         self.get_response = get_response
+        self.modo = getattr(settings, 'RLS_SETUP_MODE', 'classico')
+        if self.modo not in MODOS_RLS:
+            logger.warning(f"RLS_SETUP_MODE inválido ({self.modo!r}); usando 'classico'")
+            self.modo = 'classico'
+        self.ttl_orgao = getattr(settings, 'RLS_ORGAO_CACHE_SECONDS', 300)
 
     def __call__(self, request):
+        if self.modo != 'classico' and connection.vendor == 'postgresql':
+            return self._processar_combinado(request)
+
         # Configurar RLS antes de processar a requisição
         self._setup_rls(request)
 
@@ -45,6 +144,61 @@ class RLSMiddleware:
 
         return response
 
+    def _processar_combinado(self, request):
+        """Modos 'combinado' e 'adiado': 1 statement, só quando o contexto muda."""
+        if self.modo == 'adiado':
+            wrapper = ContextoRLSAdiado(lambda: self._contexto_da_requisicao(request))
+            with connection.execute_wrapper(wrapper):
+                return self.get_response(request)
+
+        try:
+            contexto = self._contexto_da_requisicao(request)
+            # A marca só vale depois de abrir o cursor: se a conexão foi
+            # fechada (CONN_MAX_AGE, erro), reabrir dispara connection_created
+            # e zera a marca antes da comparação em aplicar_contexto
+            with connection.cursor() as cursor:
+                aplicar_contexto(connection, contexto, cursor)
+        except Exception as e:
+            logger.exception(f"Erro ao configurar RLS: {e}")
+
+        return self.get_response(request)
+
+    def _contexto_da_requisicao(self, request) -> ContextoRLS:
+        """(orgao_id, is_superuser) do usuário; vazio para anônimo/sem órgão."""
+        user = getattr(request, 'user', None)
+        if user is None or isinstance(user, AnonymousUser) or not user.is_authenticated:
+            return CONTEXTO_VAZIO
+
+        orgao_id = self._obter_orgao_id(request, user)
+        if orgao_id is None:
+            logger.warning(
+                f"Usuário {user.username} (ID: {user.id}) não tem Orgão associado. "
+                "RLS não será configurado."
+            )
+            return CONTEXTO_VAZIO
+
+        return (str(orgao_id), 'true' if user.is_superuser else 'false')
+
+    def _obter_orgao_id(self, request, user) -> int | None:
+        """
+        _get_user_orgao_id com cache na sessão (evita query por requisição).
+
+        Valor na sessão: [user_id, orgao_id, expira_em]. Só cacheia quando há
+        órgão, para que uma associação nova valha na próxima requisição.
+        """
+        sessao = getattr(request, 'session', None)
+        agora = time.time()
+
+        if sessao is not None:
+            salvo = sessao.get(CHAVE_SESSAO_ORGAO)
+            if salvo and salvo[0] == user.pk and salvo[2] > agora:
+                return salvo[1]
+
+        orgao_id = self._get_user_orgao_id(user)
+        if orgao_id is not None and sessao is not None:
+            sessao[CHAVE_SESSAO_ORGAO] = [user.pk, orgao_id, agora + self.ttl_orgao]
+        return orgao_id
+
     def _setup_rls(self, request):
         """
         Configura variáveis de sessão do PostgreSQL para RLS.
@@ -70,7 +224,7 @@ class RLSMiddleware:
 
         try:
             # Determinar Orgão do usuário
-            orgao_id = self._get_user_orgao_id(user)
+            orgao_id = self._obter_orgao_id(request, user)
 
             if orgao_id is None:
                 logger.warning(
@@ -150,9 +304,9 @@ class RLSMiddleware:
             return user.orgao.id
 
         # Estratégia 2: Profile separado
-        if hasattr(user, 'profile') and hasattr(user.profile, 'orgao'):
-            if user.profile.orgao is not None:
-                return user.profile.orgao.id
+        if hasattr(user, 'profile') and hasattr(user.profile, 'orgao_id'):
+            if user.profile.orgao_id is not None:
+                return user.profile.orgao_id
 
         # Estratégia 3: Primeiro Orgao (APENAS para testes/desenvolvimento)
         # REMOVER em produção!
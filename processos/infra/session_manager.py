@@ -5,20 +5,139 @@ Responsável por:
 - Get/Create sessões (Redis → DB fallback)
 - Salvar mensagens (idempotência via req_uuid)
 - Sincronização híbrida (Redis + PostgreSQL)
+- Commit de turno (TurnCommit): estado + mensagens em 1 transação
+- Write-behind opcional (settings.CHAT_WRITE_BEHIND): mensagens vão para o
+  buffer no Redis e são gravadas em lote (ChatMessageBuffer)
 """
 import uuid
 import logging
-from typing import Optional, Dict, Any
+import threading
+from typing import Optional, Dict, Any, List
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import transaction, IntegrityError
 from processos.models_new.orgao import Orgao
 from processos.models_new.chat_session import ChatSession
 from processos.models_new.chat_message import ChatMessage
+from processos.infra.chat_message_buffer import ChatMessageBuffer, iniciar_flusher
+from processos.infra.metrics import (
+    cache_hit_rate, cache_hits_total, cache_misses_total, chat_session_queries_saved_total,
+)
 from processos.infra.redis_cache import RedisSessionCache
 
 logger = logging.getLogger(__name__)
 
 
+class SessaoDesatualizada(Exception):
+    """A sessão mudou no banco depois de lida (cache Redis velho); o turno não foi gravado."""
+
+
+class TurnCommit:
+    """
+    Unidade de trabalho de um turno de chat.
+
+    Acumula as mudanças da sessão e as mensagens do turno e grava tudo de uma
+    vez em commit():
+    - 1 transação: UPDATE da sessão (só campos marcados, condicionado ao
+      atualizado_em lido; SessaoDesatualizada se a linha mudou) + 1 INSERT
+      em lote das mensagens (bulk_create, duplicatas de req_uuid ignoradas)
+    - Após o commit: sessão + contador no Redis em 1 pipeline
+    - Write-behind: mensagens vão para o buffer no Redis em vez do INSERT,
+      também após o commit (fallback para o INSERT se o Redis falhar)
+
+    Uso:
+        turno = session_manager.begin_turn(session)
+        session.estados[ctx] = novo_estado
+        turno.mark_dirty('estados')
+        turno.add_message('user', mensagem, req_uuid=req_uuid)
+        turno.commit()
+    """
+
+    def __init__(
+        self,
+        session: ChatSession,
+        cache: RedisSessionCache,
+        buffer: Optional[ChatMessageBuffer] = None
+    ):
+        self.session = session
+        self.cache = cache
+        self.buffer = buffer
+        self._campos: set = set()
+        self._mensagens: List[ChatMessage] = []
+        self._commitado = False
+
+    def mark_dirty(self, *campos: str) -> None:
+        """Marca campos da sessão para o UPDATE do commit."""
+        self._campos.update(campos)
+
+    def add_message(
+        self,
+        role: str,
+        content: str,
+        req_uuid: Optional[str] = None,
+        contexto: Optional[str] = None,
+        metadados: Optional[Dict[str, Any]] = None
+    ) -> ChatMessage:
+        """
+        Enfileira mensagem para o INSERT em lote (mesmas regras de save_message).
+
+        Raises:
+            ValueError: Se role inválido
+        """
+        if role not in ['user', 'assistant', 'system']:
+            raise ValueError(f"Role inválido: {role}. Permitidos: user, assistant, system")
+
+        message = ChatMessage(
+            req_uuid=req_uuid or str(uuid.uuid4()),
+            session=self.session,
+            user=self.session.user,
+            role=role,
+            content=content,
+            contexto=contexto or self.session.contexto_atual,
+            metadados=metadados or {},
+        )
+        self._mensagens.append(message)
+        return message
+
+    def commit(self) -> None:
+        """Grava o turno (idempotente: 2ª chamada não faz nada)."""
+        if self._commitado:
+            return
+        self._commitado = True
+
+        session = self.session
+        session_id = str(session.session_id)
+        mensagens = self._mensagens
+        try:
+            with transaction.atomic():
+                if self._campos and not session.salvar_se_versao(self._campos):
+                    raise SessaoDesatualizada(f"Sessão {session_id} mudou desde a leitura")
+                if mensagens and self.buffer is None:
+                    ChatMessage.objects.bulk_create(mensagens, ignore_conflicts=True)
+        except SessaoDesatualizada:
+            # Próxima requisição recarrega do banco
+            self.cache.delete_session(session_id)
+            raise
+
+        logger.debug(
+            f"Turno salvo: {session.session_id} "
+            f"(campos={sorted(self._campos)}, mensagens={len(mensagens)})"
+        )
+
+        # Buffer e Redis só depois do commit (inclusive de transação externa):
+        # rollback não deixa mensagens nem marcadores req_uuid órfãos no buffer
+        def _apos_commit():
+            if mensagens and self.buffer is not None:
+                if self.buffer.enqueue(session_id, mensagens) is None:
+                    ChatMessage.objects.bulk_create(mensagens, ignore_conflicts=True)
+            if mensagens:
+                self.cache.commit_turn(session_id, session.to_dict())
+            elif self._campos:
+                self.cache.set_session(session_id, session.to_dict())
+
+        transaction.on_commit(_apos_commit)
+
+
 class SessionManager:
     """
     Gerencia sessões de chat com estratégia híbrida Redis + PostgreSQL.
@@ -37,10 +156,31 @@ class SessionManager:
     """
 
     SYNC_EVERY_N_MESSAGES = 5  # Sincroniza estado com DB a cada 5 mensagens
+    CACHE_TYPE = 'chat_session'  # Label das métricas de cache
 
     def __init__(self):
         """Inicializa com cache Redis"""
         self.cache = RedisSessionCache()
+        self._cache_stats = {'hits': 0, 'misses': 0}
+        self._cache_stats_lock = threading.Lock()
+
+        # Write-behind de mensagens (só com Redis disponível)
+        self.buffer: Optional[ChatMessageBuffer] = None
+        if getattr(settings, 'CHAT_WRITE_BEHIND', False) and self.cache.available:
+            self.buffer = ChatMessageBuffer(
+                self.cache.client,
+                batch_size=getattr(settings, 'CHAT_WRITE_BEHIND_BATCH_SIZE', 500),
+            )
+            iniciar_flusher(self.buffer)
+
+    def _registrar_cache(self, hit: bool) -> None:
+        """Atualiza contadores de hit/miss e a taxa de acerto (gauge)."""
+        (cache_hits_total if hit else cache_misses_total).labels(cache_type=self.CACHE_TYPE).inc()
+        with self._cache_stats_lock:
+            self._cache_stats['hits' if hit else 'misses'] += 1
+            total = self._cache_stats['hits'] + self._cache_stats['misses']
+            taxa = self._cache_stats['hits'] / total
+        cache_hit_rate.labels(cache_type=self.CACHE_TYPE).set(taxa)
 
     def get_or_create_session(
         self,
@@ -52,32 +192,41 @@ class SessionManager:
         Busca ou cria sessão.
 
         Estratégia:
-        1. Tenta cache Redis
-        2. Se miss, busca PostgreSQL
+        1. Tenta cache Redis (sessão + contador em 1 round-trip); o payload
+           de to_dict() é autoritativo: a sessão é reconstruída sem query
+        2. Se miss (ou payload de outra CACHE_VERSION), busca PostgreSQL
         3. Se não existe, cria nova
         4. Cacheia resultado
 
+        O cache é mantido atualizado por quem grava a sessão (TurnCommit,
+        update_session_state); finalize_session remove a entrada.
+
         Args:
             session_id: UUID da sessão (string)
             user: Usuário Django autenticado
             orgao: Órgão (se None, pega do user.orgao)
 
         Returns:
-            ChatSession: Instância da sessão
+            ChatSession: Instância da sessão (atributo msg_count = contador
+            do Redis, 0 se indisponível)
 
         Raises:
             ValueError: Se user sem órgão e orgao não fornecido
         """
         # 1. Tenta Redis
-        cached_data = self.cache.get_session(session_id)
+        cached_data, msg_count = self.cache.get_session_with_count(session_id)
         if cached_data:
-            logger.debug(f"Sessão {session_id} vinda do cache Redis")
-            try:
-                return ChatSession.objects.get(session_id=session_id)
-            except ChatSession.DoesNotExist:
-                # Cache inconsistente - limpa e recria
-                logger.warning(f"Cache inconsistente para {session_id}. Limpando...")
-                self.cache.delete_session(session_id)
+            session = ChatSession.from_cache_dict(cached_data)
+            if session is not None and str(session.session_id) == str(session_id):
+                logger.debug(f"Sessão {session_id} hidratada do cache Redis")
+                if session.user_id == user.pk:
+                    session.user = user  # evita query do FK em add_message
+                session.msg_count = msg_count
+                self._registrar_cache(hit=True)
+                chat_session_queries_saved_total.inc()
+                return session
+            logger.debug(f"Cache de {session_id} em versão antiga - recarregando do banco")
+        self._registrar_cache(hit=False)
 
         # 2. Busca ou cria no PostgreSQL
         if orgao is None:
@@ -110,8 +259,13 @@ class SessionManager:
         # 3. Cacheia no Redis
         self.cache.set_session(session_id, session.to_dict())
 
+        session.msg_count = msg_count
         return session
 
+    def begin_turn(self, session: ChatSession) -> TurnCommit:
+        """Inicia a unidade de trabalho de um turno (ver TurnCommit)."""
+        return TurnCommit(session, self.cache, self.buffer)
+
     def save_message(
         self,
         session: ChatSession,
@@ -150,6 +304,18 @@ class SessionManager:
         if metadados is None:
             metadados = {}
 
+        # Write-behind: enfileira no Redis (idempotência pelo marcador req_uuid)
+        if self.buffer is not None:
+            message = ChatMessage(
+                req_uuid=req_uuid, session=session, user=session.user, role=role,
+                content=content, contexto=contexto, metadados=metadados,
+            )
+            resultado = self.buffer.enqueue(str(session.session_id), [message])
+            if resultado is not None:
+                if not resultado[0]:
+                    logger.warning(f"Mensagem duplicada ignorada: req_uuid={req_uuid}")
+                return message, resultado[0]
+
         # Idempotência: tenta criar, se já existe ignora
         try:
             with transaction.atomic():
@@ -210,12 +376,14 @@ class SessionManager:
             updated = True
 
         if updated:
-            session.save(update_fields=['contexto_atual', 'estados', 'agent_versions', 'atualizado_em'])
+            if not session.salvar_se_versao(['contexto_atual', 'estados', 'agent_versions']):
+                self.cache.delete_session(str(session.session_id))
+                raise SessaoDesatualizada(f"Sessão {session.session_id} mudou desde a leitura")
             # Atualiza cache
             self.cache.set_session(str(session.session_id), session.to_dict())
             logger.debug(f"Sessão atualizada: {session.session_id}")
 
-    def should_sync_to_db(self, session_id: str) -> bool:
+    def should_sync_to_db(self, session_id: str, msg_count: Optional[int] = None) -> bool:
         """
         Verifica se deve sincronizar estado com DB.
 
@@ -223,24 +391,28 @@ class SessionManager:
 
         Args:
             session_id: UUID da sessão
+            msg_count: Contador já lido (session.msg_count) - evita round-trip
 
         Returns:
             bool: True se deve sincronizar
         """
-        msg_count = self.cache.get_message_count(session_id)
+        if msg_count is None:
+            msg_count = self.cache.get_message_count(session_id)
         return msg_count % self.SYNC_EVERY_N_MESSAGES == 0
 
     def finalize_session(self, session_id: str) -> None:
         """
         Finaliza sessão (ao fechar chat).
 
-        - Força sync com DB
+        - Força sync com DB (inclui flush do buffer de mensagens)
         - Limpa cache Redis
         - Marca sessão como concluída
 
         Args:
             session_id: UUID da sessão
         """
+        self.flush_messages(session_id)
+
         try:
             session = ChatSession.objects.get(session_id=session_id)
 
@@ -259,6 +431,20 @@ class SessionManager:
         except ChatSession.DoesNotExist:
             logger.warning(f"Tentativa de finalizar sessão inexistente: {session_id}")
 
+    def flush_messages(self, session_id: Optional[str] = None) -> int:
+        """
+        Grava no banco as mensagens pendentes no buffer write-behind.
+
+        Args:
+            session_id: Sessão a gravar (None = todas)
+
+        Returns:
+            int: Mensagens gravadas (0 se write-behind desativado)
+        """
+        if self.buffer is None:
+            return 0
+        return self.buffer.flush(session_id)
+
     def get_session_history(
         self,
         session_id: str,
@@ -274,6 +460,8 @@ class SessionManager:
         Returns:
             list[ChatMessage]: Lista de mensagens ordenadas por data
         """
+        self.flush_messages(session_id)
+
         queryset = ChatMessage.objects.filter(
             session__session_id=session_id
         ).select_related('user').order_by('criado_em')
@@ -293,6 +481,8 @@ class SessionManager:
         Returns:
             dict: Estatísticas (total_msgs, user_msgs, assistant_msgs, etc.)
         """
+        self.flush_messages(session_id)
+
         try:
             session = ChatSession.objects.get(session_id=session_id)
             messages = session.mensagens.all()
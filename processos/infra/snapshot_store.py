@@ -0,0 +1,358 @@
+"""
+Snapshot Store - Armazenamento compacto de POPSnapshot / PopVersion / AnaliseSnapshot
+
+Responsável por:
+- Endereçamento por conteúdo: cada payload vira um PayloadBlob imutável
+  identificado pelo sha256 do JSON canônico (chaves ordenadas); estados
+  idênticos reaproveitam o blob (+1 referência, sem gravar dados)
+- Keyframes periódicos: payload completo, orjson + zstd
+- Versões intermediárias como delta: JSON Patch (RFC 6902) do keyframe da
+  cadeia até a versão, orjson + zstd
+- Reconstrução limitada: todo blob = 1 keyframe + no máximo 1 patch,
+  independente do tamanho do histórico
+- Novo keyframe a cada POP_SNAPSHOT_KEYFRAME_INTERVAL deltas ou quando o
+  delta deixa de compensar (> LIMITE_DELTA do keyframe)
+- Contagem de referências, coleta de lixo e verificação dos blobs
+
+Formatos do blob (PayloadBlob.formato):
+- 'keyframe': dados_zstd = zstd(orjson(payload))
+- 'delta': dados_zstd = zstd(orjson(patch)); base = blob keyframe
+
+Linhas sem blob são legadas (payload completo no JSONField, ver
+compact_snapshots).
+"""
+import hashlib
+import logging
+import threading
+from collections import Counter as Contador
+from datetime import timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import jsonpatch
+import orjson
+import zstandard
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from processos.infra.metrics import payload_blobs_total
+
+logger = logging.getLogger(__name__)
+
+FORMATO_KEYFRAME = 'keyframe'
+FORMATO_DELTA = 'delta'
+
+NIVEL_ZSTD = 9
+LIMITE_DELTA = 0.5  # delta maior que isso (fração do keyframe) vira keyframe
+LOTE_GC = 500
+
+# ZstdCompressor/Decompressor não são thread-safe: 1 par por thread
+_zstd = threading.local()
+
+
+def _zstd_par() -> Tuple[zstandard.ZstdCompressor, zstandard.ZstdDecompressor]:
+    if not hasattr(_zstd, 'c'):
+        _zstd.c = zstandard.ZstdCompressor(level=NIVEL_ZSTD)
+        _zstd.d = zstandard.ZstdDecompressor()
+    return _zstd.c, _zstd.d
+
+
+def comprimir(obj: Any) -> bytes:
+    return _zstd_par()[0].compress(orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS))
+
+
+def descomprimir(dados) -> Any:
+    return orjson.loads(_zstd_par()[1].decompress(bytes(dados)))
+
+
+def normalizar(payload: Any) -> Any:
+    """Payload como ficaria num JSONField (tipos JSON puros)."""
+    return orjson.loads(orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS))
+
+
+def hash_payload(payload: Any) -> Tuple[str, bytes]:
+    """(sha256 hex, JSON canônico) de um payload já normalizado."""
+    bruto = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return hashlib.sha256(bruto).hexdigest(), bruto
+
+
+def codificar(
+    payload: Any,
+    keyframe_payload: Optional[Any],
+    tamanho_keyframe: int,
+    deltas_na_cadeia: int,
+    intervalo_keyframe: int,
+) -> Tuple[str, bytes]:
+    """
+    Decide keyframe x delta para um payload (já normalizado).
+
+    Args:
+        keyframe_payload: payload do keyframe corrente da cadeia (None = sem)
+        tamanho_keyframe: bytes comprimidos do keyframe corrente
+        deltas_na_cadeia: deltas já apoiados nesse keyframe
+
+    Returns:
+        (formato, dados_zstd)
+    """
+    if keyframe_payload is not None and deltas_na_cadeia < intervalo_keyframe - 1:
+        patch = jsonpatch.make_patch(keyframe_payload, payload).patch
+        # make_patch é heurístico: só usa o delta se ele reproduz o payload
+        if jsonpatch.apply_patch(keyframe_payload, patch) == payload:
+            dados = comprimir(patch)
+            if len(dados) <= tamanho_keyframe * LIMITE_DELTA:
+                return FORMATO_DELTA, dados
+    return FORMATO_KEYFRAME, comprimir(payload)
+
+
+def _blob_model():
+    from processos.models_new.payload_blob import PayloadBlob
+    return PayloadBlob
+
+
+class SnapshotStore:
+    """
+    Grava/lê payloads de models com PayloadCompacto.
+
+    Uso:
+        POPSnapshot.criar_com_payload(payload, {'pop': pop}, pop=pop, ...)
+        payload = store.carregar(snapshot)
+    """
+
+    def __init__(self, intervalo_keyframe: int = 10):
+        self.intervalo_keyframe = max(1, intervalo_keyframe)
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def campos(self, model, payload: Any, **cadeia) -> Dict[str, Any]:
+        """
+        Campos de armazenamento para uma nova linha de `model` (a referência
+        ao blob já é contada aqui: chamar na mesma transação do INSERT).
+
+        Args:
+            cadeia: filtro que define a cadeia de versões (ex.: pop=pop)
+        """
+        blob_id, _ = self.referenciar(model, payload, **cadeia)
+        return {'blob_id': blob_id, model.CAMPO_LEGADO: None}
+
+    def referenciar(self, model, payload: Any, **cadeia) -> Tuple[str, int]:
+        """
+        +1 referência ao blob do payload, criando-o se ainda não existe.
+
+        Returns:
+            (hash do blob, bytes gravados: 0 se deduplicado)
+        """
+        PayloadBlob = _blob_model()
+        payload = normalizar(payload)
+        hash_, bruto = hash_payload(payload)
+
+        if self._incrementar(hash_):
+            payload_blobs_total.labels(resultado='deduplicado').inc()
+            return hash_, 0
+
+        keyframe = self._keyframe_da_cadeia(model, cadeia)
+        formato, dados = codificar(
+            payload,
+            descomprimir(keyframe.dados_zstd) if keyframe else None,
+            len(keyframe.dados_zstd) if keyframe else 0,
+            keyframe.n_deltas if keyframe else 0,
+            self.intervalo_keyframe,
+        )
+        base_id = keyframe.pk if formato == FORMATO_DELTA else None
+
+        try:
+            with transaction.atomic():
+                PayloadBlob.objects.create(
+                    hash=hash_,
+                    formato=formato,
+                    dados_zstd=dados,
+                    base_id=base_id,
+                    tamanho=len(bruto),
+                    referencias=1,
+                )
+                if base_id:
+                    self._incrementar(base_id)
+        except IntegrityError:
+            # Mesmo conteúdo criado em paralelo
+            if not self._incrementar(hash_):
+                raise
+            payload_blobs_total.labels(resultado='deduplicado').inc()
+            return hash_, 0
+
+        payload_blobs_total.labels(resultado='novo').inc()
+        return hash_, len(dados)
+
+    def liberar(self, blob_id: str) -> None:
+        """-1 referência (o blob só sai do banco no gc_blobs)."""
+        _blob_model().objects.filter(pk=blob_id).update(referencias=F('referencias') - 1)
+
+    def _incrementar(self, blob_id: str) -> bool:
+        return bool(_blob_model().objects.filter(pk=blob_id).update(referencias=F('referencias') + 1))
+
+    def _keyframe_da_cadeia(self, model, cadeia):
+        """Keyframe do blob da última linha da cadeia (com n_deltas)."""
+        ultimo = (
+            model.objects.filter(blob__isnull=False, **cadeia)
+            .order_by(*model.ORDEM_CADEIA)
+            .values_list('blob__formato', 'blob_id', 'blob__base_id')
+            .first()
+        )
+        if not ultimo:
+            return None
+        formato, blob_id, base_id = ultimo
+        return (
+            _blob_model().objects.filter(pk=blob_id if formato == FORMATO_KEYFRAME else base_id)
+            .annotate(n_deltas=Count('deltas'))
+            .only('hash', 'dados_zstd')
+            .first()
+        )
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def carregar(self, instancia) -> Any:
+        """Payload completo de uma linha (blob ou legado)."""
+        if instancia.blob_id:
+            return self.ler_blob(instancia.blob)
+        return getattr(instancia, instancia.CAMPO_LEGADO)
+
+    def ler_blob(self, blob) -> Any:
+        if blob.formato == FORMATO_DELTA:
+            base = descomprimir(blob.base.dados_zstd)
+            return jsonpatch.apply_patch(base, descomprimir(blob.dados_zstd), in_place=True)
+        return descomprimir(blob.dados_zstd)
+
+    # ------------------------------------------------------------------
+    # Manutenção
+    # ------------------------------------------------------------------
+
+    def compactar(self, model, linhas: Iterable, **cadeia) -> Tuple[int, int, int]:
+        """
+        Converte linhas legadas de UMA cadeia para blobs, em ordem cronológica.
+
+        Returns:
+            (linhas convertidas, bytes JSON antes, bytes de blobs novos)
+        """
+        convertidas = antes = depois = 0
+        campo = model.CAMPO_LEGADO
+
+        for linha in linhas:
+            if linha.blob_id:
+                continue
+            payload = getattr(linha, campo)
+            blob_id, gravados = self.referenciar(model, payload, **cadeia)
+            antes += len(orjson.dumps(payload, default=str))
+            depois += gravados
+            convertidas += 1
+
+            linha.blob_id = blob_id
+            setattr(linha, campo, None)
+            linha.save(update_fields=['blob', campo])
+
+        return convertidas, antes, depois
+
+    def coletar_lixo(self, carencia: timedelta = timedelta(hours=1)) -> Tuple[int, int]:
+        """
+        Remove blobs sem referências criados há mais de `carencia` (a carência
+        protege blobs recém-criados cuja linha ainda não foi gravada).
+
+        Returns:
+            (blobs removidos, bytes liberados)
+        """
+        PayloadBlob = _blob_model()
+        limite = timezone.now() - carencia
+        removidos = liberados = 0
+
+        while True:
+            with transaction.atomic():
+                # skip_locked: blob sendo re-referenciado agora fica para a próxima
+                lote = list(
+                    PayloadBlob.objects.select_for_update(skip_locked=True)
+                    .filter(referencias__lte=0, created_at__lt=limite)
+                    .values_list('hash', 'base_id', 'dados_zstd')[:LOTE_GC]
+                )
+                if not lote:
+                    break
+                PayloadBlob.objects.filter(pk__in=[h for h, _, _ in lote]).delete()
+                # Deltas removidos devolvem a referência do keyframe base
+                for base_id, n in Contador(b for _, b, _ in lote if b).items():
+                    PayloadBlob.objects.filter(pk=base_id).update(referencias=F('referencias') - n)
+
+            removidos += len(lote)
+            liberados += sum(len(d) for _, _, d in lote)
+
+        if removidos:
+            logger.info(f"[SNAPSHOTS] GC removeu {removidos} blobs ({liberados} bytes)")
+        return removidos, liberados
+
+    def contar_referencias(self) -> Dict[str, int]:
+        """Referências reais por blob (linhas de todos os models + deltas)."""
+        from django.apps import apps
+        from processos.models_new.payload_blob import PayloadCompacto
+
+        contagem: Dict[str, int] = Contador()
+        for model in apps.get_models():
+            if issubclass(model, PayloadCompacto):
+                for blob_id, n in (
+                    model.objects.filter(blob__isnull=False)
+                    .values_list('blob_id').annotate(n=Count('pk')).order_by()
+                ):
+                    contagem[blob_id] += n
+        for base_id, n in (
+            _blob_model().objects.filter(base__isnull=False)
+            .values_list('base_id').annotate(n=Count('pk')).order_by()
+        ):
+            contagem[base_id] += n
+        return contagem
+
+    def verificar(self, corrigir_referencias: bool = False) -> Dict[str, Any]:
+        """
+        Re-hash de todos os blobs e conferência das referências.
+
+        Returns:
+            {'blobs', 'corrompidos': [hash], 'referencias_divergentes': {hash: (gravado, real)}}
+        """
+        PayloadBlob = _blob_model()
+        corrompidos = []
+        divergentes = {}
+        reais = self.contar_referencias()
+        total = 0
+
+        for blob in PayloadBlob.objects.select_related('base').iterator(chunk_size=200):
+            total += 1
+            try:
+                ok = hash_payload(self.ler_blob(blob))[0] == blob.hash
+            except Exception as e:
+                logger.error(f"[SNAPSHOTS] Blob {blob.hash} ilegível: {e}")
+                ok = False
+            if not ok:
+                corrompidos.append(blob.hash)
+
+            real = reais.get(blob.hash, 0)
+            if blob.referencias != real:
+                divergentes[blob.hash] = (blob.referencias, real)
+                if corrigir_referencias:
+                    PayloadBlob.objects.filter(pk=blob.hash).update(referencias=real)
+
+        return {'blobs': total, 'corrompidos': corrompidos, 'referencias_divergentes': divergentes}
+
+
+_snapshot_store: Optional[SnapshotStore] = None
+_snapshot_store_lock = threading.Lock()
+
+
+def get_snapshot_store() -> SnapshotStore:
+    """Retorna instância singleton do snapshot store."""
+    global _snapshot_store
+
+    if _snapshot_store is None:
+        with _snapshot_store_lock:
+            if _snapshot_store is None:
+                _snapshot_store = SnapshotStore(
+                    intervalo_keyframe=getattr(settings, 'POP_SNAPSHOT_KEYFRAME_INTERVAL', 10),
+                )
+
+    return _snapshot_store
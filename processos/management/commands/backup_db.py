@@ -5,7 +5,7 @@ from pathlib import Path
 from django.core.management.base import BaseCommand, CommandError
 from django.core import serializers as dj_serializers
 from django.conf import settings
-from processos.models import POP, POPSnapshot, POPChangeLog
+from processos.models import POP, PayloadBlob, POPSnapshot, POPChangeLog
 from processos.utils.backup_storage import build_uploader_from_env, BackupUploaderError
 
 
@@ -58,6 +58,7 @@ class Command(BaseCommand):
 
         pop_filename = f"pops_{timestamp}{'_' + tag if tag else ''}.json"
         snapshot_filename = f"pop_snapshots_{timestamp}{'_' + tag if tag else ''}.json"
+        blob_filename = f"payload_blobs_{timestamp}{'_' + tag if tag else ''}.json"
         changelog_filename = f"pop_changelog_{timestamp}{'_' + tag if tag else ''}.json"
 
         indent = 2 if options.get('pretty', False) else None
@@ -71,6 +72,12 @@ class Command(BaseCommand):
             self._dump_queryset(snapshot_qs, dated_path / snapshot_filename, indent)
             self.stdout.write(self.style.SUCCESS(f"Snapshots salvos em {dated_path / snapshot_filename}"))
 
+            # Conteúdo dos snapshots (payload=None na linha): restaurar este
+            # arquivo com loaddata junto com/antes de pop_snapshots_*
+            blob_qs = self._blobs_referenciados(snapshot_qs)
+            self._dump_queryset(blob_qs, dated_path / blob_filename, indent)
+            self.stdout.write(self.style.SUCCESS(f"Blobs de payload salvos em {dated_path / blob_filename}"))
+
         if not options.get('no-changelog', False):
             changelog_qs = POPChangeLog.objects.filter(pop__in=pop_qs)
             self._dump_queryset(changelog_qs, dated_path / changelog_filename, indent)
@@ -93,6 +100,7 @@ class Command(BaseCommand):
             dated_path / pop_filename,
         ]
         if not options.get('no-snapshots', False):
+            generated_files.append(dated_path / blob_filename)
             generated_files.append(dated_path / snapshot_filename)
         if not options.get('no-changelog', False):
             generated_files.append(dated_path / changelog_filename)
@@ -115,6 +123,14 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.SUCCESS("Backup concluído."))
 
+    def _blobs_referenciados(self, snapshot_qs):
+        """Blobs das linhas + keyframes base dos deltas (keyframes primeiro)."""
+        hashes = set(snapshot_qs.exclude(blob=None).values_list('blob_id', flat=True))
+        bases = set(
+            PayloadBlob.objects.filter(hash__in=hashes).exclude(base=None).values_list('base_id', flat=True)
+        )
+        return PayloadBlob.objects.filter(hash__in=hashes | bases).order_by('-formato', 'hash')
+
     def _dump_queryset(self, qs, filepath: Path, indent=None):
         data = dj_serializers.serialize('json', qs)
         if indent:
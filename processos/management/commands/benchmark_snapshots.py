@@ -0,0 +1,125 @@
+import copy
+import random
+import statistics
+import time
+
+import orjson
+from django.core.management.base import BaseCommand
+from processos.infra.snapshot_store import (
+    FORMATO_DELTA,
+    SnapshotStore,
+    codificar,
+    descomprimir,
+    hash_payload,
+)
+
+
+def _pop_sintetico(n_etapas):
+    return {
+        'nome_processo': 'Conceder ressarcimento a servidor',
+        'area': {'codigo': 'CGBEN', 'nome': 'Coordenação-Geral de Benefícios'},
+        'entrega_esperada': 'Ressarcimento concedido e lançado em folha',
+        'dispositivos_normativos': 'Lei 8.112/1990, art. 46; IN SGP 97/2022',
+        'sistemas_utilizados': ['SEI', 'SIAPE', 'SouGov'],
+        'etapas': [
+            {
+                'id': f'e{i}',
+                'ordem': i,
+                'descricao': f'Etapa {i}: analisar documentação enviada pelo servidor e registrar no SEI',
+                'operador': 'Técnico especializado',
+                'sistemas': ['SEI'],
+                'detalhes': [f'Conferir item {j} do checklist' for j in range(5)],
+            }
+            for i in range(1, n_etapas + 1)
+        ],
+    }
+
+
+class _Blob:
+    """Blob em memória (mesmos atributos lidos por SnapshotStore.ler_blob)."""
+
+    def __init__(self, formato, dados_zstd, base=None):
+        self.formato = formato
+        self.dados_zstd = dados_zstd
+        self.base = base
+
+
+class Command(BaseCommand):
+    help = "Benchmark (sem banco) de armazenamento/reconstrução: payload JSON completo x blobs keyframe/delta zstd."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--versoes', type=int, default=100, help='Quantidade de versões do histórico sintético.')
+        parser.add_argument('--etapas', type=int, default=30, help='Etapas do POP sintético.')
+        parser.add_argument('--intervalo', type=int, default=10, help='Intervalo de keyframes.')
+        parser.add_argument('--repetidas', type=float, default=0.2, help='Fração de saves sem mudança (deduplicados).')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rnd = random.Random(options['seed'])
+        store = SnapshotStore(intervalo_keyframe=options['intervalo'])
+
+        # Histórico: cada versão edita uma etapa (como o autosave) ou repete a anterior
+        payload = _pop_sintetico(options['etapas'])
+        historico = []
+        for v in range(options['versoes']):
+            if not historico or rnd.random() >= options['repetidas']:
+                payload = copy.deepcopy(payload)
+                etapa = rnd.choice(payload['etapas'])
+                etapa['descricao'] += f' (rev {v})'
+            historico.append(payload)
+
+        # Grava (em memória) com a mesma decisão do SnapshotStore
+        blobs = {}
+        linhas = []
+        keyframe = None
+        deltas = 0
+        for p in historico:
+            hash_, _ = hash_payload(p)
+            if hash_ not in blobs:
+                formato, dados = codificar(
+                    p,
+                    descomprimir(keyframe.dados_zstd) if keyframe else None,
+                    len(keyframe.dados_zstd) if keyframe else 0,
+                    deltas,
+                    store.intervalo_keyframe,
+                )
+                if formato == FORMATO_DELTA:
+                    blobs[hash_] = _Blob(formato, dados, keyframe)
+                    deltas += 1
+                else:
+                    keyframe = blobs[hash_] = _Blob(formato, dados)
+                    deltas = 0
+            linhas.append(blobs[hash_])
+
+        bytes_json = sum(len(orjson.dumps(p)) for p in historico)
+        bytes_compacto = sum(len(b.dados_zstd) for b in blobs.values())
+        n_keyframes = sum(1 for b in blobs.values() if b.formato != FORMATO_DELTA)
+
+        tempos_json, tempos_compacto = [], []
+        for p, blob in zip(historico, linhas):
+            bruto = orjson.dumps(p)
+            inicio = time.perf_counter()
+            orjson.loads(bruto)
+            tempos_json.append(time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            reconstruido = store.ler_blob(blob)
+            tempos_compacto.append(time.perf_counter() - inicio)
+            if reconstruido != p:
+                self.stderr.write(self.style.ERROR("Reconstrução divergente do payload original"))
+                return
+
+        def _p(tempos, q):
+            return statistics.quantiles(tempos, n=100)[q - 1] * 1000 if len(tempos) > 1 else tempos[0] * 1000
+
+        reducao = (1 - bytes_compacto / bytes_json) * 100
+        self.stdout.write(self.style.NOTICE(
+            f"{options['versoes']} versões, {options['etapas']} etapas, intervalo {store.intervalo_keyframe}: "
+            f"{len(blobs)} blobs ({n_keyframes} keyframes)"
+        ))
+        self.stdout.write(f"Armazenamento: JSON {bytes_json} bytes | blobs {bytes_compacto} bytes (-{reducao:.1f}%)")
+        self.stdout.write(
+            f"Leitura p50/p95: JSON {_p(tempos_json, 50):.3f}/{_p(tempos_json, 95):.3f} ms | "
+            f"blobs {_p(tempos_compacto, 50):.3f}/{_p(tempos_compacto, 95):.3f} ms"
+        )
+        self.stdout.write(self.style.SUCCESS("Benchmark concluído."))
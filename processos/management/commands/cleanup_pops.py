@@ -46,7 +46,7 @@ class Command(BaseCommand):
         # 4. Snapshots: para cada POP ativo ou arquivado
         pops_for_snapshots = POP.objects.filter(is_deleted=False)
         for pop in pops_for_snapshots.iterator(chunk_size=200):
-            snaps = list(pop.snapshots.order_by('-created_at'))
+            snaps = list(pop.snapshots.order_by('-created_at').only('id', 'milestone', 'created_at'))
             if len(snaps) <= keep_last:
                 continue
             # Manter últimos keep_last SEMPRE + todos milestone + recentes dentro do período
@@ -59,12 +59,11 @@ class Command(BaseCommand):
             for s in snaps:
                 if s.created_at >= cutoff_snapshot:
                     preserve_ids.add(s.id)
-            # Deletar o resto
-            for s in snaps:
-                if s.id not in preserve_ids:
-                    if not dry_run:
-                        s.delete()
-                    snapshots_deleted_total += 1
+            # Deletar o resto (referências aos blobs são devolvidas; ver gc_blobs)
+            delete_ids = [s.id for s in snaps if s.id not in preserve_ids]
+            if delete_ids and not dry_run:
+                POPSnapshot.objects.filter(id__in=delete_ids).delete()
+            snapshots_deleted_total += len(delete_ids)
 
         self.stdout.write(self.style.WARNING(f"Snapshots removidos: {snapshots_deleted_total}"))
 
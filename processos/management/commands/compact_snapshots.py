@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from processos.infra.snapshot_store import get_snapshot_store
+from processos.models import AnaliseSnapshot, POPSnapshot, PopVersion
+
+
+class Command(BaseCommand):
+    help = "Converte snapshots/versões legados (payload JSON completo na linha) para blobs deduplicados keyframe/delta."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pop', type=int, help='Converte apenas snapshots/versões do POP com este id.')
+        parser.add_argument('--dry-run', action='store_true', help='Mostra quantas linhas seriam convertidas sem aplicar mudanças.')
+
+    def handle(self, *args, **options):
+        store = get_snapshot_store()
+        dry_run = options['dry_run']
+
+        # (model, campo da cadeia, ordem cronológica)
+        alvos = [
+            (POPSnapshot, 'pop', ('sequence', 'id')),
+            (PopVersion, 'pop', ('versao', 'id')),
+            (AnaliseSnapshot, 'analise', ('versao', 'criado_em')),
+        ]
+        if options.get('pop'):
+            alvos = alvos[:2]
+
+        for model, campo_cadeia, ordem in alvos:
+            legados = model.objects.filter(blob__isnull=True)
+            if options.get('pop'):
+                legados = legados.filter(pop_id=options['pop'])
+            cadeias = list(legados.values_list(f'{campo_cadeia}_id', flat=True).distinct().order_by())
+
+            if dry_run:
+                self.stdout.write(self.style.NOTICE(
+                    f"{model.__name__}: {legados.count()} linhas legadas em {len(cadeias)} cadeias (dry-run)"
+                ))
+                continue
+
+            convertidas = antes = depois = 0
+            for cadeia_id in cadeias:
+                filtro = {f'{campo_cadeia}_id': cadeia_id}
+                with transaction.atomic():
+                    linhas = model.objects.select_for_update().filter(**filtro).order_by(*ordem)
+                    n, a, d = store.compactar(model, linhas, **filtro)
+                convertidas += n
+                antes += a
+                depois += d
+
+            reducao = (1 - depois / antes) * 100 if antes else 0
+            self.stdout.write(self.style.WARNING(
+                f"{model.__name__}: {convertidas} linhas convertidas em {len(cadeias)} cadeias "
+                f"({antes} -> {depois} bytes, -{reducao:.1f}%)"
+            ))
+
+        self.stdout.write(self.style.SUCCESS("Compactação concluída."))
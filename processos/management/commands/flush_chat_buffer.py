@@ -0,0 +1,49 @@
+"""
+Grava no PostgreSQL as mensagens de chat pendentes no buffer write-behind (Redis).
+
+Uso:
+    python manage.py flush_chat_buffer                  # 1 flush e sai
+    python manage.py flush_chat_buffer --session <id>   # só uma sessão
+    python manage.py flush_chat_buffer --loop --intervalo 2
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from processos.infra.chat_message_buffer import CHAVE_DEAD_LETTER, ChatMessageBuffer
+from processos.infra.redis_cache import RedisSessionCache
+
+
+class Command(BaseCommand):
+    help = "Grava em lote no banco as mensagens de chat pendentes no buffer write-behind (Redis)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--session', help='Grava apenas esta sessão (session_id).')
+        parser.add_argument('--loop', action='store_true', help='Continua rodando (worker dedicado).')
+        parser.add_argument('--intervalo', type=float, default=None,
+                            help='Segundos entre flushes no modo --loop (default: CHAT_WRITE_BEHIND_FLUSH_SECONDS).')
+
+    def handle(self, *args, **options):
+        cache = RedisSessionCache()
+        if not cache.available:
+            raise CommandError("Redis indisponível - nada a gravar.")
+
+        buffer = ChatMessageBuffer(cache.client, batch_size=getattr(settings, 'CHAT_WRITE_BEHIND_BATCH_SIZE', 500))
+        intervalo = options['intervalo'] or getattr(settings, 'CHAT_WRITE_BEHIND_FLUSH_SECONDS', 2.0)
+
+        self.stdout.write(self.style.NOTICE(f"Mensagens pendentes: {buffer.pending(options['session'])}"))
+        descartadas = buffer.dead_letters()
+        if descartadas:
+            self.stdout.write(self.style.WARNING(f"Mensagens na dead-letter ({CHAVE_DEAD_LETTER}): {descartadas}"))
+
+        while True:
+            gravadas = buffer.flush(options['session'])
+            close_old_connections()
+            if gravadas or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f"Mensagens gravadas: {gravadas}"))
+            if not options['loop']:
+                break
+            time.sleep(intervalo)
@@ -0,0 +1,24 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from processos.infra.snapshot_store import get_snapshot_store
+from processos.models import PayloadBlob
+
+
+class Command(BaseCommand):
+    help = "Remove blobs de payload sem referências (snapshots/versões apagados)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-minutes', type=int, default=60, help='Só remove blobs criados há mais que isso (protege gravações em andamento).')
+        parser.add_argument('--dry-run', action='store_true', help='Mostra o que seria removido sem aplicar mudanças.')
+
+    def handle(self, *args, **options):
+        carencia = timedelta(minutes=options['grace_minutes'])
+
+        if options['dry_run']:
+            orfaos = PayloadBlob.objects.filter(referencias__lte=0)
+            self.stdout.write(self.style.NOTICE(f"Blobs sem referências: {orfaos.count()} (dry-run)"))
+            return
+
+        removidos, liberados = get_snapshot_store().coletar_lixo(carencia)
+        self.stdout.write(self.style.WARNING(f"Blobs removidos: {removidos} ({liberados} bytes)"))
+        self.stdout.write(self.style.SUCCESS("GC concluído."))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from processos.infra.export_jobs import nome_worker, processar_proximo, remover_antigos
+
+
+class Command(BaseCommand):
+    help = "Processa a fila de exports (PDF/DOCX) gerados fora da requisição."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Processa os jobs disponíveis e sai.')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Segundos de espera quando a fila está vazia.')
+        parser.add_argument('--purge-days', type=int, default=7, help='Remove jobs concluídos/falhos (e arquivos) mais antigos que isso; 0 desativa.')
+
+    def handle(self, *args, **options):
+        worker = nome_worker()
+        self.stdout.write(self.style.NOTICE(f"Worker de exports: {worker}"))
+
+        processados = 0
+        ultima_limpeza = 0.0
+        try:
+            while True:
+                if options['purge_days'] and time.monotonic() - ultima_limpeza > 3600:
+                    removidos = remover_antigos(options['purge_days'])
+                    if removidos:
+                        self.stdout.write(f"Jobs antigos removidos: {removidos}")
+                    ultima_limpeza = time.monotonic()
+
+                if processar_proximo(worker):
+                    processados += 1
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"Jobs processados: {processados}"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from processos.infra.snapshot_store import get_snapshot_store
+
+
+class Command(BaseCommand):
+    help = "Recalcula o sha256 de todos os blobs de payload e confere a contagem de referências."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix-refcounts', action='store_true', help='Corrige contagens de referência divergentes.')
+
+    def handle(self, *args, **options):
+        resultado = get_snapshot_store().verificar(corrigir_referencias=options['fix_refcounts'])
+
+        self.stdout.write(self.style.NOTICE(f"Blobs verificados: {resultado['blobs']}"))
+        for hash_ in resultado['corrompidos']:
+            self.stdout.write(self.style.ERROR(f"Hash divergente/ilegível: {hash_}"))
+        for hash_, (gravado, real) in resultado['referencias_divergentes'].items():
+            acao = 'corrigido' if options['fix_refcounts'] else 'use --fix-refcounts'
+            self.stdout.write(self.style.WARNING(f"Referências {hash_[:12]}: {gravado} gravadas, {real} reais ({acao})"))
+
+        if resultado['corrompidos']:
+            raise CommandError(f"{len(resultado['corrompidos'])} blobs corrompidos.")
+        self.stdout.write(self.style.SUCCESS("Verificação concluída."))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('processos', '0030_pop_review_workflow'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='popsnapshot',
+            name='payload',
+            field=models.JSONField(blank=True, null=True, verbose_name='Dados Serializados do POP'),
+        ),
+        migrations.AlterField(
+            model_name='popversion',
+            name='payload',
+            field=models.JSONField(blank=True, null=True, verbose_name='Dados completos congelados'),
+        ),
+    ]
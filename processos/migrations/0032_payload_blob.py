@@ -0,0 +1,55 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('processos', '0031_snapshot_payload_compacto'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='analisesnapshot',
+            name='dados_completos',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='PayloadBlob',
+            fields=[
+                ('hash', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='SHA-256 do Payload')),
+                ('formato', models.CharField(choices=[('keyframe', 'Keyframe'), ('delta', 'Delta')], max_length=10, verbose_name='Formato')),
+                ('dados_zstd', models.BinaryField(verbose_name='Conteúdo Comprimido (zstd)')),
+                ('tamanho', models.PositiveIntegerField(verbose_name='Tamanho do Payload (bytes)')),
+                ('referencias', models.IntegerField(default=0, verbose_name='Referências')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('base', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='deltas', to='processos.payloadblob', verbose_name='Keyframe Base')),
+            ],
+            options={
+                'verbose_name': 'Blob de Payload',
+                'verbose_name_plural': 'Blobs de Payload',
+                'db_table': 'payload_blob',
+            },
+        ),
+        migrations.AddField(
+            model_name='analisesnapshot',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='processos.payloadblob', verbose_name='Blob do Payload'),
+        ),
+        migrations.AddField(
+            model_name='popsnapshot',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='processos.payloadblob', verbose_name='Blob do Payload'),
+        ),
+        migrations.AddField(
+            model_name='popversion',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='processos.payloadblob', verbose_name='Blob do Payload'),
+        ),
+        migrations.AddIndex(
+            model_name='payloadblob',
+            index=models.Index(fields=['referencias', 'created_at'], name='payload_blob_gc_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:43
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('processos', '0032_payload_blob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('tipo', models.CharField(choices=[('pop_pdf', 'PDF do POP (formulário)'), ('catalogo_pdf', 'PDF do POP (catálogo)'), ('analise_export', 'Análise de Riscos (PDF/DOCX)')], max_length=30, verbose_name='Tipo')),
+                ('parametros', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Parâmetros')),
+                ('status', models.CharField(choices=[('pending', 'Na fila'), ('running', 'Em execução'), ('done', 'Concluído'), ('failed', 'Falhou')], default='pending', max_length=10, verbose_name='Status')),
+                ('dono', models.CharField(max_length=100, verbose_name='Dono')),
+                ('tentativas', models.PositiveSmallIntegerField(default=0, verbose_name='Tentativas')),
+                ('max_tentativas', models.PositiveSmallIntegerField(default=3, verbose_name='Máximo de Tentativas')),
+                ('executar_apos', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Executar Após')),
+                ('lease_ate', models.DateTimeField(blank=True, null=True, verbose_name='Reservado Até')),
+                ('worker', models.CharField(blank=True, default='', max_length=100, verbose_name='Worker')),
+                ('resultado_arquivo', models.CharField(blank=True, default='', max_length=500, verbose_name='Arquivo Gerado')),
+                ('resultado_nome', models.CharField(blank=True, default='', max_length=255, verbose_name='Nome para Download')),
+                ('resultado_content_type', models.CharField(blank=True, default='', max_length=100, verbose_name='Content-Type')),
+                ('erro', models.TextField(blank=True, default='', verbose_name='Último Erro')),
+                ('criado_em', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('iniciado_em', models.DateTimeField(blank=True, null=True, verbose_name='Iniciado em')),
+                ('concluido_em', models.DateTimeField(blank=True, null=True, verbose_name='Concluído em')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Job de Exportação',
+                'verbose_name_plural': 'Jobs de Exportação',
+                'db_table': 'export_job',
+                'ordering': ['criado_em'],
+                'indexes': [models.Index(fields=['status', 'executar_apos'], name='export_job_fila_idx'), models.Index(fields=['dono', 'status'], name='export_job_dono_idx')],
+            },
+        ),
+    ]
@@ -1,10 +1,13 @@
 from django.db import models
+from django.db.models.signals import post_delete
 from django.contrib.auth.models import User
 from django.utils import timezone
 import uuid
 import hashlib
 import json
 
+import orjson
+
 # Novos models FASE 1 (arquitetura refatorada)
 from processos.models_new.orgao import Orgao
 from processos.models_new.chat_session import ChatSession
@@ -14,6 +17,12 @@ from processos.models_new.chat_message import ChatMessage
 from processos.models_new.rbac import Role, Permission, RolePermission, UserRole
 from processos.models_new.audit_log import AuditLog, SecurityEvent
 
+# Payloads versionados endereçados por conteúdo
+from processos.models_new.payload_blob import PayloadBlob, PayloadCompacto, liberar_blob
+
+# Fila de exports (PDF/DOCX) fora da requisição
+from processos.models_new.export_job import ExportJob
+
 # Auth & Access Control
 from processos.models_auth import UserProfile, AccessApproval
 
@@ -178,33 +187,117 @@ class POP(models.Model):
         payload['status'] = self.status
         payload['versao'] = self.versao
         payload['uuid'] = str(self.uuid)
-        last_snapshot = self.snapshots.order_by('-sequence').first()
-        next_seq = (last_snapshot.sequence + 1) if last_snapshot else 1
-        return self.snapshots.create(
+        last_seq = self.snapshots.order_by('-sequence').values_list('sequence', flat=True).first()
+        next_seq = (last_seq + 1) if last_seq else 1
+        return POPSnapshot.criar_com_payload(
+            payload, {'pop': self},
+            pop=self,
             sequence=next_seq,
             versao=self.versao,
             autosave_sequence=self.autosave_sequence,
             status=self.status,
             integrity_hash=integrity,
-            payload=payload
         )
 
+    # Campos com histórico em POPChangeLog
+    CAMPOS_AUDITADOS = (
+        'nome_processo', 'macroprocesso', 'codigo_processo', 'processo_especifico',
+        'entrega_esperada', 'dispositivos_normativos', 'sistemas_utilizados', 'operadores',
+        'pontos_atencao', 'etapas', 'documentos_utilizados', 'fluxos_entrada', 'fluxos_saida', 'status',
+    )
+
+    # ------------------------------------------------------------------
+    # Dirty tracking: valores como vieram do banco (ou do último save).
+    # JSONFields guardados serializados (orjson): mutação in-place na
+    # lista/dict do modelo não altera a referência.
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._capturar_valores()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self._capturar_valores(
+            None if fields is None else {self._meta.get_field(f).attname for f in fields}
+        )
+
+    @staticmethod
+    def _valor_comparavel(field, valor):
+        if isinstance(field, models.JSONField):
+            return orjson.dumps(valor, default=str, option=orjson.OPT_SORT_KEYS)
+        return valor
+
+    def _capturar_valores(self, campos=None):
+        """Registra os valores atuais como base de comparação."""
+        adiados = self.get_deferred_fields()
+        valores = getattr(self, '_valores_carregados', {}) if campos is not None else {}
+        for field in self._meta.concrete_fields:
+            if field.attname in adiados or (campos is not None and field.attname not in campos):
+                continue
+            valores[field.attname] = self._valor_comparavel(field, getattr(self, field.attname))
+        self._valores_carregados = valores
+
+    def _valor_carregado(self, attname):
+        valor = self._valores_carregados[attname]
+        if isinstance(self._meta.get_field(attname), models.JSONField):
+            return orjson.loads(valor)
+        return valor
+
+    def campos_alterados(self):
+        """
+        Nomes dos campos alterados em memória desde o load/último save.
+
+        Campos sem valor de base (adiados ou POP não carregado do banco)
+        contam como alterados.
+        """
+        carregados = getattr(self, '_valores_carregados', {})
+        adiados = self.get_deferred_fields()
+        alterados = []
+        for field in self._meta.concrete_fields:
+            if field.primary_key or field.attname in adiados:
+                continue
+            if field.attname not in carregados or \
+                    carregados[field.attname] != self._valor_comparavel(field, getattr(self, field.attname)):
+                alterados.append(field.name)
+        return alterados
+
+    def _valores_antigos_auditados(self):
+        """Valores de CAMPOS_AUDITADOS antes da alteração (SELECT só sem base)."""
+        carregados = getattr(self, '_valores_carregados', {})
+        antigos = {f: self._valor_carregado(f) for f in self.CAMPOS_AUDITADOS if f in carregados}
+        faltantes = [f for f in self.CAMPOS_AUDITADOS if f not in antigos]
+        if faltantes:
+            linha = POP.objects.filter(pk=self.pk).values(*faltantes).first()
+            if linha is None:
+                return {}
+            antigos.update(linha)
+        return antigos
+
+    def save_alteracoes(self, **kwargs):
+        """
+        Salva só as colunas alteradas (UPDATE ... SET <alterados>).
+
+        Usado pelo autosave. POP novo faz INSERT completo.
+        """
+        if self._state.adding or not self.pk:
+            return self.save(**kwargs)
+        if not self.integrity_hash:
+            self.integrity_hash = self.compute_integrity_hash()
+        campos = set(self.campos_alterados()) | {'last_activity_at', 'updated_at'}
+        return self.save(update_fields=campos, **kwargs)
+
     def save(self, *args, **kwargs):
         creating = self._state.adding
-        # Capturar estado antigo para auditoria
+        update_fields = kwargs.get('update_fields')
+        # Capturar estado antigo para auditoria (da base em memória)
         old_values = {}
         if not creating and self.pk:
-            try:
-                old = POP.objects.get(pk=self.pk)
-                audit_fields = [
-                    'nome_processo','macroprocesso','codigo_processo','processo_especifico',
-                    'entrega_esperada','dispositivos_normativos','sistemas_utilizados','operadores',
-                    'pontos_atencao','etapas','documentos_utilizados','fluxos_entrada','fluxos_saida','status'
-                ]
-                for f in audit_fields:
-                    old_values[f] = getattr(old, f)
-            except POP.DoesNotExist:
-                pass
+            old_values = self._valores_antigos_auditados()
+            if update_fields is not None:
+                old_values = {k: v for k, v in old_values.items() if k in update_fields}
 
         # Atualizar last_activity_at sempre que salvar (atividade manual ou autosave)
         self.last_activity_at = timezone.now()
@@ -215,29 +308,34 @@ class POP(models.Model):
                 pass
         super().save(*args, **kwargs)
 
-        # Registrar diffs
+        # Registrar diffs (1 INSERT para todos os campos alterados)
         if not creating and old_values:
-            from django.forms.models import model_to_dict
-            new_values = {}
-            for k in old_values.keys():
-                new_values[k] = getattr(self, k)
-            for field, old_val in old_values.items():
-                new_val = new_values.get(field)
-                if old_val != new_val:
-                    try:
-                        POPChangeLog.objects.create(
-                            pop=self,
-                            user=self.created_by,  # Simplificação: autor original; futuro: user corrente via contexto
-                            field_name=field,
-                            old_value=old_val,
-                            new_value=new_val,
-                            autosave_sequence=self.autosave_sequence
-                        )
-                    except Exception:
-                        pass
-
-
-class POPSnapshot(models.Model):
+            logs = [
+                POPChangeLog(
+                    pop=self,
+                    user=self.created_by,  # Simplificação: autor original; futuro: user corrente via contexto
+                    field_name=field,
+                    old_value=old_val,
+                    new_value=getattr(self, field),
+                    autosave_sequence=self.autosave_sequence
+                )
+                for field, old_val in old_values.items()
+                if old_val != getattr(self, field)
+            ]
+            if logs:
+                try:
+                    POPChangeLog.objects.bulk_create(logs)
+                except Exception:
+                    pass
+
+        # Nova base para o próximo save
+        if update_fields is None:
+            self._capturar_valores()
+        else:
+            self._capturar_valores({self._meta.get_field(f).attname for f in update_fields})
+
+
+class POPSnapshot(PayloadCompacto):
     pop = models.ForeignKey(POP, on_delete=models.CASCADE, related_name='snapshots', verbose_name="POP")
     from django.utils import timezone
     created_at = models.DateTimeField(default=timezone.now, verbose_name="Criado em")
@@ -246,7 +344,7 @@ class POPSnapshot(models.Model):
     autosave_sequence = models.PositiveIntegerField(default=0, verbose_name="Sequência de Auto-Save no Momento")
     status = models.CharField(max_length=30, verbose_name="Status no Momento")
     integrity_hash = models.CharField(max_length=64, null=True, blank=True, verbose_name="Hash de Integridade")
-    payload = models.JSONField(verbose_name="Dados Serializados do POP")
+    payload = models.JSONField(null=True, blank=True, verbose_name="Dados Serializados do POP")
     milestone = models.BooleanField(default=False, verbose_name="Marco (Milestone)")
     milestone_label = models.CharField(max_length=120, null=True, blank=True, verbose_name="Rótulo do Marco")
 
@@ -505,7 +603,7 @@ class Area(models.Model):
 # POP VERSION - Versão publicada imutável (publish-driven)
 # ============================================================================
 
-class PopVersion(models.Model):
+class PopVersion(PayloadCompacto):
     """
     Versão publicada e imutável de um POP.
     Criada no momento do publish. Armazena snapshot congelado dos dados.
@@ -513,7 +611,7 @@ class PopVersion(models.Model):
     """
     pop = models.ForeignKey(POP, on_delete=models.CASCADE, related_name='versions', verbose_name="POP")
     versao = models.PositiveIntegerField(verbose_name="Número da versão")
-    payload = models.JSONField(verbose_name="Dados completos congelados")
+    payload = models.JSONField(null=True, blank=True, verbose_name="Dados completos congelados")
     integrity_hash = models.CharField(max_length=64, verbose_name="Hash SHA256")
     published_by = models.ForeignKey(
         User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Publicado por"
@@ -537,6 +635,11 @@ class PopVersion(models.Model):
         return f"POP {self.pop_id} v{self.versao}"
 
 
+# Linhas removidas (inclusive em CASCADE do POP) devolvem a referência do blob
+post_delete.connect(liberar_blob, sender=POPSnapshot, dispatch_uid='liberar_blob_popsnapshot')
+post_delete.connect(liberar_blob, sender=PopVersion, dispatch_uid='liberar_blob_popversion')
+
+
 # Modelo para Controle de Gastos
 class ControleGastos(models.Model):
     descricao = models.CharField(max_length=255, verbose_name="Descrição")
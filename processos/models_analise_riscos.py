@@ -11,8 +11,11 @@ Tabelas:
 """
 import uuid
 from django.db import models
+from django.db.models.signals import post_delete
 from django.contrib.auth.models import User
 
+from processos.models_new.payload_blob import PayloadCompacto, liberar_blob
+
 # Imports de modulos NEUTROS (sem dependencia de domain)
 from .analise_riscos_enums import (
     StatusAnalise,
@@ -345,8 +348,11 @@ class RespostaRisco(models.Model):
         return f"{self.estrategia} - {self.risco.titulo}"
 
 
-class AnaliseSnapshot(models.Model):
-    """Snapshot de versao da analise"""
+class AnaliseSnapshot(PayloadCompacto):
+    """Snapshot de versao da analise (payload em PayloadBlob, ver obter_payload)"""
+
+    CAMPO_LEGADO = "dados_completos"
+    ORDEM_CADEIA = ("-versao", "-criado_em")
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
@@ -357,7 +363,7 @@ class AnaliseSnapshot(models.Model):
     )
 
     versao = models.PositiveIntegerField()
-    dados_completos = models.JSONField()
+    dados_completos = models.JSONField(null=True, blank=True)
     motivo_snapshot = models.CharField(
         max_length=30,
         choices=MotivoSnapshot.choices,
@@ -382,3 +388,6 @@ class AnaliseSnapshot(models.Model):
 
     def __str__(self):
         return f"Snapshot v{self.versao} - {self.analise_id}"
+
+
+post_delete.connect(liberar_blob, sender=AnaliseSnapshot, dispatch_uid="liberar_blob_analisesnapshot")
@@ -17,8 +17,12 @@ Benefícios:
 - Forense (investigação de incidentes)
 - Rollback (reverter alterações indevidas)
 - Analytics (quem usa o quê, quando)
+
+Gravação: via processos/infra/audit_sink.py (em lote, fora da requisição,
+quando settings.AUDIT_ASYNC está ligado).
 """
 
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
@@ -26,6 +30,9 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.utils import timezone
 import json
 
+from processos.infra.audit_sink import content_type_id, registrar_evento
+from processos.infra.metrics import security_events_total
+
 
 class AuditLog(models.Model):
     """
@@ -207,7 +214,8 @@ class AuditLog(models.Model):
         orgao=None,
         metadata=None,
         duration_ms=None,
-        error_message: str = ''
+        error_message: str = '',
+        sincrono: bool = False
     ):
         """
         Helper method para criar log de auditoria.
@@ -224,17 +232,20 @@ class AuditLog(models.Model):
                 ip_address=request.META.get('REMOTE_ADDR'),
                 orgao=orgao
             )
+
+        Com AUDIT_ASYNC o registro vai para a fila do audit_sink e a
+        instância retornada ainda não tem pk (sincrono=True grava na hora).
         """
         username = user.username if user and user.is_authenticated else 'anonymous'
 
         # Content type e object_id do objeto afetado
-        ct = None
+        ct_id = None
         obj_id = None
         if content_object:
-            ct = ContentType.objects.get_for_model(content_object)
+            ct_id = content_type_id(content_object)
             obj_id = content_object.pk
 
-        return cls.objects.create(
+        return registrar_evento(cls(
             user=user if (user and user.is_authenticated) else None,
             username=username,
             action=action,
@@ -243,7 +254,7 @@ class AuditLog(models.Model):
             description=description,
             old_value=old_value,
             new_value=new_value,
-            content_type=ct,
+            content_type_id=ct_id,
             object_id=obj_id,
             ip_address=ip_address,
             user_agent=user_agent,
@@ -251,7 +262,7 @@ class AuditLog(models.Model):
             metadata=metadata or {},
             duration_ms=duration_ms,
             error_message=error_message
-        )
+        ), sincrono=sincrono)
 
     @classmethod
     def get_user_activity(cls, user, days=30):
@@ -402,7 +413,8 @@ class SecurityEvent(models.Model):
         user,
         ip_address: str,
         description: str,
-        details: dict = None
+        details: dict = None,
+        sincrono: bool = False
     ):
         """
         Registra evento de segurança.
@@ -416,10 +428,15 @@ class SecurityEvent(models.Model):
                 description='Tentou acessar dados de outro órgão',
                 details={'orgao_tentado': 'AGU', 'orgao_usuario': 'TCU'}
             )
+
+        Severidades em settings.AUDIT_SYNC_SEVERITIES (default: high,
+        critical) são gravadas na hora, sem passar pela fila do audit_sink.
         """
         username = user.username if user and user.is_authenticated else 'anonymous'
+        security_events_total.labels(event_type=event_type, severity=severity).inc()
 
-        return cls.objects.create(
+        sincrono = sincrono or severity in getattr(settings, 'AUDIT_SYNC_SEVERITIES', ('high', 'critical'))
+        return registrar_evento(cls(
             event_type=event_type,
             severity=severity,
             user=user if (user and user.is_authenticated) else None,
@@ -427,4 +444,4 @@ class SecurityEvent(models.Model):
             ip_address=ip_address,
             description=description,
             details=details or {}
-        )
+        ), sincrono=sincrono)
@@ -3,9 +3,15 @@ Modelo ChatSession - Sessão de conversação com Helena
 """
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from processos.models_new.orgao import Orgao
 import uuid
 
+# Versão do formato de to_dict() no Redis. Incrementar ao mudar campos do
+# modelo ou do payload: entradas antigas passam a ser ignoradas (fallback DB).
+CACHE_VERSION = 2
+
 
 class ChatSession(models.Model):
     """
@@ -129,19 +135,84 @@ class ChatSession(models.Model):
         return f"{titulo} - {self.orgao.sigla}"
 
     def to_dict(self) -> dict:
-        """Serializa para dicionário (usado pelo SessionManager)"""
+        """
+        Serializa para dicionário (usado pelo SessionManager).
+
+        Contém todos os campos do modelo: from_cache_dict() reconstrói a
+        instância sem consultar o banco.
+        """
         return {
+            'cache_version': CACHE_VERSION,
+            'id': self.pk,
             'session_id': str(self.session_id),
-            'user_id': self.user.id,
-            'orgao_id': self.orgao.id,
+            'user_id': self.user_id,
+            'orgao_id': self.orgao_id,
             'contexto_atual': self.contexto_atual,
             'estados': self.estados,
             'agent_versions': self.agent_versions,
             'api_version': self.api_version,
+            'titulo': self.titulo,
+            'tags': self.tags,
             'status': self.status,
             'criado_em': self.criado_em.isoformat() if self.criado_em else None,
             'atualizado_em': self.atualizado_em.isoformat() if self.atualizado_em else None,
+            'finalizado_em': self.finalizado_em.isoformat() if self.finalizado_em else None,
+        }
+
+    @classmethod
+    def from_cache_dict(cls, data: dict):
+        """
+        Reconstrói a sessão a partir de to_dict() (sem query).
+
+        Returns:
+            ChatSession (estado 'do banco': save() faz UPDATE) ou None se o
+            payload for de outra versão/incompleto
+        """
+        if not isinstance(data, dict) or data.get('cache_version') != CACHE_VERSION or not data.get('id'):
+            return None
+
+        def _data_hora(valor):
+            return parse_datetime(valor) if valor else None
+
+        valores = {
+            'id': data['id'],
+            'session_id': uuid.UUID(data['session_id']),
+            'user_id': data['user_id'],
+            'orgao_id': data['orgao_id'],
+            'contexto_atual': data['contexto_atual'],
+            'estados': data['estados'],
+            'agent_versions': data['agent_versions'],
+            'api_version': data['api_version'],
+            'titulo': data['titulo'],
+            'tags': data['tags'],
+            'status': data['status'],
+            'criado_em': _data_hora(data['criado_em']),
+            'atualizado_em': _data_hora(data['atualizado_em']),
+            'finalizado_em': _data_hora(data['finalizado_em']),
         }
+        campos = [f.attname for f in cls._meta.concrete_fields]
+        if set(campos) != set(valores):
+            return None
+        return cls.from_db('default', campos, [valores[c] for c in campos])
+
+    def salvar_se_versao(self, campos) -> bool:
+        """
+        UPDATE dos campos só se a linha ainda está na versão lida
+        (atualizado_em); protege contra sobrescrever o banco a partir de um
+        cache Redis que ficou para trás.
+
+        Returns:
+            False se a linha mudou desde a leitura (nada foi gravado)
+        """
+        anterior = self.atualizado_em
+        novo = timezone.now()
+        valores = {c: getattr(self, c) for c in campos if c != 'atualizado_em'}
+        gravadas = type(self).objects.filter(pk=self.pk, atualizado_em=anterior).update(
+            atualizado_em=novo, **valores
+        )
+        if gravadas:
+            self.atualizado_em = novo
+        return bool(gravadas)
 
     def to_json(self) -> str:
         """Serializa para JSON (usado no Redis cache)"""
@@ -0,0 +1,69 @@
+"""
+Model ExportJob - Fila de gerações de PDF/DOCX fora da requisição
+
+O endpoint de export enfileira o job e responde 202; um worker
+(`manage.py run_export_jobs` ou o pool de threads do processo, ver
+processos/infra/export_jobs.py) gera o arquivo e o cliente acompanha por
+GET /api/export-jobs/<id>/.
+"""
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class ExportJob(models.Model):
+    TIPOS = [
+        ('pop_pdf', 'PDF do POP (formulário)'),
+        ('catalogo_pdf', 'PDF do POP (catálogo)'),
+        ('analise_export', 'Análise de Riscos (PDF/DOCX)'),
+    ]
+
+    STATUS = [
+        ('pending', 'Na fila'),
+        ('running', 'Em execução'),
+        ('done', 'Concluído'),
+        ('failed', 'Falhou'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tipo = models.CharField(max_length=30, choices=TIPOS, verbose_name="Tipo")
+    parametros = models.JSONField(default=dict, encoder=DjangoJSONEncoder, verbose_name="Parâmetros")
+    status = models.CharField(max_length=10, choices=STATUS, default='pending', verbose_name="Status")
+
+    # 'user:<id>' ou 'session:<chave>' (limite de jobs e acesso ao resultado)
+    dono = models.CharField(max_length=100, verbose_name="Dono")
+    usuario = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='export_jobs', verbose_name="Usuário"
+    )
+
+    tentativas = models.PositiveSmallIntegerField(default=0, verbose_name="Tentativas")
+    max_tentativas = models.PositiveSmallIntegerField(default=3, verbose_name="Máximo de Tentativas")
+    executar_apos = models.DateTimeField(default=timezone.now, verbose_name="Executar Após")
+    lease_ate = models.DateTimeField(null=True, blank=True, verbose_name="Reservado Até")
+    worker = models.CharField(max_length=100, blank=True, default='', verbose_name="Worker")
+
+    resultado_arquivo = models.CharField(max_length=500, blank=True, default='', verbose_name="Arquivo Gerado")
+    resultado_nome = models.CharField(max_length=255, blank=True, default='', verbose_name="Nome para Download")
+    resultado_content_type = models.CharField(max_length=100, blank=True, default='', verbose_name="Content-Type")
+    erro = models.TextField(blank=True, default='', verbose_name="Último Erro")
+
+    criado_em = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+    iniciado_em = models.DateTimeField(null=True, blank=True, verbose_name="Iniciado em")
+    concluido_em = models.DateTimeField(null=True, blank=True, verbose_name="Concluído em")
+
+    class Meta:
+        db_table = 'export_job'
+        verbose_name = "Job de Exportação"
+        verbose_name_plural = "Jobs de Exportação"
+        ordering = ['criado_em']
+        indexes = [
+            models.Index(fields=['status', 'executar_apos'], name='export_job_fila_idx'),
+            models.Index(fields=['dono', 'status'], name='export_job_dono_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} {self.id} ({self.status})"
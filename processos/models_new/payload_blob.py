@@ -0,0 +1,95 @@
+"""
+Model PayloadBlob - Payloads versionados endereçados por conteúdo
+
+Snapshots e versões (POPSnapshot, PopVersion, AnaliseSnapshot) apontam para
+um blob imutável identificado pelo sha256 do payload canônico: estados
+idênticos (save sem mudança, restore seguido de novo save) custam 1 linha.
+
+O conteúdo do blob é keyframe ou delta (ver processos/infra/snapshot_store.py).
+`referencias` conta as linhas que apontam para o blob mais os deltas que o
+usam como base; blobs com 0 referências são removidos por
+`manage.py gc_blobs` e conferidos por `manage.py verify_blobs`.
+"""
+from django.db import models, transaction
+
+
+class PayloadBlob(models.Model):
+    FORMATOS = [
+        ('keyframe', 'Keyframe'),
+        ('delta', 'Delta'),
+    ]
+
+    hash = models.CharField(max_length=64, primary_key=True, verbose_name="SHA-256 do Payload")
+    formato = models.CharField(max_length=10, choices=FORMATOS, verbose_name="Formato")
+    dados_zstd = models.BinaryField(verbose_name="Conteúdo Comprimido (zstd)")
+    base = models.ForeignKey(
+        'self', on_delete=models.RESTRICT, null=True, blank=True,
+        related_name='deltas', verbose_name="Keyframe Base"
+    )
+    tamanho = models.PositiveIntegerField(verbose_name="Tamanho do Payload (bytes)")
+    referencias = models.IntegerField(default=0, verbose_name="Referências")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+
+    class Meta:
+        db_table = 'payload_blob'
+        verbose_name = "Blob de Payload"
+        verbose_name_plural = "Blobs de Payload"
+        indexes = [
+            models.Index(fields=['referencias', 'created_at'], name='payload_blob_gc_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.hash[:12]} ({self.formato}, refs={self.referencias})"
+
+
+class PayloadCompacto(models.Model):
+    """
+    Payload versionado guardado como PayloadBlob.
+
+    Ler sempre via obter_payload(); o JSONField legado (CAMPO_LEGADO) só é
+    preenchido em linhas antigas (ver manage.py compact_snapshots).
+    """
+    CAMPO_LEGADO = 'payload'
+    ORDEM_CADEIA = ('-pk',)  # última linha da cadeia primeiro
+
+    blob = models.ForeignKey(
+        PayloadBlob, on_delete=models.PROTECT, null=True, blank=True,
+        related_name='+', verbose_name="Blob do Payload"
+    )
+
+    class Meta:
+        abstract = True
+
+    def obter_payload(self):
+        from processos.infra.snapshot_store import get_snapshot_store
+        return get_snapshot_store().carregar(self)
+
+    @classmethod
+    def campos_payload(cls, payload, **cadeia):
+        """
+        Campos (blob + campo legado vazio) para create(); já conta a
+        referência, então o create() tem de estar na mesma transação (ver
+        criar_com_payload).
+        """
+        from processos.infra.snapshot_store import get_snapshot_store
+        return get_snapshot_store().campos(cls, payload, **cadeia)
+
+    @classmethod
+    def criar_com_payload(cls, payload, cadeia, **campos):
+        """
+        create() com o payload em blob: referência e INSERT na mesma
+        transação (INSERT que falha não deixa referência que o gc_blobs
+        nunca recolheria).
+
+        Args:
+            cadeia: filtro que define a cadeia de versões (ex.: {'pop': pop})
+        """
+        with transaction.atomic():
+            return cls.objects.create(**campos, **cls.campos_payload(payload, **cadeia))
+
+
+def liberar_blob(sender, instance, **kwargs):
+    """post_delete das linhas com PayloadCompacto: devolve a referência."""
+    if instance.blob_id:
+        from processos.infra.snapshot_store import get_snapshot_store
+        get_snapshot_store().liberar(instance.blob_id)
@@ -13,11 +13,16 @@ Hierarquia de Roles:
 Permissões:
 - Granulares por recurso (processo, chat, análise de riscos, etc.)
 - Herdadas via hierarquia (ADMIN tem todas as permissões)
+- Resolvidas 1x por (usuário, órgão, rbac_version) e cacheadas
+  (processos/infra/rbac_cache.py); signals abaixo invalidam o cache
 """
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from processos.infra.rbac_cache import get_rbac_cache
 from processos.models_new.orgao import Orgao
 
 
@@ -87,6 +92,18 @@ class Role(models.Model):
         inherited.extend(self.ROLE_HIERARCHY.get(self.nome, []))
         return inherited
 
+    @classmethod
+    def roles_efetivas(cls, nome: str) -> frozenset:
+        """Role + todas as herdadas (hierarquia achatada, transitiva)."""
+        efetivas = {nome}
+        pendentes = list(cls.ROLE_HIERARCHY.get(nome, []))
+        while pendentes:
+            herdada = pendentes.pop()
+            if herdada not in efetivas:
+                efetivas.add(herdada)
+                pendentes.extend(cls.ROLE_HIERARCHY.get(herdada, []))
+        return frozenset(efetivas)
+
 
 class Permission(models.Model):
     """
@@ -260,6 +277,36 @@ class UserRole(models.Model):
 # Helper Functions para verificar permissões
 # ================================================
 
+def _resolver_permissoes(user_id: int, orgao_id: int) -> frozenset:
+    """Consulta o banco: roles ativas do usuário no órgão -> códigos (2 queries)."""
+    nomes = set()
+    for nome in UserRole.objects.filter(
+        user_id=user_id,
+        orgao_id=orgao_id,
+        ativo=True
+    ).values_list('role__nome', flat=True):
+        nomes |= Role.roles_efetivas(nome)
+
+    if not nomes:
+        return frozenset()
+
+    return frozenset(RolePermission.objects.filter(
+        role__nome__in=nomes
+    ).values_list('permission__codigo', flat=True))
+
+
+def get_permission_set(user: User, orgao: Orgao) -> frozenset:
+    """
+    Conjunto de códigos de permissão do usuário no órgão (cacheado).
+
+    Não trata superuser (ver user_has_permission/get_user_permissions).
+    """
+    user_id, orgao_id = user.pk, orgao.pk
+    return get_rbac_cache().obter(
+        user_id, orgao_id, lambda: _resolver_permissoes(user_id, orgao_id)
+    )
+
+
 def user_has_permission(user: User, permission_code: str, orgao: Orgao) -> bool:
     """
     Verifica se usuário tem permissão em um órgão.
@@ -280,28 +327,7 @@ def user_has_permission(user: User, permission_code: str, orgao: Orgao) -> bool:
     if user.is_superuser:
         return True
 
-    # Buscar roles do usuário neste órgão
-    user_roles = UserRole.objects.filter(
-        user=user,
-        orgao=orgao,
-        ativo=True
-    ).select_related('role')
-
-    # Para cada role, verificar se tem a permissão (incluindo herdadas)
-    for user_role in user_roles:
-        role = user_role.role
-        inherited_roles = role.get_inherited_roles()
-
-        # Verificar se alguma role (atual ou herdada) tem a permissão
-        has_perm = RolePermission.objects.filter(
-            role__nome__in=inherited_roles,
-            permission__codigo=permission_code
-        ).exists()
-
-        if has_perm:
-            return True
-
-    return False
+    return permission_code in get_permission_set(user, orgao)
 
 
 def get_user_permissions(user: User, orgao: Orgao) -> list[str]:
@@ -319,24 +345,28 @@ def get_user_permissions(user: User, orgao: Orgao) -> list[str]:
         # Superuser tem todas as permissões
         return list(Permission.objects.values_list('codigo', flat=True))
 
-    permissions = set()
+    return sorted(get_permission_set(user, orgao))
 
-    # Buscar roles do usuário
-    user_roles = UserRole.objects.filter(
-        user=user,
-        orgao=orgao,
-        ativo=True
-    ).select_related('role')
 
-    for user_role in user_roles:
-        role = user_role.role
-        inherited_roles = role.get_inherited_roles()
-
-        # Buscar permissões de todas as roles (incluindo herdadas)
-        role_perms = Permission.objects.filter(
-            roles__role__nome__in=inherited_roles
-        ).values_list('codigo', flat=True)
+# ================================================
+# Invalidação do cache de permissões
+# ================================================
 
-        permissions.update(role_perms)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(post_save, sender=RolePermission)
+@receiver(post_delete, sender=RolePermission)
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+def invalidar_cache_permissoes(sender, **kwargs):
+    """
+    Qualquer mudança de RBAC gera nova rbac_version.
 
-    return sorted(list(permissions))
+    Invalida na hora (este processo/transação já enxerga a mudança) e de
+    novo no commit (descarta o que outro processo resolveu antes do commit).
+    """
+    cache_rbac = get_rbac_cache()
+    cache_rbac.invalidar()
+    transaction.on_commit(cache_rbac.invalidar)
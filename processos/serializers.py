@@ -36,7 +36,12 @@ class POPAutosaveSerializer(serializers.ModelSerializer):
 
 
 class POPSnapshotSerializer(serializers.ModelSerializer):
+    payload = serializers.SerializerMethodField()
+
     class Meta:
         model = POPSnapshot
-        fields = '__all__'
-        read_only_fields = ['created_at']
\ No newline at end of file
+        exclude = ['blob']
+        read_only_fields = ['created_at']
+
+    def get_payload(self, obj):
+        return obj.obter_payload()
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+Testes do índice imutável da arquitetura DECIPEX.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from processos.infra.loaders import ArquiteturaDecipex, obter_indice_arquitetura
+
+CSV = """Aba,Numero,Macroprocesso,Processo,Subprocesso,Atividade
+,1.1.1.1,Gestão de Benefícios,Aposentadorias,Análise,Analisar requerimento
+,1.1.1.2,Gestão de Benefícios,Aposentadorias,Análise,Implantar benefício
+,1.2.1.1,Gestão de Benefícios,Pensões,Concessão,Conceder pensão
+,7.1.1.1,Governança,Riscos,Controles,Avaliar controles
+"""
+
+
+class TestArquiteturaIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.base = tempfile.mkdtemp()
+        self.csv = os.path.join(self.base, 'arquitetura.csv')
+        self._gravar(CSV)
+
+    def tearDown(self):
+        shutil.rmtree(self.base, ignore_errors=True)
+
+    def _gravar(self, conteudo, mtime=None):
+        with open(self.csv, 'w', encoding='utf-8') as f:
+            f.write(conteudo)
+        if mtime is not None:
+            os.utime(self.csv, ns=(mtime, mtime))
+
+    def test_filhos_em_ordem_de_aparicao(self):
+        indice = obter_indice_arquitetura(self.csv)
+        self.assertEqual(indice.filhos(), ('Gestão de Benefícios', 'Governança'))
+        self.assertEqual(indice.filhos('Gestão de Benefícios'), ('Aposentadorias', 'Pensões'))
+        self.assertEqual(indice.filhos('Inexistente'), ())
+
+    def test_existencia_e_linhas(self):
+        indice = obter_indice_arquitetura(self.csv)
+        self.assertTrue(indice.existe('Gestão de Benefícios', 'Aposentadorias', 'Análise'))
+        self.assertFalse(indice.existe('Gestão de Benefícios', 'Aposentadorias', 'Outro'))
+        numeros = [l.numero for l in indice.linhas_do_caminho('Gestão de Benefícios', 'Aposentadorias', 'Análise')]
+        self.assertEqual(numeros, ['1.1.1.1', '1.1.1.2'])
+
+    def test_numero(self):
+        indice = obter_indice_arquitetura(self.csv)
+        self.assertEqual(indice.linha_por_numero('7.1.1.1').atividade, 'Avaliar controles')
+        self.assertEqual(indice.prefixo_numero('Gestão de Benefícios', 'Pensões'), '1.2')
+
+    def test_reutiliza_indice_e_reconstroi_quando_csv_muda(self):
+        indice = obter_indice_arquitetura(self.csv)
+        self.assertIs(obter_indice_arquitetura(self.csv), indice)
+
+        # mtime muda, conteúdo igual -> mesmo objeto
+        self._gravar(CSV, mtime=10**18)
+        self.assertIs(obter_indice_arquitetura(self.csv), indice)
+
+        self._gravar(CSV + ",7.1.1.2,Governança,Riscos,Controles,Monitorar riscos\n")
+        novo = obter_indice_arquitetura(self.csv)
+        self.assertIsNot(novo, indice)
+        self.assertEqual(len(novo), 5)
+
+    def test_loader_usa_indice(self):
+        arq = ArquiteturaDecipex(self.csv)
+        self.assertEqual(arq.obter_atividades_por_subprocesso('Gestão de Benefícios', 'Pensões', 'Concessão'),
+                         ['Conceder pensão'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Testes do audit sink (gravação em lote de AuditLog / SecurityEvent).
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from processos.infra.audit_sink import AuditSink, definir_audit_sink
+from processos.models_new.audit_log import AuditLog, SecurityEvent
+
+
+def _evento(i):
+    return AuditLog(username='ana', action='update', resource='processo', description=f'evento {i}')
+
+
+class TestAuditSink(TestCase):
+
+    def test_flush_grava_em_lotes(self):
+        sink = AuditSink(tamanho_lote=10, thread=False)
+        for i in range(25):
+            self.assertTrue(sink.enviar(_evento(i)))
+        self.assertEqual(AuditLog.objects.count(), 0)
+
+        with self.assertNumQueries(3):
+            self.assertEqual(sink.flush(), 25)
+        self.assertEqual(sink.pendentes(), 0)
+        self.assertEqual(AuditLog.objects.count(), 25)
+
+    def test_politicas_de_fila_cheia(self):
+        novo = AuditSink(max_fila=2, politica='descartar_novo', thread=False)
+        resultados = [novo.enviar(_evento(i)) for i in range(3)]
+        self.assertEqual(resultados, [True, True, False])
+
+        antigo = AuditSink(max_fila=2, politica='descartar_antigo', thread=False)
+        for i in range(3):
+            antigo.enviar(_evento(i))
+        antigo.flush()
+        self.assertEqual(
+            sorted(AuditLog.objects.values_list('description', flat=True)),
+            ['evento 1', 'evento 2'],
+        )
+
+        sincrono = AuditSink(max_fila=1, politica='sincrono', thread=False)
+        sincrono.enviar(_evento(8))
+        sincrono.enviar(_evento(9))  # fila cheia: grava na hora
+        self.assertTrue(AuditLog.objects.filter(description='evento 9').exists())
+        self.assertEqual(sincrono.pendentes(), 1)
+
+
+@override_settings(AUDIT_ASYNC=True)
+class TestAuditAssincrono(TestCase):
+
+    def setUp(self):
+        self.sink = AuditSink(thread=False)
+        definir_audit_sink(self.sink)
+        self.addCleanup(definir_audit_sink, None)
+
+    def test_log_action_enfileira_com_content_type_em_cache(self):
+        user = User.objects.create_user('auditado', password='x')
+        AuditLog.log_action(user=user, action='update', resource='usuario', content_object=user)
+
+        with self.assertNumQueries(0):
+            log = AuditLog.log_action(user=user, action='read', resource='usuario', content_object=user)
+        self.assertIsNone(log.pk)
+
+        self.sink.flush()
+        self.assertEqual(AuditLog.objects.filter(object_id=user.pk, content_type__model='user').count(), 2)
+
+    def test_evento_critico_ignora_a_fila(self):
+        SecurityEvent.log_security_event('brute_force', 'critical', None, '10.0.0.1', 'muitas tentativas')
+        SecurityEvent.log_security_event('suspicious_activity', 'low', None, '10.0.0.1', 'uma tentativa')
+
+        self.assertEqual(list(SecurityEvent.objects.values_list('severity', flat=True)), ['critical'])
+        self.assertEqual(self.sink.pendentes(), 1)
@@ -0,0 +1,98 @@
+"""
+Testes do autosave delta (JSON Patch sobre o documento do formulario).
+"""
+import json
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from processos.models import POP
+from processos.views import _autosave_delta
+
+
+class TestAutosaveDelta(TestCase):
+
+    def setUp(self):
+        self.url = reverse('pop_autosave')
+        self.etapas = [{'numero': str(i), 'descricao': f'Etapa {i}'} for i in range(1, 31)]
+        resposta = self._post({
+            'session_id': 'sessao-delta',
+            'nome_processo': 'Conceder aposentadoria',
+            'etapas': self.etapas,
+        })
+        self.assertEqual(resposta.status_code, 200)
+        self.pop_id = resposta.json()['pop']['id']
+        self.hash = resposta.json()['integrity_hash']
+
+    def _post(self, corpo):
+        return self.client.post(self.url, data=json.dumps(corpo), content_type='application/json')
+
+    def _delta(self, patch, base_hash=None, **extra):
+        return self._post({
+            'session_id': 'sessao-delta',
+            'id': self.pop_id,
+            'base_hash': base_hash or self.hash,
+            'patch': patch,
+            **extra,
+        })
+
+    def test_patch_grava_so_o_campo_tocado(self):
+        resposta = self._delta([
+            {'op': 'replace', 'path': '/etapas/4/descricao', 'value': 'Analisar requisitos'},
+            {'op': 'replace', 'path': '/pontos_atencao', 'value': 'Prazo legal'},
+        ])
+        self.assertEqual(resposta.status_code, 200, resposta.content)
+        dados = resposta.json()
+        self.assertIn('etapas', dados['campos_alterados'])
+        self.assertIn('pontos_atencao', dados['campos_alterados'])
+        self.assertNotIn('nome_processo', dados['campos_alterados'])
+
+        pop = POP.objects.get(pk=self.pop_id)
+        self.assertEqual(pop.etapas[4]['descricao'], 'Analisar requisitos')
+        self.assertEqual(len(pop.etapas), 30)
+        self.assertEqual(pop.pontos_atencao, 'Prazo legal')
+        self.assertEqual(pop.nome_processo, 'Conceder aposentadoria')
+        self.assertEqual(pop.integrity_hash, dados['integrity_hash'])
+        self.assertEqual(pop.integrity_hash, pop.compute_integrity_hash())
+        self.assertEqual(pop.autosave_sequence, 2)
+
+    def test_hash_base_desatualizado_retorna_versao_atual(self):
+        self.assertEqual(self._delta([{'op': 'replace', 'path': '/nome_processo', 'value': 'A'}]).status_code, 200)
+
+        resposta = self._delta([{'op': 'replace', 'path': '/nome_processo', 'value': 'B'}])
+        self.assertEqual(resposta.status_code, 409)
+        conflito = resposta.json()['conflict']
+        self.assertEqual(conflito['server_dados']['nome_processo'], 'A')
+        self.assertEqual(conflito['server_sequence'], 2)
+        self.assertEqual(POP.objects.get(pk=self.pop_id).nome_processo, 'A')
+
+    def test_hash_resultante_divergente_e_patch_invalido(self):
+        resposta = self._delta(
+            [{'op': 'replace', 'path': '/nome_processo', 'value': 'B'}],
+            result_hash='0' * 64,
+        )
+        self.assertEqual(resposta.status_code, 409)
+        self.assertEqual(resposta.json()['conflict']['server_dados']['nome_processo'], 'Conceder aposentadoria')
+
+        self.assertEqual(self._delta([{'op': 'remove', 'path': '/etapas/99'}]).status_code, 422)
+        self.assertEqual(self._delta([{'op': 'replace', 'path': '/status', 'value': 'published'}]).status_code, 422)
+        pop = POP.objects.get(pk=self.pop_id)
+        self.assertEqual((pop.status, pop.autosave_sequence), ('draft', 1))
+
+    def test_patch_concorrente_sobre_a_mesma_base_vira_conflito(self):
+        # Requisição A leu o POP antes de B gravar outro patch sobre a mesma base
+        lido_por_a = POP.objects.get(pk=self.pop_id)
+        self.assertEqual(self._delta([{'op': 'replace', 'path': '/etapas/0/descricao', 'value': 'B'}]).status_code, 200)
+
+        request = RequestFactory().post(self.url)
+        request.user = AnonymousUser()
+        resposta = _autosave_delta(request, {
+            'base_hash': self.hash,
+            'patch': [{'op': 'replace', 'path': '/etapas/1/descricao', 'value': 'A'}],
+        }, lido_por_a)
+
+        self.assertEqual(resposta.status_code, 409)
+        pop = POP.objects.get(pk=self.pop_id)
+        self.assertEqual((pop.etapas[0]['descricao'], pop.etapas[1]['descricao']), ('B', 'Etapa 2'))
+        self.assertEqual(pop.integrity_hash, pop.compute_integrity_hash())
@@ -0,0 +1,156 @@
+"""
+Testes da classificação em lote (pipeline + POST /api/busca-atividade/lote/).
+"""
+import json
+import os
+import shutil
+import tempfile
+import zlib
+from unittest import mock
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from processos.api import busca_atividade_api
+from processos.domain.helena_mapeamento import busca_atividade_pipeline as pipeline
+from processos.domain.helena_mapeamento.busca_atividade_pipeline import BuscaAtividadePipeline
+from processos.infra.corpus_builder import atualizar_corpus
+from processos.infra.query_embedding_cache import get_query_embedding_cache
+from processos.models_auth import UserProfile
+
+CSV = """Aba,Numero,Macroprocesso,Processo,Subprocesso,Atividade
+,1.1.1.1,Gestão de Benefícios,Aposentadorias,Análise,Analisar requerimento
+,1.1.1.2,Gestão de Benefícios,Aposentadorias,Análise,Implantar benefício
+,7.1.1.1,Governança,Riscos,Controles,Avaliar controles
+"""
+
+EXATA = 'Conceder pensão'
+SEMANTICA = 'Gestão de Benefícios Aposentadorias Análise Implantar benefício'
+SEM_MATCH = 'Organizar confraternização'
+
+
+def _vetor(texto):
+    """Vetor determinístico por texto (textos diferentes ~ ortogonais)."""
+    gerador = np.random.default_rng(zlib.crc32(texto.lower().encode('utf-8')))
+    vetor = gerador.standard_normal(64).astype(np.float32)
+    return vetor / np.linalg.norm(vetor)
+
+
+class ModeloFake:
+    def encode(self, textos, convert_to_numpy=True, normalize_embeddings=True):
+        if isinstance(textos, str):
+            return _vetor(textos)
+        return np.stack([_vetor(t) for t in textos])
+
+
+def _camada1_fake(self, descricao, area_codigo, contexto, autor_dados):
+    if descricao != EXATA:
+        return {'sucesso': True, 'encontrado': False}
+    return {
+        'sucesso': True, 'encontrado': True, 'origem': 'match_exato', 'score': 1.0,
+        'cap': '01.02.03.04.005', 'tipo_cap': 'oficial',
+        'atividade': {'macroprocesso': 'M', 'processo': 'P', 'subprocesso': 'S', 'atividade': EXATA},
+    }
+
+
+class TestClassificacaoEmLote(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.base = tempfile.mkdtemp()
+        csv = os.path.join(cls.base, 'arquitetura.csv')
+        with open(csv, 'w', encoding='utf-8') as f:
+            f.write(CSV)
+        atualizar_corpus(cls.base, csv, encoder=lambda textos: np.stack([_vetor(t) for t in textos]))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.base, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache_original = dict(pipeline._CORPUS_CACHE)
+        pipeline._CORPUS_CACHE.update({'corpus': None, 'proxima_checagem': 0.0, 'model': ModeloFake()})
+        pipeline.obter_corpus(self.base)
+        pipeline._CORPUS_CACHE['proxima_checagem'] = float('inf')
+
+        def restaurar():
+            pipeline._CORPUS_CACHE.clear()
+            pipeline._CORPUS_CACHE.update(cache_original)
+        self.addCleanup(restaurar)
+
+        get_query_embedding_cache().limpar()
+        self.addCleanup(get_query_embedding_cache().limpar)
+
+        for alvo in (
+            mock.patch.object(BuscaAtividadePipeline, '_camada1_match_deterministico', _camada1_fake),
+            mock.patch.dict(os.environ, {'HELENA_LITE_MODE': 'False'}),
+        ):
+            alvo.start()
+            self.addCleanup(alvo.stop)
+
+        self.pipeline = BuscaAtividadePipeline()
+        api = mock.patch.object(busca_atividade_api, '_pipeline', self.pipeline)
+        api.start()
+        self.addCleanup(api.stop)
+        self.descricoes = [SEMANTICA, EXATA, '', SEM_MATCH]
+
+        usuario = User.objects.create_user('analista', password='x')
+        UserProfile.objects.update(email_verified=True, access_status='approved')
+        self.client.force_login(usuario)
+
+    def test_lote_bate_com_o_caminho_unitario(self):
+        linhas = self.pipeline.buscar_atividades_lote(self.descricoes, 'CGBEN', top_k=3)
+        self.assertEqual([l['linha'] for l in linhas], [0, 1, 2, 3])
+        self.assertEqual(
+            [l['origem'] for l in linhas], ['semantic', 'match_exato', 'nao_encontrado', 'nao_encontrado']
+        )
+
+        for linha, descricao in zip(linhas, self.descricoes):
+            if not descricao:
+                continue
+            unitario = self.pipeline.buscar_atividade(descricao, 'CGBEN')
+            if linha['origem'] == 'nao_encontrado':
+                self.assertEqual(unitario['origem'], 'selecao_manual')
+                continue
+            self.assertEqual(linha['origem'], unitario['origem'])
+            self.assertEqual(linha['cap'], unitario['cap'])
+            self.assertEqual(linha['atividade'], unitario['atividade'])
+            self.assertAlmostEqual(linha['score'], unitario['score'], places=5)
+            if linha['origem'] == 'semantic':
+                self.assertEqual(
+                    [c['cap'] for c in linha['candidatos']],
+                    [c['cap'] for c in unitario['candidatos'][:3]],
+                )
+
+        # Blocos menores que o lote não mudam o resultado
+        em_blocos = list(self.pipeline.iterar_atividades_lote(self.descricoes, 'CGBEN', top_k=3, tamanho_bloco=1))
+        self.assertEqual([(l['origem'], l['cap']) for l in em_blocos], [(l['origem'], l['cap']) for l in linhas])
+
+    def test_api_jsonl_emite_uma_linha_por_descricao(self):
+        resposta = self.client.post(
+            '/api/busca-atividade/lote/?formato=jsonl',
+            data=json.dumps({'area_codigo': 'CGBEN', 'descricoes': self.descricoes, 'top_k': 3}),
+            content_type='application/json',
+        )
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta['Content-Type'], busca_atividade_api.CONTENT_TYPE_JSONL)
+
+        corpo = b''.join(resposta.streaming_content).decode('utf-8')
+        self.assertTrue(corpo.endswith('\n'))
+        linhas = [json.loads(l) for l in corpo.splitlines()]
+        esperado = self.pipeline.buscar_atividades_lote(self.descricoes, 'CGBEN', top_k=3)
+        self.assertEqual([(l['linha'], l['origem'], l['cap']) for l in linhas],
+                         [(l['linha'], l['origem'], l['cap']) for l in esperado])
+
+    def test_api_recusa_lote_acima_do_limite(self):
+        with mock.patch.object(busca_atividade_api, 'MAX_LINHAS_LOTE', 3):
+            resposta = self.client.post(
+                '/api/busca-atividade/lote/',
+                data=json.dumps({'area_codigo': 'CGBEN', 'descricoes': self.descricoes}),
+                content_type='application/json',
+            )
+        self.assertEqual(resposta.status_code, 400)
+        self.assertEqual(resposta.json()['codigo'], 'LOTE_EXCEDIDO')
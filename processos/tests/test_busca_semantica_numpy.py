@@ -0,0 +1,66 @@
+"""
+Testes dos helpers NumPy da busca semântica (Camadas 2, 3 e 5).
+"""
+import unittest
+
+import numpy as np
+
+from processos.domain.helena_mapeamento.busca_atividade_pipeline import (
+    _calcular_centroides_macro, _extrair_macro_ids, _indices_top_k, _indices_top_k_lote,
+)
+
+
+class TestIndicesTopK(unittest.TestCase):
+
+    def test_ordem_decrescente(self):
+        scores = np.array([0.1, 0.9, 0.3, 0.7, 0.5])
+        self.assertEqual(_indices_top_k(scores, 3).tolist(), [1, 3, 4])
+
+    def test_k_maior_que_corpus(self):
+        scores = np.array([0.2, 0.8])
+        self.assertEqual(_indices_top_k(scores, 10).tolist(), [1, 0])
+
+    def test_corpus_vazio(self):
+        self.assertEqual(_indices_top_k(np.array([]), 5).size, 0)
+
+
+class TestIndicesTopKLote(unittest.TestCase):
+
+    def test_cada_linha_igual_ao_1d(self):
+        scores = np.random.RandomState(1).rand(4, 20)
+        top = _indices_top_k_lote(scores, 5)
+        self.assertEqual(top.shape, (4, 5))
+        for i in range(4):
+            self.assertEqual(top[i].tolist(), _indices_top_k(scores[i], 5).tolist())
+
+    def test_k_maior_que_corpus(self):
+        scores = np.array([[0.2, 0.8], [0.9, 0.1]])
+        self.assertEqual(_indices_top_k_lote(scores, 10).tolist(), [[1, 0], [0, 1]])
+
+
+class TestExtrairMacroIds(unittest.TestCase):
+
+    def test_primeiro_segmento(self):
+        ids = _extrair_macro_ids(['1.1.1.1', '10.2.1.3', '', 'x.1'])
+        self.assertEqual(ids.tolist(), [1, 10, -1, -1])
+
+
+class TestCentroidesMacro(unittest.TestCase):
+
+    def test_centroide_normalizado_por_macro(self):
+        emb = np.array([[1, 0], [0.8, 0.6], [0, 1]], dtype=np.float32)
+        nomes, centroides = _calcular_centroides_macro(emb, ['A', 'A', 'B'])
+        self.assertEqual(nomes, ['A', 'B'])
+        np.testing.assert_allclose(np.linalg.norm(centroides, axis=1), [1.0, 1.0], rtol=1e-6)
+        np.testing.assert_allclose(centroides[1], [0, 1])
+        self.assertGreater(centroides[0][0], centroides[0][1])
+
+    def test_macro_vazio_descartado(self):
+        emb = np.eye(2, dtype=np.float32)
+        nomes, centroides = _calcular_centroides_macro(emb, ['', 'B'])
+        self.assertEqual(nomes, ['B'])
+        self.assertEqual(centroides.shape, (1, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,6 +11,7 @@ from django.test import TestCase, override_settings
 from rest_framework.test import APIClient
 
 from processos.models import Area, POP, PopVersion
+from processos.infra.helena_state_store import HelenaStateStore
 
 
 # ============================================================================
@@ -234,7 +235,7 @@ class TestPublishWorkflow(TestCase):
 
         version = PopVersion.objects.get(pop=pop, versao=2)
         self.assertTrue(version.is_current)
-        self.assertIn('nome_processo', version.payload)
+        self.assertIn('nome_processo', version.obter_payload())
 
     def test_publish_twice_increments(self):
         pop = create_pop(area=self.area)
@@ -604,7 +605,7 @@ class TestCloneStateMachine(TestCase):
         session = self.client.session
         self.assertIn(session_key, session)
 
-        sm_data = session[session_key]
+        sm_data = HelenaStateStore(session).carregar(new_session_id)
         self.assertEqual(sm_data['estado'], 'revisao_final')
         self.assertEqual(sm_data['atividade_selecionada'], 'Concessao de licenca')
         self.assertEqual(sm_data['macro_selecionado'], 'Gestao de Pessoas')
@@ -619,7 +620,7 @@ class TestCloneStateMachine(TestCase):
         self.assertEqual(resp.status_code, 201)
 
         new_session_id = resp.data['pop']['session_id']
-        sm_data = self.client.session[f'helena_pop_state_{new_session_id}']
+        sm_data = HelenaStateStore(self.client.session).carregar(new_session_id)
 
         dispositivos = sm_data['dados_coletados']['dispositivos_normativos']
         operadores = sm_data['dados_coletados']['operadores']
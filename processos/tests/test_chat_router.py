@@ -7,15 +7,23 @@ Testa:
 - Mudança explícita de contexto (mudar_contexto)
 - Validações de contexto inválido
 - Registry vazio
+- Commit do turno (estado + mensagens em 1 transação)
+- Turno concorrente na mesma sessão (409 no chat_v2)
 
 Executar: python manage.py test processos.tests.test_chat_router -v2
 """
 
+import json
+import uuid
 from unittest.mock import MagicMock, patch
+from django.contrib.auth.models import User
 from django.test import TestCase
 
 from processos.app.helena_core import HelenaCore
 from processos.domain.base import BaseHelena
+from processos.models_new.chat_message import ChatMessage
+from processos.models_new.chat_session import ChatSession
+from processos.models_new.orgao import Orgao
 
 
 class FakeProduto(BaseHelena):
@@ -155,3 +163,310 @@ class TestRegistryValidacao(TestCase):
         self.assertIn('pop', produtos)
         self.assertEqual(produtos['pop']['nome'], 'Fake')
         self.assertEqual(produtos['pop']['versao'], '0.0.1')
+
+
+class TestCommitTurno(TestCase):
+    """Turno grava estado + mensagens juntos (TurnCommit)."""
+
+    def setUp(self):
+        self.core = HelenaCore(registry={'pop': FakeProduto(), 'etapas': FakeProduto()})
+        self.core.session_manager.cache = MagicMock()
+        self.core.session_manager.cache.get_session_with_count.return_value = (None, 0)
+        self.user = User.objects.create_user('turno', password='x')
+        Orgao.objects.create(codigo='T1', nome='Órgão Teste', sigla='OT')
+        self.session_id = str(uuid.uuid4())
+
+    def test_turno_grava_estado_mensagens_e_redis(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            resposta = self.core.processar_mensagem('olá', self.session_id, self.user, req_uuid=str(uuid.uuid4()))
+
+        self.assertEqual(resposta['resposta'], 'fake: olá')
+        session = ChatSession.objects.get(session_id=self.session_id)
+        self.assertEqual(session.estados['pop'], {'etapa_atual': 0})
+        self.assertEqual(
+            list(ChatMessage.objects.filter(session=session).values_list('role', flat=True)),
+            ['user', 'assistant']
+        )
+        self.core.session_manager.cache.commit_turn.assert_called_once()
+        self.core.session_manager.cache.increment_message_count.assert_not_called()
+
+    def test_retry_com_mesmo_req_uuid_nao_duplica(self):
+        req_uuid = str(uuid.uuid4())
+        self.core.processar_mensagem('olá', self.session_id, self.user, req_uuid=req_uuid)
+        self.core.processar_mensagem('olá', self.session_id, self.user, req_uuid=req_uuid)
+        self.assertEqual(ChatMessage.objects.filter(role='user').count(), 1)
+
+    def test_commit_em_uma_transacao(self):
+        session = self.core.session_manager.get_or_create_session(self.session_id, self.user)
+        turno = self.core.session_manager.begin_turn(session)
+        session.estados['pop'] = {'etapa_atual': 1}
+        turno.mark_dirty('estados')
+        turno.add_message('user', 'a')
+        turno.add_message('assistant', 'b')
+
+        # SAVEPOINT + UPDATE + INSERT (lote) + RELEASE
+        with self.assertNumQueries(4):
+            turno.commit()
+        self.assertEqual(ChatMessage.objects.filter(session=session).count(), 2)
+
+
+class TestHidratacaoSessaoCache(TestCase):
+    """Cache Redis autoritativo: HIT reconstrói a sessão sem query."""
+
+    def setUp(self):
+        from processos.infra.session_manager import SessionManager
+        self.manager = SessionManager()
+        self.manager.cache = MagicMock()
+        self.user = User.objects.create_user('hidrata', password='x')
+        Orgao.objects.create(codigo='T2', nome='Órgão Teste', sigla='OT')
+        self.session_id = str(uuid.uuid4())
+        self.manager.cache.get_session_with_count.return_value = (None, 0)
+        self.original = self.manager.get_or_create_session(self.session_id, self.user)
+        self.original.estados = {'pop': {'etapa_atual': 3}}
+        self.original.save(update_fields=['estados', 'atualizado_em'])
+
+    def test_hit_sem_query(self):
+        self.manager.cache.get_session_with_count.return_value = (self.original.to_dict(), 7)
+
+        with self.assertNumQueries(0):
+            session = self.manager.get_or_create_session(self.session_id, self.user)
+            self.assertEqual(session.user.username, 'hidrata')
+
+        self.assertEqual(session.pk, self.original.pk)
+        self.assertEqual(session.estados, {'pop': {'etapa_atual': 3}})
+        self.assertEqual(session.criado_em, self.original.criado_em)
+        self.assertEqual(session.msg_count, 7)
+
+        # Instância hidratada grava com UPDATE na mesma linha
+        session.contexto_atual = 'etapas'
+        session.save(update_fields=['contexto_atual', 'atualizado_em'])
+        self.assertEqual(ChatSession.objects.get(pk=self.original.pk).contexto_atual, 'etapas')
+
+    def test_versao_diferente_recarrega_do_banco(self):
+        payload = self.original.to_dict()
+        payload['cache_version'] = 0
+        self.manager.cache.get_session_with_count.return_value = (payload, 0)
+
+        # Órgão padrão + SELECT da sessão
+        with self.assertNumQueries(2):
+            session = self.manager.get_or_create_session(self.session_id, self.user)
+        self.assertEqual(session.pk, self.original.pk)
+
+
+    def test_cache_velho_nao_sobrescreve_o_banco(self):
+        from processos.infra.session_manager import SessaoDesatualizada
+
+        velho = self.original.to_dict()
+        # Outro turno gravou no banco, mas a escrita no Redis falhou
+        self.original.estados = {'pop': {'etapa_atual': 4}}
+        self.original.save(update_fields=['estados', 'atualizado_em'])
+        self.manager.cache.get_session_with_count.return_value = (velho, 0)
+
+        session = self.manager.get_or_create_session(self.session_id, self.user)
+        turno = self.manager.begin_turn(session)
+        session.estados['pop'] = {'etapa_atual': 99}
+        turno.mark_dirty('estados')
+        with self.assertRaises(SessaoDesatualizada):
+            turno.commit()
+
+        self.assertEqual(ChatSession.objects.get(pk=self.original.pk).estados, {'pop': {'etapa_atual': 4}})
+        self.manager.cache.delete_session.assert_called_once_with(self.session_id)
+
+
+class TestWriteBehindMensagens(TestCase):
+    """Write-behind: mensagens do turno vão para o buffer, não para o INSERT."""
+
+    def setUp(self):
+        self.core = HelenaCore(registry={'pop': FakeProduto()})
+        self.manager = self.core.session_manager
+        self.manager.cache = MagicMock()
+        self.manager.cache.get_session_with_count.return_value = (None, 0)
+        self.manager.cache.get_session.return_value = None
+        self.manager.buffer = MagicMock()
+        self.user = User.objects.create_user('buffer', password='x')
+        Orgao.objects.create(codigo='T3', nome='Órgão Teste', sigla='OT')
+        self.session_id = str(uuid.uuid4())
+
+    def test_turno_enfileira_mensagens(self):
+        self.manager.buffer.enqueue.return_value = [True, True]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.core.processar_mensagem('olá', self.session_id, self.user)
+
+        session_id, mensagens = self.manager.buffer.enqueue.call_args[0]
+        self.assertEqual(session_id, self.session_id)
+        self.assertEqual([m.role for m in mensagens], ['user', 'assistant'])
+        self.assertFalse(ChatMessage.objects.exists())
+
+    def test_redis_falhou_grava_direto(self):
+        self.manager.buffer.enqueue.return_value = None
+        with self.captureOnCommitCallbacks(execute=True):
+            self.core.processar_mensagem('olá', self.session_id, self.user)
+        self.assertEqual(ChatMessage.objects.count(), 2)
+
+    def test_rollback_nao_enfileira(self):
+        from django.db import transaction
+
+        session = self.manager.get_or_create_session(self.session_id, self.user)
+        turno = self.manager.begin_turn(session)
+        turno.add_message('user', 'olá')
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    turno.commit()
+                    raise RuntimeError('falha depois do turno')
+            except RuntimeError:
+                pass
+        self.manager.buffer.enqueue.assert_not_called()
+
+    def test_payload_do_buffer_vira_mensagem(self):
+        from processos.infra.chat_message_buffer import desserializar_mensagem, serializar_mensagem
+
+        session = self.manager.get_or_create_session(self.session_id, self.user)
+        turno = self.manager.begin_turn(session)
+        original = turno.add_message('assistant', 'resposta', metadados={'tipo_interface': 'areas'})
+
+        ChatMessage.objects.bulk_create([desserializar_mensagem(serializar_mensagem(original))] * 2,
+                                        ignore_conflicts=True)
+        salva = ChatMessage.objects.get()
+        self.assertEqual(str(salva.req_uuid), str(original.req_uuid))
+        self.assertEqual((salva.session_id, salva.role), (session.pk, 'assistant'))
+        self.assertEqual(salva.metadados, {'tipo_interface': 'areas'})
+
+    def test_finalizar_sessao_faz_flush(self):
+        self.manager.get_or_create_session(self.session_id, self.user)
+        self.core.finalizar_sessao(self.session_id)
+        self.manager.buffer.flush.assert_called_with(self.session_id)
+
+    def test_mensagem_recusada_vai_para_dead_letter_sem_travar_as_outras(self):
+        from processos.infra.chat_message_buffer import CHAVE_DEAD_LETTER, ChatMessageBuffer, serializar_mensagem
+
+        boa = self.manager.get_or_create_session(self.session_id, self.user)
+        outra = self.manager.get_or_create_session(str(uuid.uuid4()), self.user)
+        payloads = {}
+        for session in (boa, outra):
+            turno = self.manager.begin_turn(session)
+            payloads[str(session.session_id)] = [
+                serializar_mensagem(turno.add_message('user', 'pergunta')),
+                serializar_mensagem(turno.add_message('assistant', 'resposta')),
+            ]
+        ruim = json.loads(payloads[str(outra.session_id)][1])
+        del ruim['session_pk']  # payload que nunca vai gravar
+        payloads[str(outra.session_id)][1] = json.dumps(ruim)
+
+        redis = RedisFake(payloads)
+        buffer = ChatMessageBuffer(redis)
+        self.assertEqual(buffer._flush_sessoes(list(payloads)), 4)
+
+        self.assertEqual(ChatMessage.objects.filter(session=boa).count(), 2)
+        self.assertEqual(ChatMessage.objects.filter(session=outra).count(), 1)
+        self.assertEqual(redis.confirmados, {sid: 2 for sid in payloads})
+        self.assertEqual(len(redis.listas[CHAVE_DEAD_LETTER]), 1)
+
+
+class ProdutoConcorrente(FakeProduto):
+    """Durante o turno, outra requisição da mesma sessão termina primeiro."""
+
+    def __init__(self):
+        super().__init__()
+        self.core = None
+        self.concorrer = False
+
+    def processar(self, mensagem, session_data):
+        if self.concorrer:
+            self.concorrer = False
+            self.core.processar_mensagem('turno concorrente', self.session_id, self.user)
+        return super().processar(mensagem, session_data)
+
+
+class TestTurnoConcorrenteChatV2(TestCase):
+    """Dois turnos sobrepostos na mesma sessão: o segundo a gravar recebe 409."""
+
+    def setUp(self):
+        from processos.models_auth import UserProfile
+
+        self.produto = ProdutoConcorrente()
+        self.core = HelenaCore(registry={'pop': self.produto})
+        self.produto.core = self.core
+        manager = self.core.session_manager
+        manager.cache = MagicMock()
+        manager.cache.get_session_with_count.return_value = (None, 0)
+        manager.cache.get_session.return_value = None
+        manager.buffer = MagicMock()
+        manager.buffer.enqueue.return_value = None
+
+        self.user = User.objects.create_user('concorrente', password='x')
+        UserProfile.objects.update(email_verified=True, access_status='approved')
+        self.client.force_login(self.user)
+        Orgao.objects.create(codigo='T4', nome='Órgão Teste', sigla='OT')
+
+        self.session_id = str(uuid.uuid4())
+        self.produto.session_id = self.session_id
+        self.produto.user = self.user
+        with self.captureOnCommitCallbacks(execute=True):
+            self.core.processar_mensagem('olá', self.session_id, self.user)
+
+        alvo = patch('processos.api.chat_api.get_helena_core', return_value=self.core)
+        alvo.start()
+        self.addCleanup(alvo.stop)
+
+    def _post(self, mensagem):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                '/api/chat-v2/',
+                data=json.dumps({'mensagem': mensagem, 'session_id': self.session_id}),
+                content_type='application/json',
+            )
+
+    def test_turno_atrasado_recebe_409_retentavel(self):
+        mensagens_antes = ChatMessage.objects.filter(session__session_id=self.session_id).count()
+        self.produto.concorrer = True
+
+        resposta = self._post('turno atrasado')
+
+        self.assertEqual(resposta.status_code, 409)
+        corpo = resposta.json()
+        self.assertEqual(corpo['code'], 'session_conflict')
+        self.assertTrue(corpo['retryable'])
+        self.assertEqual(corpo['session_id'], self.session_id)
+
+        # Só o turno concorrente gravou; o atrasado não deixou mensagens
+        conteudos = list(
+            ChatMessage.objects.filter(session__session_id=self.session_id)
+            .order_by('criado_em', 'id').values_list('content', flat=True)
+        )[mensagens_antes:]
+        self.assertEqual(conteudos, ['turno concorrente', 'fake: turno concorrente'])
+
+        # A nova tentativa parte da versão atual e passa
+        self.assertEqual(self._post('turno atrasado').status_code, 200)
+
+
+class RedisFake:
+    """Só o que _flush_sessoes usa: LRANGE em pipeline, scripts e RPUSH."""
+
+    def __init__(self, payloads):
+        self.payloads = payloads
+        self.listas = {}
+        self.confirmados = {}
+
+    def register_script(self, _lua):
+        def script(keys, args, client=None):
+            self.confirmados[args[1]] = args[0]
+        return script
+
+    def pipeline(self, transaction=False):
+        return PipelineFake(self)
+
+    def rpush(self, chave, valor):
+        self.listas.setdefault(chave, []).append(valor)
+
+
+class PipelineFake:
+    def __init__(self, redis):
+        self.redis = redis
+        self.resultados = []
+
+    def lrange(self, chave, inicio, fim):
+        self.resultados.append(self.redis.payloads[chave.split(':')[-1]])
+
+    def execute(self):
+        return self.resultados
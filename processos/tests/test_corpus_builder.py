@@ -0,0 +1,160 @@
+"""
+Testes do build incremental do corpus semântico e do hot reload nos workers.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+from django.test import TestCase
+
+from processos.domain.governanca import versionamento_csv
+from processos.domain.helena_mapeamento import busca_atividade_pipeline as pipeline
+from processos.infra.corpus_builder import atualizar_corpus
+from processos.infra.corpus_store import CorpusStore
+
+CSV = """Aba,Numero,Macroprocesso,Processo,Subprocesso,Atividade
+,1.1.1.1,Gestão de Benefícios,Aposentadorias,Análise,Analisar requerimento
+,1.1.1.2,Gestão de Benefícios,Aposentadorias,Análise,Implantar benefício
+,7.1.1.1,Governança,Riscos,Controles,Avaliar controles
+"""
+
+
+class EncoderFake:
+    """Vetor determinístico por texto; registra o que foi embeddado."""
+
+    def __init__(self):
+        self.textos = []
+
+    def __call__(self, textos):
+        self.textos.extend(textos)
+        vetores = np.array([[len(t), sum(map(ord, t)) % 97, 1.0] for t in textos], dtype=np.float32)
+        return vetores / np.linalg.norm(vetores, axis=1, keepdims=True)
+
+
+class TestCorpusBuilder(unittest.TestCase):
+
+    def setUp(self):
+        self.base = tempfile.mkdtemp()
+        self.csv = os.path.join(self.base, 'arquitetura.csv')
+        self._gravar(CSV)
+
+    def tearDown(self):
+        shutil.rmtree(self.base, ignore_errors=True)
+
+    def _gravar(self, conteudo):
+        with open(self.csv, 'w', encoding='utf-8') as f:
+            f.write(conteudo)
+
+    def test_build_inicial_gera_store_valido(self):
+        encoder = EncoderFake()
+        stats = atualizar_corpus(self.base, self.csv, encoder=encoder)
+
+        self.assertEqual(stats['gerados'], 3)
+        store = CorpusStore.abrir(self.base)
+        self.assertIsNotNone(store)
+        self.assertEqual(store.embeddings.shape, (3, 3))
+        self.assertEqual(store.meta[2]['atividade'], 'Avaliar controles')
+
+    def test_rebuild_embedda_apenas_linhas_novas_ou_alteradas(self):
+        atualizar_corpus(self.base, self.csv, encoder=EncoderFake())
+        anteriores = np.load(os.path.join(self.base, 'corpus_embeddings.npy'))
+
+        self._gravar(
+            CSV.replace('Implantar benefício', 'Revisar benefício')
+            + ",7.1.1.2,Governança,Riscos,Controles,Monitorar riscos\n"
+        )
+        encoder = EncoderFake()
+        stats = atualizar_corpus(self.base, self.csv, encoder=encoder)
+
+        self.assertEqual((stats['reaproveitados'], stats['gerados']), (2, 2))
+        self.assertEqual(len(encoder.textos), 2)
+        self.assertTrue(all('Revisar' in t or 'Monitorar' in t for t in encoder.textos))
+
+        store = CorpusStore.abrir(self.base)
+        np.testing.assert_array_equal(store.embeddings[0], anteriores[0])
+        np.testing.assert_array_equal(store.embeddings[2], anteriores[2])
+        self.assertEqual(len(store.meta), 4)
+
+    def test_forcar_regera_tudo(self):
+        atualizar_corpus(self.base, self.csv, encoder=EncoderFake())
+        stats = atualizar_corpus(self.base, self.csv, encoder=EncoderFake(), forcar=True)
+        self.assertEqual(stats['gerados'], 3)
+
+
+class TestCorpusHotReload(unittest.TestCase):
+
+    def setUp(self):
+        self.base = tempfile.mkdtemp()
+        self.csv = os.path.join(self.base, 'arquitetura.csv')
+        with open(self.csv, 'w', encoding='utf-8') as f:
+            f.write(CSV)
+        atualizar_corpus(self.base, self.csv, encoder=EncoderFake())
+        self._cache_original = dict(pipeline._CORPUS_CACHE)
+        pipeline._CORPUS_CACHE.update({'corpus': None, 'proxima_checagem': 0.0})
+
+    def tearDown(self):
+        pipeline._CORPUS_CACHE.clear()
+        pipeline._CORPUS_CACHE.update(self._cache_original)
+        shutil.rmtree(self.base, ignore_errors=True)
+
+    def test_troca_versao_quando_fingerprint_muda(self):
+        v1 = pipeline.obter_corpus(self.base)
+        self.assertEqual((v1.versao, len(v1.meta)), (1, 3))
+        self.assertIs(pipeline.obter_corpus(self.base), v1)
+
+        with open(self.csv, 'a', encoding='utf-8') as f:
+            f.write(",7.1.1.2,Governança,Riscos,Controles,Monitorar riscos\n")
+        atualizar_corpus(self.base, self.csv, encoder=EncoderFake())
+
+        # Dentro do intervalo de rechecagem: mesma versão
+        self.assertIs(pipeline.obter_corpus(self.base), v1)
+
+        pipeline.invalidar_corpus_cache()
+        v2 = pipeline.obter_corpus(self.base)
+        self.assertEqual((v2.versao, len(v2.meta)), (2, 4))
+        # Quem já tinha a versão antiga continua com ela íntegra
+        self.assertEqual((v1.embeddings.shape[0], len(v1.meta)), (3, 3))
+
+    def test_store_invalido_mantem_versao_atual(self):
+        v1 = pipeline.obter_corpus(self.base)
+        fingerprint = os.path.join(self.base, 'corpus_fingerprint.json')
+        with open(fingerprint, 'w', encoding='utf-8') as f:
+            f.write('{"n_atividades": 99, "embedding_dim": 3}')
+
+        pipeline.invalidar_corpus_cache()
+        self.assertIs(pipeline.obter_corpus(self.base), v1)
+
+
+class TestReindexacaoAposPublicacao(TestCase):
+
+    def test_reindexa_em_background_so_apos_o_commit(self):
+        iniciou, liberar, chamadas = threading.Event(), threading.Event(), []
+
+        def reindexar(csv_path):
+            chamadas.append((csv_path, threading.current_thread().name))
+            iniciou.set()
+            liberar.wait(5)
+
+        with mock.patch.object(versionamento_csv, 'reindexar_corpus_semantico', reindexar):
+            with self.captureOnCommitCallbacks(execute=True):
+                versionamento_csv.agendar_reindexacao_corpus('a.csv')
+                self.assertEqual(chamadas, [])
+
+            # Publicações durante o build coalescem num build a mais
+            self.assertTrue(iniciou.wait(5))
+            versionamento_csv._iniciar_reindexacao('a.csv')
+            versionamento_csv._iniciar_reindexacao('a.csv')
+            thread = versionamento_csv._reindex_thread
+            liberar.set()
+            thread.join(5)
+
+        self.assertEqual(chamadas, [('a.csv', 'corpus-reindex')] * 2)
+        self.assertIsNone(versionamento_csv._reindex_thread)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Testes do CorpusStore (formato mmap-v1 do corpus semântico).
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from processos.infra.corpus_store import (
+    CorpusStore, gravar_meta_colunar, descrever_store, validar_fingerprint,
+    ARQUIVO_EMBEDDINGS, ARQUIVO_FINGERPRINT, ARQUIVO_META_LEGADO,
+)
+
+META = [
+    {'idx': 0, 'numero': '1.1.1.1', 'macroprocesso': 'Gestão de Benefícios',
+     'processo': 'Aposentadorias', 'subprocesso': 'Análise', 'atividade': 'Analisar requerimento',
+     'texto': 'Gestão de Benefícios Aposentadorias Análise Analisar requerimento'},
+    {'idx': 1, 'numero': '1.1.1.2', 'macroprocesso': 'Gestão de Benefícios',
+     'processo': 'Aposentadorias', 'subprocesso': 'Análise', 'atividade': 'Implantar benefício',
+     'texto': 'Gestão de Benefícios Aposentadorias Análise Implantar benefício'},
+    {'idx': 2, 'numero': '7.2.1.1', 'macroprocesso': 'Governança',
+     'processo': 'Riscos', 'subprocesso': 'Controles', 'atividade': 'Avaliar controles',
+     'texto': 'Governança Riscos Controles Avaliar controles'},
+]
+
+
+class TestCorpusStore(unittest.TestCase):
+
+    def setUp(self):
+        self.base = tempfile.mkdtemp()
+        emb = np.random.RandomState(0).rand(len(META), 8).astype(np.float32)
+        np.save(os.path.join(self.base, ARQUIVO_EMBEDDINGS), emb)
+        gravar_meta_colunar(META, self.base)
+        self._gravar_fingerprint({'n_atividades': len(META), 'embedding_dim': 8,
+                                  'store': descrever_store(self.base)})
+
+    def tearDown(self):
+        shutil.rmtree(self.base, ignore_errors=True)
+
+    def _gravar_fingerprint(self, fp):
+        with open(os.path.join(self.base, ARQUIVO_FINGERPRINT), 'w', encoding='utf-8') as f:
+            json.dump(fp, f)
+
+    def test_abre_com_mmap(self):
+        store = CorpusStore.abrir(self.base)
+        self.assertIsNotNone(store)
+        self.assertEqual(store.formato, 'mmap-v1')
+        self.assertIsInstance(store.embeddings, np.memmap)
+        self.assertEqual(store.embeddings.shape, (3, 8))
+
+    def test_meta_colunar_equivale_ao_json(self):
+        store = CorpusStore.abrir(self.base)
+        self.assertEqual(len(store.meta), len(META))
+        for i, esperado in enumerate(META):
+            self.assertEqual(store.meta[i], esperado)
+        self.assertEqual(store.meta.coluna('numero'), ['1.1.1.1', '1.1.1.2', '7.2.1.1'])
+
+    def test_fingerprint_divergente_invalida(self):
+        self._gravar_fingerprint({'n_atividades': 99, 'embedding_dim': 8})
+        self.assertIsNone(CorpusStore.abrir(self.base))
+
+    def test_tamanho_divergente_invalida(self):
+        fp = {'n_atividades': 3, 'embedding_dim': 8, 'store': descrever_store(self.base)}
+        fp['store']['arquivos'][ARQUIVO_EMBEDDINGS]['bytes'] += 1
+        ok, motivo = validar_fingerprint(self.base, fp)
+        self.assertFalse(ok)
+        self.assertIn(ARQUIVO_EMBEDDINGS, motivo)
+
+    def test_fallback_meta_json_legado(self):
+        for nome in ('corpus_meta_codes.npy', 'corpus_meta_strings.npy'):
+            os.remove(os.path.join(self.base, nome))
+        self._gravar_fingerprint({'n_atividades': 3, 'embedding_dim': 8})
+        with open(os.path.join(self.base, ARQUIVO_META_LEGADO), 'w', encoding='utf-8') as f:
+            json.dump(META, f)
+        store = CorpusStore.abrir(self.base)
+        self.assertEqual(store.formato, 'legado')
+        self.assertEqual(store.meta[2]['numero'], '7.2.1.1')
+
+
+if __name__ == '__main__':
+    unittest.main()
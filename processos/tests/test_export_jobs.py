@@ -0,0 +1,119 @@
+"""
+Testes da fila de exports (enfileirar, reservar, retentativa, limites e API).
+"""
+import json
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from processos.infra import export_jobs
+from processos.infra.export_jobs import LimiteJobsExcedido, enfileirar, executar, processar_proximo, reservar
+from processos.infra.pdf_render_cache import PDFRenderCache, definir_pdf_render_cache
+from processos.models import ExportJob
+from processos.models_auth import UserProfile
+
+FALHAS = []
+
+
+def tarefa_teste(parametros):
+    if FALHAS:
+        raise FALHAS.pop()
+    return f"conteudo {parametros['n']}".encode(), f"arquivo_{parametros['n']}.txt", 'text/plain'
+
+
+class TestExportJobs(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        ajustes = override_settings(
+            EXPORT_JOBS_DIR=self.tmp.name, EXPORT_JOBS_THREADS=0, EXPORT_JOBS_RETRY_BASE_SECONDS=0,
+        )
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        tarefas = mock.patch.dict(export_jobs.TAREFAS, {'pop_pdf': f'{__name__}.tarefa_teste'})
+        tarefas.start()
+        self.addCleanup(tarefas.stop)
+        FALHAS.clear()
+
+    def test_enfileira_e_processa(self):
+        job = enfileirar('pop_pdf', {'n': 1}, 'user:1')
+        self.assertEqual(job.status, 'pending')
+
+        self.assertTrue(processar_proximo('w1'))
+        self.assertFalse(processar_proximo('w1'))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(job.tentativas, 1)
+        self.assertEqual(job.resultado_nome, 'arquivo_1.txt')
+        with open(job.resultado_arquivo, 'rb') as f:
+            self.assertEqual(f.read(), b'conteudo 1')
+
+    def test_retentativa_e_falha_definitiva(self):
+        job = enfileirar('pop_pdf', {'n': 1}, 'user:1')
+        FALHAS.extend([RuntimeError('de novo'), RuntimeError('falhou')])
+
+        self.assertEqual(executar(reservar('w1'), 'w1'), 'pending')
+        self.assertEqual(executar(reservar('w1'), 'w1'), 'pending')
+        self.assertEqual(executar(reservar('w1'), 'w1'), 'done')
+        job.refresh_from_db()
+        self.assertEqual(job.tentativas, 3)
+
+        outro = enfileirar('pop_pdf', {'n': 2}, 'user:1')
+        FALHAS.append(export_jobs.ErroTarefaDefinitivo('POP não encontrado'))
+        self.assertEqual(executar(reservar('w1'), 'w1'), 'failed')
+        outro.refresh_from_db()
+        self.assertEqual(outro.status, 'failed')
+
+    @override_settings(EXPORT_JOBS_MAX_PENDING_PER_USER=2, EXPORT_JOBS_MAX_RUNNING_PER_USER=1)
+    def test_limites_por_usuario(self):
+        primeiro = enfileirar('pop_pdf', {'n': 1}, 'user:1')
+        enfileirar('pop_pdf', {'n': 2}, 'user:1')
+        with self.assertRaises(LimiteJobsExcedido):
+            enfileirar('pop_pdf', {'n': 3}, 'user:1')
+        de_outro = enfileirar('pop_pdf', {'n': 4}, 'user:2')
+
+        self.assertEqual(reservar('w1').pk, primeiro.pk)
+        # user:1 já tem 1 job em execução: o próximo reservável é o do user:2
+        self.assertEqual(reservar('w2').pk, de_outro.pk)
+        self.assertIsNone(reservar('w3'))
+
+    def test_api_status_e_resultado_so_para_o_dono(self):
+        dono = User.objects.create_user('dono', password='x')
+        User.objects.create_user('outro', password='x')
+        UserProfile.objects.update(email_verified=True, access_status='approved')
+        job = enfileirar('pop_pdf', {'n': 1}, f'user:{dono.pk}', usuario=dono)
+
+        self.client.force_login(dono)
+        resposta = self.client.get(f'/api/export-jobs/{job.pk}/resultado/')
+        self.assertEqual(resposta.status_code, 409)
+
+        processar_proximo('w1')
+        resposta = self.client.get(f'/api/export-jobs/{job.pk}/')
+        self.assertEqual(resposta.json()['status'], 'done')
+        resposta = self.client.get(f'/api/export-jobs/{job.pk}/resultado/')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(b''.join(resposta.streaming_content), b'conteudo 1')
+
+        self.client.force_login(User.objects.get(username='outro'))
+        self.assertEqual(self.client.get(f'/api/export-jobs/{job.pk}/').status_code, 404)
+
+    def test_gerar_pdf_pop_assincrono_responde_202(self):
+        definir_pdf_render_cache(PDFRenderCache(self.tmp.name))
+        self.addCleanup(definir_pdf_render_cache, None)
+
+        corpo = {'dados_pop': {
+            'nome_processo': 'Conceder aposentadoria', 'area': {'nome': 'CGBEN'},
+            'entrega_esperada': 'Aposentadoria concedida', 'codigo_processo': '1.2.3',
+        }}
+        resposta = self.client.post(
+            '/api/gerar-pdf-pop/?async=1', data=json.dumps(corpo), content_type='application/json'
+        )
+        self.assertEqual(resposta.status_code, 202)
+        job = ExportJob.objects.get(pk=resposta.json()['job_id'])
+        self.assertEqual(job.tipo, 'pop_pdf')
+        self.assertTrue(job.dono.startswith('session:'))
+        self.assertEqual(resposta['Location'], f'/api/export-jobs/{job.pk}/')
@@ -0,0 +1,89 @@
+"""
+Contrato de thread-safety dos produtos Helena (instância única por processo).
+
+O produto é compartilhado por todas as requisições do worker (threads do
+gunicorn): processar() não pode guardar nada da conversa em self.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase
+
+from processos.app.helena_core import HelenaCore
+from processos.domain.base import BaseHelena
+from processos.domain.helena_mapeamento.helena_etapas import HelenaEtapas
+from processos.domain.helena_mapeamento.helena_pop import HelenaPOP, POPStateMachine
+
+ROTEIROS = {
+    'ana': ['Ana', 'sim', 'detalhes', 'ok'],
+    'bruno': ['Bruno', 'sim', 'sim'],
+    'carla': ['Carla', 'detalhes', 'ok', 'sim'],
+}
+
+
+class ProdutoContador(BaseHelena):
+    inits = 0
+
+    def __init__(self):
+        super().__init__()
+        ProdutoContador.inits += 1
+
+    def processar(self, mensagem, session_data):
+        return self.criar_resposta(resposta=mensagem, novo_estado=session_data)
+
+    def inicializar_estado(self):
+        return {}
+
+
+def _conversar(produto, mensagens):
+    estado = produto.inicializar_estado()
+    estados = []
+    for mensagem in mensagens:
+        estado = produto.processar(mensagem, estado)['novo_estado']
+        estados.append(estado)
+    return estados
+
+
+class TestProdutosSingleton(SimpleTestCase):
+
+    def test_instancia_unica_mesmo_com_threads(self):
+        BaseHelena._instancias.pop(ProdutoContador, None)
+        ProdutoContador.inits = 0
+        barreira = threading.Barrier(8)
+
+        def obter():
+            barreira.wait()
+            return ProdutoContador.instancia()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            instancias = list(pool.map(lambda _: obter(), range(8)))
+
+        self.assertEqual(ProdutoContador.inits, 1)
+        self.assertTrue(all(i is instancias[0] for i in instancias))
+        self.assertIsNot(HelenaPOP.instancia(), HelenaEtapas.instancia())
+
+    def test_core_usa_instancias_do_processo(self):
+        core = HelenaCore(registry={'pop': HelenaPOP, 'etapas': HelenaEtapas})
+        self.assertIs(core.registry['pop'], HelenaPOP.instancia())
+        self.assertIs(core.registry['etapas'], HelenaEtapas.instancia())
+
+    def test_conversas_concorrentes_nao_vazam_estado(self):
+        produto = HelenaPOP.instancia()
+        atributos_antes = {k: id(v) for k, v in vars(produto).items()}
+
+        esperados = {nome: _conversar(produto, msgs) for nome, msgs in ROTEIROS.items()}
+
+        trabalhos = [nome for nome in ROTEIROS for _ in range(4)]
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            obtidos = list(pool.map(lambda nome: (nome, _conversar(produto, ROTEIROS[nome])), trabalhos))
+
+        for nome, estados in obtidos:
+            self.assertEqual(estados, esperados[nome], nome)
+            self.assertEqual(estados[0]['nome_usuario'], ROTEIROS[nome][0])
+
+        # Nada da conversa ficou no produto compartilhado
+        self.assertEqual({k: id(v) for k, v in vars(produto).items()}, atributos_antes)
+
+    def test_produto_nao_guarda_memoria_de_sugestoes(self):
+        self.assertFalse(hasattr(HelenaPOP.instancia(), '_atividades_sugeridas'))
+        self.assertNotIn('atividades_sugeridas', POPStateMachine().to_dict())
@@ -0,0 +1,83 @@
+"""
+Testes do state store dos produtos Helena (estado compacto na sessão).
+"""
+import json
+import unittest
+from unittest.mock import patch
+
+from processos.infra import helena_state_store
+from processos.infra.helena_state_store import HelenaStateStore, codificar_estado
+from processos.infra.loaders.registro_referencia import congelar
+
+SISTEMAS = {'Pessoal': ['SIAPE', 'SIGEPE'], 'Documentos': ['SEI']}
+TIPOS_GERADOS = ['Despacho', 'Nota Técnica']
+
+
+class TestHelenaStateStore(unittest.TestCase):
+
+    def setUp(self):
+        catalogos = {
+            **helena_state_store.CATALOGOS,
+            'sistemas': lambda: congelar(SISTEMAS),
+            'tipos_documentos_requeridos': lambda: congelar(['Requerimento']),
+            'tipos_documentos_gerados': lambda: congelar(TIPOS_GERADOS),
+        }
+        patcher = patch.dict(helena_state_store.CATALOGOS, catalogos)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.session = {}
+        self.store = HelenaStateStore(self.session)
+        self.estado = {
+            'estado': 'etapa_docs_gerados',
+            'nome_usuario': 'Maria',
+            'dados_coletados': {'sistemas': ['SEI'], 'operadores': ['Analista']},
+            'tipo_interface': 'docs_gerados_etapa',
+            'dados_interface': {
+                'numero_etapa': 3,
+                'modo': 'gerados',
+                'tipos_documentos': list(TIPOS_GERADOS),
+                'sistemas_por_categoria': json.loads(json.dumps(SISTEMAS)),
+                'sistemas': ['SEI'],  # não é o catálogo: fica no estado
+            },
+            '_helena_modo': 'pop',
+        }
+
+    def test_ida_e_volta_sem_catalogos_no_valor(self):
+        self.assertTrue(self.store.salvar('abc', self.estado))
+
+        valor = self.session['helena_pop_state_abc']
+        self.assertIsInstance(valor, str)
+        self.assertTrue(valor.startswith('hz1:'))
+
+        compacto = helena_state_store.compactar_interface(self.estado['dados_interface'])
+        self.assertEqual(compacto['_catalogos'], {
+            'sistemas_por_categoria': 'sistemas',
+            'tipos_documentos': 'tipos_documentos_gerados',
+        })
+        self.assertEqual(compacto['sistemas'], ['SEI'])
+
+        self.assertEqual(self.store.carregar('abc'), self.estado)
+
+    def test_so_regrava_quando_o_estado_muda(self):
+        self.store.salvar('abc', self.estado)
+        valor = self.session['helena_pop_state_abc']
+
+        self.assertFalse(self.store.salvar('abc', dict(self.estado)))
+        self.assertIs(self.session['helena_pop_state_abc'], valor)
+
+        self.estado['dados_interface']['numero_etapa'] = 4
+        self.assertTrue(self.store.salvar('abc', self.estado))
+        self.assertNotEqual(self.session['helena_pop_state_abc'], valor)
+
+    def test_hash_independe_da_ordem_das_chaves(self):
+        invertido = dict(reversed(list(self.estado.items())))
+        self.assertEqual(codificar_estado(self.estado)[1], codificar_estado(invertido)[1])
+
+    def test_le_sessao_antiga_e_valor_ilegivel(self):
+        self.session['helena_pop_state_velha'] = {'estado': 'nome_usuario'}
+        self.assertEqual(self.store.carregar('velha'), {'estado': 'nome_usuario'})
+
+        self.session['helena_pop_state_ruim'] = 'hz1:0000:nao-e-zstd'
+        self.assertIsNone(self.store.carregar('ruim'))
+        self.assertIsNone(self.store.carregar('inexistente'))
@@ -0,0 +1,51 @@
+"""
+Testes do índice pré-computado da Camada 1 (match exato/fuzzy).
+"""
+import unittest
+
+from rapidfuzz import fuzz, process
+
+from processos.domain.helena_mapeamento.indice_camada1 import IndiceCamada1
+from processos.infra.loaders.arquitetura_index import ArquiteturaIndex, LinhaArquitetura
+
+
+def _linha(idx, numero, macro, processo, sub, atividade):
+    return LinhaArquitetura(idx, numero, macro, processo, sub, atividade)
+
+
+LINHAS = [
+    _linha(0, '1.1.1.1', 'Gestão de Benefícios', 'Aposentadorias', 'Análise', 'Analisar requerimento de aposentadoria'),
+    _linha(1, '1.1.1.2', 'Gestão de Benefícios', 'Aposentadorias', 'Análise', 'Implantar benefício no SIAPE'),
+    _linha(2, '7.1.1.1', 'Governança', 'Riscos', 'Controles', 'Avaliar controles internos'),
+]
+
+
+class TestIndiceCamada1(unittest.TestCase):
+
+    def setUp(self):
+        self.indice = IndiceCamada1(ArquiteturaIndex(LINHAS, csv_hash='x'))
+
+    def test_match_exato_respeita_ordem_das_colunas(self):
+        linha, coluna = self.indice.match_exato('  APOSENTADORIAS ')
+        self.assertEqual((linha.idx, coluna), (0, 'Processo'))
+        linha, coluna = self.indice.match_exato('avaliar controles internos')
+        self.assertEqual((linha.idx, coluna), (2, 'Atividade'))
+        self.assertIsNone(self.indice.match_exato(''))
+
+    def test_fuzzy_equivale_a_token_sort_ratio(self):
+        consulta = 'aposentadoria de requerimento analisar'
+        esperado = process.extractOne(consulta, [l.atividade for l in LINHAS], scorer=fuzz.token_sort_ratio)
+        linha, score, _ = self.indice.match_fuzzy(consulta)
+        self.assertEqual((linha.idx, score), (esperado[2], esperado[1]))
+
+    def test_fuzzy_abaixo_do_corte(self):
+        self.assertIsNone(self.indice.match_fuzzy('emitir certidão de tempo de contribuição'))
+
+    def test_fuzzy_filtrado_por_area(self):
+        self.assertIsNone(self.indice.match_fuzzy('avaliar controles internos', macros_area=['1']))
+        linha, _, _ = self.indice.match_fuzzy('avaliar controles internos', macros_area=['7'])
+        self.assertEqual(linha.idx, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Testes do cache de PDFs renderizados (LRU em disco, single-flight, ETag).
+"""
+import os
+import tempfile
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from processos.infra.pdf_render_cache import PDFRenderCache, definir_pdf_render_cache
+
+
+class TestPDFRenderCache(SimpleTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = PDFRenderCache(os.path.join(self.tmp.name, 'cache'), max_bytes=250, versao_gerador='2.1')
+        self.geracoes = 0
+
+    def _gerador(self, conteudo=b'%PDF' + b'x' * 96, espera=0):
+        def gerar():
+            self.geracoes += 1
+            time.sleep(espera)
+            caminho = os.path.join(self.tmp.name, f'gerado_{self.geracoes}_{threading.get_ident()}.pdf')
+            with open(caminho, 'wb') as f:
+                f.write(conteudo)
+            return caminho
+        return gerar
+
+    def test_chave_depende_do_conteudo_e_das_versoes(self):
+        dados = {'nome_processo': 'Conceder aposentadoria', 'etapas': [1, 2]}
+        chave = self.cache.chave(dados)
+        self.assertEqual(chave, self.cache.chave({'etapas': [1, 2], 'nome_processo': 'Conceder aposentadoria'}))
+        self.assertNotEqual(chave, self.cache.chave(dados, url_base='https://mapagov.app'))
+        outro_template = PDFRenderCache(self.tmp.name, versao_template='2', versao_gerador='2.1')
+        self.assertNotEqual(chave, outro_template.chave(dados))
+
+    def test_repeticao_servida_do_cache(self):
+        chave = self.cache.chave({'nome_processo': 'A'})
+        caminho, hit = self.cache.obter_ou_gerar(chave, self._gerador())
+        self.assertFalse(hit)
+        caminho2, hit2 = self.cache.obter_ou_gerar(chave, self._gerador())
+        self.assertTrue(hit2)
+        self.assertEqual(caminho, caminho2)
+        self.assertEqual(self.geracoes, 1)
+
+    def test_single_flight(self):
+        chave = self.cache.chave({'nome_processo': 'A'})
+        resultados = []
+        threads = [
+            threading.Thread(target=lambda: resultados.append(self.cache.obter_ou_gerar(chave, self._gerador(espera=0.05))))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(self.geracoes, 1)
+        self.assertEqual(len({str(c) for c, _ in resultados}), 1)
+        self.assertEqual(sum(1 for _, hit in resultados if not hit), 1)
+
+    def test_lru_remove_menos_usado(self):
+        chaves = [self.cache.chave({'n': i}) for i in range(3)]
+        self.cache.obter_ou_gerar(chaves[0], self._gerador())
+        self.cache.obter_ou_gerar(chaves[1], self._gerador())
+        caminho0 = self.cache.diretorio / f'{chaves[0]}.pdf'
+        os.utime(caminho0, (time.time() - 60, time.time() - 60))
+        os.utime(self.cache.diretorio / f'{chaves[1]}.pdf', (time.time() - 120, time.time() - 120))
+        self.cache.caminho(chaves[0])  # uso recente: renova
+
+        self.cache.obter_ou_gerar(chaves[2], self._gerador())  # 300 bytes > 250: 1 sai
+
+        self.assertIsNotNone(self.cache.caminho(chaves[0]))
+        self.assertIsNone(self.cache.caminho(chaves[1]))
+        self.assertIsNotNone(self.cache.caminho(chaves[2]))
+
+    def test_download_pdf_com_etag(self):
+        definir_pdf_render_cache(self.cache)
+        self.addCleanup(definir_pdf_render_cache, None)
+        chave = self.cache.chave({'nome_processo': 'A'})
+        self.cache.obter_ou_gerar(chave, self._gerador())
+
+        url = f'/api/download-pdf/POP_1-1_20260101.pdf/?k={chave}'
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['ETag'], f'"{chave}"')
+        self.assertEqual(b''.join(resp.streaming_content)[:4], b'%PDF')
+
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=f'"{chave}"')
+        self.assertEqual(resp.status_code, 304)
@@ -0,0 +1,56 @@
+"""
+Testes do dirty tracking do POP (save sem SELECT prévio, changelog em lote).
+"""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from processos.models import POP, POPChangeLog
+
+
+class TestPOPDirtyTracking(TestCase):
+
+    def setUp(self):
+        criado = POP.objects.create(
+            nome_processo='Conceder aposentadoria',
+            entrega_esperada='Portaria publicada',
+            etapas=[{'id': 1, 'descricao': 'Receber pedido'}],
+        )
+        self.pop = POP.objects.get(pk=criado.pk)
+
+    def test_save_sem_select_e_changelog_em_um_insert(self):
+        self.pop.nome_processo = 'Conceder pensão'
+        self.pop.etapas.append({'id': 2, 'descricao': 'Analisar'})  # mutação in-place
+
+        self.assertEqual(set(self.pop.campos_alterados()), {'nome_processo', 'etapas'})
+        with CaptureQueriesContext(connection) as queries:
+            self.pop.save()
+        sqls = [q['sql'].upper() for q in queries.captured_queries]
+        self.assertFalse(any(sql.startswith('SELECT') for sql in sqls))
+        self.assertEqual(sum('POPCHANGELOG' in sql for sql in sqls), 1)
+
+        logs = {log.field_name: log for log in POPChangeLog.objects.filter(pop=self.pop)}
+        self.assertEqual(set(logs), {'nome_processo', 'etapas'})
+        self.assertEqual(logs['nome_processo'].old_value, 'Conceder aposentadoria')
+        self.assertEqual(len(logs['etapas'].old_value), 1)
+        self.assertEqual(self.pop.campos_alterados(), [])
+
+    def test_autosave_atualiza_so_colunas_alteradas(self):
+        self.pop.autosave_sequence += 1
+        self.pop.pontos_atencao = 'Prazo legal'
+
+        with CaptureQueriesContext(connection) as queries:
+            self.pop.save_alteracoes()
+        update = next(q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE'))
+        self.assertIn('"pontos_atencao"', update)
+        self.assertIn('"autosave_sequence"', update)
+        self.assertNotIn('"etapas"', update)
+        self.assertNotIn('"entrega_esperada"', update)
+
+        recarregado = POP.objects.get(pk=self.pop.pk)
+        self.assertEqual(recarregado.pontos_atencao, 'Prazo legal')
+        self.assertEqual(recarregado.autosave_sequence, 1)
+        self.assertEqual(
+            list(POPChangeLog.objects.filter(pop=self.pop).values_list('field_name', flat=True)),
+            ['pontos_atencao'],
+        )
@@ -0,0 +1,83 @@
+"""
+Testes do cache de embeddings de query (Camada 2).
+"""
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from processos.infra.query_embedding_cache import QueryEmbeddingCache, normalizar_chave_query
+
+
+class FakeEncoder:
+    def __init__(self):
+        self.chamadas = []
+
+    def __call__(self, texto):
+        self.chamadas.append(texto)
+        return np.full(4, len(self.chamadas), dtype=np.float32)
+
+
+class TestNormalizarChaveQuery(unittest.TestCase):
+
+    def test_acentos_caixa_e_espacos(self):
+        self.assertEqual(normalizar_chave_query('  Analisar   Aposentadória '), 'analisar aposentadoria')
+
+    def test_vazio(self):
+        self.assertEqual(normalizar_chave_query(None), '')
+
+
+class TestQueryEmbeddingCache(unittest.TestCase):
+
+    def test_variacoes_reaproveitam_vetor(self):
+        cache = QueryEmbeddingCache(max_itens=10, ttl=60)
+        enc = FakeEncoder()
+        v1 = cache.obter_ou_calcular('analisar aposentadoria', enc)
+        v2 = cache.obter_ou_calcular('Analisar aposentadoria ', enc)
+        self.assertEqual(len(enc.chamadas), 1)
+        np.testing.assert_array_equal(v1, v2)
+
+    def test_vetor_somente_leitura(self):
+        cache = QueryEmbeddingCache()
+        v = cache.obter_ou_calcular('x', FakeEncoder())
+        with self.assertRaises(ValueError):
+            v[0] = 99
+
+    def test_lru_descarta_mais_antigo(self):
+        cache = QueryEmbeddingCache(max_itens=2, ttl=60)
+        enc = FakeEncoder()
+        cache.obter_ou_calcular('a', enc)
+        cache.obter_ou_calcular('b', enc)
+        cache.obter_ou_calcular('a', enc)  # 'a' vira mais recente
+        cache.obter_ou_calcular('c', enc)  # descarta 'b'
+        cache.obter_ou_calcular('a', enc)
+        self.assertEqual(enc.chamadas, ['a', 'b', 'c'])
+        cache.obter_ou_calcular('b', enc)
+        self.assertEqual(enc.chamadas, ['a', 'b', 'c', 'b'])
+
+    def test_ttl_expira(self):
+        cache = QueryEmbeddingCache(max_itens=10, ttl=5)
+        enc = FakeEncoder()
+        with patch('processos.infra.query_embedding_cache.time.monotonic', return_value=100.0):
+            cache.obter_ou_calcular('a', enc)
+        with patch('processos.infra.query_embedding_cache.time.monotonic', return_value=106.0):
+            cache.obter_ou_calcular('a', enc)
+        self.assertEqual(len(enc.chamadas), 2)
+
+    def test_lote_codifica_apenas_misses_uma_vez(self):
+        cache = QueryEmbeddingCache(max_itens=10, ttl=60)
+        cache.obter_ou_calcular('a', FakeEncoder())
+        lotes = []
+
+        def encoder_lote(textos):
+            lotes.append(list(textos))
+            return np.ones((len(textos), 4), dtype=np.float32)
+
+        vetores = cache.obter_ou_calcular_lote(['A ', 'b', 'B', 'c'], encoder_lote)
+        self.assertEqual(lotes, [['b', 'c']])
+        self.assertEqual(vetores.shape, (4, 4))
+        np.testing.assert_array_equal(vetores[0], np.full(4, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
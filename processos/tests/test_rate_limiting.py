@@ -0,0 +1,144 @@
+"""
+Testes do rate limiting (motores GCRA e decorators).
+"""
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import JsonResponse
+from django.test import RequestFactory, TestCase
+
+from processos.infra.rate_limit_engine import (
+    MotorGCRALocal,
+    MotorGCRARedis,
+    definir_motor_rate_limit,
+)
+from processos.infra.rate_limiting import RateLimiter, get_rate_limit_status, rate_limit_ip
+
+
+class RelogioFake:
+    def __init__(self, agora=1_700_000_000.0):
+        self.agora = agora
+
+    def __call__(self):
+        return self.agora
+
+
+class TestMotorGCRALocal(unittest.TestCase):
+
+    def setUp(self):
+        self.relogio = RelogioFake()
+        self.limiter = RateLimiter('rl:teste', limit=5, window=60,
+                                   motor=MotorGCRALocal(relogio=self.relogio))
+
+    def test_rajada_ate_o_limite_e_bloqueio(self):
+        restantes = [self.limiter.is_allowed('u1')[1]['remaining'] for _ in range(5)]
+        self.assertEqual(restantes, [4, 3, 2, 1, 0])
+
+        permitido, info = self.limiter.is_allowed('u1')
+        self.assertFalse(permitido)
+        self.assertEqual(info['remaining'], 0)
+        self.assertEqual(info['retry_after'], 12)  # T = 60/5
+
+        # Outro identificador não é afetado
+        self.assertTrue(self.limiter.is_allowed('u2')[0])
+
+    def test_reposicao_gradual(self):
+        for _ in range(5):
+            self.limiter.is_allowed('u1')
+        self.relogio.agora += 12
+        self.assertTrue(self.limiter.is_allowed('u1')[0])
+        self.assertFalse(self.limiter.is_allowed('u1')[0])
+
+        self.relogio.agora += 60
+        self.assertEqual(self.limiter.is_allowed('u1')[1]['remaining'], 4)
+
+    def test_status_nao_consome_e_reset(self):
+        self.limiter.is_allowed('u1')
+        status = get_rate_limit_status('u1', self.limiter)
+        self.assertEqual(status['remaining'], 4)
+        self.assertEqual(status['requests_count'], 1)
+        self.assertEqual(get_rate_limit_status('u1', self.limiter)['remaining'], 4)
+
+        self.limiter.reset('u1')
+        self.assertEqual(self.limiter.status('u1')[1]['remaining'], 5)
+
+    def test_threads_concorrentes_respeitam_limite(self):
+        limiter = RateLimiter('rl:teste', limit=50, window=3600, motor=MotorGCRALocal())
+        permitidos = []
+        barreira = threading.Barrier(8)
+
+        def worker():
+            barreira.wait()
+            for _ in range(25):
+                if limiter.is_allowed('u1')[0]:
+                    permitidos.append(1)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(permitidos), 50)
+
+    def test_varredura_remove_chaves_expiradas(self):
+        motor = MotorGCRALocal(max_chaves=3, relogio=self.relogio)
+        for i in range(3):
+            motor.consumir(f'k{i}', 10, 1)
+        self.relogio.agora += 5
+        motor.consumir('k3', 10, 1)
+        motor.consumir('k4', 10, 1)
+        self.assertEqual(sorted(motor._tat), ['k3', 'k4'])
+
+
+class TestMotorGCRARedis(unittest.TestCase):
+
+    def test_decisao_do_script_e_fallback_local(self):
+        client = MagicMock()
+        script = client.register_script.return_value
+        script.return_value = [1, 24_000_000, 0]  # TAT' = agora + 24s
+
+        limiter = RateLimiter('rl:teste', limit=5, window=60, motor=MotorGCRARedis(client))
+        permitido, info = limiter.is_allowed('u1')
+        self.assertTrue(permitido)
+        self.assertEqual(info['remaining'], 3)
+        script.assert_called_once_with(keys=['rl:teste:u1'], args=[12_000_000, 60_000_000, 1])
+
+        script.return_value = [0, 60_000_000, 7_500_000]
+        permitido, info = limiter.is_allowed('u1')
+        self.assertFalse(permitido)
+        self.assertEqual(info['retry_after'], 8)
+
+        # Redis fora: motor local decide (continua limitando)
+        script.side_effect = ConnectionError('down')
+        resultados = [limiter.is_allowed('u9')[0] for _ in range(6)]
+        self.assertEqual(resultados, [True] * 5 + [False])
+
+
+class TestDecoratorRateLimit(TestCase):
+
+    def setUp(self):
+        definir_motor_rate_limit(MotorGCRALocal())
+        self.addCleanup(definir_motor_rate_limit, None)
+
+    def test_headers_e_429(self):
+        @rate_limit_ip(limit=2, window=60)
+        def view(request):
+            return JsonResponse({'ok': True})
+
+        def chamar():
+            request = RequestFactory().get('/api/teste/', REMOTE_ADDR='10.0.0.1')
+            request.user = AnonymousUser()
+            return view(request)
+
+        r1 = chamar()
+        self.assertEqual(r1.status_code, 200)
+        self.assertEqual(r1['X-RateLimit-Limit'], '2')
+        self.assertEqual(r1['X-RateLimit-Remaining'], '1')
+        self.assertEqual(chamar()['X-RateLimit-Remaining'], '0')
+
+        r3 = chamar()
+        self.assertEqual(r3.status_code, 429)
+        self.assertEqual(r3['Retry-After'], '30')
+        self.assertIn('X-RateLimit-Reset', r3)
@@ -0,0 +1,77 @@
+"""
+Testes do cache de permissões RBAC (hierarquia achatada + invalidação por versão).
+"""
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from processos.infra.rbac_cache import get_rbac_cache
+from processos.models_new.orgao import Orgao
+from processos.models_new.rbac import (
+    Permission,
+    Role,
+    RolePermission,
+    UserRole,
+    get_user_permissions,
+    user_has_permission,
+)
+
+
+class TestRBACCache(TestCase):
+
+    def setUp(self):
+        get_rbac_cache().invalidar()
+        RolePermission.objects.all().delete()  # descarta o seed da migration
+        self.orgao = Orgao.objects.create(codigo='RB1', nome='Órgão RBAC', sigla='ORB')
+        self.user = User.objects.create_user('analista_rbac', password='x')
+
+        self.gestor = Role.objects.get_or_create(nome='gestor')[0]
+        self.analista = Role.objects.get_or_create(nome='analista')[0]
+        self.visualizador = Role.objects.get_or_create(nome='visualizador')[0]
+
+        self.ver = self._permissao('processo.visualizar')
+        self.editar = self._permissao('processo.editar')
+        self.excluir = self._permissao('processo.excluir')
+
+        RolePermission.objects.create(role=self.visualizador, permission=self.ver)
+        RolePermission.objects.create(role=self.analista, permission=self.editar)
+        RolePermission.objects.create(role=self.gestor, permission=self.excluir)
+
+        self.user_role = UserRole.objects.create(user=self.user, role=self.analista, orgao=self.orgao)
+
+    def _permissao(self, codigo):
+        recurso, acao = codigo.split('.')
+        return Permission.objects.get_or_create(
+            codigo=codigo, defaults={'nome': codigo, 'recurso': recurso, 'acao': acao}
+        )[0]
+
+    def test_hierarquia_achatada(self):
+        self.assertEqual(Role.roles_efetivas('admin_orgao'), {'admin_orgao', 'gestor', 'analista', 'visualizador'})
+        self.assertEqual(
+            get_user_permissions(self.user, self.orgao),
+            ['processo.editar', 'processo.visualizar'],
+        )
+        self.assertTrue(user_has_permission(self.user, 'processo.visualizar', self.orgao))
+        self.assertFalse(user_has_permission(self.user, 'processo.excluir', self.orgao))
+
+    def test_checagens_seguintes_nao_consultam_o_banco(self):
+        user_has_permission(self.user, 'processo.editar', self.orgao)
+        with self.assertNumQueries(0):
+            for codigo in ('processo.editar', 'processo.visualizar', 'processo.excluir'):
+                user_has_permission(self.user, codigo, self.orgao)
+            get_user_permissions(self.user, self.orgao)
+
+    def test_mudancas_de_rbac_invalidam(self):
+        self.assertFalse(user_has_permission(self.user, 'processo.excluir', self.orgao))
+
+        promocao = UserRole.objects.create(user=self.user, role=self.gestor, orgao=self.orgao)
+        self.assertTrue(user_has_permission(self.user, 'processo.excluir', self.orgao))
+
+        promocao.delete()
+        self.assertFalse(user_has_permission(self.user, 'processo.excluir', self.orgao))
+
+        RolePermission.objects.create(role=self.analista, permission=self.excluir)
+        self.assertTrue(user_has_permission(self.user, 'processo.excluir', self.orgao))
+
+        self.user_role.ativo = False
+        self.user_role.save()
+        self.assertEqual(get_user_permissions(self.user, self.orgao), [])
@@ -0,0 +1,99 @@
+"""
+Testes do registro de dados de referência (CSVs de documentos_base/).
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from processos.infra.loaders.registro_referencia import (
+    RegistroReferencia, congelar, descongelar, igual_aos_dados,
+)
+
+
+class TestRegistroReferencia(unittest.TestCase):
+
+    def setUp(self):
+        self.base = tempfile.mkdtemp()
+        self.csv = os.path.join(self.base, 'operadores.csv')
+        self._gravar('nome\nAnalista\n')
+        self.leituras = []
+
+    def tearDown(self):
+        shutil.rmtree(self.base, ignore_errors=True)
+
+    def _gravar(self, conteudo, mtime=None):
+        with open(self.csv, 'w', encoding='utf-8') as f:
+            f.write(conteudo)
+        if mtime is not None:
+            os.utime(self.csv, ns=(mtime, mtime))
+
+    def _leitor(self, caminho):
+        self.leituras.append(caminho)
+        with open(caminho, encoding='utf-8') as f:
+            return {'nomes': f.read().split()[1:]}
+
+    def test_le_uma_vez_e_snapshot_imutavel(self):
+        registro = RegistroReferencia(intervalo_rechecagem=0)
+        s1 = registro.obter('operadores', self.csv, self._leitor)
+        s2 = registro.obter('operadores', self.csv, self._leitor)
+        self.assertIs(s1, s2)
+        self.assertEqual(len(self.leituras), 1)
+        with self.assertRaises(TypeError):
+            s1.dados['nomes'] = []
+        copia = descongelar(s1.dados)
+        copia['nomes'].append('x')
+        self.assertEqual(descongelar(s1.dados), {'nomes': ['Analista']})
+
+    def test_recarrega_so_quando_conteudo_muda(self):
+        registro = RegistroReferencia(intervalo_rechecagem=0)
+        s1 = registro.obter('operadores', self.csv, self._leitor)
+
+        self._gravar('nome\nAnalista\n', mtime=10**18)  # touch
+        self.assertIs(registro.obter('operadores', self.csv, self._leitor), s1)
+
+        self._gravar('nome\nAnalista\nCoordenador\n')
+        s2 = registro.obter('operadores', self.csv, self._leitor)
+        self.assertEqual(s2.versao, 2)
+        self.assertEqual(s2.dados['nomes'], ('Analista', 'Coordenador'))
+        self.assertEqual(len(self.leituras), 2)
+
+    def test_intervalo_de_rechecagem(self):
+        registro = RegistroReferencia(intervalo_rechecagem=60)
+        with patch('processos.infra.loaders.registro_referencia.time.monotonic', return_value=100.0):
+            registro.obter('operadores', self.csv, self._leitor)
+            self._gravar('nome\nOutro\n')
+            with patch('processos.infra.loaders.registro_referencia.os.stat') as stat:
+                registro.obter('operadores', self.csv, self._leitor)
+                stat.assert_not_called()
+        self.assertEqual(len(self.leituras), 1)
+
+    def test_comparacao_com_snapshot_sem_descongelar(self):
+        congelado = congelar({'Pessoal': ['SIAPE'], 'Docs': [{'tipo': 'SEI'}]})
+        self.assertTrue(igual_aos_dados({'Pessoal': ['SIAPE'], 'Docs': [{'tipo': 'SEI'}]}, congelado))
+        self.assertFalse(igual_aos_dados({'Pessoal': ['SIAPE']}, congelado))
+        self.assertFalse(igual_aos_dados({'Pessoal': 'SIAPE', 'Docs': [{'tipo': 'SEI'}]}, congelado))
+        self.assertFalse(igual_aos_dados(['SIAPE'], congelar(['SIAPE', 'SEI'])))
+
+
+class TestLeituraSemCopia(unittest.TestCase):
+
+    def test_propriedades_do_helena_pop_compartilham_o_snapshot(self):
+        from processos.domain.helena_mapeamento.helena_pop import HelenaPOP
+        from processos.infra.loaders import carregar_sistemas
+
+        helena = HelenaPOP()
+        self.assertIs(helena.SISTEMAS_DECIPEX, helena.SISTEMAS_DECIPEX)
+        self.assertIs(helena.AREAS_DECIPEX, helena.AREAS_DECIPEX)
+        with self.assertRaises(TypeError):
+            helena.SISTEMAS_DECIPEX['Novo'] = ()
+
+        # Quem guarda/altera recebe cópia própria
+        copia = carregar_sistemas()
+        self.assertIsNot(copia, carregar_sistemas())
+        self.assertTrue(igual_aos_dados(copia, helena.SISTEMAS_DECIPEX))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Testes do RLSMiddleware nos modos combinado/adiado (1 set_config por mudança).
+"""
+import unittest
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from processos.infra.rls_middleware import (
+    CONTEXTO_VAZIO,
+    SQL_DEFINIR_CONTEXTO,
+    ContextoRLSAdiado,
+    RLSMiddleware,
+    _marcar_conexao_limpa,
+    aplicar_contexto,
+)
+
+
+class ConexaoFake:
+    def __init__(self):
+        self._rls_contexto = CONTEXTO_VAZIO
+        self.in_atomic_block = False
+        self.callbacks = []
+
+    def on_commit(self, func):
+        self.callbacks.append(func)
+
+
+class ConexaoReabrivel(ConexaoFake):
+    """Conexão que pode ser fechada; reabrir dispara connection_created."""
+    vendor = 'postgresql'
+
+    def __init__(self):
+        super().__init__()
+        self.aberta = False
+        self.cursor_real = MagicMock()
+
+    def fechar(self):
+        self.aberta = False  # a marca _rls_contexto fica no wrapper
+
+    @contextmanager
+    def cursor(self):
+        if not self.aberta:
+            self.aberta = True
+            _marcar_conexao_limpa(sender=None, connection=self)
+        yield self.cursor_real
+
+
+class TestAplicarContexto(unittest.TestCase):
+
+    def test_um_statement_so_quando_o_contexto_muda(self):
+        conexao, cursor = ConexaoFake(), MagicMock()
+
+        self.assertFalse(aplicar_contexto(conexao, CONTEXTO_VAZIO, cursor))
+        self.assertTrue(aplicar_contexto(conexao, ('7', 'false'), cursor))
+        self.assertFalse(aplicar_contexto(conexao, ('7', 'false'), cursor))
+        self.assertTrue(aplicar_contexto(conexao, ('9', 'true'), cursor))
+
+        self.assertEqual(cursor.execute.call_count, 2)
+        cursor.execute.assert_called_with(SQL_DEFINIR_CONTEXTO, ['9', 'true'])
+
+    def test_em_transacao_so_marca_apos_commit(self):
+        conexao, cursor = ConexaoFake(), MagicMock()
+        conexao.in_atomic_block = True
+
+        aplicar_contexto(conexao, ('7', 'false'), cursor)
+        self.assertIsNone(conexao._rls_contexto)
+        aplicar_contexto(conexao, ('7', 'false'), cursor)  # rollback poderia ter desfeito
+        self.assertEqual(cursor.execute.call_count, 2)
+
+        conexao.callbacks[-1]()
+        self.assertEqual(conexao._rls_contexto, ('7', 'false'))
+
+
+class TestContextoAdiado(unittest.TestCase):
+
+    def test_resolve_e_aplica_na_primeira_query(self):
+        conexao, cursor = ConexaoFake(), MagicMock()
+        resolver = MagicMock(return_value=('3', 'false'))
+        wrapper = ContextoRLSAdiado(resolver)
+        execute = MagicMock(return_value='ok')
+        context = {'connection': conexao, 'cursor': SimpleNamespace(cursor=cursor)}
+
+        for _ in range(3):
+            self.assertEqual(wrapper(execute, 'SELECT 1', None, False, context), 'ok')
+
+        resolver.assert_called_once()
+        cursor.execute.assert_called_once_with(SQL_DEFINIR_CONTEXTO, ['3', 'false'])
+        self.assertEqual(execute.call_count, 3)
+
+
+@override_settings(RLS_SETUP_MODE='combinado', RLS_ORGAO_CACHE_SECONDS=300)
+class TestOrgaoEmCacheNaSessao(SimpleTestCase):
+
+    def setUp(self):
+        self.middleware = RLSMiddleware(lambda request: None)
+        self.middleware._get_user_orgao_id = MagicMock(return_value=5)
+
+    def _request(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        request.session = {}
+        return request
+
+    def test_contexto_usa_orgao_da_sessao(self):
+        user = SimpleNamespace(pk=1, id=1, username='ana', is_authenticated=True, is_superuser=False)
+        request = self._request(user)
+
+        self.assertEqual(self.middleware._contexto_da_requisicao(request), ('5', 'false'))
+        self.assertEqual(self.middleware._contexto_da_requisicao(request), ('5', 'false'))
+        self.middleware._get_user_orgao_id.assert_called_once()
+
+        # Sessão de outro usuário não reaproveita o órgão
+        request.user = SimpleNamespace(pk=2, id=2, username='bia', is_authenticated=True, is_superuser=True)
+        self.assertEqual(self.middleware._contexto_da_requisicao(request), ('5', 'true'))
+        self.assertEqual(self.middleware._get_user_orgao_id.call_count, 2)
+
+        self.assertEqual(self.middleware._contexto_da_requisicao(self._request(AnonymousUser())), CONTEXTO_VAZIO)
+
+    def test_conexao_reaberta_recebe_contexto_de_novo(self):
+        conexao = ConexaoReabrivel()
+        user = SimpleNamespace(pk=1, id=1, username='ana', is_authenticated=True, is_superuser=False)
+
+        with patch('processos.infra.rls_middleware.connection', conexao):
+            middleware = RLSMiddleware(lambda request: None)
+            middleware._get_user_orgao_id = MagicMock(return_value=5)
+
+            middleware(self._request(user))
+            middleware(self._request(user))
+            self.assertEqual(conexao.cursor_real.execute.call_count, 1)
+
+            # CONN_MAX_AGE/erro fecha a conexão entre duas requisições do mesmo usuário
+            conexao.fechar()
+            middleware(self._request(user))
+
+        self.assertEqual(conexao.cursor_real.execute.call_count, 2)
+        conexao.cursor_real.execute.assert_called_with(SQL_DEFINIR_CONTEXTO, ['5', 'false'])
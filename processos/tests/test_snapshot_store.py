@@ -0,0 +1,155 @@
+"""
+Testes do armazenamento de POPSnapshot / PopVersion em blobs endereçados
+por conteúdo (keyframe/delta, deduplicação, GC e verificação).
+"""
+import io
+import os
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError
+from django.test import TestCase
+
+from processos.infra.snapshot_store import comprimir, get_snapshot_store
+from processos.models import POP, PayloadBlob, POPSnapshot
+
+
+class TestSnapshotStore(TestCase):
+
+    def setUp(self):
+        self.pop = POP.objects.create(
+            nome_processo='Conceder aposentadoria',
+            entrega_esperada='Portaria publicada',
+            etapas=[{'id': i, 'descricao': f'Etapa {i} do processo de aposentadoria'} for i in range(30)],
+        )
+
+    def _historico(self, n):
+        for v in range(n):
+            self.pop.etapas[v % 30]['descricao'] += f' (rev {v})'
+            self.pop.create_snapshot()
+
+    def test_cadeia_keyframe_a_cada_intervalo(self):
+        self._historico(25)
+
+        snaps = list(self.pop.snapshots.order_by('sequence').select_related('blob'))
+        self.assertEqual([i for i, s in enumerate(snaps) if s.blob.formato == 'keyframe'], [0, 10, 20])
+        for snap in snaps:
+            self.assertIsNone(snap.payload)
+            if snap.blob.formato == 'delta':
+                self.assertEqual(snap.blob.base.formato, 'keyframe')
+
+    def test_reconstrucao_igual_ao_original_e_menor(self):
+        for v in range(12):
+            self.pop.etapas[v]['descricao'] = f'Revisada {v}'
+            self.pop.create_snapshot()
+
+        for snap in POPSnapshot.objects.filter(pop=self.pop):
+            payload = snap.obter_payload()
+            self.assertEqual(payload['etapas'][snap.sequence - 1]['descricao'], f'Revisada {snap.sequence - 1}')
+            self.assertEqual(payload['uuid'], str(self.pop.uuid))
+
+        delta = POPSnapshot.objects.get(pop=self.pop, sequence=2).blob
+        self.assertEqual(delta.formato, 'delta')
+        self.assertLess(len(delta.dados_zstd), delta.tamanho / 10)
+
+    def test_insert_que_falha_nao_deixa_referencia(self):
+        self.pop.create_snapshot()
+        blob = POPSnapshot.objects.get(pop=self.pop).blob
+
+        payload = POPSnapshot.objects.get(pop=self.pop).obter_payload()
+        with self.assertRaises(IntegrityError):
+            POPSnapshot.criar_com_payload(payload, {'pop': self.pop}, pop=self.pop, sequence=2, versao=None)
+        with self.assertRaises(IntegrityError):
+            POPSnapshot.criar_com_payload({'novo': True}, {'pop': self.pop}, pop=self.pop, sequence=2, versao=None)
+
+        blob.refresh_from_db()
+        self.assertEqual(blob.referencias, 1)
+        self.assertEqual(PayloadBlob.objects.count(), 1)
+
+    def test_estados_identicos_compartilham_blob(self):
+        self.pop.create_snapshot()
+        self.pop.create_snapshot()  # save sem mudança
+        self.pop.etapas[0]['descricao'] = 'Alterada'
+        self.pop.create_snapshot()
+        self.pop.etapas[0]['descricao'] = 'Etapa 0 do processo de aposentadoria'
+        self.pop.create_snapshot()  # volta ao estado inicial
+
+        blobs = list(self.pop.snapshots.order_by('sequence').values_list('blob_id', flat=True))
+        self.assertEqual(blobs[0], blobs[1])
+        self.assertEqual(blobs[0], blobs[3])
+        self.assertEqual(PayloadBlob.objects.count(), 2)
+        self.assertEqual(PayloadBlob.objects.get(pk=blobs[0]).referencias, 4)  # 3 linhas + 1 delta
+
+    def test_compact_snapshots_converte_legados(self):
+        for v in range(5):
+            POPSnapshot.objects.create(
+                pop=self.pop, sequence=v + 1, versao=1, integrity_hash='x',
+                payload={'nome_processo': 'Legado', 'etapas': self.pop.etapas, 'rev': v % 4},
+            )
+
+        call_command('compact_snapshots', stdout=io.StringIO())
+
+        snaps = list(self.pop.snapshots.order_by('sequence').select_related('blob'))
+        self.assertEqual([s.blob.formato for s in snaps], ['keyframe'] + ['delta'] * 3 + ['keyframe'])
+        self.assertEqual(snaps[0].blob_id, snaps[4].blob_id)
+        for v, snap in enumerate(snaps):
+            self.assertIsNone(snap.payload)
+            self.assertEqual(snap.obter_payload()['rev'], v % 4)
+
+    def test_cleanup_e_gc_preservam_keyframe_de_delta_vivo(self):
+        self._historico(15)
+        for snap in self.pop.snapshots.all():
+            POPSnapshot.objects.filter(pk=snap.pk).update(created_at=f'2020-01-{snap.sequence:02d}T00:00:00Z')
+
+        call_command('cleanup_pops', keep_last=3, stdout=io.StringIO())
+        self.assertEqual(list(self.pop.snapshots.order_by('sequence').values_list('sequence', flat=True)), [13, 14, 15])
+
+        removidos, _ = get_snapshot_store().coletar_lixo(carencia=timedelta(0))
+        self.assertEqual(removidos, 12 - 1)  # blobs 1..12 exceto o keyframe 11 (base dos deltas 13..15)
+        self.assertEqual(PayloadBlob.objects.count(), 4)
+        for snap in self.pop.snapshots.all():
+            self.assertEqual(snap.obter_payload()['uuid'], str(self.pop.uuid))
+
+        resultado = get_snapshot_store().verificar()
+        self.assertEqual(resultado['corrompidos'], [])
+        self.assertEqual(resultado['referencias_divergentes'], {})
+
+    def test_verify_blobs_detecta_corrupcao_e_corrige_referencias(self):
+        self._historico(2)
+        keyframe = PayloadBlob.objects.get(formato='keyframe')
+        PayloadBlob.objects.filter(pk=keyframe.pk).update(referencias=7)
+
+        call_command('verify_blobs', fix_refcounts=True, stdout=io.StringIO())
+        self.assertEqual(PayloadBlob.objects.get(pk=keyframe.pk).referencias, 2)
+
+        PayloadBlob.objects.filter(pk=keyframe.pk).update(dados_zstd=comprimir({'adulterado': True}))
+        with self.assertRaises(CommandError):
+            call_command('verify_blobs', stdout=io.StringIO())
+
+    def test_backup_db_exporta_blobs_e_snapshot_e_reconstruido(self):
+        self._historico(15)
+        call_command('cleanup_pops', keep_last=3, stdout=io.StringIO())  # sobram deltas de um keyframe sem linha
+        originais = {s.sequence: s.obter_payload() for s in self.pop.snapshots.all()}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            anterior = os.getcwd()
+            os.chdir(tmp)
+            try:
+                call_command('backup_db', no_upload=True, stdout=io.StringIO())
+            finally:
+                os.chdir(anterior)
+            arquivos = {p.name.split('_2')[0]: str(p) for p in Path(tmp).rglob('*.json')}
+
+            POP.objects.all().delete()
+            PayloadBlob.objects.filter(formato='delta').delete()
+            PayloadBlob.objects.all().delete()
+            call_command(
+                'loaddata', arquivos['payload_blobs'], arquivos['pops'], arquivos['pop_snapshots'],
+                stdout=io.StringIO(),
+            )
+
+        snaps = POPSnapshot.objects.filter(pop__uuid=self.pop.uuid)
+        self.assertEqual({s.sequence: s.obter_payload() for s in snaps}, originais)
+        self.assertEqual(get_snapshot_store().verificar()['corrompidos'], [])
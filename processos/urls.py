@@ -10,9 +10,11 @@ from processos.api import analise_riscos_api as ar_api  # Analise de Riscos API
 from processos.api import analise_riscos_export as ar_export  # Exportacao Word/PDF
 from processos.api.catalogo_api import AreaViewSet, POPViewSet, pop_por_area_codigo, resolve_pop
 from processos.api.catalogo_pdf import gerar_pdf_catalogo
+from processos.api.export_jobs_api import status_export_job, resultado_export_job
 from processos.api.catalogo_search import search_pops
 from processos.api.catalogo_stats import stats_global, stats_area
 from processos.api.produtos_busca_api import buscar_por_codigo  # Busca unificada SNI
+from processos.api.busca_atividade_api import classificar_lote  # Classificação em lote (Camadas 1-2)
 from processos.api import auth_api, admin_api  # Auth & Access Control
 from processos.infra import metrics  # FASE 3 - Prometheus Metrics
 from processos.infra.health import health_check  # Health check endpoint
@@ -127,6 +129,8 @@ urlpatterns = [
 
     path('api/gerar-pdf-pop/', views.gerar_pdf_pop, name='gerar_pdf_pop'),
     path('api/download-pdf/<str:nome_arquivo>/', views.download_pdf, name='download_pdf'),
+    path('api/export-jobs/<uuid:job_id>/', status_export_job, name='status_export_job'),
+    path('api/export-jobs/<uuid:job_id>/resultado/', resultado_export_job, name='resultado_export_job'),
     path('api/validar-dados-pop/', views.validar_dados_pop, name='validar_dados_pop'),
     # path('api/validar-codigo-processo/', views.validar_codigo_processo, name='validar_codigo_processo'),  # View não existe
 
@@ -171,6 +175,11 @@ urlpatterns = [
     # ============================================================================
     path('api/produtos/busca/', buscar_por_codigo, name='busca-codigo'),
 
+    # ============================================================================
+    # BUSCA DE ATIVIDADES EM LOTE — Camadas 1 (exato/fuzzy) e 2 (semântica)
+    # ============================================================================
+    path('api/busca-atividade/lote/', classificar_lote, name='busca-atividade-lote'),
+
     # ============================================================================
     # AUTH API — Registro, Login, Verificação, Senha
     # ============================================================================
@@ -407,7 +407,11 @@ class PDFGenerator:
     Gerador de PDF para Procedimentos Operacionais Padrão (POP)
     Versão 2.1 - Com paginação corrigida, metadados e QR Code funcional
     """
-    
+
+    # Entra na chave do cache de PDFs (infra/pdf_render_cache.py): mudar a
+    # renderização exige novo valor
+    VERSAO = '2.1'
+
     COR_AZUL_GOVBR = colors.HexColor(CORES['azul_primario'])
     COR_AZUL_CLARO = colors.HexColor(CORES['azul_claro'])
     COR_CINZA_CLARO = colors.HexColor(CORES['cinza_fundo'])
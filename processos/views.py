@@ -8,7 +8,7 @@ import time
 import uuid as uuid_mod
 from datetime import datetime
 from dotenv import load_dotenv
-from django.http import JsonResponse, HttpResponse
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.conf import settings
 import pypdf
@@ -19,6 +19,8 @@ MAX_PDF_SIZE = 20 * 1024 * 1024
 PDF_MAGIC_BYTES = b'%PDF'
 
 from .models import POP, PopDraft
+from processos.api.export_jobs_api import responder_export_assincrono
+from processos.infra.export_jobs import pedido_assincrono
 
 # Logger
 logger = logging.getLogger(__name__)
@@ -110,19 +112,21 @@ def chat_api_view(request):
             # OTIMIZACAO: Import lazy - so carrega quando necessario
             from .domain.helena_mapeamento.helena_pop import HelenaPOP, POPStateMachine
             from .domain.helena_mapeamento.helena_etapas import HelenaEtapas
+            from .infra.helena_state_store import HelenaStateStore
 
             # FIX: Usar session_id do frontend para criar chave unica
-            session_key = f'helena_pop_state_{session_id}'
+            # Estado compacto/comprimido na sessão (helena_state_store)
+            state_store = HelenaStateStore(request.session)
             sid_tail = str(session_id)[-6:]
 
             # Obter ou criar session_data (dicionário serializado)
-            if session_key not in request.session or not request.session.get(session_key):
+            session_data = state_store.carregar(session_id)
+            if not session_data:
                 # Primeira mensagem - criar novo state machine vazio
                 session_data = POPStateMachine().to_dict()
-                logger.debug(f"[SESSAO] Nova sessão criada: {session_key}")
+                logger.debug(f"[SESSAO] Nova sessão criada: {state_store.chave(session_id)}")
             else:
                 # Mensagens seguintes - usar estado existente
-                session_data = request.session[session_key]
                 logger.debug(f"[SESSAO] Restaurada: estado={session_data.get('estado')}")
 
             # ✅ ROTEADOR: Verificar modo atual (pop ou etapas)
@@ -133,11 +137,12 @@ def chat_api_view(request):
             if nome_frontend and nome_frontend.strip():
                 session_data['nome_usuario'] = nome_frontend.strip()
 
+            # Produtos stateless: instância única por processo (sem CSV/init por turno)
             if modo_inicial == MODO_ETAPAS:
-                helena = HelenaEtapas()
+                helena = HelenaEtapas.instancia()
                 resultado = helena.processar(user_message, session_data)
             else:
-                helena = HelenaPOP()
+                helena = HelenaPOP.instancia()
                 resultado = helena.processar(user_message, session_data)
 
             meta = (resultado or {}).get('metadados', {})
@@ -148,7 +153,7 @@ def chat_api_view(request):
                 session_data['_helena_modo'] = MODO_ETAPAS
                 session_data['_helena_bootstrap'] = meta.get('dados_herdados') or {}
                 try:
-                    helena_etapas = HelenaEtapas()
+                    helena_etapas = HelenaEtapas.instancia()
                     resultado = helena_etapas.processar(user_message, session_data)
                     meta = (resultado or {}).get('metadados', {})
                 except Exception as e:
@@ -178,10 +183,8 @@ def chat_api_view(request):
                 # Mesclar campos do roteador (caso tenha vindo de transição etapas->pop)
                 novo_session_data['_helena_modo'] = MODO_POP
 
-            request.session[session_key] = novo_session_data
-
-            # Forcar Django a salvar a sessao modificada
-            request.session.modified = True
+            # Só regrava se o estado mudou (hash do estado compacto)
+            state_store.salvar(session_id, novo_session_data)
 
             # ========== DRAFT: Persistir rascunho no banco ==========
             estado_atual = novo_session_data.get('estado', '')
@@ -531,6 +534,50 @@ MAX_ETAPAS_PDF = 50  # Guard: limite razoável para não travar worker
 PDF_TIMEOUT_SECONDS = 30  # Tempo máximo de geração
 
 
+def _renderizar_pdf_pop(dados_limpos, url_base):
+    """
+    PDF do POP via cache de renderização; em miss gera com timeout.
+
+    Returns:
+        (caminho do PDF ou None, chave do cache, hit)
+    """
+    import signal
+    import threading
+    from processos.infra.pdf_render_cache import get_pdf_render_cache
+
+    def _timeout_handler(signum, frame):
+        raise TimeoutError("Geração de PDF excedeu o tempo limite")
+
+    pdf_cache = get_pdf_render_cache()
+    chave = pdf_cache.chave(dados_limpos, url_base)
+
+    def _gerar():
+        generator = PDFGenerator()
+        # signal.alarm só funciona em Unix na main thread
+        usar_alarm = hasattr(signal, 'SIGALRM') and threading.current_thread() is threading.main_thread()
+        if usar_alarm:
+            old_handler = signal.signal(signal.SIGALRM, _timeout_handler)
+            signal.alarm(PDF_TIMEOUT_SECONDS)
+        try:
+            # Nome pela chave: gerações de chaves diferentes não colidem em media/pdfs
+            return generator.gerar_pop_completo(dados_limpos, f'{chave}.pdf', url_base=url_base)
+        finally:
+            if usar_alarm:
+                signal.alarm(0)
+                signal.signal(signal.SIGALRM, old_handler)
+
+    pdf_path, cache_hit = pdf_cache.obter_ou_gerar(chave, _gerar)
+    return pdf_path, chave, cache_hit
+
+
+def tarefa_pdf_pop(parametros):
+    """Tarefa de ExportJob 'pop_pdf' (ver processos/infra/export_jobs.py)."""
+    pdf_path, _, _ = _renderizar_pdf_pop(parametros['dados'], parametros.get('url_base'))
+    if not pdf_path:
+        raise RuntimeError('PDFGenerator não gerou o arquivo')
+    return pdf_path, parametros['nome_arquivo'], 'application/pdf'
+
+
 @require_http_methods(["POST"])
 def gerar_pdf_pop(request):
     """API para gerar PDF profissional do POP"""
@@ -581,27 +628,17 @@ def gerar_pdf_pop(request):
         data_str = datetime.now().strftime("%Y%m%d")
         nome_arquivo = f"POP_{codigo}_{data_str}.pdf"
 
-        # Gerar PDF com timeout
-        import signal
-
-        def _timeout_handler(signum, frame):
-            raise TimeoutError("Geração de PDF excedeu o tempo limite")
-
-        generator = PDFGenerator()
         url_base = getattr(settings, 'REACT_FRONTEND_URL', None)
 
-        # signal.alarm só funciona em Unix na main thread
-        import threading
-        usar_alarm = hasattr(signal, 'SIGALRM') and threading.current_thread() is threading.main_thread()
-        if usar_alarm:
-            old_handler = signal.signal(signal.SIGALRM, _timeout_handler)
-            signal.alarm(PDF_TIMEOUT_SECONDS)
-        try:
-            pdf_path = generator.gerar_pop_completo(dados_limpos, nome_arquivo, url_base=url_base)
-        finally:
-            if usar_alarm:
-                signal.alarm(0)
-                signal.signal(signal.SIGALRM, old_handler)
+        # Modo assíncrono (?async=1): 202 + job id, gerado pelo worker de exports
+        from processos.infra.pdf_render_cache import get_pdf_render_cache
+        pdf_cache = get_pdf_render_cache()
+        if pedido_assincrono(request, data) and not pdf_cache.caminho(pdf_cache.chave(dados_limpos, url_base)):
+            return responder_export_assincrono(request, 'pop_pdf', {
+                'dados': dados_limpos, 'url_base': url_base, 'nome_arquivo': nome_arquivo,
+            })
+
+        pdf_path, chave, cache_hit = _renderizar_pdf_pop(dados_limpos, url_base)
 
         # Verificar se PDF foi gerado
         if not pdf_path or not os.path.exists(pdf_path):
@@ -615,14 +652,14 @@ def gerar_pdf_pop(request):
 
         # Log estruturado: 1 linha por geração
         logger.info(
-            "[gerar_pdf_pop] ok codigo=%s etapas=%d size=%.1fKB time=%.2fs file=%s",
-            codigo, n_etapas_out, tamanho_kb, elapsed, nome_arquivo,
+            "[gerar_pdf_pop] ok codigo=%s etapas=%d size=%.1fKB time=%.2fs file=%s cache=%s",
+            codigo, n_etapas_out, tamanho_kb, elapsed, nome_arquivo, 'hit' if cache_hit else 'miss',
         )
 
-        # Retornar sucesso com URLs
+        # Retornar sucesso com URLs (k = chave do PDF no cache, vira o ETag)
         return JsonResponse({
             'success': True,
-            'pdf_url': f'/api/download-pdf/{nome_arquivo}',
+            'pdf_url': f'/api/download-pdf/{nome_arquivo}?k={chave}',
             'arquivo': nome_arquivo,
             'message': 'PDF gerado com sucesso!'
         })
@@ -654,6 +691,31 @@ def download_pdf(request, nome_arquivo):
         if not nome_arquivo.endswith('.pdf') or not re.match(r'^[\w\-]+\.pdf$', nome_arquivo):
             return JsonResponse({'error': 'Arquivo inválido'}, status=400)
 
+        # PDF do cache de renderização (?k=<chave>): ETag + If-None-Match
+        chave = request.GET.get('k')
+        if chave:
+            from django.utils.cache import get_conditional_response
+            from processos.infra.pdf_render_cache import get_pdf_render_cache
+
+            cache_path = get_pdf_render_cache().caminho(chave)
+            if cache_path:
+                etag = f'"{chave}"'
+                if get_conditional_response(request, etag=etag) is not None:
+                    response = HttpResponseNotModified()
+                    response['ETag'] = etag
+                    return response
+                try:
+                    response = FileResponse(
+                        open(cache_path, 'rb'), as_attachment=True,
+                        filename=nome_arquivo, content_type='application/pdf'
+                    )
+                except FileNotFoundError:  # removido pelo LRU entre caminho() e open()
+                    return JsonResponse({'error': 'Arquivo não encontrado'}, status=404)
+                response['ETag'] = etag
+                # Conteúdo endereçado pela chave: browser pode guardar, mas revalida
+                response['Cache-Control'] = 'private, no-cache'
+                return response
+
         pdf_path = os.path.join(settings.MEDIA_ROOT, 'pdfs', nome_arquivo)
 
         if not os.path.exists(pdf_path):
@@ -724,7 +786,7 @@ def consultar_rag_sugestoes(request):
         
         # Importar Helena para usar RAG
         from .domain.helena_mapeamento.helena_pop import HelenaPOP
-        helena = HelenaPOP()
+        helena = HelenaPOP.instancia()
         
         if helena.vectorstore:
             # Construir query contextual
@@ -1241,6 +1303,276 @@ def chat_recepcao_api(request):
 # API DE AUTO-SAVE - FASE 2
 # ============================================================================
 
+# Mapeamento campos do formulario (frontend) → modelo
+_AUTOSAVE_CAMPOS_DIRETOS = {
+    'macroprocesso': 'macroprocesso',
+    'codigo_processo': 'codigo_processo',
+    'nome_processo': 'nome_processo',
+    'processo_especifico': 'processo_especifico',
+    'entrega_esperada': 'entrega_esperada',
+    'dispositivos_normativos': 'dispositivos_normativos',
+    'pontos_atencao': 'pontos_atencao',
+}
+
+_AUTOSAVE_CAMPOS_JSON = {
+    'sistemas': 'sistemas_utilizados',
+    'etapas': 'etapas',
+    'documentos_utilizados': 'documentos_utilizados',
+    'fluxos_entrada': 'fluxos_entrada',
+    'fluxos_saida': 'fluxos_saida',
+}
+
+_AUTOSAVE_CAMPOS_DOCUMENTO = frozenset(['area', 'operadores', *_AUTOSAVE_CAMPOS_DIRETOS, *_AUTOSAVE_CAMPOS_JSON])
+
+
+def _documento_autosave(pop):
+    """
+    Documento do POP no formato do formulario (base dos patches do autosave delta).
+
+    Os valores são os objetos do próprio modelo (sem cópia): o patch é
+    aplicado in-place e o resultado volta ao modelo por _aplicar_campos_autosave.
+    """
+    documento = {
+        'area': {'codigo': pop.area_codigo, 'nome': pop.area_nome},
+        'operadores': pop.operadores,
+    }
+    for frontend_key, model_field in _AUTOSAVE_CAMPOS_DIRETOS.items():
+        documento[frontend_key] = getattr(pop, model_field)
+    for frontend_key, model_field in _AUTOSAVE_CAMPOS_JSON.items():
+        documento[frontend_key] = getattr(pop, model_field)
+    return documento
+
+
+def _aplicar_campos_autosave(pop, data):
+    """Copia os campos do formulario presentes em data para o POP (normalizando)."""
+    area = data.get('area')
+    if isinstance(area, dict):
+        pop.area_codigo = area.get('codigo', '')
+        pop.area_nome = area.get('nome', '')
+        # Resolver FK para Area model
+        if pop.area_codigo:
+            from processos.models import Area
+            area_obj = Area.objects.filter(codigo=pop.area_codigo).first()
+            if area_obj:
+                pop.area = area_obj
+
+    for frontend_key, model_field in _AUTOSAVE_CAMPOS_DIRETOS.items():
+        val = data.get(frontend_key)
+        if val is not None:
+            # Não salvar placeholders como codigo_processo (causa colisão UNIQUE)
+            if model_field == 'codigo_processo' and val in ('Aguardando...', ''):
+                val = None
+            setattr(pop, model_field, val)
+
+    # Campos JSON
+    for frontend_key, model_field in _AUTOSAVE_CAMPOS_JSON.items():
+        val = data.get(frontend_key)
+        if val is not None:
+            # Normalizar etapas antes de gravar (garante id, ordem, schema canonico)
+            if frontend_key == 'etapas' and isinstance(val, list):
+                from processos.domain.helena_mapeamento.normalizar_etapa import normalizar_etapas
+                val = normalizar_etapas(val)
+            setattr(pop, model_field, val)
+
+    # Operadores: frontend envia list, modelo aceita TextField
+    operadores = data.get('operadores')
+    if operadores is not None:
+        if isinstance(operadores, list):
+            pop.operadores = ', '.join(operadores)
+        else:
+            pop.operadores = str(operadores)
+
+
+def _validar_edicao_autosave(request, pop):
+    """Regras de status/setor para editar POP existente. Retorna resposta de erro ou None."""
+    if pop.pk and pop.status in ('published', 'archived'):
+        return JsonResponse({
+            'success': False,
+            'error': 'POP publicado/arquivado nao pode ser editado.'
+        }, status=400)
+
+    if pop.pk and pop.status == 'in_review':
+        # Somente tecnicos da mesma area podem editar POP em revisao
+        profile = getattr(request.user, 'profile', None) if request.user.is_authenticated else None
+        if not request.user.is_authenticated:
+            return JsonResponse({
+                'success': False,
+                'error': 'Autenticacao necessaria para editar POP em revisao.'
+            }, status=403)
+        if not request.user.is_superuser:
+            if not profile or not profile.area_id:
+                return JsonResponse({
+                    'success': False,
+                    'error': 'Usuario sem perfil/setor configurado.'
+                }, status=403)
+            if not pop.area_id:
+                return JsonResponse({
+                    'success': False,
+                    'error': 'POP sem setor vinculado.'
+                }, status=403)
+            if profile.area_id != pop.area_id:
+                return JsonResponse({
+                    'success': False,
+                    'error': 'Apenas tecnicos do mesmo setor podem editar POP em revisao.'
+                }, status=403)
+        # Registrar revisor
+        pop.reviewed_by = request.user
+    return None
+
+
+def _conflito_autosave(pop):
+    """409 com a versão atual do servidor (o cliente refaz o patch sobre ela)."""
+    return JsonResponse({
+        'success': False,
+        'error': 'CONFLICT',
+        'conflict': {
+            'server_hash': pop.integrity_hash,
+            'server_sequence': pop.autosave_sequence,
+            'server_updated_at': pop.updated_at.isoformat() if pop.updated_at else None,
+            'server_dados': pop.get_dados_completos(),
+        }
+    }, status=409)
+
+
+def _salvar_autosave(pop):
+    """
+    Incrementa sequência, grava só as colunas alteradas (retry em colisão
+    de CAP) e cria snapshot a cada 5 saves.
+
+    Returns:
+        True se criou snapshot
+    """
+    from django.db import IntegrityError, transaction
+
+    # Incrementar sequencia e timestamps
+    pop.autosave_sequence = (pop.autosave_sequence or 0) + 1
+    pop.last_autosave_at = timezone.now()
+    pop.status = pop.status or 'draft'
+
+    # Computar integrity_hash antes de salvar
+    pop.integrity_hash = pop.compute_integrity_hash()
+
+    # Save com retry em caso de colisão de codigo_processo (UniqueConstraint)
+    max_tentativas = 3
+    for tentativa in range(max_tentativas):
+        try:
+            with transaction.atomic():
+                pop.save_alteracoes()
+            break
+        except IntegrityError as e:
+            if 'unique_cap_ativo' in str(e) and pop.codigo_processo and tentativa < max_tentativas - 1:
+                cap = pop.codigo_processo
+                partes = cap.rsplit('.', 1)
+                if len(partes) == 2:
+                    try:
+                        novo_num = int(partes[1]) + 1
+                        pop.codigo_processo = f"{partes[0]}.{novo_num}"
+                    except ValueError:
+                        pop.codigo_processo = f"{cap}-{tentativa + 2}"
+                else:
+                    pop.codigo_processo = f"{cap}-{tentativa + 2}"
+                pop.integrity_hash = pop.compute_integrity_hash()
+                logger.warning(f"[AUTO-SAVE] Colisão CAP, tentativa {tentativa + 2}: {pop.codigo_processo}")
+            else:
+                raise
+
+    # Snapshot a cada 5 saves
+    snapshot_created = False
+    if pop.autosave_sequence % 5 == 0:
+        try:
+            with transaction.atomic():  # falha não invalida transação externa (_autosave_delta)
+                pop.create_snapshot(autosave=True)
+            snapshot_created = True
+            logger.info(f"[AUTO-SAVE] Snapshot criado (seq={pop.autosave_sequence})")
+        except Exception as snap_err:
+            logger.warning(f"[AUTO-SAVE] Falha ao criar snapshot: {snap_err}")
+
+    logger.info(f"[AUTO-SAVE] POP {pop.pk} salvo (seq={pop.autosave_sequence})")
+    return snapshot_created
+
+
+def _autosave_delta(request, data, pop):
+    """
+    Modo delta do autosave: patch RFC 6902 sobre o documento do formulario.
+
+    Body: {"id"|"uuid", "session_id", "base_hash": "<integrity_hash>",
+           "patch": [{"op": "replace", "path": "/etapas/3/descricao", ...}],
+           "result_hash": "<opcional>"}
+
+    O patch é aplicado sobre o documento atual (ver _documento_autosave); só
+    os campos de primeiro nível tocados pelo patch voltam ao modelo e são
+    gravados. base_hash diferente do servidor (ou result_hash diferente do
+    hash resultante) → 409 com a versão atual.
+
+    A linha do POP fica travada (select_for_update) da checagem do base_hash
+    até o save: dois patches sobre a mesma base não passam juntos.
+    """
+    from django.db import transaction
+
+    if not pop or not pop.pk:
+        return JsonResponse({
+            'success': False,
+            'error': 'Autosave delta exige POP existente (id ou uuid).'
+        }, status=400)
+
+    with transaction.atomic():
+        pop = POP.objects.select_for_update().get(pk=pop.pk)
+        return _aplicar_patch_autosave(request, data, pop)
+
+
+def _aplicar_patch_autosave(request, data, pop):
+    """Corpo do _autosave_delta, com a linha do POP já travada."""
+    import jsonpatch
+    import jsonpointer
+
+    if data.get('base_hash') != pop.integrity_hash:
+        return _conflito_autosave(pop)
+
+    erro = _validar_edicao_autosave(request, pop)
+    if erro:
+        return erro
+
+    operacoes = data['patch']
+    tocados = set()
+    try:
+        for op in operacoes:
+            for chave in ('path', 'from'):
+                if chave in op:
+                    partes = jsonpointer.JsonPointer(op[chave]).parts
+                    if not partes or partes[0] not in _AUTOSAVE_CAMPOS_DOCUMENTO:
+                        raise jsonpatch.InvalidJsonPatch(f"Caminho fora do documento: {op[chave]!r}")
+                    tocados.add(partes[0])
+        documento = jsonpatch.apply_patch(_documento_autosave(pop), operacoes, in_place=True)
+    except (jsonpatch.JsonPatchException, jsonpointer.JsonPointerException, TypeError, KeyError) as e:
+        logger.warning(f"[AUTO-SAVE] Patch invalido para POP {pop.pk}: {e}")
+        return JsonResponse({
+            'success': False,
+            'error': 'PATCH_INVALIDO',
+            'detalhe': str(e),
+        }, status=422)
+
+    _aplicar_campos_autosave(pop, {campo: documento[campo] for campo in tocados})
+
+    if data.get('result_hash') and data['result_hash'] != pop.compute_integrity_hash():
+        pop.refresh_from_db()
+        return _conflito_autosave(pop)
+
+    campos_alterados = pop.campos_alterados()
+    snapshot_created = _salvar_autosave(pop)
+
+    return JsonResponse({
+        'success': True,
+        'pop': {
+            'id': pop.pk,
+            'uuid': str(pop.uuid),
+            'autosave_sequence': pop.autosave_sequence,
+        },
+        'integrity_hash': pop.integrity_hash,
+        'snapshot_created': snapshot_created,
+        'campos_alterados': campos_alterados,
+    })
+
+
 @require_http_methods(["POST"])
 def autosave_pop(request):
     """
@@ -1259,6 +1591,9 @@ def autosave_pop(request):
         "raw_payload": "{...}",
         ...campos do formulario
     }
+
+    Modo delta (POP já existente): em vez dos campos, enviar "base_hash" e
+    "patch" (JSON Patch, RFC 6902) - ver _autosave_delta.
     """
     try:
         data = json.loads(request.body)
@@ -1283,6 +1618,9 @@ def autosave_pop(request):
         if not pop and pop_uuid:
             pop = POP.objects.filter(uuid=pop_uuid, is_deleted=False).first()
 
+        if data.get('patch') is not None:
+            return _autosave_delta(request, data, pop)
+
         if not pop:
             pop = POP.objects.filter(
                 session_id=session_id, is_deleted=False
@@ -1291,15 +1629,7 @@ def autosave_pop(request):
         # Controle de concorrência: rejeitar se hash divergiu (409 Conflict)
         client_hash = data.get('integrity_hash')
         if client_hash and pop and pop.pk and pop.integrity_hash and client_hash != pop.integrity_hash:
-            return JsonResponse({
-                'success': False,
-                'error': 'CONFLICT',
-                'conflict': {
-                    'server_hash': pop.integrity_hash,
-                    'server_sequence': pop.autosave_sequence,
-                    'server_updated_at': pop.updated_at.isoformat() if pop.updated_at else None,
-                }
-            }, status=409)
+            return _conflito_autosave(pop)
 
         # Criar se nao existe
         if not pop:
@@ -1311,142 +1641,19 @@ def autosave_pop(request):
             logger.info(f"[AUTO-SAVE] Criando novo POP para sessao {session_id}")
 
         # Validacoes de status para edicao
-        if pop.pk and pop.status in ('published', 'archived'):
-            return JsonResponse({
-                'success': False,
-                'error': 'POP publicado/arquivado nao pode ser editado.'
-            }, status=400)
-
-        if pop.pk and pop.status == 'in_review':
-            # Somente tecnicos da mesma area podem editar POP em revisao
-            profile = getattr(request.user, 'profile', None) if request.user.is_authenticated else None
-            if not request.user.is_authenticated:
-                return JsonResponse({
-                    'success': False,
-                    'error': 'Autenticacao necessaria para editar POP em revisao.'
-                }, status=403)
-            if not request.user.is_superuser:
-                if not profile or not profile.area_id:
-                    return JsonResponse({
-                        'success': False,
-                        'error': 'Usuario sem perfil/setor configurado.'
-                    }, status=403)
-                if not pop.area_id:
-                    return JsonResponse({
-                        'success': False,
-                        'error': 'POP sem setor vinculado.'
-                    }, status=403)
-                if profile.area_id != pop.area_id:
-                    return JsonResponse({
-                        'success': False,
-                        'error': 'Apenas tecnicos do mesmo setor podem editar POP em revisao.'
-                    }, status=403)
-            # Registrar revisor
-            pop.reviewed_by = request.user
+        erro = _validar_edicao_autosave(request, pop)
+        if erro:
+            return erro
 
         # Mapear campos frontend → modelo
-        area = data.get('area')
-        if isinstance(area, dict):
-            pop.area_codigo = area.get('codigo', '')
-            pop.area_nome = area.get('nome', '')
-            # Resolver FK para Area model
-            if pop.area_codigo:
-                from processos.models import Area
-                area_obj = Area.objects.filter(codigo=pop.area_codigo).first()
-                if area_obj:
-                    pop.area = area_obj
-
-        campos_diretos = {
-            'macroprocesso': 'macroprocesso',
-            'codigo_processo': 'codigo_processo',
-            'nome_processo': 'nome_processo',
-            'processo_especifico': 'processo_especifico',
-            'entrega_esperada': 'entrega_esperada',
-            'dispositivos_normativos': 'dispositivos_normativos',
-            'pontos_atencao': 'pontos_atencao',
-        }
-        for frontend_key, model_field in campos_diretos.items():
-            val = data.get(frontend_key)
-            if val is not None:
-                # Não salvar placeholders como codigo_processo (causa colisão UNIQUE)
-                if model_field == 'codigo_processo' and val in ('Aguardando...', ''):
-                    val = None
-                setattr(pop, model_field, val)
-
-        # Campos JSON
-        campos_json = {
-            'sistemas': 'sistemas_utilizados',
-            'etapas': 'etapas',
-            'documentos_utilizados': 'documentos_utilizados',
-            'fluxos_entrada': 'fluxos_entrada',
-            'fluxos_saida': 'fluxos_saida',
-        }
-        for frontend_key, model_field in campos_json.items():
-            val = data.get(frontend_key)
-            if val is not None:
-                # Normalizar etapas antes de gravar (garante id, ordem, schema canonico)
-                if frontend_key == 'etapas' and isinstance(val, list):
-                    from processos.domain.helena_mapeamento.normalizar_etapa import normalizar_etapas
-                    val = normalizar_etapas(val)
-                setattr(pop, model_field, val)
-
-        # Operadores: frontend envia list, modelo aceita TextField
-        operadores = data.get('operadores')
-        if operadores is not None:
-            if isinstance(operadores, list):
-                pop.operadores = ', '.join(operadores)
-            else:
-                pop.operadores = str(operadores)
+        _aplicar_campos_autosave(pop, data)
 
         # Raw payload para reconstrucao/debug
         raw = data.get('raw_payload')
         if raw:
             pop.raw_payload = json.loads(raw) if isinstance(raw, str) else raw
 
-        # Incrementar sequencia e timestamps
-        pop.autosave_sequence = (pop.autosave_sequence or 0) + 1
-        pop.last_autosave_at = timezone.now()
-        pop.status = pop.status or 'draft'
-
-        # Computar integrity_hash antes de salvar
-        pop.integrity_hash = pop.compute_integrity_hash()
-
-        # Save com retry em caso de colisão de codigo_processo (UniqueConstraint)
-        from django.db import IntegrityError, transaction
-        max_tentativas = 3
-        for tentativa in range(max_tentativas):
-            try:
-                with transaction.atomic():
-                    pop.save()
-                break
-            except IntegrityError as e:
-                if 'unique_cap_ativo' in str(e) and pop.codigo_processo and tentativa < max_tentativas - 1:
-                    cap = pop.codigo_processo
-                    partes = cap.rsplit('.', 1)
-                    if len(partes) == 2:
-                        try:
-                            novo_num = int(partes[1]) + 1
-                            pop.codigo_processo = f"{partes[0]}.{novo_num}"
-                        except ValueError:
-                            pop.codigo_processo = f"{cap}-{tentativa + 2}"
-                    else:
-                        pop.codigo_processo = f"{cap}-{tentativa + 2}"
-                    pop.integrity_hash = pop.compute_integrity_hash()
-                    logger.warning(f"[AUTO-SAVE] Colisão CAP, tentativa {tentativa + 2}: {pop.codigo_processo}")
-                else:
-                    raise
-
-        # Snapshot a cada 5 saves
-        snapshot_created = False
-        if pop.autosave_sequence % 5 == 0:
-            try:
-                pop.create_snapshot(autosave=True)
-                snapshot_created = True
-                logger.info(f"[AUTO-SAVE] Snapshot criado (seq={pop.autosave_sequence})")
-            except Exception as snap_err:
-                logger.warning(f"[AUTO-SAVE] Falha ao criar snapshot: {snap_err}")
-
-        logger.info(f"[AUTO-SAVE] POP {pop.pk} salvo (seq={pop.autosave_sequence})")
+        snapshot_created = _salvar_autosave(pop)
 
         return JsonResponse({
             'success': True,
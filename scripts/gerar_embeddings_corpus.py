@@ -5,173 +5,109 @@ Script para pre-computar embeddings do corpus de atividades DECIPEX
 ===============================================================================
 
 USO:
-    python scripts/gerar_embeddings_corpus.py
+    python scripts/gerar_embeddings_corpus.py             # incremental
+    python scripts/gerar_embeddings_corpus.py --completo  # regera todos os vetores
 
-SAIDA (3 arquivos):
+SAIDA (6 arquivos):
     documentos_base/corpus_embeddings.npy   - matriz float32 normalizada
     documentos_base/corpus_meta.json        - metadados de cada atividade
-    documentos_base/corpus_fingerprint.json - hash do CSV + modelo
+    documentos_base/corpus_meta_codes.npy   - metadados colunares (mmap)
+    documentos_base/corpus_meta_strings.npy - dicionario de strings (mmap)
+    documentos_base/corpus_row_hashes.npy   - hash do texto de cada linha
+    documentos_base/corpus_fingerprint.json - hash do CSV + modelo + store
 
 QUANDO RODAR:
     - Quando o CSV de atividades mudar
     - Apos adicionar novas atividades ao catalogo
-    - Commitar os 3 arquivos JUNTOS no repositorio
+    - Commitar os 6 arquivos JUNTOS no repositorio
+    - (atividades publicadas via injetar_atividade_no_csv ja atualizam o
+      corpus incrementalmente no servidor)
 
 REGRAS:
     - Ordem dos vetores == ordem do corpus_meta.json
     - Vetores ja normalizados (prontos para cosine)
-    - fingerprint permite validar alinhamento
+    - fingerprint permite validar alinhamento (secao 'store' = bytes de
+      cada arquivo mmap, validada em runtime sem ler os arquivos)
+    - Incremental: linhas com o mesmo texto reaproveitam o vetor anterior;
+      so linhas novas/alteradas passam pelo modelo
+    - Gravacao atomica, fingerprint por ultimo
 
 ===============================================================================
 """
 
-import numpy as np
-import pandas as pd
-import json
-import hashlib
+import argparse
 import os
 import sys
-from datetime import datetime
+
+import numpy as np
 
 # Adicionar raiz do projeto ao path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from processos.infra.corpus_builder import (  # noqa: E402
+    CSV_ARQUITETURA, MODELO_EMBEDDINGS, _encoder_sentence_transformer, atualizar_corpus,
+)
+from processos.infra.corpus_store import CorpusStore  # noqa: E402
 
-def calcular_hash_arquivo(filepath: str) -> str:
-    """Calcula SHA256 de um arquivo."""
-    sha256 = hashlib.sha256()
-    with open(filepath, 'rb') as f:
-        for chunk in iter(lambda: f.read(8192), b''):
-            sha256.update(chunk)
-    return sha256.hexdigest()[:16]  # Primeiros 16 chars
+ARQUIVOS = (
+    'corpus_embeddings.npy',
+    'corpus_meta.json',
+    'corpus_meta_codes.npy',
+    'corpus_meta_strings.npy',
+    'corpus_row_hashes.npy',
+    'corpus_fingerprint.json',
+)
 
 
-def gerar_embeddings():
-    """Gera embeddings do corpus e salva em 3 arquivos."""
+def gerar_embeddings(completo: bool = False):
+    """Atualiza os artefatos do corpus (incremental por padrao)."""
 
     print("=" * 70)
-    print("[EMBEDDINGS] GERADOR DE EMBEDDINGS - Helena POP v4.0")
+    print("[EMBEDDINGS] GERADOR DE EMBEDDINGS - Helena POP v4.1")
     print("=" * 70)
 
-    # Paths
-    csv_path = 'documentos_base/Arquitetura_DECIPEX_mapeada.csv'
-    embeddings_path = 'documentos_base/corpus_embeddings.npy'
-    meta_path = 'documentos_base/corpus_meta.json'
-    fingerprint_path = 'documentos_base/corpus_fingerprint.json'
-
-    model_name = 'paraphrase-multilingual-MiniLM-L12-v2'
-
-    # 1. Carregar CSV
-    print(f"\n[1] Carregando CSV: {csv_path}")
-    df = pd.read_csv(csv_path)
-    df = df.fillna('')
-    print(f"    [OK] {len(df)} atividades carregadas")
-
-    # 2. Calcular hash do CSV (para fingerprint)
-    csv_hash = calcular_hash_arquivo(csv_path)
-    print(f"    Hash do CSV: {csv_hash}")
-
-    # 3. Preparar corpus_meta.json (metadados alinhados com embeddings)
-    print("\n[2] Preparando metadados do corpus...")
-    corpus_meta = []
-    corpus_textos = []
-
-    for idx, row in df.iterrows():
-        texto = f"{row['Macroprocesso']} {row['Processo']} {row['Subprocesso']} {row['Atividade']}"
-        texto = texto.strip()
-
-        meta = {
-            'idx': int(idx),
-            'numero': str(row.get('Numero', '')).strip(),
-            'texto': texto,
-            'macroprocesso': row['Macroprocesso'],
-            'processo': row['Processo'],
-            'subprocesso': row['Subprocesso'],
-            'atividade': row['Atividade']
-        }
-        corpus_meta.append(meta)
-        corpus_textos.append(texto)
-
-    print(f"    [OK] {len(corpus_meta)} metadados preparados")
-
-    # 4. Carregar modelo
-    print("\n[3] Carregando modelo SentenceTransformer...")
-    print(f"    ({model_name})")
-    from sentence_transformers import SentenceTransformer
-    model = SentenceTransformer(model_name)
-    print("    [OK] Modelo carregado")
-
-    # 5. Gerar embeddings normalizados
-    print("\n[4] Gerando embeddings do corpus...")
-    print("    (isso pode demorar alguns segundos)")
-    embeddings = model.encode(
-        corpus_textos,
-        convert_to_numpy=True,
-        show_progress_bar=True,
-        normalize_embeddings=True  # Ja normaliza para busca por cosine
-    )
-    embeddings = embeddings.astype(np.float32)
-    print(f"    [OK] Shape: {embeddings.shape}")
-    print(f"    [OK] Dtype: {embeddings.dtype}")
-
-    # 6. Salvar corpus_embeddings.npy
-    print(f"\n[5] Salvando embeddings: {embeddings_path}")
-    np.save(embeddings_path, embeddings)
-    emb_size = os.path.getsize(embeddings_path) / (1024 * 1024)
-    print(f"    [OK] {emb_size:.2f} MB")
-
-    # 7. Salvar corpus_meta.json
-    print(f"\n[6] Salvando metadados: {meta_path}")
-    with open(meta_path, 'w', encoding='utf-8') as f:
-        json.dump(corpus_meta, f, ensure_ascii=False, indent=2)
-    meta_size = os.path.getsize(meta_path) / 1024
-    print(f"    [OK] {meta_size:.1f} KB")
-
-    # 8. Salvar corpus_fingerprint.json
-    print(f"\n[7] Salvando fingerprint: {fingerprint_path}")
-    fingerprint = {
-        'csv_path': csv_path,
-        'csv_hash': csv_hash,
-        'model_name': model_name,
-        'n_atividades': len(df),
-        'embedding_dim': int(embeddings.shape[1]),
-        'gerado_em': datetime.now().isoformat(),
-        'versao': '4.0'
-    }
-    with open(fingerprint_path, 'w', encoding='utf-8') as f:
-        json.dump(fingerprint, f, ensure_ascii=False, indent=2)
-    print("    [OK] Fingerprint salvo")
-
-    # 9. Validacao cruzada
-    print("\n[8] Validando alinhamento...")
-    assert len(corpus_meta) == embeddings.shape[0], "ERRO: metadados e embeddings desalinhados!"
-    print(f"    [OK] {len(corpus_meta)} metadados == {embeddings.shape[0]} embeddings")
-
-    # 10. Teste rapido de busca
-    print("\n[9] Teste rapido de busca...")
+    base_path = 'documentos_base'
+    encoder = _encoder_sentence_transformer(model_name=MODELO_EMBEDDINGS)
+
+    # 1. Build (incremental ou completo)
+    print(f"\n[1] Atualizando corpus a partir de: {CSV_ARQUITETURA}")
+    print(f"    Modo: {'completo' if completo else 'incremental'}")
+    stats = atualizar_corpus(base_path, CSV_ARQUITETURA, encoder=encoder, forcar=completo)
+    print(f"    [OK] {stats['n_atividades']} atividades")
+    print(f"    [OK] {stats['reaproveitados']} vetores reaproveitados, {stats['gerados']} gerados")
+    print(f"    Hash do CSV: {stats['csv_hash']}")
+
+    # 2. Validacao cruzada (mesmo caminho do runtime)
+    print("\n[2] Validando store...")
+    store = CorpusStore.abrir(base_path)
+    assert store is not None, "ERRO: store invalido apos o build!"
+    assert len(store.meta) == store.embeddings.shape[0], "ERRO: metadados e embeddings desalinhados!"
+    print(f"    [OK] {len(store.meta)} metadados == {store.embeddings.shape[0]} embeddings")
+
+    # 3. Teste rapido de busca
+    print("\n[3] Teste rapido de busca...")
     query = "demandas judiciais"
-    query_emb = model.encode(query, normalize_embeddings=True)
-    scores = np.dot(embeddings, query_emb)
-    top_idx = np.argmax(scores)
-    top_score = scores[top_idx]
-    top_meta = corpus_meta[top_idx]
+    query_emb = encoder([query])[0]
+    scores = np.dot(store.embeddings, query_emb)
+    top_idx = int(np.argmax(scores))
     print(f"    Query: '{query}'")
-    print(f"    Top match: '{top_meta['atividade']}' (score: {top_score:.3f})")
+    print(f"    Top match: '{store.meta[top_idx]['atividade']}' (score: {scores[top_idx]:.3f})")
 
     print("\n" + "=" * 70)
-    print("[OK] EMBEDDINGS GERADOS COM SUCESSO!")
+    print("[OK] EMBEDDINGS ATUALIZADOS COM SUCESSO!")
     print("=" * 70)
-    print(f"\nArquivos gerados:")
-    print(f"   1. {embeddings_path} ({emb_size:.2f} MB)")
-    print(f"   2. {meta_path} ({meta_size:.1f} KB)")
-    print(f"   3. {fingerprint_path}")
-    print(f"\nProximo passo: commitar os 3 arquivos JUNTOS")
-    print("   git add documentos_base/corpus_embeddings.npy")
-    print("   git add documentos_base/corpus_meta.json")
-    print("   git add documentos_base/corpus_fingerprint.json")
-    print("   git commit -m 'feat: embeddings pre-computados v4.0'")
+    print("\nArquivos gerados:")
+    for i, nome in enumerate(ARQUIVOS, 1):
+        print(f"   {i}. {base_path}/{nome}")
+    print(f"\nProximo passo: commitar os {len(ARQUIVOS)} arquivos JUNTOS")
+    for nome in ARQUIVOS:
+        print(f"   git add {base_path}/{nome}")
+    print("   git commit -m 'feat: embeddings pre-computados v4.1'")
     print("   git push")
 
 
 if __name__ == '__main__':
-    gerar_embeddings()
+    parser = argparse.ArgumentParser(description='Gera/atualiza embeddings do corpus DECIPEX')
+    parser.add_argument('--completo', action='store_true', help='Regera todos os vetores (ignora o build anterior)')
+    args = parser.parse_args()
+    gerar_embeddings(completo=args.completo)